@@ -4,7 +4,7 @@ from dataclasses import dataclass
 # Son objetos que se usan para transferir datos entre capas
 # Serán encargados de darle el formato deseado para la impresión en pantalla
 
-@dataclass
+@dataclass(slots=True)
 class RutinaViewDTO:
     id: int
     ID: int
@@ -12,13 +12,13 @@ class RutinaViewDTO:
     QR: str = "🔎"
     Acciones: str = "🛠️ 🗑️" # Placeholder que luego serán botones reales
 
-@dataclass
+@dataclass(slots=True)
 class InstructorViewDTO:
     id: int
     Nombre_y_Apellido: str
     Acciones: str = "🛠️ 🗑️" # Placeholder que luego serán botones reales
 
-@dataclass
+@dataclass(slots=True)
 class ClienteViewDTO:
     id: int
     Nombre_y_Apellido: str
@@ -28,3 +28,12 @@ class ClienteViewDTO:
     Fechas: str
     QR: str = "🔎"
     Acciones: str = "🛠️ 🗑️" # Placeholder que luego serán botones reales
+
+@dataclass(slots=True)
+class VencimientoViewDTO:
+    id: int
+    Nombre_y_Apellido: str
+    Rutina: str
+    Ciclo: str
+    Instructor: str
+    Vence: str
@@ -0,0 +1,149 @@
+"""
+Actualizaciones de la página agrupadas por acción.
+
+Cada page.update() le manda al cliente de Flet las diferencias de todos los controles modificados.
+Antes una sola acción (guardar, borrar, abrir una tabla) llamaba a page.update() varias veces:
+una por cada aviso, otra al cerrar el diálogo, otra por cada error de carga, una por control...
+
+Dentro de `with actualizador.accion("nombre")` (o de un método del controlador decorado con @_en_lote):
+    - refrescar(control) solo anota que hay cambios: los controles modificados viajan en el update final.
+    - avisar(mensaje) encola el aviso. Al final se muestran todos juntos en UN snackbar, que además
+      se reutiliza (antes se agregaba uno nuevo al overlay por aviso y el overlay crecía sin límite).
+    - mostrar_dialogo()/cerrar_dialogo() se aplican al final, en orden (cada uno ya actualiza la página).
+Al salir del bloque más externo se manda un único page.update(), o ninguno si no cambió nada.
+Las acciones anidadas (SendRegistro -> GetTabla) comparten el lote de la acción externa.
+
+Fuera de una acción (avisos desde hilos de fondo sin lote) cada llamada actualiza en el momento.
+
+Métricas: 'ui_acciones.<nombre>' y 'ui_updates.<nombre>' (updates enviados por esas acciones; el cociente
+es el promedio por acción). Los updates fuera de una acción suman a 'ui_updates.sin_accion'.
+Los componentes cuentan sus renderizados con contar_render() en 'ui_render.<componente>'.
+"""
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+import flet as ft
+
+from infrastructure.metrics import RegistroMetricas, metricas as metricas_globales
+
+
+def contar_render(componente: str, metricas: RegistroMetricas = None):
+    """Un renderizado más de 'componente' (se llama al principio de la función del componente)."""
+    (metricas or metricas_globales).incrementar(f"ui_render.{componente}")
+
+
+@dataclass
+class _Lote:
+    nombre: str
+    pagina: object            # None: ft.context.page, que se busca solo si hay algo para enviar
+    pendiente: bool = False   # Hay controles modificados que todavía no se enviaron
+    avisos: list = field(default_factory=list)     # [(mensaje, color)]
+    dialogos: list = field(default_factory=list)   # [("mostrar", dlg) | ("cerrar", None)] en orden
+    updates: int = 0
+
+
+class ActualizadorPagina:
+    def __init__(self, metricas: RegistroMetricas = None):
+        self.metricas = metricas or metricas_globales
+        # Flet atiende cada evento en su hilo: el lote en curso es por hilo
+        self._local = threading.local()
+        self._snacks: dict[int, ft.SnackBar] = {}  # Un snackbar reutilizable por página
+
+    def _lote(self) -> _Lote | None:
+        return getattr(self._local, "lote", None)
+
+    @contextmanager
+    def accion(self, nombre: str, pagina=None):
+        """Agrupa todo lo que pase adentro en un solo envío. 'pagina' hace falta desde hilos de fondo
+        (ft.context.page solo existe en el hilo del evento)."""
+        lote = self._lote()
+        if lote is not None:
+            yield lote  # Acción anidada: se envía con la externa
+            return
+        lote = self._local.lote = _Lote(nombre, pagina)
+        try:
+            yield lote
+        finally:
+            # También si la acción falló: los avisos de error tienen que llegar a la pantalla
+            self._local.lote = None
+            self._enviar(lote)
+            self.metricas.incrementar(f"ui_acciones.{nombre}")
+            if lote.updates:
+                self.metricas.incrementar(f"ui_updates.{nombre}", lote.updates)
+
+    # --- API para el controlador y las vistas ---
+    def refrescar(self, *controles, pagina=None):
+        """Controles modificados. En una acción se envían al final; fuera de una, ya."""
+        lote = self._lote()
+        if lote is not None:
+            lote.pendiente = True
+            return
+        if controles:
+            for control in controles:
+                control.update()
+            self.metricas.incrementar("ui_updates.sin_accion", len(controles))
+        else:
+            (pagina or ft.context.page).update()
+            self.metricas.incrementar("ui_updates.sin_accion")
+
+    def avisar(self, mensaje: str, color=None, pagina=None):
+        """Snackbar con 'mensaje'. En una acción se juntan todos los avisos en uno solo al final."""
+        lote = self._lote()
+        if lote is not None:
+            lote.avisos.append((mensaje, color))
+            return
+        with self.accion("aviso", pagina):
+            self.avisar(mensaje, color)
+
+    def mostrar_dialogo(self, dialogo, pagina=None):
+        lote = self._lote()
+        if lote is not None:
+            lote.dialogos.append(("mostrar", dialogo))
+            return
+        with self.accion("dialogo", pagina):
+            self.mostrar_dialogo(dialogo)
+
+    def cerrar_dialogo(self, pagina=None):
+        """Cierra el último diálogo abierto (page.pop_dialog)."""
+        lote = self._lote()
+        if lote is not None:
+            lote.dialogos.append(("cerrar", None))
+            return
+        with self.accion("dialogo", pagina):
+            self.cerrar_dialogo()
+
+    # --- Envío ---
+    def _snack(self, pagina) -> ft.SnackBar:
+        snack = self._snacks.get(id(pagina))
+        if snack is None:
+            snack = ft.SnackBar(ft.Text("", color=ft.Colors.WHITE))
+            pagina.overlay.append(snack)
+            self._snacks[id(pagina)] = snack
+        return snack
+
+    def _enviar(self, lote: _Lote):
+        if not (lote.avisos or lote.dialogos or lote.pendiente):
+            return  # Nada para mostrar (por ejemplo, GetTabla desde un benchmark, sin página)
+        # Mismo hilo que abrió la acción: si es el de un evento, ft.context.page está disponible
+        pagina = lote.pagina or ft.context.page
+        if lote.avisos:
+            snack = self._snack(pagina)
+            snack.content.value = "\n".join(mensaje for mensaje, _ in lote.avisos)
+            # Si alguno es de error, el color del error; si no, el del último aviso
+            colores = [color for _, color in lote.avisos]
+            snack.bgcolor = ft.Colors.RED_700 if ft.Colors.RED_700 in colores else colores[-1]
+            snack.open = True
+            lote.pendiente = True
+        for operacion, dialogo in lote.dialogos:
+            # show_dialog/pop_dialog ya actualizan la página: se llevan los cambios pendientes
+            if operacion == "mostrar":
+                pagina.show_dialog(dialogo)
+            else:
+                pagina.pop_dialog()
+            lote.updates += 1
+            lote.pendiente = False
+        if lote.pendiente:
+            pagina.update()
+            lote.updates += 1
@@ -0,0 +1,5 @@
+import flet as ft
+
+# Controlador (y estado) de la sesión. En modo web cada pestaña es una sesión con el suyo:
+# main.py lo crea por página y lo provee con este contexto (el servicio, en cambio, es uno solo).
+GymControllerContext = ft.create_context(None)
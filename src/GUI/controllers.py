@@ -1,37 +1,90 @@
 import flet as ft
 from GUI.contexts.service_context import GymServiceContext as servicio
 from domain.entities import ENTIDADES, Instructor, Rutina, Cliente
-from domain.exceptions import NegocioError, PersistenciaError, ServiceNoDisponibleError
-from dataclasses import dataclass, field, fields, asdict
+from domain.metadata import meta
+from domain.exceptions import ConflictoEdicionError, NegocioError, PersistenciaError, ServiceNoDisponibleError
+from dataclasses import dataclass, field, fields, replace
+from domain.campos import combinar, como_dict, diferencias, modificados
 from typing import Type, get_type_hints
 from datetime import datetime
+from functools import wraps
+import threading
 from GUI.assets.themes.colors import Colors
-from GUI.DTOs import ClienteViewDTO, RutinaViewDTO, InstructorViewDTO
+from GUI.DTOs import ClienteViewDTO, RutinaViewDTO, InstructorViewDTO, VencimientoViewDTO
+from GUI.actualizaciones import ActualizadorPagina
 import qrcode
 import io
 import base64
 
+# Columnas de cada DTO de vista, calculadas una sola vez (antes se hacía fields() en cada GetTabla)
+COLUMNAS_VISTA = {
+    dto: {f.name: f.type for f in fields(dto)}
+    for dto in (ClienteViewDTO, RutinaViewDTO, InstructorViewDTO, VencimientoViewDTO)
+}
+DTO_POR_ENTIDAD = {Cliente: ClienteViewDTO, Rutina: RutinaViewDTO, Instructor: InstructorViewDTO}
+
+def _exclusivo(metodo):
+    """Flet atiende los eventos en paralelo (y los cambios de otras estaciones llegan desde otro hilo):
+    las acciones que reescriben el estado compartido se ejecutan de a una."""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._lock:
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+def _en_lote(metodo):
+    """Lo que la acción cambie en pantalla (controles, avisos, diálogos) se envía en un solo page.update() al terminar.
+    Va por fuera de @_exclusivo, así el envío se hace con el lock ya liberado."""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self.pantalla.accion(metodo.__name__):
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+@ft.observable
+@dataclass
+class FilaTabla:
+    # Una fila de la tabla abierta. Sus celdas (tables.Celda) la observan: reemplazar 'dato'
+    # vuelve a pintar solo esas celdas, no Body ni Tablas.
+    id: int
+    dato: object  # DTO de la vista (ClienteViewDTO, RutinaViewDTO, ...)
+
 @ft.observable
 @dataclass
 class GymState:
     # Esta es la "Source of Truth" que la vista (views.py) observará
-    datos_actuales: list = field(default_factory=list)
+    ids_filas: list = field(default_factory=list)  # Ids de la tabla abierta, en orden. Se reasigna solo con altas, bajas o recargas
+    filas: dict = field(default_factory=dict)  # {id: FilaTabla}. Editar una fila cambia su FilaTabla, no este dict
     columnas_actuales: dict = field(default_factory=dict)
     columnas_reales: dict = field(default_factory=dict)  # Columnas reales de la entidad (para UPDATE)
     add_fields: list = field(default_factory=list)
     tabla_actual: str = ""
     entidad_a_editar: object = None  # Almacena la entidad siendo editada para operaciones UPDATE
+    vista_actual: str = "tabla"  # "tabla" (CRUD de la entidad) o "vencimientos" (panel de rutinas por vencer)
+    vencimientos: list = field(default_factory=list)
+    dias_vencimiento: int = 7
+    tablero: object = None  # Tablero de estadísticas (domain.reportes.Tablero)
+    dias_estadisticas: int = 30
+    ids_cambiados: dict = field(default_factory=dict)  # {tabla: ids} del último aviso de cambios (esta u otra estación)
 
 class GymController:
     """
     Controlador principal que utiliza el servicio inyectado por contexto.
     No mantiene estado visual (eso lo hace la View), pero orquesta las llamadas.
+    Hay uno por sesión (ver GUI.contexts.controller_context); el servicio es compartido.
     """
     def __init__(self, state: GymState):
         self.state = state
         self.lista_instructores = []
         self.lista_rutinas = []
         self.inputs_fecha = {}
+        self.cargas_instructores = {}  # {instructor_id: CargaInstructor} para mostrar el cupo en el formulario
+        self.instructor_propuesto = None  # Instructor con menos carga (preseleccionado al agregar un cliente)
+        self.registros = {}  # {id: entidad} de la tabla abierta, tal como vino de la base
+        self.version_a_editar = None  # Versión de la fila al abrir el formulario de edición (ver SendRegistro)
+        self._lock = threading.RLock()  # Ver _exclusivo (reentrante: SendRegistro llama a GetTabla)
+        self.pantalla = ActualizadorPagina()  # Ver _en_lote: un page.update() por acción
+        self._al_cambiar = None  # Oyente de esta sesión en el vigilante de cambios (ver observar_cambios)
 
     def _formatear_clientes(self, clientes_crudos):
         lista_formateada = []
@@ -50,6 +103,7 @@ class GymController:
             })
         return lista_formateada
 
+    @_en_lote
     def mostrar_qr(self, servicio, entidad_tipo, id_registro):
         """Genera y muestra un QR basado en el pdf_link de la rutina."""
         url = None
@@ -69,10 +123,7 @@ class GymController:
 
         if not url:
             # Mostrar un snackbar o error si no hay link
-            snack = ft.SnackBar(ft.Text("No hay enlace PDF asociado para generar QR"))
-            ft.context.page.overlay.append(snack)
-            snack.open = True
-            ft.context.page.update()
+            self.pantalla.avisar("No hay enlace PDF asociado para generar QR")
             return
 
         # 2. Generar QR en memoria
@@ -88,19 +139,77 @@ class GymController:
 
         img_control = ft.Image(src=f"data:image/png;base64,{img_str}", width=300, height=300)
         
+        acciones = [ft.TextButton("Cerrar", on_click=lambda e: self.pantalla.cerrar_dialogo())]
+        if entidad_tipo == Cliente:
+            # Check-in desde el kiosco: solo encola la asistencia (se guarda en lote en segundo plano)
+            acciones.insert(0, ft.TextButton("Registrar asistencia", icon=ft.Icons.HOW_TO_REG,
+                                             on_click=lambda e: self.registrar_asistencia(servicio, id_registro, dlg)))
+
         dlg = ft.AlertDialog(
             title=ft.Text("Escanea tu Rutina"),
             content=img_control,
-            actions=[ft.TextButton("Cerrar", on_click=lambda e: setattr(dlg, "open", False) or ft.context.page.update())],
+            actions=acciones,
         )
-        ft.context.page.show_dialog(dlg)
+        self.pantalla.mostrar_dialogo(dlg)
+
+    @_en_lote
+    def registrar_asistencia(self, servicio, cliente_id, dlg=None):
+        """Registra el check-in del cliente y muestra la confirmación."""
+        try:
+            servicio.registrar_asistencia(cliente_id)
+            mensaje, color = "Asistencia registrada", ft.Colors.GREEN_700
+        except Exception as e:
+            mensaje, color = f"No se pudo registrar la asistencia: {e}", ft.Colors.RED_700
+        if dlg:
+            self.pantalla.cerrar_dialogo()
+        self.pantalla.avisar(mensaje, color)
 
+    @_en_lote
     def eliminar_registro(self, servicio, entidad_tipo, id_registro, nombre_registro):
+        # Vista previa de referencias (un count por índice): si el registro está en uso se ofrece
+        # reasignar sus clientes a otro registro del mismo tipo y borrarlo en la misma transacción.
+        try:
+            referencias = servicio.referencias(entidad_tipo, id_registro)
+        except Exception as ex:
+            print(f"Error al contar referencias: {ex}")
+            referencias = []
+        en_uso = sum(r.cantidad for r in referencias)
+        reasignable = en_uso > 0 and entidad_tipo in (Instructor, Rutina)
+        # Un cliente con historial (asistencias, pagos) no se borra: el servicio lo archiva
+        archivable = en_uso > 0 and entidad_tipo is Cliente
+
+        selector_destino = None
+        if reasignable:
+            candidatos = [e for e in servicio.buscar_todos(entidad_tipo) if e.id != id_registro]
+            if entidad_tipo is Instructor:
+                self.cargas_instructores = {c.instructor_id: c for c in servicio.cargas_instructores()}
+                opciones = [
+                    ft.dropdown.Option(key=str(e.id), text=self._texto_instructor(e), disabled=self._cupo_completo(e.id))
+                    for e in candidatos
+                ]
+            else:
+                opciones = [ft.dropdown.Option(key=str(e.id), text=e.nombre) for e in candidatos]
+            selector_destino = ft.Dropdown(label="Reasignar a", options=opciones, width=300)
+
+        def mostrar_resultado(eliminado: bool, mensaje: str):
+            # Refrescar tabla SOLO si la eliminación fue exitosa
+            if eliminado:
+                try:
+                    self.GetTabla(servicio, entidad_tipo)
+                except Exception as ex:
+                    print(f"Error al refrescar tabla: {ex}")
+
+            # Mostrar feedback
+            self.pantalla.avisar(mensaje, ft.Colors.GREEN_700 if eliminado else ft.Colors.RED_700)
+
         def ejecutar_eliminacion(e):
             """Callback que se ejecuta al confirmar la eliminación."""
-            # Cerramos el diálogo primero
-            dlg_confirmacion.open = False
-            ft.context.page.update()
+            with self.pantalla.accion("eliminar_registro.confirmar"):
+                eliminar()
+
+        def eliminar():
+            # El diálogo se cierra junto con el aviso y la tabla recargada (un solo envío)
+            self.pantalla.cerrar_dialogo()
 
             eliminado = False
             mensaje = "No se pudo eliminar el registro"
@@ -108,54 +217,102 @@ class GymController:
                 entidad = servicio.buscar_por_id(entidad_tipo, id_registro)
                 servicio.eliminar(entidad)
                 eliminado = True
-                mensaje = "Registro eliminado correctamente"
+                mensaje = "Cliente archivado: su historial se conserva" if archivable else "Registro eliminado correctamente"
             except Exception as ex:
                 mensaje = str(ex) if str(ex) else "No se pudo eliminar el registro"
                 print(f"Error al eliminar: {ex}")
-            
-            # Refrescar tabla SOLO si la eliminación fue exitosa
-            if eliminado:
-                try:
-                    self.GetTabla(servicio, entidad_tipo)
-                except Exception as ex:
-                    print(f"Error al refrescar tabla: {ex}")
-            
-            # Mostrar feedback
-            snack = ft.SnackBar(
-                ft.Text(mensaje, color=ft.Colors.WHITE),
-                bgcolor=ft.Colors.GREEN_700 if eliminado else ft.Colors.RED_700
-            )
-            ft.context.page.overlay.append(snack)
-            snack.open = True
-            ft.context.page.update()
+            mostrar_resultado(eliminado, mensaje)
+
+        def ejecutar_reasignacion(e):
+            """Reasigna todos los clientes al destino elegido y elimina el registro (una transacción)."""
+            with self.pantalla.accion("eliminar_registro.reasignar"):
+                reasignar()
+
+        def reasignar():
+            if not selector_destino.value:
+                selector_destino.error_text = "Elija un destino"
+                self.pantalla.refrescar(selector_destino)
+                return
+            self.pantalla.cerrar_dialogo()
+
+            eliminado = False
+            try:
+                origen = servicio.buscar_por_id(entidad_tipo, id_registro)
+                destino = servicio.buscar_por_id(entidad_tipo, int(selector_destino.value))
+                movidos = servicio.reasignar_y_eliminar(origen, destino)
+                eliminado = True
+                mensaje = f"Registro eliminado: {movidos} clientes reasignados"
+            except Exception as ex:
+                mensaje = str(ex) if str(ex) else "No se pudo reasignar el registro"
+                print(f"Error al reasignar: {ex}")
+            mostrar_resultado(eliminado, mensaje)
 
         def cancelar(e):
-            dlg_confirmacion.open = False
-            ft.context.page.update()
+            self.pantalla.cerrar_dialogo()
+
+        contenido = [ft.Text(f"¿Está seguro de eliminar el registro \"{nombre_registro}\"?")]
+        if archivable:
+            historial = ", ".join(f"{r.cantidad} de {r.tabla}" for r in referencias if r.cantidad)
+            contenido.append(ft.Text(
+                f"Tiene historial ({historial}): se archivará. Deja de aparecer en las tablas y libera "
+                "su lugar en el cupo del instructor; las asistencias y los pagos se conservan.",
+                color=ft.Colors.ORANGE,
+            ))
+        else:
+            contenido += [
+                ft.Text(f"Está asignado a {r.cantidad} registros de {r.tabla}.", color=ft.Colors.RED)
+                for r in referencias if r.cantidad
+            ]
+        acciones = [ft.TextButton("Cancelar", on_click=cancelar)]
+        if reasignable:
+            contenido.append(selector_destino)
+            acciones.append(ft.TextButton("Reasignar y eliminar", on_click=ejecutar_reasignacion,
+                style=ft.ButtonStyle(color=ft.Colors.RED)))
+        elif archivable:
+            acciones.append(ft.TextButton("Archivar", on_click=ejecutar_eliminacion,
+                style=ft.ButtonStyle(color=ft.Colors.RED)))
+        else:
+            # Con referencias que no se pueden reasignar, el borrado fallaría por la FK
+            acciones.append(ft.TextButton("Eliminar", on_click=ejecutar_eliminacion, disabled=en_uso > 0,
+                style=ft.ButtonStyle(color=ft.Colors.RED)))
 
         dlg_confirmacion = ft.AlertDialog(
             title=ft.Text("Confirmar eliminación"),
-            content=ft.Text(f"¿Está seguro de eliminar el registro \"{nombre_registro}\"?"),
-            actions=[
-                ft.TextButton("Cancelar", on_click=cancelar),
-                ft.TextButton("Eliminar", on_click=ejecutar_eliminacion,
-                    style=ft.ButtonStyle(color=ft.Colors.RED)),
-            ],
+            content=ft.Column(tight=True, controls=contenido),
+            actions=acciones,
         )
-        ft.context.page.show_dialog(dlg_confirmacion)
+        self.pantalla.mostrar_dialogo(dlg_confirmacion)
 
+    @_en_lote
+    @_exclusivo
     def preparar_edicion(self, servicio, entidad_tipo, id_registro):
         """
         1. Busca la entidad.
-        2. Carga la tabla con la entidad en modo edición (precargando valores).
+        2. Arma el formulario en modo edición (precargando valores). La tabla no se recarga.
         """
         try:
-            entidad = servicio.buscar_por_id(entidad_tipo, id_registro)
-            # Cargar la tabla en modo edición: GetTabla cargará los campos precargados
-            self.GetTabla(servicio, entidad_tipo, entidad_a_editar=entidad)
+            encontrado = servicio.buscar_para_editar(entidad_tipo, id_registro)
+            if encontrado is None:
+                print(f"Error al preparar edición: no existe el registro {id_registro}")
+                return
+            # La versión leída viaja con el guardado: si otra estación lo guarda antes, no se pisa
+            entidad, self.version_a_editar = encontrado
+            if entidad_tipo == Cliente:
+                self._cargar_catalogos(servicio)  # Cupos al día para los desplegables del formulario
+            # entidad_a_editar cambia: la vista abre el formulario con los campos precargados
+            self._preparar_formulario(entidad_tipo, servicio.obtener_columnas_por_entidad(entidad_tipo), entidad_a_editar=entidad)
         except Exception as e:
             print(f"Error al preparar edición: {e}")
 
+    @_en_lote
+    @_exclusivo
+    def preparar_alta(self, servicio, entidad_tipo):
+        """Formulario vacío para agregar un registro. La tabla no se recarga."""
+        if entidad_tipo == Cliente:
+            self._cargar_catalogos(servicio)  # Cupos al día y el instructor propuesto
+        self._preparar_formulario(entidad_tipo, servicio.obtener_columnas_por_entidad(entidad_tipo))
+
+    @_en_lote
     def limpiar_error(self, e):
         # 1. La lógica para detectar si es fecha por el diccionario de tipos
         # Usamos getattr(e.control, "data", None) por si el evento viene de un control sin data
@@ -180,13 +337,27 @@ class GymController:
                 
             # Restauramos el borde original
             target.border_color = Colors.INPUT_BORDE
-            target.update()
+            self.pantalla.refrescar(target)
+
+    def _texto_instructor(self, instructor) -> str:
+        carga = self.cargas_instructores.get(instructor.id)
+        nombre = f"{instructor.nombre} {instructor.apellido}"
+        return f"{nombre} ({carga.clientes}/{carga.cupo})" if carga else nombre
 
-    def form_gen(self, columnas: dict, valores_precargados: dict = None):
-        """Genera campos de formulario. Si valores_precargados es dict, carga esos valores."""
+    def _cupo_completo(self, instructor_id) -> bool:
+        carga = self.cargas_instructores.get(instructor_id)
+        return carga is not None and carga.libres == 0
+
+    def form_gen(self, columnas: dict, valores_precargados: dict = None, entidad: Type[ENTIDADES] = None):
+        """Genera campos de formulario. Si valores_precargados es dict, carga esos valores.
+        Los widgets se eligen con el registro de metadatos: FK -> Dropdown, datetime -> DatePicker, int/float -> numérico."""
         fields_box = []
+        metadatos = meta(entidad) if entidad else None
         for campo ,tipo in columnas.items():
-            if campo == "instructor_id":
+            meta_campo = metadatos.campo(campo) if metadatos else None
+            fk = meta_campo.fk if meta_campo else None
+
+            if fk == "instructor":
                 # Verificación de existencia para evitar el TypeError
                 hay_instructores = len(self.lista_instructores) > 0
                 valor_precargado = valores_precargados.get(campo) if valores_precargados else None
@@ -202,12 +373,16 @@ class GymController:
                     options=[
                         ft.dropdown.Option(
                             key=str(ins.id), 
-                            text=f"{ins.nombre} {ins.apellido}"
+                            text=self._texto_instructor(ins),
+                            # Los instructores con el cupo completo no se pueden elegir (salvo el que ya tiene asignado)
+                            disabled=self._cupo_completo(ins.id) and ins.id != valor_precargado,
                         ) for ins in self.lista_instructores
                     ] if hay_instructores else []
                 )
                 if valor_precargado:
                     dropdown.value = str(valor_precargado)
+                elif self.instructor_propuesto:
+                    dropdown.value = str(self.instructor_propuesto.instructor_id)
                 fields_box.append(dropdown)
 
             elif campo == "ciclo_rutina":
@@ -227,7 +402,7 @@ class GymController:
                     dropdown.value = str(valor_precargado)
                 fields_box.append(dropdown)
 
-            elif campo == "rutina_id":
+            elif fk == "rutina":
                 hay_rutinas = len(self.lista_rutinas) > 0
                 valor_precargado = valores_precargados.get(campo) if valores_precargados else None
                 dropdown = ft.Dropdown(
@@ -272,27 +447,9 @@ class GymController:
                     )
 
                 # Picker y su lógica de cambio
-                # Usamos una función anidada para capturar 'campo_calendario' correctamente
-                def crear_handle_fecha(txt_field):
-                    return lambda e: (
-                        setattr(txt_field, "value", e.control.value.strftime("%d-%m-%Y")),
-                        setattr(txt_field, "error_text", None), # Limpia error al elegir fecha
-                        txt_field.update()
-                    )
-
                 picker = ft.DatePicker(
                     data=campo,
-                    on_change=lambda e, clave=campo: (
-                        setattr(self.inputs_fecha[clave], "value", e.control.value.strftime("%d-%m-%Y")),
-                        setattr(self.inputs_fecha[clave], "error_text", None),
-                        self.inputs_fecha[clave].update(),
-                        self.limpiar_error(
-                            ft.ControlEvent(
-                                name="on_change",
-                                control=self.inputs_fecha[clave],
-                            )
-                        )
-                    )
+                    on_change=lambda e, clave=campo: self._elegir_fecha(clave, e.control.value),
                 )
 
                 # Ícono donde pulsar para seleccionar la fecha
@@ -301,11 +458,7 @@ class GymController:
                     height=40,
                     width=40,
                     right= 0,
-                    on_click=lambda _, p=picker: (
-                        ft.context.page.overlay.append(p) if p not in ft.context.page.overlay else None,
-                        setattr(p, "open", True),
-                        ft.context.page.update()
-                    ),
+                    on_click=lambda _, p=picker: self._abrir_calendario(p),
                 )
 
                 field = ft.Stack([
@@ -322,7 +475,7 @@ class GymController:
 
                 fields_box.append(field)
 
-            elif ("Optional[int]" in str(tipo)) or (tipo == int) or (tipo == float):
+            elif tipo in (int, float):
                 valor_precargado = valores_precargados.get(campo) if valores_precargados else None
                 field = ft.TextField(
                     label=campo.replace("_", " ").title(),
@@ -347,6 +500,206 @@ class GymController:
 
         return fields_box
 
+    @_en_lote
+    def _elegir_fecha(self, clave, fecha):
+        # Valor y error limpio viajan en el mismo envío (antes: un update del campo y otro de limpiar_error)
+        txt_field = self.inputs_fecha[clave]
+        txt_field.value = fecha.strftime("%d-%m-%Y")
+        txt_field.error_text = None
+        self.pantalla.refrescar(txt_field)
+        self.limpiar_error(ft.ControlEvent(name="on_change", control=txt_field))
+
+    @_en_lote
+    def _abrir_calendario(self, picker):
+        pagina = ft.context.page
+        if picker not in pagina.overlay:
+            pagina.overlay.append(picker)
+        picker.open = True
+        self.pantalla.refrescar()
+
+    def _cargar_catalogos(self, servicio) -> list[str]:
+        """Instructores, cupos y rutinas para armar las filas y el formulario de clientes. Devuelve los errores."""
+        errores = []
+        try: 
+            self.lista_instructores = servicio.buscar_todos(Instructor)
+        except Exception as e: 
+            errores.append(f"Error cargando instructores: {e}")
+            self.lista_instructores = []
+
+        try:
+            # Carga de cada instructor (contadores) y el propuesto para un cliente nuevo
+            self.cargas_instructores = {c.instructor_id: c for c in servicio.cargas_instructores()}
+            self.instructor_propuesto = servicio.proponer_instructor()
+        except Exception as e:
+            print(f"Error cargando cupos de instructores: {e}")
+            self.cargas_instructores = {}
+            self.instructor_propuesto = None
+
+        try: 
+            self.lista_rutinas = servicio.buscar_todos(Rutina)
+        except Exception as e: 
+            errores.append(f"Error cargando rutinas: {e}")
+            self.lista_rutinas = []
+
+        for error_msg in errores:
+            print(error_msg)
+        return errores
+
+    def _vista_cliente(self, c, dict_rutinas: dict, dict_instructores: dict) -> ClienteViewDTO:
+        # Intentar convertir fechas con múltiples formatos posibles
+        try:
+            f_inicio = datetime.strptime(c.fecha_inicio_rutina, '%Y-%m-%d').strftime('%d/%m/%y')
+        except:
+            try:
+                f_inicio = datetime.strptime(c.fecha_inicio_rutina, '%d-%m-%Y').strftime('%d/%m/%y')
+            except:
+                f_inicio = c.fecha_inicio_rutina  # Fallback a valor original
+        
+        try:
+            f_fin = datetime.strptime(c.fecha_fin_rutina, '%Y-%m-%d').strftime('%d/%m/%y')
+        except:
+            try:
+                f_fin = datetime.strptime(c.fecha_fin_rutina, '%d-%m-%Y').strftime('%d/%m/%y')
+            except:
+                f_fin = c.fecha_fin_rutina  # Fallback a valor original
+    
+        return ClienteViewDTO(
+            id=c.id,
+            Nombre_y_Apellido=f"{c.nombre} {c.apellido}",
+            Rutina=dict_rutinas.get(c.rutina_id, "N/A"),
+            Instructor=dict_instructores.get(c.instructor_id, "N/A"),
+            Ciclo=c.ciclo_rutina,
+            Fechas=f"{f_inicio} - {f_fin}"
+        )
+
+    def _a_vista(self, entidad: Type[ENTIDADES], registros: list) -> list:
+        """Convierte registros de la entidad en las filas (DTOs) que muestra la tabla."""
+        if entidad == Cliente:
+            # RE-EMPAQUETADO PARA CLIENTES
+            dict_rutinas = {r.id: f"{r.nombre} (id:{r.id})" for r in self.lista_rutinas}
+            dict_instructores = {i.id: f"{i.nombre} {i.apellido}" for i in self.lista_instructores}
+            return [self._vista_cliente(c, dict_rutinas, dict_instructores) for c in registros]
+        if entidad == Rutina:
+            # RE-EMPAQUETADO PARA RUTINAS (para mostrar el ID)
+            return [RutinaViewDTO(id=r.id, ID=r.id, Nombre=r.nombre) for r in registros]
+        if entidad == Instructor:
+            # RE-EMPAQUETADO PARA INSTRUCTORES
+            return [InstructorViewDTO(id=i.id, Nombre_y_Apellido=f"{i.nombre} {i.apellido}") for i in registros]
+        return list(registros)
+
+    def _cargar_datos(self, servicio, entidad: Type[ENTIDADES]) -> list[str]:
+        """Lee la tabla completa (y los catálogos si son clientes) y la deja en el estado. Devuelve los errores de carga."""
+        errores = []
+        try:
+            try: datos_db = servicio.buscar_todos(entidad)
+            except: datos_db = []
+
+            if entidad == Cliente:
+                errores = self._cargar_catalogos(servicio)
+
+            # Registros crudos de la tabla abierta: de acá parten las actualizaciones incrementales (aplicar_cambios)
+            self.registros = {r.id: r for r in datos_db}
+            self._mostrar_filas(self._a_vista(entidad, datos_db))
+            # Importante: Las columnas ahora son las del DTO
+            dto = DTO_POR_ENTIDAD.get(entidad)
+            self.state.columnas_actuales = dict(COLUMNAS_VISTA[dto]) if dto else self.state.columnas_reales
+        except Exception as e:
+            print(f"Error al cargar catálogos: {e}")
+            self.lista_instructores = []
+            self.lista_rutinas = []
+            self._mostrar_filas([])
+        return errores
+
+    def _mostrar_filas(self, dtos: list):
+        """Reemplaza todas las filas (recarga completa: se vuelve a pintar la tabla entera)."""
+        self.state.filas = {d.id: FilaTabla(d.id, d) for d in dtos}
+        self.state.ids_filas = [d.id for d in dtos]
+
+    def _refrescar_fila(self, entidad: Type[ENTIDADES], registro):
+        """Después de guardar 'registro' desde esta estación: se reemplaza solo su fila."""
+        self.registros[registro.id] = registro
+        fila = self.state.filas.get(registro.id)
+        if fila is not None and ENTIDADES.get(self.state.tabla_actual) is entidad:
+            dato = self._a_vista(entidad, [registro])[0]
+            if fila.dato != dato:
+                fila.dato = dato
+
+    # --- Sincronización con otras estaciones ---
+    def observar_cambios(self, servicio) -> bool:
+        """Empieza a recibir los cambios de otras estaciones. La tabla abierta se actualiza fila por fila."""
+        # El aviso llega desde el hilo del vigilante: se guarda la página ahora (ft.context es del hilo de la UI)
+        pagina = ft.context.page
+
+        def al_cambiar(cambios):
+            with self.pantalla.accion("aplicar_cambios", pagina):
+                self.aplicar_cambios(servicio, cambios)
+                self.pantalla.refrescar()
+
+        self._al_cambiar = al_cambiar
+        try:
+            return servicio.observar_cambios(al_cambiar)
+        except Exception as e:
+            print(f"No se pudo iniciar la sincronización: {e}")
+            return False
+
+    def cerrar_sesion(self, servicio):
+        """La página se cerró: deja de recibir los cambios (el vigilante sigue para las demás sesiones)."""
+        if self._al_cambiar is not None:
+            servicio.dejar_de_observar(self._al_cambiar)
+            self._al_cambiar = None
+
+    @_exclusivo
+    def aplicar_cambios(self, servicio, cambios):
+        """Relee por id solo los registros cambiados y reemplaza, agrega o quita esas filas de la tabla abierta."""
+        self.state.ids_cambiados = {tabla: set(ids) for tabla, ids in cambios.ids.items()}
+        if self.state.vista_actual != "tabla" or self.state.tabla_actual not in ENTIDADES:
+            return
+        entidad = ENTIDADES[self.state.tabla_actual]
+        if cambios.completo:
+            # Demasiados cambios juntos: una recarga de los datos (el formulario abierto no se toca)
+            self._cargar_datos(servicio, entidad)
+            return
+
+        cambiados = cambios.ids.get(meta(entidad).tabla, frozenset())
+        afectados = set(cambiados)
+        if entidad == Cliente:
+            # Un instructor o una rutina editados cambian el texto de las filas de sus clientes
+            instructores = cambios.ids.get("instructor", frozenset())
+            rutinas = cambios.ids.get("rutina", frozenset())
+            if instructores or rutinas:
+                self._cargar_catalogos(servicio)
+                afectados |= {c.id for c in self.registros.values() if c.instructor_id in instructores or c.rutina_id in rutinas}
+        if not afectados:
+            return
+
+        releidos = {r.id: r for r in servicio.buscar_por_ids(entidad, cambiados)}
+        for registro_id in cambiados:
+            if registro_id in releidos:
+                self.registros[registro_id] = releidos[registro_id]
+            else:
+                self.registros.pop(registro_id, None)  # Borrado en la otra estación
+
+        # Las filas conservan su lugar; las altas se agregan al final. Una fila editada solo cambia su
+        # FilaTabla (se vuelven a pintar sus celdas); la lista de ids se reasigna solo si hubo altas o bajas.
+        filas = self.state.filas
+        ids = list(self.state.ids_filas)
+        for registro_id in afectados:
+            fila = filas.get(registro_id)
+            if registro_id in self.registros:
+                dato = self._a_vista(entidad, [self.registros[registro_id]])[0]
+                if fila is None:
+                    filas[registro_id] = FilaTabla(registro_id, dato)
+                    ids.append(registro_id)
+                elif fila.dato != dato:
+                    fila.dato = dato
+            elif fila is not None:
+                del filas[registro_id]
+                ids.remove(registro_id)
+        if ids != self.state.ids_filas:
+            self.state.ids_filas = ids
+
+    @_en_lote
+    @_exclusivo
     def GetTabla(self, servicio, entidad: Type[ENTIDADES], entidad_a_editar=None): # entidad: clase, no instancia. Por eso ponemos Type[ENTIDADES].
         # ESTO ES PARA EL FORMULARIO (DB Real). Estas van a perdurar sin modificarse.
         columnas_para_formulario = servicio.obtener_columnas_por_entidad(entidad)
@@ -355,113 +708,207 @@ class GymController:
         self.state.columnas_reales = columnas_para_formulario  # Guardar las columnas reales para UPDATE
         self.state.columnas_actuales = servicio.obtener_columnas_por_entidad(entidad) # Columnas reales de la entidad (DB), luego serán modificadas. 
         self.state.tabla_actual = entidad.__name__.lower().capitalize() # Por ejemplo: "Cliente", "Instructor", "Rutina"
-        self.inputs_fecha = {}
+        self.state.vista_actual = "tabla"
 
         # Generamos los campos para agregar un nuevo registro
         if self.state.columnas_actuales:
-            fields_box = []
-        
             # Convertimos para efecto visual los datos de la DB de Rutina y Cliente conforme a los DTOs
             # Con esto logramos que si hay nuevos cambios, solo vaste con modificar los DTOs y nada más. 
-            try:
-                try: datos_db = servicio.buscar_todos(entidad)
-                except: datos_db = []
-
-                if entidad == Cliente:
-                    try: 
-                        self.lista_instructores = servicio.buscar_todos(Instructor)
-                    except Exception as e: 
-                        error_msg = f"Error cargando instructores: {e}"
-                        print(error_msg)
-                        self.lista_instructores = []
-                        # Mostrar error en snackbar
-                        snack = ft.SnackBar(ft.Text(error_msg, color=ft.Colors.WHITE), bgcolor=ft.Colors.RED_700)
-                        ft.context.page.overlay.append(snack)
-                        snack.open = True
-                        ft.context.page.update()
-                        
-                    try: 
-                        self.lista_rutinas = servicio.buscar_todos(Rutina)
-                    except Exception as e: 
-                        error_msg = f"Error cargando rutinas: {e}"
-                        print(error_msg)
-                        self.lista_rutinas = []
-                        # Mostrar error en snackbar
-                        snack = ft.SnackBar(ft.Text(error_msg, color=ft.Colors.WHITE), bgcolor=ft.Colors.RED_700)
-                        ft.context.page.overlay.append(snack)
-                        snack.open = True
-                        ft.context.page.update()
-
-                    # RE-EMPAQUETADO PARA CLIENTES
-                    dict_rutinas = {r.id: f"{r.nombre} (id:{r.id})" for r in self.lista_rutinas}
-                    dict_instructores = {i.id: f"{i.nombre} {i.apellido}" for i in self.lista_instructores}
-                    
-                    nuevos_datos = []
-                    for c in datos_db:
-                        # Intentar convertir fechas con múltiples formatos posibles
-                        try:
-                            f_inicio = datetime.strptime(c.fecha_inicio_rutina, '%Y-%m-%d').strftime('%d/%m/%y')
-                        except:
-                            try:
-                                f_inicio = datetime.strptime(c.fecha_inicio_rutina, '%d-%m-%Y').strftime('%d/%m/%y')
-                            except:
-                                f_inicio = c.fecha_inicio_rutina  # Fallback a valor original
-                        
-                        try:
-                            f_fin = datetime.strptime(c.fecha_fin_rutina, '%Y-%m-%d').strftime('%d/%m/%y')
-                        except:
-                            try:
-                                f_fin = datetime.strptime(c.fecha_fin_rutina, '%d-%m-%Y').strftime('%d/%m/%y')
-                            except:
-                                f_fin = c.fecha_fin_rutina  # Fallback a valor original
-                    
-                        nuevos_datos.append(ClienteViewDTO(
-                            id=c.id,
-                            Nombre_y_Apellido=f"{c.nombre} {c.apellido}",
-                            Rutina=dict_rutinas.get(c.rutina_id, "N/A"),
-                            Instructor=dict_instructores.get(c.instructor_id, "N/A"),
-                            Ciclo=c.ciclo_rutina,
-                            Fechas=f"{f_inicio} - {f_fin}"
-                        ))
-                
-                    self.state.datos_actuales = nuevos_datos
-                    # Importante: Las columnas ahora son las del DTO
-                    self.state.columnas_actuales = {f.name: f.type for f in fields(ClienteViewDTO)}
-
-                elif entidad == Rutina:
-                    # RE-EMPAQUETADO PARA RUTINAS (para mostrar el ID)
-                    self.state.datos_actuales = [RutinaViewDTO(id=r.id, ID=r.id, Nombre=r.nombre) for r in datos_db]
-                    self.state.columnas_actuales = {f.name: f.type for f in fields(RutinaViewDTO)}
-
-                elif entidad == Instructor:
-                    # RE-EMPAQUETADO PARA INSTRUCTORES
-                    self.state.datos_actuales = [InstructorViewDTO(id=i.id, Nombre_y_Apellido=f"{i.nombre} {i.apellido}") for i in datos_db]
-                    self.state.columnas_actuales = {f.name: f.type for f in fields(InstructorViewDTO)}
-            
-                else:
-                    self.state.datos_actuales = datos_db
-                    self.state.columnas_actuales = columnas_para_formulario
+            for error_msg in self._cargar_datos(servicio, entidad):
+                # Los errores de carga se muestran juntos en un snackbar al terminar la acción
+                self.pantalla.avisar(error_msg, ft.Colors.RED_700)
 
-                # >>> ----------------------------------------------------------------------------- <<<
-            except Exception as e:
-                print(f"Error al cargar catálogos: {e}")
-                self.lista_instructores = []
-                self.lista_rutinas = []
-                self.state.datos_actuales = []
-
-            # Preparar valores precargados si estamos en modo edición
-            valores_precargados = None
-            if entidad_a_editar:
-                self.state.entidad_a_editar = entidad_a_editar
-                valores_precargados = asdict(entidad_a_editar)
-            else:
-                self.state.entidad_a_editar = None
-            
-            # Generamos los campos para el formulario de agregar/editar nuevo registro según las columnas reales de la entidad (DB)
-            fields_box = self.form_gen(columnas_para_formulario, valores_precargados)
-            # Enviamos los campos al estado
-            self.state.add_fields = fields_box
+            self._preparar_formulario(entidad, columnas_para_formulario, entidad_a_editar)
+
+    def _preparar_formulario(self, entidad: Type[ENTIDADES], columnas: dict, entidad_a_editar=None):
+        """Genera los campos del formulario de agregar/editar (no toca las filas de la tabla)."""
+        self.inputs_fecha = {}
+        # Preparar valores precargados si estamos en modo edición
+        valores_precargados = como_dict(entidad_a_editar) if entidad_a_editar else None
+        self.state.entidad_a_editar = entidad_a_editar
+
+        # Generamos los campos para el formulario de agregar/editar nuevo registro según las columnas reales de la entidad (DB)
+        fields_box = self.form_gen(columnas, valores_precargados, entidad=entidad)
+        # Enviamos los campos al estado
+        self.state.add_fields = fields_box
     
+    @_en_lote
+    @_exclusivo
+    def GetVencimientos(self, servicio, dias: int = 7, limite: int = 50):
+        """Carga el panel de rutinas por vencer. Incluye las ya vencidas (para renovarlas primero).
+        Es una sola consulta por índice con límite: no depende de cuántos clientes haya."""
+        try:
+            vencimientos = servicio.clientes_por_vencer(dias=dias, limite=limite, incluir_vencidos=True)
+        except Exception as e:
+            # El panel queda vacío: sin el aviso parecería que no hay rutinas por vencer
+            self.pantalla.avisar(f"No se pudieron cargar los vencimientos: {e}", ft.Colors.RED_700)
+            vencimientos = []
+
+        hoy = datetime.now().strftime("%Y-%m-%d")
+        self.state.vencimientos = [
+            VencimientoViewDTO(
+                id=v.cliente_id,
+                Nombre_y_Apellido=v.nombre_cliente,
+                Rutina=v.rutina,
+                Ciclo=str(v.ciclo_rutina),
+                Instructor=v.instructor,
+                Vence=datetime.strptime(v.fecha_fin_rutina, "%Y-%m-%d").strftime("%d/%m/%y")
+                      + (" (vencida)" if v.fecha_fin_rutina < hoy else ""),
+            )
+            for v in vencimientos
+        ]
+        self.state.dias_vencimiento = dias
+        self.state.vista_actual = "vencimientos"
+
+    @_en_lote
+    @_exclusivo
+    def GetEstadisticas(self, servicio, dias: int = 30):
+        """Carga el tablero de estadísticas desde los resúmenes (no recorre asistencias ni clientes)."""
+        try:
+            self.state.tablero = servicio.tablero(dias=dias)
+        except Exception as e:
+            self.pantalla.avisar(f"No se pudieron cargar las estadísticas: {e}", ft.Colors.RED_700)
+            self.state.tablero = None
+        self.state.dias_estadisticas = dias
+        self.state.vista_actual = "estadisticas"
+
+    @_en_lote
+    def rotar_ciclos(self, servicio):
+        """Muestra el resultado simulado de la rotación de ciclos y, si se confirma, la aplica (un UPDATE por regla)."""
+        try:
+            simulacion = servicio.rotar_ciclos(simular=True)
+        except Exception as e:
+            self.pantalla.avisar(f"No se pudo simular la rotación: {e}", ft.Colors.RED_700)
+            return
+
+        def confirmar(e):
+            with self.pantalla.accion("rotar_ciclos.confirmar"):
+                self.pantalla.cerrar_dialogo()
+                try:
+                    resultado = servicio.rotar_ciclos()
+                    mensaje, color = f"{resultado.total} clientes rotados", ft.Colors.GREEN_700
+                except Exception as ex:
+                    mensaje, color = f"No se pudo rotar: {ex}", ft.Colors.RED_700
+                # Una sola recarga del panel para todos los clientes rotados
+                self.GetVencimientos(servicio, dias=self.state.dias_vencimiento)
+                self.pantalla.avisar(mensaje, color)
+
+        detalle = [ft.Text(f"{r.regla}: {r.clientes} clientes") for r in simulacion.reglas]
+        dlg = ft.AlertDialog(
+            title=ft.Text("Rotar ciclos vencidos"),
+            content=ft.Column(
+                tight=True,
+                controls=[ft.Text(f"Se rotarán {simulacion.total} clientes con la rutina vencida al {simulacion.hoy}.")] + detalle,
+            ),
+            actions=[
+                ft.TextButton("Cancelar", on_click=lambda e: self.pantalla.cerrar_dialogo()),
+                ft.TextButton("Rotar", on_click=confirmar, disabled=simulacion.total == 0),
+            ],
+        )
+        self.pantalla.mostrar_dialogo(dlg)
+
+    def respaldar(self, servicio):
+        """Copia de seguridad en segundo plano: la UI sigue respondiendo y el diálogo muestra el avance."""
+        # El progreso llega desde el hilo del respaldo: se guarda la página ahora (ft.context es del hilo de la UI)
+        pagina = ft.context.page
+        barra = ft.ProgressBar(value=0, width=300)
+        detalle = ft.Text("Preparando copia...")
+        dlg = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("Copia de seguridad"),
+            content=ft.Column(tight=True, controls=[barra, detalle]),
+        )
+
+        def progreso(copiadas, total):
+            with self.pantalla.accion("respaldar.progreso", pagina):
+                barra.value = copiadas / total if total else 1
+                detalle.value = f"{copiadas} de {total} páginas"
+                self.pantalla.refrescar()
+
+        def al_terminar(respaldo, error):
+            with self.pantalla.accion("respaldar.terminado", pagina):
+                # Cierre del diálogo y aviso en un solo envío
+                dlg.open = False
+                self.pantalla.refrescar()
+                if error is None:
+                    mensaje, color = f"Copia guardada: {respaldo.nombre} ({respaldo.bytes // 1024} KB)", ft.Colors.GREEN_700
+                else:
+                    mensaje, color = f"No se pudo hacer la copia: {error}", ft.Colors.RED_700
+                self.pantalla.avisar(mensaje, color)
+
+        self.pantalla.mostrar_dialogo(dlg, pagina)
+        try:
+            iniciado = servicio.respaldar(progreso=progreso, en_segundo_plano=True, al_terminar=al_terminar)
+            if not iniciado:
+                al_terminar(None, "ya hay una copia en curso")
+        except Exception as e:
+            al_terminar(None, e)
+
+    def _resolver_conflicto(self, servicio, entidad: Type[ENTIDADES], original, mia, conflicto: ConflictoEdicionError):
+        """
+        Otra estación guardó el registro mientras se editaba. Se ofrece:
+            - Combinar: la versión actual con los campos que cambió el usuario encima (se guarda con la versión nueva).
+            - Recargar: descartar lo escrito y reabrir el formulario con los datos actuales.
+        Si la otra estación no cambió ningún campo (solo la versión), se combina sin preguntar.
+        """
+        combinada, mis_campos, pisados = combinar(original, mia, conflicto.actual)
+
+        def guardar_combinada():
+            try:
+                servicio.actualizar_campos(combinada, mis_campos, version=conflicto.version)
+            except ConflictoEdicionError as otro:
+                # Volvió a cambiar mientras se decidía: se ofrece de nuevo con la versión más nueva
+                self._resolver_conflicto(servicio, entidad, original, mia, otro)
+                return
+            except Exception as ex:
+                self.pantalla.avisar(f"No se pudo guardar: {ex}", ft.Colors.RED_700)
+                return
+            self.pantalla.cerrar_dialogo()  # El formulario de edición
+            self.state.entidad_a_editar = None
+            self._refrescar_fila(entidad, combinada)
+            self.pantalla.avisar("Cambios combinados con los de la otra estación", ft.Colors.GREEN_700)
+
+        if not diferencias(original, conflicto.actual):
+            guardar_combinada()
+            return
+
+        def al_combinar(e):
+            with self.pantalla.accion("conflicto.combinar"):
+                self.pantalla.cerrar_dialogo()  # Este diálogo
+                guardar_combinada()
+
+        def al_recargar(e):
+            with self.pantalla.accion("conflicto.recargar"):
+                self.pantalla.cerrar_dialogo()  # Este diálogo
+                self.pantalla.cerrar_dialogo()  # El formulario con los datos viejos
+                self.version_a_editar = conflicto.version
+                # entidad_a_editar cambia: la vista abre un formulario nuevo con los datos actuales
+                self._refrescar_fila(entidad, conflicto.actual)
+                self._preparar_formulario(entidad, self.state.columnas_reales, entidad_a_editar=conflicto.actual)
+                self.pantalla.refrescar()
+
+        suyos = [n for n in diferencias(original, conflicto.actual) if n not in pisados]
+        contenido = [ft.Text("Otra estación guardó este registro mientras usted lo editaba.")]
+        if suyos:
+            contenido.append(ft.Text(f"Cambió: {', '.join(n.replace('_', ' ') for n in suyos)}."))
+        contenido += [
+            ft.Text(f"{n.replace('_', ' ')}: la otra estación puso \"{getattr(conflicto.actual, n)}\"; "
+                    f"al combinar queda \"{getattr(mia, n)}\".", color=ft.Colors.RED)
+            for n in pisados
+        ]
+        dlg = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("El registro cambió"),
+            content=ft.Column(tight=True, controls=contenido),
+            actions=[
+                ft.TextButton("Recargar", on_click=al_recargar),
+                ft.TextButton("Combinar y guardar", on_click=al_combinar),
+            ],
+        )
+        self.pantalla.mostrar_dialogo(dlg)
+
+    @_en_lote
+    @_exclusivo
     def SendRegistro(self, servicio, entidad: Type[ENTIDADES], es_actualizacion=False):
         """
         Recolecta los datos de add_fields, los valida y los envía al servicio.
@@ -494,22 +941,32 @@ class GymController:
                 if tipo_destino == datetime:
                     # Convertimos el string "DD-MM-YYYY" al formato que SQLite ama "YYYY-MM-DD"
                     payload[nombre_campo] = datetime.strptime(valor_raw, "%d-%m-%Y").strftime("%Y-%m-%d")
-                elif "int" in str(tipo_destino) or tipo_destino == int:
+                elif tipo_destino is int:
                     payload[nombre_campo] = int(valor_raw)
+                elif tipo_destino is float:
+                    payload[nombre_campo] = float(valor_raw)
                 else:
                     payload[nombre_campo] = valor_raw
 
             try:
                 # 3. Intentar guardar
                 if es_actualizacion:
-                    # Modo UPDATE: reinyectar ID y actualizar
-                    if self.state.entidad_a_editar:
-                        payload["id"] = self.state.entidad_a_editar.id
-                    obj_actualizado = entidad(**payload)
-                    servicio.actualizar(obj_actualizado)
-                    
-                    # 4. Refrescar la tabla y limpiar campos
-                    self.GetTabla(servicio, entidad)
+                    # Modo UPDATE: solo los campos sucios (los que difieren de lo cargado en el formulario),
+                    # y solo si la fila sigue en la versión leída. Sin cambios no se escribe ni se recarga nada.
+                    original = self.state.entidad_a_editar
+                    cambios = modificados(original, payload)
+                    if not cambios:
+                        print(f"Sin cambios en {entidad.__name__}: no se guarda nada")
+                        return True  # Se cierra el formulario como si se hubiera guardado
+                    obj_actualizado = replace(original, **cambios)
+                    try:
+                        servicio.actualizar_campos(obj_actualizado, cambios, version=self.version_a_editar)
+                    except ConflictoEdicionError as e:
+                        self._resolver_conflicto(servicio, entidad, original, obj_actualizado, e)
+                        return False  # El formulario queda abierto hasta que el usuario elija
+
+                    # 4. Refrescar solo la fila editada (las demás celdas no se vuelven a pintar)
+                    self._refrescar_fila(entidad, obj_actualizado)
                     print(f"Registro actualizado con éxito en {entidad.__name__}")
                     return True  # Éxito
                 else:
@@ -523,9 +980,14 @@ class GymController:
                     print(f"Registro agregado con éxito en {entidad.__name__}")
                     return True  # Éxito
                 
+            except NegocioError as e:
+                # Regla de negocio (por ejemplo, cupo del instructor completo): se avisa al usuario
+                self.pantalla.avisar(str(e), ft.Colors.RED_700)
+                return False
             except Exception as e:
-                print(f"Error al guardar: {e}")
-                return False  # Error interno
+                # Error interno (persistencia, datos inválidos): el formulario queda abierto con el aviso
+                self.pantalla.avisar(f"No se pudo guardar: {e}", ft.Colors.RED_700)
+                return False
         
         else:
             # 5. Lógica de error visual (la que ya teníamos)
@@ -537,11 +999,6 @@ class GymController:
                     if hasattr(target, "error"):
                         target.error = "Campo requerido"
                     target.border_color = Colors.INPUT_ERROR_BORDE
-                target.update()
+            # Todos los campos marcados en un solo envío (antes, un update por campo)
+            self.pantalla.refrescar()
             return False  # Validación falló
-
-
-# Instancia global del ESTADO (Observable)
-gym_state = GymState()
-# Instancia del controlador que manipula ese estado
-gym_controller = GymController(gym_state)
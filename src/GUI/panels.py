@@ -0,0 +1,100 @@
+import flet as ft
+from .tables import Tablas
+from .controllers import COLUMNAS_VISTA
+from .DTOs import VencimientoViewDTO
+
+# Opciones de ventana (en días) para el panel de vencimientos
+OPCIONES_DIAS = (7, 14, 30)
+
+@ft.component
+def PanelVencimientos(vencimientos: list, dias: int, on_cambiar_dias=None, on_rotar=None):
+    # Componente puro: recibe la lista ya resuelta por el controlador (consulta indexada con límite)
+    # y solo la pinta. Cambiar la ventana de días vuelve a pedir la consulta al controlador.
+    return ft.Column(
+        expand=True,
+        controls=[
+            ft.Row(
+                controls=[
+                    ft.Text("Rutinas por vencer", size=20, weight=ft.FontWeight.BOLD),
+                    ft.Row(
+                        controls=[
+                            ft.Dropdown(
+                                label="Próximos días",
+                                width=160,
+                                value=str(dias),
+                                options=[ft.dropdown.Option(str(d)) for d in OPCIONES_DIAS],
+                                on_select=lambda e: on_cambiar_dias(int(e.control.value)) if on_cambiar_dias else None,
+                            ),
+                            # Rotación masiva de los vencidos (muestra antes una simulación)
+                            ft.Button("Rotar vencidos", icon=ft.Icons.AUTORENEW, on_click=lambda e: on_rotar() if on_rotar else None),
+                        ],
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            Tablas(
+                datos=vencimientos,
+                columnas=COLUMNAS_VISTA[VencimientoViewDTO],
+            ),
+        ],
+    )
+
+
+def _barras(titulo: str, filas: list[tuple[str, int]]) -> ft.Control:
+    """Lista de barras horizontales (etiqueta, valor) escaladas al máximo de la serie."""
+    maximo = max((v for _, v in filas), default=0) or 1
+    controles = [ft.Text(titulo, weight=ft.FontWeight.BOLD)]
+    if not filas:
+        controles.append(ft.Text("Sin datos en el período"))
+    for etiqueta, valor in filas:
+        controles.append(ft.Row(
+            controls=[
+                ft.Text(etiqueta, width=140, no_wrap=True),
+                ft.ProgressBar(value=valor / maximo, expand=True),
+                ft.Text(str(valor), width=50, text_align=ft.TextAlign.RIGHT),
+            ],
+        ))
+    return ft.Column(expand=True, controls=controles)
+
+
+@ft.component
+def PanelEstadisticas(tablero, dias: int, on_cambiar_dias=None):
+    # Componente puro: el tablero ya viene resuelto desde las tablas de resumen (rollups),
+    # así el costo de pintarlo depende de la cantidad de buckets y no del historial.
+    if tablero is None:
+        return ft.Container(expand=True)
+
+    return ft.Column(
+        expand=True,
+        scroll=ft.ScrollMode.ADAPTIVE,
+        controls=[
+            ft.Row(
+                controls=[
+                    ft.Text(f"Estadísticas ({tablero.desde} a {tablero.hasta}): {tablero.total_asistencias} asistencias",
+                            size=20, weight=ft.FontWeight.BOLD),
+                    ft.Dropdown(
+                        label="Últimos días",
+                        width=160,
+                        value=str(dias),
+                        options=[ft.dropdown.Option(str(d)) for d in (7, 30, 90)],
+                        on_select=lambda e: on_cambiar_dias(int(e.control.value)) if on_cambiar_dias else None,
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            ),
+            ft.Row(
+                vertical_alignment=ft.CrossAxisAlignment.START,
+                controls=[
+                    _barras("Por semana", [(c.periodo, c.asistencias) for c in tablero.por_semana]),
+                    _barras("Horas pico", [(f"{c.periodo} h", c.asistencias) for c in tablero.por_hora]),
+                ],
+            ),
+            ft.Row(
+                vertical_alignment=ft.CrossAxisAlignment.START,
+                controls=[
+                    _barras("Clientes por instructor", [(c.instructor, c.clientes) for c in tablero.por_instructor]),
+                    _barras("Rutinas más usadas", [(c.rutina, c.clientes) for c in tablero.por_rutina]),
+                ],
+            ),
+        ],
+    )
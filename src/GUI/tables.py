@@ -1,13 +1,84 @@
 import flet as ft
 import flet_datatable2 as ftd
-from dataclasses import fields, asdict
+from dataclasses import fields
+from domain.campos import nombres_campos
+from GUI.actualizaciones import contar_render
+
+def contenido_celda(campo: str, dato, on_qr=None, on_edit=None, on_delete=None) -> ft.Control:
+    """Lo que se pinta en la celda 'campo' de la fila del DTO 'dato'."""
+    if campo == "QR":
+        return ft.Row([
+            ft.IconButton(
+                icon=ft.Icons.QR_CODE_2,
+                icon_color=ft.Colors.PRIMARY,
+                tooltip="Ver Rutina",
+                on_click=lambda e, d=dato: on_qr(d.id) if on_qr else None
+            )
+        ], spacing=0, alignment=ft.MainAxisAlignment.CENTER)
+    if campo == "Acciones":
+        return ft.Row([
+            ft.IconButton(
+                icon=ft.Icons.EDIT, 
+                icon_color=ft.Colors.BLUE,
+                tooltip="Editar",
+                on_click=lambda e, d=dato: on_edit(d.id) if on_edit else None
+            ),
+            ft.IconButton(
+                icon=ft.Icons.DELETE, 
+                icon_color=ft.Colors.RED,
+                tooltip="Eliminar",
+                on_click=lambda e, d=dato: on_delete(
+                    d.id, 
+                    getattr(d, 'Nombre_y_Apellido', None) or getattr(d, 'Nombre', None) or f"ID {d.id}"
+                ) if on_delete else None
+            ),
+        ], spacing=0, alignment=ft.MainAxisAlignment.CENTER)
+    return ft.Row([
+        ft.Text(value=str(getattr(dato, campo)), text_align="center")
+    ], spacing = 0, alignment=ft.MainAxisAlignment.CENTER)
+
+def construir_filas(datos: list, on_qr=None, on_edit=None, on_delete=None) -> list:
+    """Construye las filas (DataRow2) de la tabla a partir de los DTOs.
+    Es una función pura (no usa hooks), así se puede medir fuera del renderizado."""
+    data_rows = []
+    for dato in datos:
+        # El ID interno para lógica (el que está en minúscula 'id') lo saltamos.
+        # El ID visible (el que está en mayúscula 'ID' en Rutinas) lo mostramos.
+        # nombres_campos hace una lectura superficial (asdict copiaba en profundidad cada DTO)
+        celdas = [
+            ft.DataCell(contenido_celda(k, dato, on_qr=on_qr, on_edit=on_edit, on_delete=on_delete))
+            for k in nombres_campos(type(dato)) if k != "id"
+        ]
+        # Añadimos la lista de celdas como una nueva fila a la lista de filas
+        data_rows.append(ftd.DataRow2(cells=celdas))
+
+    return data_rows
 
 @ft.component
-def Tablas(datos: list, columnas: dict, on_qr=None, on_edit=None, on_delete=None):
+def Celda(fila, campo: str, on_qr=None, on_edit=None, on_delete=None):
+    # Recibe la fila observable (FilaTabla): cuando cambia fila.dato se vuelve a pintar esta celda,
+    # sin pasar por Tablas ni por las celdas de las demás filas
+    contar_render("celda")
+    return contenido_celda(campo, fila.dato, on_qr=on_qr, on_edit=on_edit, on_delete=on_delete)
+
+def construir_filas_observadas(filas: list, on_qr=None, on_edit=None, on_delete=None) -> list:
+    """Como construir_filas, pero cada celda es un componente Celda que observa su FilaTabla."""
+    return [
+        ftd.DataRow2(cells=[
+            ft.DataCell(Celda(fila, k, on_qr=on_qr, on_edit=on_edit, on_delete=on_delete))
+            for k in nombres_campos(type(fila.dato)) if k != "id"
+        ])
+        for fila in filas
+    ]
+
+@ft.component
+def Tablas(ids: list, filas: dict, columnas: dict, on_qr=None, on_edit=None, on_delete=None):
     # Tablas ahora es un componente puro: recibe datos y los pinta.
     # No sabe nada del estado global.
-    # datos: list[Entidad]
+    # ids: ids de las filas en orden (cambia solo con altas, bajas o recargas)
+    # filas: {id: FilaTabla}; editar una fila no vuelve a pintar Tablas, solo las celdas de esa fila
     # columnas: dict
+    contar_render("tablas")
 
     # Definimos los estados: la lista de ítems, el índice de la columna y el orden
     sort_index, set_sort_index = ft.use_state(0)
@@ -32,12 +103,13 @@ def Tablas(datos: list, columnas: dict, on_qr=None, on_edit=None, on_delete=None
     data_rows = []
     
     # Ordenar datos si es necesario
+    datos = [filas[i] for i in ids if i in filas]
     datos_para_mostrar = datos
     if sort_index >= 0 and sort_index < len(nombres_columnas):
         nombre_columna = nombres_columnas[sort_index]
         
-        def get_sort_key(obj):
-            valor = getattr(obj, nombre_columna, "")
+        def get_sort_key(fila):
+            valor = getattr(fila.dato, nombre_columna, "")
             if valor is None:
                 return ""
             
@@ -71,55 +143,7 @@ def Tablas(datos: list, columnas: dict, on_qr=None, on_edit=None, on_delete=None
         )
     
     if datos_para_mostrar:
-        for dato in datos_para_mostrar:
-            d_dict = asdict(dato)
-            # Generamos la lista de celdas con list comprehension
-            celdas = []
-            
-            # El ID interno para lógica (el que está en minúscula 'id') lo saltamos.
-            # El ID visible (el que está en mayúscula 'ID' en Rutinas) lo mostramos.
-            for k, v in d_dict.items():
-                if k == "id": 
-                    continue
-                
-                content = None
-                
-                if k == "QR":
-                    content = ft.Row([
-                        ft.IconButton(
-                            icon=ft.Icons.QR_CODE_2,
-                            icon_color=ft.Colors.PRIMARY,
-                            tooltip="Ver Rutina",
-                            on_click=lambda e, d=dato: on_qr(d.id) if on_qr else None
-                        )
-                    ], spacing=0, alignment=ft.MainAxisAlignment.CENTER)
-                elif k == "Acciones":
-                    content = ft.Row([
-                        ft.IconButton(
-                            icon=ft.Icons.EDIT, 
-                            icon_color=ft.Colors.BLUE,
-                            tooltip="Editar",
-                            on_click=lambda e, d=dato: on_edit(d.id) if on_edit else None
-                        ),
-                        ft.IconButton(
-                            icon=ft.Icons.DELETE, 
-                            icon_color=ft.Colors.RED,
-                            tooltip="Eliminar",
-                            on_click=lambda e, d=dato: on_delete(
-                                d.id, 
-                                getattr(d, 'Nombre_y_Apellido', None) or getattr(d, 'Nombre', None) or f"ID {d.id}"
-                            ) if on_delete else None
-                        ),
-                    ], spacing=0, alignment=ft.MainAxisAlignment.CENTER)
-                else:
-                    content = ft.Row([
-                        ft.Text(value=str(v), text_align="center")
-                    ], spacing = 0, alignment=ft.MainAxisAlignment.CENTER)
-                
-                celdas.append(ft.DataCell(content))
-
-            # Añadimos la lista de celdas como una nueva fila a la lista de filas
-            data_rows.append(ftd.DataRow2(cells=celdas))
+        data_rows = construir_filas_observadas(datos_para_mostrar, on_qr=on_qr, on_edit=on_edit, on_delete=on_delete)
 
     # 4. GENERAR COLUMNAS DINÁMICAS
     columnas_formateadas = []
@@ -2,8 +2,10 @@ import flet as ft
 from .styles import MenuButton
 from .theme import MenuTheme
 from .tables import Tablas
+from .panels import PanelVencimientos, PanelEstadisticas
 from .assets.themes.colors import Colors
-from .controllers import gym_controller, gym_state # Importamos el estado y controlador
+from .contexts.controller_context import GymControllerContext
+from .actualizaciones import contar_render
 from .contexts.service_context import GymServiceContext
 from domain.entities import Rutina, Instructor, Cliente, ENTIDADES
 from typing import get_type_hints
@@ -13,6 +15,13 @@ from datetime import datetime
 def AppView():
     # AQUÍ SÍ es legal usar el context porque estamos en el renderizado
     servicio = ft.use_context(GymServiceContext)
+    # Controlador y estado de ESTA sesión (en modo web cada pestaña tiene los suyos)
+    gym_controller = ft.use_context(GymControllerContext)
+    def iniciar_sincronizacion():
+        """Una sola vez al montar: la tabla abierta se mantiene al día con los cambios de otras estaciones."""
+        gym_controller.observar_cambios(servicio)
+
+    ft.use_effect(iniciar_sincronizacion, [])
 
     @ft.component
     def Navigation():
@@ -51,6 +60,21 @@ def AppView():
                         style=MenuButton(),
                         on_click=lambda e: gym_controller.GetTabla(servicio=servicio, entidad=Cliente)
                         ),
+                    ft.Button(
+                        content = "Vencimientos",
+                        style=MenuButton(),
+                        on_click=lambda e: gym_controller.GetVencimientos(servicio=servicio)
+                        ),
+                    ft.Button(
+                        content = "Estadísticas",
+                        style=MenuButton(),
+                        on_click=lambda e: gym_controller.GetEstadisticas(servicio=servicio)
+                        ),
+                    ft.Button(
+                        content = "Respaldo",
+                        style=MenuButton(),
+                        on_click=lambda e: gym_controller.respaldar(servicio=servicio)
+                        ),
                 ],
                 alignment=ft.MainAxisAlignment.CENTER,
                 horizontal_alignment=ft.CrossAxisAlignment.STRETCH,
@@ -58,7 +82,8 @@ def AppView():
 
     @ft.component
     def Body():
-        state, _ = ft.use_state(gym_state)
+        state, _ = ft.use_state(gym_controller.state)
+        contar_render("body")
 
         def IsAllFieldsFilled(tipos):
             for control in state.add_fields:
@@ -74,19 +99,21 @@ def AppView():
             entidad = ENTIDADES[state.tabla_actual]
             es_actualizacion = state.entidad_a_editar is not None
             
-            # Delegamos al controlador con el flag correcto
-            guardado_exitosamente = gym_controller.SendRegistro(servicio, entidad, es_actualizacion=es_actualizacion)
-            
-            # Cerrar el sheet SOLO si se guardó exitosamente
-            if guardado_exitosamente:
-                # Limpiar modo edición al guardar
-                gym_controller.state.entidad_a_editar = None
-                ft.context.page.pop_dialog()
+            # Guardado, tabla recargada, avisos y cierre del sheet viajan en un solo envío
+            with gym_controller.pantalla.accion("guardar_formulario"):
+                # Delegamos al controlador con el flag correcto
+                guardado_exitosamente = gym_controller.SendRegistro(servicio, entidad, es_actualizacion=es_actualizacion)
+
+                # Cerrar el sheet SOLO si se guardó exitosamente
+                if guardado_exitosamente:
+                    # Limpiar modo edición al guardar
+                    gym_controller.state.entidad_a_editar = None
+                    gym_controller.pantalla.cerrar_dialogo()
 
         def cancelar_formulario(e):
             """Cancela y descarta el formulario (limpia edición si la hay)."""
             gym_controller.state.entidad_a_editar = None
-            ft.context.page.pop_dialog()
+            gym_controller.pantalla.cerrar_dialogo()
 
         def on_sheet_dismiss(e):
             """Al cerrar el Sheet (por click afuera), solo limpiar sin cerrar nada más."""
@@ -130,13 +157,11 @@ def AppView():
         def abrir_sheet_add():
             """Limpia el modo edición y abre un nuevo Sheet para agregar."""
             entidad = ENTIDADES[state.tabla_actual]
-            # Regenerar campos sin precarga (limpia todos los valores a "")
-            gym_controller.GetTabla(servicio, entidad)
-            # Limpiar modo edición para que el formulario sea de ADD
-            gym_controller.state.entidad_a_editar = None
-            # Abrir un Sheet nuevo (fresco)
-            sheet = crear_sheet()
-            ft.context.page.show_dialog(sheet)
+            with gym_controller.pantalla.accion("abrir_formulario"):
+                # Regenerar campos sin precarga (limpia todos los valores a "" y el modo edición)
+                gym_controller.preparar_alta(servicio, entidad)
+                # Abrir un Sheet nuevo (fresco)
+                gym_controller.pantalla.mostrar_dialogo(crear_sheet())
 
         def use_effect_edicion():
             """Hook reactivo: abre Sheet cuando entidad_a_editar cambia a no-None."""
@@ -159,6 +184,31 @@ def AppView():
             # preparar_edicion precarga los datos; use_effect detectará el cambio y abrirá el Sheet
             gym_controller.preparar_edicion(servicio, entidad_tipo, id_registro)
 
+        if state.vista_actual == "vencimientos":
+            return ft.Container(
+                bgcolor=ft.Colors.SURFACE,
+                padding=25,
+                expand=True,
+                content=PanelVencimientos(
+                    vencimientos=state.vencimientos,
+                    dias=state.dias_vencimiento,
+                    on_cambiar_dias=lambda dias: gym_controller.GetVencimientos(servicio, dias=dias),
+                    on_rotar=lambda: gym_controller.rotar_ciclos(servicio),
+                ),
+            )
+
+        if state.vista_actual == "estadisticas":
+            return ft.Container(
+                bgcolor=ft.Colors.SURFACE,
+                padding=25,
+                expand=True,
+                content=PanelEstadisticas(
+                    tablero=state.tablero,
+                    dias=state.dias_estadisticas,
+                    on_cambiar_dias=lambda dias: gym_controller.GetEstadisticas(servicio, dias=dias),
+                ),
+            )
+
         return ft.Container(
             bgcolor=ft.Colors.SURFACE,
             padding=25,
@@ -167,7 +217,8 @@ def AppView():
             content=ft.Column(
                 controls=[
                     Tablas(
-                        datos=state.datos_actuales, 
+                        ids=state.ids_filas,
+                        filas=state.filas,
                         columnas=state.columnas_actuales,
                         on_qr=call_qr,
                         on_delete=call_delete,
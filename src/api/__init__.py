@@ -0,0 +1,412 @@
+"""
+API HTTP/JSON local para los kioscos de check-in y otras integraciones (sin la interfaz gráfica).
+
+Servidor asyncio de la biblioteca estándar, sin dependencias nuevas: el bucle atiende las conexiones
+(HTTP/1.1 con keep-alive) y las llamadas al servicio, que bloquean (SQLite), corren en un pool acotado
+de hilos. Cada hilo usa su propia conexión de solo lectura (WAL): las lecturas no se esperan entre sí.
+Si ya hay 'max_pendientes' pedidos atendiéndose o esperando un hilo, se responde 503 con Retry-After
+en vez de encolar sin límite (un kiosco que reintenta es mejor que todos esperando).
+
+Endpoints:
+    GET  /salud
+    GET  /rutinas, /instructores, /clientes      ?despues_de=<id>&limite=<n>   (paginados por id)
+    GET  /rutinas/<id>, /instructores/<id>, /clientes/<id>
+    GET  /vencimientos                           ?dias=7&limite=50&vencidos=1
+    POST /asistencias                            {"cliente_id": 7}   (check-in, 202: se guarda en lote)
+
+Los listados se piden por cursor: la respuesta trae "siguiente", el 'despues_de' de la próxima página
+(null en la última). Cada página es un rango sobre la PK: cuesta lo mismo la primera que la número mil.
+
+Las respuestas GET llevan ETag (hash del cuerpo). Con If-None-Match igual se responde 304 sin cuerpo:
+el kiosco que consulta las rutinas cada minuto no vuelve a bajar la lista si no cambió.
+
+Errores: {"error": "..."} con 400 (parámetros), 404, 405, 413, 422 (regla de negocio),
+503 (saturado o base ocupada) y 500.
+
+Uso (desde src/):
+    python -m api --puerto 8560
+    curl "localhost:8560/clientes?limite=20"
+    curl "localhost:8560/clientes?despues_de=20&limite=20"
+    curl -X POST localhost:8560/asistencias -d '{"cliente_id": 7}'
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass, field, is_dataclass
+from datetime import date
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+from application.services import LIMITE_PAGINA, GymService
+from config import Config, ruta_base_datos
+from domain.campos import como_dict
+from domain.entities import Cliente, Instructor, Rutina
+from domain.exceptions import BaseOcupadaError, GymException, NegocioError, RegistroNoEncontrado
+from infrastructure.asistencias import EscritorAsistencias
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.mantenimiento import MantenimientoProgramado
+from infrastructure.metrics import RegistroMetricas
+from infrastructure.sqlite3_repo import SQLite3Repository
+
+logger = logging.getLogger(__name__)
+
+MAX_CABECERAS = 16 * 1024   # Línea de pedido + cabeceras
+MAX_CUERPO = 64 * 1024      # Los POST de la API son objetos chicos
+
+COLECCIONES = {"rutinas": Rutina, "instructores": Instructor, "clientes": Cliente}
+# Rango de los enteros de SQLite: fuera de él sqlite3 lanza OverflowError al pasar el parámetro
+ENTERO_MIN, ENTERO_MAX = -(2**63), 2**63 - 1
+
+
+class _ErrorHTTP(Exception):
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+@dataclass(slots=True)
+class Pedido:
+    metodo: str
+    ruta: str
+    consulta: dict[str, str]
+    cabeceras: dict[str, str]   # Nombres en minúscula
+    cuerpo: bytes = b""
+    mantener: bool = True       # Keep-alive: la conexión sigue abierta después de responder
+
+
+@dataclass(slots=True)
+class Respuesta:
+    estado: int
+    cuerpo: bytes = b""
+    cabeceras: dict[str, str] = field(default_factory=dict)
+
+
+def _serializable(valor):
+    if is_dataclass(valor):
+        return como_dict(valor)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+def _entero(consulta: dict[str, str], nombre: str, defecto: int) -> int:
+    valor = consulta.get(nombre)
+    if valor is None:
+        return defecto
+    try:
+        numero = int(valor)
+    except ValueError:
+        raise _ErrorHTTP(400, f"'{nombre}' debe ser un número entero")
+    if not ENTERO_MIN <= numero <= ENTERO_MAX:
+        raise _ErrorHTTP(400, f"'{nombre}' está fuera de rango")
+    return numero
+
+
+def _id(texto: str) -> int | None:
+    """El id de la ruta como entero, o None si ningún registro puede tenerlo (fuera del rango de SQLite)."""
+    try:
+        numero = int(texto)
+    except ValueError:  # Más dígitos de los que int() acepta de un texto
+        return None
+    return numero if numero <= ENTERO_MAX else None
+
+
+# ========================================
+# ENDPOINTS (corren en el pool de hilos; devuelven (estado, datos))
+# ========================================
+
+def _salud(servicio: GymService, pedido: Pedido) -> tuple[int, object]:
+    return 200, {"estado": "ok"}
+
+
+def _listar(servicio: GymService, pedido: Pedido, coleccion: str) -> tuple[int, object]:
+    despues_de = _entero(pedido.consulta, "despues_de", 0)
+    limite = _entero(pedido.consulta, "limite", LIMITE_PAGINA)
+    pagina = servicio.listar_pagina(COLECCIONES[coleccion], despues_de=despues_de, limite=limite)
+    return 200, {"datos": pagina.registros, "siguiente": pagina.siguiente}
+
+
+def _detalle(servicio: GymService, pedido: Pedido, coleccion: str, registro_id: str) -> tuple[int, object]:
+    numero = _id(registro_id)
+    registro = servicio.buscar_por_id(COLECCIONES[coleccion], numero) if numero is not None else None
+    if registro is None:
+        raise _ErrorHTTP(404, f"No existe {coleccion}/{registro_id}")
+    return 200, registro
+
+
+def _vencimientos(servicio: GymService, pedido: Pedido) -> tuple[int, object]:
+    vencimientos = servicio.clientes_por_vencer(
+        dias=_entero(pedido.consulta, "dias", 7),
+        limite=_entero(pedido.consulta, "limite", LIMITE_PAGINA),
+        incluir_vencidos=pedido.consulta.get("vencidos") in ("1", "true"),
+    )
+    return 200, {"datos": vencimientos}
+
+
+def _asistencia(servicio: GymService, pedido: Pedido) -> tuple[int, object]:
+    try:
+        datos = json.loads(pedido.cuerpo or b"null")
+    except ValueError:
+        raise _ErrorHTTP(400, "El cuerpo no es JSON válido")
+    cliente_id = datos.get("cliente_id") if isinstance(datos, dict) else None
+    if not isinstance(cliente_id, int) or isinstance(cliente_id, bool):
+        raise _ErrorHTTP(400, "Falta 'cliente_id' (entero)")
+    # El escritor en lotes descarta en silencio las asistencias con un cliente inexistente (FK):
+    # el kiosco tiene que enterarse ahora. Es una búsqueda por PK.
+    if not ENTERO_MIN <= cliente_id <= ENTERO_MAX or servicio.buscar_por_id(Cliente, cliente_id) is None:
+        raise _ErrorHTTP(404, f"No existe el cliente {cliente_id}")
+    servicio.registrar_asistencia(cliente_id)
+    return 202, {"cliente_id": cliente_id, "estado": "registrada"}
+
+
+# (método, ruta completa, endpoint): los grupos de la expresión se pasan como argumentos
+RUTAS = [
+    ("GET", re.compile(r"/salud"), _salud),
+    ("GET", re.compile(r"/(rutinas|instructores|clientes)"), _listar),
+    ("GET", re.compile(r"/(rutinas|instructores|clientes)/(\d+)"), _detalle),
+    ("GET", re.compile(r"/vencimientos"), _vencimientos),
+    ("POST", re.compile(r"/asistencias"), _asistencia),
+]
+
+
+def _etag(cuerpo: bytes) -> str:
+    return '"' + hashlib.blake2b(cuerpo, digest_size=16).hexdigest() + '"'
+
+
+def _coincide_etag(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = {e.strip().removeprefix("W/") for e in if_none_match.split(",")}
+    return "*" in candidatos or etag in candidatos
+
+
+def _json(estado: int, datos) -> Respuesta:
+    cuerpo = json.dumps(datos, default=_serializable, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Respuesta(estado, cuerpo)
+
+
+def procesar(servicio: GymService, pedido: Pedido) -> Respuesta:
+    """Busca la ruta, llama al endpoint y arma la respuesta (JSON, ETag, errores). Bloquea: va en el pool."""
+    permitidos = []
+    for metodo, patron, endpoint in RUTAS:
+        encontrada = patron.fullmatch(pedido.ruta)
+        if encontrada is None:
+            continue
+        if metodo != pedido.metodo:
+            permitidos.append(metodo)
+            continue
+        try:
+            estado, datos = endpoint(servicio, pedido, *encontrada.groups())
+        except _ErrorHTTP as e:
+            return _json(e.estado, {"error": str(e)})
+        except RegistroNoEncontrado as e:
+            return _json(404, {"error": str(e)})
+        except BaseOcupadaError as e:
+            respuesta = _json(503, {"error": str(e)})
+            respuesta.cabeceras["Retry-After"] = "1"
+            return respuesta
+        except NegocioError as e:
+            return _json(422, {"error": str(e)})
+        except GymException as e:
+            logger.error("Error atendiendo %s %s: %s", pedido.metodo, pedido.ruta, e)
+            return _json(500, {"error": str(e)})
+
+        respuesta = _json(estado, datos)
+        if pedido.metodo == "GET" and estado == 200:
+            etag = _etag(respuesta.cuerpo)
+            # no-cache: el cliente puede guardar la respuesta, pero la revalida siempre (If-None-Match)
+            respuesta.cabeceras.update({"ETag": etag, "Cache-Control": "no-cache"})
+            if _coincide_etag(pedido.cabeceras.get("if-none-match"), etag):
+                return Respuesta(304, b"", respuesta.cabeceras)
+        return respuesta
+
+    if permitidos:
+        respuesta = _json(405, {"error": f"Método {pedido.metodo} no permitido en {pedido.ruta}"})
+        respuesta.cabeceras["Allow"] = ", ".join(permitidos)
+        return respuesta
+    return _json(404, {"error": f"No existe la ruta {pedido.ruta}"})
+
+
+# ========================================
+# SERVIDOR
+# ========================================
+
+class ServidorAPI:
+    def __init__(
+        self,
+        servicio: GymService,
+        host: str = "127.0.0.1",
+        puerto: int = Config.API_PUERTO,
+        hilos: int = Config.API_HILOS,
+        max_pendientes: int = Config.API_MAX_PENDIENTES,
+        espera_s: float = Config.API_ESPERA_S,
+        metricas: RegistroMetricas = None,
+    ):
+        self.servicio = servicio
+        self.host = host
+        self.puerto = puerto   # Con 0 el sistema elige uno libre; después de iniciar() queda el real
+        self.max_pendientes = max_pendientes
+        self.espera_s = espera_s
+        self.metricas = metricas or servicio.repositorio.metricas
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="api")
+        self._pendientes = 0   # Solo lo toca el hilo del bucle
+        self._servidor: asyncio.Server | None = None
+
+    async def iniciar(self):
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto, limit=MAX_CABECERAS)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        logger.info("API escuchando en http://%s:%s", self.host, self.puerto)
+
+    async def servir(self):
+        """Inicia y atiende hasta que se cancele la tarea (Ctrl+C con asyncio.run)."""
+        if self._servidor is None:
+            await self.iniciar()
+        try:
+            await self._servidor.serve_forever()
+        finally:
+            await self.detener()
+
+    async def detener(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            with suppress(asyncio.CancelledError):
+                await self._servidor.wait_closed()
+        # Los pedidos que ya estaban en un hilo terminan; los encolados se descartan
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    # --- Conexiones ---
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    pedido = await asyncio.wait_for(self._leer_pedido(lector), self.espera_s)
+                except _ErrorHTTP as e:
+                    # Pedido mal formado: se responde y se cierra (no se sabe dónde empieza el siguiente)
+                    escritor.write(self._bytes(_json(e.estado, {"error": str(e)}), mantener=False))
+                    await escritor.drain()
+                    return
+                if pedido is None:
+                    return  # El cliente cerró la conexión
+                respuesta = await self._despachar(pedido)
+                escritor.write(self._bytes(respuesta, pedido.mantener))
+                await escritor.drain()
+                if not pedido.mantener:
+                    return
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass  # Keep-alive inactivo o cliente que se fue a mitad de pedido
+        finally:
+            escritor.close()
+            with suppress(ConnectionError):
+                await escritor.wait_closed()
+
+    async def _leer_pedido(self, lector: asyncio.StreamReader) -> Pedido | None:
+        try:
+            encabezado = await lector.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise _ErrorHTTP(431, "Cabeceras demasiado grandes")
+
+        lineas = encabezado.decode("latin-1").split("\r\n")
+        try:
+            metodo, destino, version = lineas[0].split(" ")
+        except ValueError:
+            raise _ErrorHTTP(400, "Línea de pedido inválida")
+        cabeceras = {}
+        for linea in lineas[1:]:
+            nombre, separador, valor = linea.partition(":")
+            if separador:
+                cabeceras[nombre.strip().lower()] = valor.strip()
+        if "transfer-encoding" in cabeceras:
+            raise _ErrorHTTP(411, "Se requiere Content-Length")
+        try:
+            largo = int(cabeceras.get("content-length", 0))
+        except ValueError:
+            raise _ErrorHTTP(400, "Content-Length inválido")
+        if not 0 <= largo <= MAX_CUERPO:
+            raise _ErrorHTTP(413, f"El cuerpo supera {MAX_CUERPO} bytes")
+        cuerpo = await lector.readexactly(largo) if largo else b""
+
+        partes = urlsplit(destino)
+        conexion = cabeceras.get("connection", "").lower()
+        return Pedido(
+            metodo=metodo.upper(),
+            ruta=partes.path.rstrip("/") or "/",
+            consulta=dict(parse_qsl(partes.query)),
+            cabeceras=cabeceras,
+            cuerpo=cuerpo,
+            mantener=conexion == "keep-alive" if version == "HTTP/1.0" else conexion != "close",
+        )
+
+    async def _despachar(self, pedido: Pedido) -> Respuesta:
+        if self._pendientes >= self.max_pendientes:
+            self.metricas.incrementar("api_rechazados")
+            respuesta = _json(503, {"error": "Servidor ocupado, reintente en un momento"})
+            respuesta.cabeceras["Retry-After"] = "1"
+            return respuesta
+        self._pendientes += 1
+        inicio = time.perf_counter()
+        try:
+            respuesta = await asyncio.get_running_loop().run_in_executor(self._pool, procesar, self.servicio, pedido)
+        except Exception:
+            logger.exception("Error inesperado atendiendo %s %s", pedido.metodo, pedido.ruta)
+            respuesta = _json(500, {"error": "Error interno"})
+        finally:
+            self._pendientes -= 1
+        self.metricas.registrar_metodo(f"api {pedido.metodo}", time.perf_counter() - inicio, error=respuesta.estado >= 500)
+        self.metricas.incrementar(f"api_respuestas.{respuesta.estado}")
+        return respuesta
+
+    @staticmethod
+    def _bytes(respuesta: Respuesta, mantener: bool) -> bytes:
+        cabeceras = {"Connection": "keep-alive" if mantener else "close"}
+        if respuesta.estado != 304:  # 304 sin cuerpo ni Content-Type
+            cabeceras["Content-Type"] = "application/json; charset=utf-8"
+            cabeceras["Content-Length"] = str(len(respuesta.cuerpo))
+        cabeceras.update(respuesta.cabeceras)
+        lineas = [f"HTTP/1.1 {respuesta.estado} {HTTPStatus(respuesta.estado).phrase}"]
+        lineas += [f"{nombre}: {valor}" for nombre, valor in cabeceras.items()]
+        return ("\r\n".join(lineas) + "\r\n\r\n").encode("latin-1") + respuesta.cuerpo
+
+
+# ========================================
+# ARRANQUE
+# ========================================
+
+def crear_servicio(db_path: str) -> tuple[DatabaseConnection, EscritorAsistencias, GymService]:
+    """Stack sin GUI, como el de la línea de comandos, pero con el check-in en lotes (proceso de larga duración)."""
+    db = DatabaseConnection(db_path)
+    db.init_db()
+    MantenimientoProgramado(db).iniciar()
+    escritor = EscritorAsistencias(db)
+    return db, escritor, GymService(repositorio=SQLite3Repository(db), registro_asistencias=escritor)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m api", description="API HTTP/JSON local del gimnasio.")
+    parser.add_argument("--db", default=None, help="Ruta de la base SQLite (por defecto la de la app)")
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 para atender a otras máquinas de la red")
+    parser.add_argument("--puerto", type=int, default=Config.API_PUERTO)
+    parser.add_argument("--hilos", type=int, default=Config.API_HILOS, help="Hilos que atienden la base")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db, escritor, servicio = crear_servicio(args.db or ruta_base_datos())
+    servidor = ServidorAPI(servicio, host=args.host, puerto=args.puerto, hilos=args.hilos)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        escritor.cerrar()
+        db.mantenimiento.cerrar()
+    return 0
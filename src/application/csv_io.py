@@ -0,0 +1,168 @@
+"""
+Importación y exportación CSV de cualquier entidad de ENTIDADES, guiada por el registro de metadatos.
+
+Exportar:
+    Lee la tabla con un cursor por lotes (CargaMasivaRepository.iterar_lotes) y escribe cada lote
+    apenas llega: la memoria usada depende del tamaño del lote, no de la tabla.
+
+Importar:
+    1. Parsea cada fila según el tipo de cada campo (int, float, fechas ISO, texto).
+    2. Valida NOT NULL y las FK contra los ids de las tablas referenciadas, cargados una sola vez
+       en un set (las filas que se van importando se suman al set).
+    3. Inserta en lotes de 'tamano_lote' filas, una transacción por lote.
+    4. Al terminar avisa al repositorio (carga_terminada) para que se actualicen las estadísticas.
+    Cada fila rechazada queda en el reporte con su número de línea, el campo y el motivo.
+
+Los ids del archivo se conservan si vienen (así un export se vuelve a importar con sus FK intactas);
+una columna id vacía o en 0 deja que la base asigne uno nuevo. Es una carga masiva de datos: no pasa
+por las reglas del formulario (cupo del instructor, morosos); los contadores y resúmenes los
+mantienen los triggers igual que con un alta normal.
+"""
+
+import csv
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import MISSING
+from datetime import date, datetime
+from typing import Any, Callable, Iterable
+
+from domain.exceptions import DatosIncompletosError
+from domain.metadata import REGISTRO_POR_TABLA, MetaCampo, meta
+from domain.reportes import ErrorImportacion, ResultadoImportacion
+
+TAMANO_LOTE = 5000
+MAX_ERRORES = 1000
+
+
+def _fecha_iso(texto: str) -> str:
+    # Acepta 'YYYY-MM-DD', 'YYYY-MM-DD HH:MM[:SS]' y el formato viejo 'DD-MM-YYYY'; guarda ISO
+    try:
+        if len(texto) == 10:
+            return date.fromisoformat(texto).isoformat()
+        return datetime.fromisoformat(texto).isoformat(sep=" ", timespec="seconds")
+    except ValueError:
+        return datetime.strptime(texto, "%d-%m-%Y").date().isoformat()
+
+
+_CONVERSORES: dict[type, Callable[[str], Any]] = {
+    int: int,
+    float: float,
+    bool: lambda texto: int(texto.strip().lower() in ("1", "true", "si", "sí")),
+    date: _fecha_iso,
+    datetime: _fecha_iso,
+    str: str,
+}
+
+
+def exportar_csv(repositorio, clase_entidad: type, archivo, tamano_lote: int = TAMANO_LOTE) -> int:
+    """Escribe la entidad completa en 'archivo' (ruta u objeto de texto). Devuelve las filas escritas."""
+    m = meta(clase_entidad)
+    filas = 0
+    with _abrir(archivo, "w") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(m.nombres)
+        for lote in repositorio.iterar_lotes(clase_entidad, tamano_lote):
+            escritor.writerows(lote)
+            filas += len(lote)
+    return filas
+
+
+def importar_csv(repositorio, clase_entidad: type, archivo, tamano_lote: int = TAMANO_LOTE, max_errores: int = MAX_ERRORES) -> ResultadoImportacion:
+    """Importa 'archivo' (ruta u objeto de texto) en lotes. Devuelve el reporte con los errores por fila."""
+    inicio = time.perf_counter()
+    m = meta(clase_entidad)
+    ids_por_tabla: dict[str, set[int]] = {}
+    for campo in m.fks:
+        if campo.fk not in ids_por_tabla:
+            ids_por_tabla[campo.fk] = repositorio.get_ids(REGISTRO_POR_TABLA[campo.fk].clase)
+    propios = ids_por_tabla.setdefault(m.tabla, set())  # Para FK a la misma tabla
+
+    leidas = importadas = rechazadas = 0
+    errores: list[ErrorImportacion] = []
+
+    def rechazar(linea: int, campo: str | None, mensaje: str):
+        nonlocal rechazadas
+        rechazadas += 1
+        if len(errores) < max_errores:
+            errores.append(ErrorImportacion(linea=linea, campo=campo, mensaje=mensaje))
+
+    def guardar(lote: list[dict], lineas: list[int]):
+        nonlocal importadas
+        fallidas = dict(repositorio.insertar_lote(clase_entidad, lote))
+        for indice, (fila, linea) in enumerate(zip(lote, lineas)):
+            if indice in fallidas:
+                rechazar(linea, None, fallidas[indice])
+            elif fila["id"] is not None:
+                propios.add(fila["id"])
+        importadas += len(lote) - len(fallidas)
+
+    with _abrir(archivo, "r") as f:
+        lector = csv.DictReader(f)
+        faltantes = [c.nombre for c in m.campos if _obligatorio(c) and c.nombre not in (lector.fieldnames or [])]
+        if faltantes:
+            raise DatosIncompletosError(f"Al archivo le faltan las columnas obligatorias: {', '.join(faltantes)}")
+
+        lote: list[dict] = []
+        lineas: list[int] = []
+        for linea, fila in enumerate(lector, start=2):
+            leidas += 1
+            valores, error = _parsear(m.campos, fila, ids_por_tabla)
+            if error:
+                rechazar(linea, *error)
+                continue
+            lote.append(valores)
+            lineas.append(linea)
+            if len(lote) >= tamano_lote:
+                guardar(lote, lineas)
+                lote, lineas = [], []
+        if lote:
+            guardar(lote, lineas)
+    if importadas:
+        repositorio.carga_terminada(clase_entidad, importadas)
+
+    return ResultadoImportacion(
+        entidad=m.nombre, leidas=leidas, importadas=importadas, rechazadas=rechazadas,
+        errores=errores, segundos=round(time.perf_counter() - inicio, 3),
+    )
+
+
+def _parsear(campos: Iterable[MetaCampo], fila: dict, ids_por_tabla: dict[str, set[int]]) -> tuple[dict, tuple[str, str] | None]:
+    """Convierte una fila del CSV a {columna: valor}. Devuelve (valores, None) o ({}, (campo, motivo))."""
+    valores = {}
+    for campo in campos:
+        texto = (fila.get(campo.nombre) or "").strip()
+        if not texto:
+            if campo.es_pk:
+                valores["id"] = None
+            elif _obligatorio(campo):
+                return {}, (campo.nombre, "campo obligatorio vacío")
+            else:
+                valores[campo.nombre] = None if campo.default is MISSING else campo.default
+            continue
+        try:
+            valor = _CONVERSORES.get(campo.tipo, str)(texto)
+        except ValueError:
+            return {}, (campo.nombre, f"valor inválido '{texto}' (se espera {campo.tipo.__name__})")
+        if campo.es_pk:
+            valor = valor or None  # id 0: lo asigna la base
+        elif campo.fk and valor not in ids_por_tabla[campo.fk]:
+            return {}, (campo.nombre, f"no existe {campo.fk} con id {valor}")
+        valores[campo.nombre] = valor
+    return valores, None
+
+
+def _obligatorio(campo: MetaCampo) -> bool:
+    # NOT NULL sin un default utilizable. Las FK (Optional = None en la dataclass) son obligatorias, y los
+    # default_factory (fechas "ahora") no cuentan: en un import la fecha tiene que venir en el archivo.
+    return not campo.es_pk and campo.not_null and (campo.default is MISSING or campo.default is None)
+
+
+@contextmanager
+def _abrir(archivo, modo: str):
+    """Abre una ruta como texto UTF-8 (y la cierra al salir) o usa tal cual un archivo ya abierto."""
+    if not isinstance(archivo, (str, os.PathLike)):
+        yield archivo
+        return
+    with open(archivo, modo, newline="", encoding="utf-8") as f:
+        yield f
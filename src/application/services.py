@@ -1,11 +1,61 @@
-from domain.entities import ENTIDADES, Cliente, Instructor, Rutina
-from domain.exceptions import RequisitoClienteInstructorError, RequisitoClienteRutinaError, NegocioError, EntidadNoValidaError
-from dataclasses import fields
+from domain.entities import ENTIDADES, Asistencia, Cliente, Instructor, Pago, Rutina
+from domain.exceptions import RequisitoClienteInstructorError, RequisitoClienteRutinaError, NegocioError, EntidadNoValidaError, CupoExcedidoError, EstadoFinancieroError, RegistroNoEncontrado, ReferenciaEnUso, ServicioNoDisponibleError
+from domain.metadata import meta
+from domain.reportes import Vencimiento, ResultadoRotacion, ConteoPeriodo, Tablero, CargaInstructor, EstadoCuenta, Deudor, Referencia, ResultadoImportacion, Respaldo, Pagina
+from domain.rotacion import ReglaRotacion, CICLO_MAXIMO, reglas_por_defecto
+from application import csv_io
+from datetime import date, datetime, timedelta
 from typing import Type
 
+def _agrupar_por_semana(por_dia: list[ConteoPeriodo]) -> list[ConteoPeriodo]:
+    """Suma el resumen diario (a lo sumo una fila por día) en semanas ISO 'YYYY-Www'."""
+    semanas: dict[str, int] = {}
+    for conteo in por_dia:
+        año, semana, _ = date.fromisoformat(conteo.periodo).isocalendar()
+        clave = f"{año}-W{semana:02d}"
+        semanas[clave] = semanas.get(clave, 0) + conteo.asistencias
+    return [ConteoPeriodo(periodo=k, asistencias=v) for k, v in semanas.items()]
+
+# Claves de la caché de catálogos que quedan viejas cuando cambia cada tabla
+# (los cupos cuentan clientes: un alta, baja o cambio de instructor de un cliente los mueve)
+CATALOGOS_POR_TABLA = {
+    "cliente": ("cargas", "propuesto"),
+    "instructor": ("instructor", "cargas", "propuesto"),
+    "rutina": ("rutina",),
+}
+
+# Tamaño de página de los listados paginados (API): por defecto y máximo por pedido
+LIMITE_PAGINA = 50
+LIMITE_PAGINA_MAXIMO = 500
+
 class GymService:
-    def __init__(self, repositorio):
+    def __init__(self, repositorio, registro_asistencias=None, respaldos=None, cambios=None, catalogos=None):
         self.repositorio = repositorio
+        # Escritor en lotes de asistencias (RegistroAsistencias). Si no se inyecta, se guardan de a una con el repositorio.
+        self.registro_asistencias = registro_asistencias
+        # Copias de seguridad (Respaldos). Opcional: sin él, los métodos de respaldo lanzan ServicioNoDisponibleError.
+        self.respaldos = respaldos
+        # Cambios hechos por otras estaciones sobre la misma base (NotificadorCambios). Opcional, como respaldos.
+        self.cambios = cambios
+        # Caché de instructores, rutinas y cupos compartida por todas las sesiones (Catalogos).
+        # Opcional: sin ella cada lectura va a la base.
+        self.catalogos = catalogos
+
+    def _catalogos_cambiaron(self, *tablas: str):
+        # Después de escribir: se descartan los catálogos de esas tablas (sin tablas, todos)
+        if self.catalogos is None:
+            return
+        if not tablas:
+            self.catalogos.invalidar()
+            return
+        claves = {clave for tabla in tablas for clave in CATALOGOS_POR_TABLA.get(tabla, ())}
+        if claves:
+            self.catalogos.invalidar(*claves)
+
+    def _catalogo(self, clave: str, cargar):
+        if self.catalogos is None:
+            return cargar()
+        return self.catalogos.obtener(clave, cargar)
 
     def añadir(self, entidad: ENTIDADES): # entidad: instancia de clase
         repo = self.repositorio
@@ -14,8 +64,8 @@ class GymService:
             instructor_id = entidad.instructor_id
             rutina_id = entidad.rutina_id
                     
-            # Validar requisitos. Si existen, continúa sin problemas. Si no existen en la DB, Infra lanza una excepción.
-            self.repositorio.get_by_id(entity_id = entidad.instructor_id, class_entity = Instructor)
+            # Validar requisitos. El instructor se valida junto con su cupo (una lectura por PK del contador).
+            self._validar_cupo(entidad.instructor_id)
             self.repositorio.get_by_id(entity_id = entidad.rutina_id, class_entity = Rutina)
 
             # Validamos coherencia de fechas
@@ -23,7 +73,12 @@ class GymService:
                 raise NegocioError("La fecha de fin no puede ser anterior a la de inicio.")
                 
             # Si todo está bien, añade el cliente
-        return repo.add(entidad)
+        elif isinstance(entidad, Instructor):
+            self._validar_cupo_instructor(entidad)
+        nuevo = repo.add(entidad)
+        if self.catalogos is not None:
+            self._catalogos_cambiaron(meta(type(entidad)).tabla)
+        return nuevo
 
     def buscar_por_id(self, clase_entidad: Type[ENTIDADES], entity_id: int) -> ENTIDADES: # entidad: clase
         repo = self.repositorio
@@ -33,23 +88,332 @@ class GymService:
     def buscar_todos(self, clase_entidad: Type[ENTIDADES]) -> list[ENTIDADES]: # entidad: clase
         repo = self.repositorio
         
+        if self.catalogos is not None and clase_entidad in (Instructor, Rutina):
+            # Catálogos: una lectura compartida por todas las sesiones. Se devuelve una copia de la lista.
+            return list(self._catalogo(meta(clase_entidad).tabla, lambda: repo.get_all(class_entity=clase_entidad)))
         return repo.get_all(class_entity=clase_entidad)
 
-    def actualizar(self, entidad: ENTIDADES): # entidad: instancia de clase
+    def buscar_por_ids(self, clase_entidad: Type[ENTIDADES], ids) -> list[ENTIDADES]:
+        # Los ids que ya no existen (borrados) simplemente no vienen
+        if not ids:
+            return []
+        return self.repositorio.get_by_ids(entity_ids=ids, class_entity=clase_entidad)
+
+    def listar_pagina(self, clase_entidad: Type[ENTIDADES], despues_de: int = 0, limite: int = LIMITE_PAGINA) -> Pagina:
+        # Listado por páginas para la API: 'despues_de' es el último id de la página anterior (0 para la primera).
+        # Se pide un registro de más para saber si hay otra página sin contar la tabla.
+        meta(clase_entidad)
+        if despues_de < 0 or not 1 <= limite <= LIMITE_PAGINA_MAXIMO:
+            raise NegocioError(f"'despues_de' debe ser >= 0 y el límite entre 1 y {LIMITE_PAGINA_MAXIMO}.")
+        registros = self.repositorio.get_pagina(class_entity=clase_entidad, despues_de=despues_de, limite=limite + 1)
+        if len(registros) > limite:
+            return Pagina(registros=registros[:limite], siguiente=registros[limite - 1].id)
+        return Pagina(registros=registros, siguiente=None)
+
+    def buscar_para_editar(self, clase_entidad: Type[ENTIDADES], entity_id: int) -> tuple[ENTIDADES, int] | None:
+        # (entidad, versión): la versión se devuelve en actualizar() para no pisar lo que otra estación guardó después
+        return self.repositorio.get_con_version(entity_id=entity_id, class_entity=clase_entidad)
+
+    def actualizar(self, entidad: ENTIDADES, campos=None, version: int | None = None): # entidad: instancia de clase
+        # 'campos': solo las columnas que cambió el usuario (None = todas). 'version': la de buscar_para_editar;
+        # si la fila ya está en otra, el repositorio lanza ConflictoEdicionError con la versión actual.
         repo = self.repositorio
-        return repo.update(entidad)
+
+        if isinstance(entidad, Cliente):
+            # Solo se valida el cupo si el cliente cambia de instructor
+            anterior = repo.get_by_id(entity_id=entidad.id, class_entity=Cliente)
+            if anterior is None or anterior.instructor_id != entidad.instructor_id:
+                self._validar_cupo(entidad.instructor_id)
+            # Asignarle otra rutina (o renovar el período) exige estar al día con los pagos
+            if anterior is not None and (
+                anterior.rutina_id != entidad.rutina_id
+                or str(anterior.fecha_inicio_rutina) != str(entidad.fecha_inicio_rutina)
+                or str(anterior.fecha_fin_rutina) != str(entidad.fecha_fin_rutina)
+            ):
+                self._validar_al_dia(entidad.id)
+        elif isinstance(entidad, Instructor):
+            self._validar_cupo_instructor(entidad)
+        if campos is None and version is None:
+            actualizado = repo.update(entidad)
+        else:
+            actualizado = repo.update(entidad, campos=campos, version=version)
+        if self.catalogos is not None:
+            self._catalogos_cambiaron(meta(type(entidad)).tabla)
+        return actualizado
+
+    def actualizar_campos(self, entidad: ENTIDADES, campos, version: int | None = None) -> bool:
+        # Edición desde el formulario: 'campos' son solo los que cambió el usuario. Las validaciones corren
+        # solo si tocan esos campos (sin releer el registro) y sin campos no se escribe nada (devuelve False).
+        campos = tuple(campos)
+        if isinstance(entidad, Cliente):
+            if "instructor_id" in campos:
+                self._validar_cupo(entidad.instructor_id)
+            if {"rutina_id", "fecha_inicio_rutina", "fecha_fin_rutina"} & set(campos):
+                self._validar_al_dia(entidad.id)
+        elif isinstance(entidad, Instructor) and "cupo" in campos:
+            self._validar_cupo_instructor(entidad)
+        escrito = self.repositorio.update_fields(entidad, campos, version=version)
+        if escrito and self.catalogos is not None:
+            self._catalogos_cambiaron(meta(type(entidad)).tabla)
+        return escrito
+
+    def _validar_cupo(self, instructor_id: int) -> CargaInstructor:
+        # Chequeo previo rápido (mensaje con nombre y números): lee el contador clientes_asignados, no cuenta
+        # los clientes. El que manda es el trigger de cupo, dentro de la transacción que escribe: entre esta
+        # lectura y el insert otra sesión puede ocupar el último lugar.
+        carga = self.repositorio.get_carga_instructor(instructor_id)
+        if carga is None:
+            raise RequisitoClienteInstructorError(f"No existe el instructor con ID {instructor_id}.")
+        if carga.clientes >= carga.cupo:
+            raise CupoExcedidoError(f"{carga.instructor} ya tiene el cupo completo ({carga.clientes}/{carga.cupo}).")
+        return carga
+
+    def _validar_cupo_instructor(self, instructor: Instructor):
+        if instructor.cupo < 1:
+            raise NegocioError("El cupo del instructor debe ser de al menos 1 cliente.")
+        if instructor.id:
+            carga = self.repositorio.get_carga_instructor(instructor.id)
+            if carga is not None and instructor.cupo < carga.clientes:
+                raise CupoExcedidoError(f"El cupo no puede ser menor a los {carga.clientes} clientes que ya tiene asignados.")
+
+    def _validar_al_dia(self, cliente_id: int, hoy: date | None = None):
+        # Lectura por PK del saldo acumulado: no depende del largo del historial de pagos
+        estado = self.repositorio.get_estado_cuenta(cliente_id)
+        hoy = (hoy or date.today()).isoformat()
+        if estado is not None and estado.moroso(hoy):
+            raise EstadoFinancieroError(
+                f"El cliente tiene ${estado.saldo:.2f} de deuda vencida desde el {estado.vence_deuda}: regularice el pago antes de asignarle una rutina."
+            )
+
+    def cargas_instructores(self) -> list[CargaInstructor]:
+        return list(self._catalogo("cargas", self.repositorio.get_cargas_instructores))
+
+    def proponer_instructor(self) -> CargaInstructor | None:
+        # Instructor con menos clientes asignados y cupo libre (None si están todos completos)
+        return self._catalogo("propuesto", self.repositorio.get_instructor_con_menos_carga)
 
     def eliminar(self, entidad: ENTIDADES): # entidad: instancia de clase
+        # Un cliente con asistencias o pagos no se puede borrar sin perder ese historial (FK, tablas de
+        # solo inserción): se archiva. Deja de aparecer en tablas y reportes y libera su lugar en el cupo.
         repo = self.repositorio
-        return repo.delete(entidad)
+        try:
+            eliminado = repo.delete(entidad)
+        except ReferenciaEnUso:
+            if not isinstance(entidad, Cliente):
+                raise
+            eliminado = repo.archivar(entidad)
+        if self.catalogos is not None:
+            self._catalogos_cambiaron(meta(type(entidad)).tabla)
+        return eliminado
+
+    def referencias(self, clase_entidad: Type[ENTIDADES], entity_id: int) -> list[Referencia]:
+        # Vista previa para confirmar un borrado: cuántos registros dejarían de tener a quién apuntar
+        return self.repositorio.contar_referencias(entity_id=entity_id, class_entity=clase_entidad)
+
+    def reasignar_y_eliminar(self, origen: Instructor | Rutina, destino: Instructor | Rutina) -> int:
+        # Pasa todos los clientes de 'origen' a 'destino' y borra 'origen' (una transacción).
+        # Devuelve la cantidad de clientes reasignados.
+        if not isinstance(origen, (Instructor, Rutina)) or type(destino) is not type(origen):
+            raise EntidadNoValidaError("Solo se pueden reasignar clientes entre instructores o entre rutinas.")
+        if origen.id == destino.id:
+            raise NegocioError("El destino de la reasignación debe ser distinto del registro a eliminar.")
+        if self.repositorio.get_by_id(entity_id=origen.id, class_entity=type(origen)) is None:
+            raise RegistroNoEncontrado(f"No existe el registro a eliminar con ID {origen.id}.")
+        if self.repositorio.get_by_id(entity_id=destino.id, class_entity=type(destino)) is None:
+            raise RegistroNoEncontrado(f"No existe el destino con ID {destino.id}.")
+
+        if isinstance(origen, Instructor):
+            # Chequeo previo (mensaje con nombre y números): el destino tiene que poder absorber a los clientes
+            # activos del origen (los archivados no ocupan cupo). El que manda es el trigger de cupo, dentro de
+            # la transacción del repositorio.
+            carga = self.repositorio.get_carga_instructor(destino.id)
+            movidos = self.repositorio.get_carga_instructor(origen.id).clientes
+            if carga.clientes + movidos > carga.cupo:
+                raise CupoExcedidoError(
+                    f"{carga.instructor} solo tiene {carga.libres} lugares libres y hay {movidos} clientes para reasignar."
+                )
+        movidos = self.repositorio.reasignar_y_eliminar(origen, destino)
+        self._catalogos_cambiaron(meta(type(origen)).tabla, "cliente")
+        return movidos
 
     def obtener_columnas_por_entidad(self, entidad: ENTIDADES):
-            if not entidad in ENTIDADES.values():
-                raise EntidadNoValidaError(f"Entidad {entidad.__name__} no reconocida")
-            
-            # Generamos los nombres de columna dinámicamente con su tipo haciendo {columna: tipo}
-            # Donde 'columna' es el nombre del campo de la entidad dataclass y 'tipo' es el tipo de datos. Y eliminamos el campo id.
-            # Por ejemplo: { "nombre": str, "edad": int, "fecha_inicio": datetime, "fecha_fin": datetime, "instructor_id": int, "rutina_id": int }
-            columnas_dict = {f.name: f.type for f in fields(entidad) if f.name != "id"}
-            return columnas_dict
+            # meta() lanza EntidadNoValidaError si la entidad no está registrada.
+            # Las columnas vienen precalculadas del registro de metadatos como {columna: tipo}, sin el campo id
+            # y con los Optional ya resueltos a su tipo base.
+            # Por ejemplo: { "nombre": str, "fecha_inicio_rutina": datetime, "instructor_id": int, "rutina_id": int }
+            # Devolvemos una copia para que nadie modifique el registro compartido.
+            return dict(meta(entidad).columnas_formulario)
+
+    def clientes_por_vencer(self, dias: int = 7, limite: int = 50, hoy: date | None = None, incluir_vencidos: bool = False) -> list[Vencimiento]:
+        # Clientes cuya rutina termina en los próximos 'dias' (incluye hoy), los más próximos primero.
+        # La consulta va por índice sobre fecha_fin_rutina: el costo depende de 'limite', no del total de clientes.
+        if dias < 0 or limite <= 0:
+            raise NegocioError("Los días deben ser >= 0 y el límite mayor a 0.")
+        hoy = hoy or date.today()
+        desde = "0000-01-01" if incluir_vencidos else hoy.isoformat()
+        hasta = (hoy + timedelta(days=dias)).isoformat()
+        return self.repositorio.get_vencimientos(desde=desde, hasta=hasta, limite=limite)
+
+    def rotar_ciclos(self, reglas: list[ReglaRotacion] | None = None, hoy: date | None = None, simular: bool = False) -> ResultadoRotacion:
+        # Rota a todos los clientes con la rutina vencida (fecha_fin_rutina < hoy): un UPDATE por regla.
+        # Sin reglas se usan las por defecto (ciclos 1-2 repiten rutina, el 3 pasa a la siguiente).
+        # simular=True devuelve el mismo reporte sin guardar nada (dry-run).
+        hoy = hoy or date.today()
+        rutinas_ids = {r.id for r in self.repositorio.get_all(class_entity=Rutina)}
+        if reglas is None:
+            reglas = reglas_por_defecto(list(rutinas_ids))
+
+        for regla in reglas:
+            destinos_invalidos = set(regla.mapa_rutinas.values()) - rutinas_ids
+            if destinos_invalidos:
+                raise NegocioError(f"La regla '{regla.nombre}' asigna rutinas inexistentes: {sorted(destinos_invalidos)}")
+            if regla.duracion_dias is not None and regla.duracion_dias < 1:
+                raise NegocioError(f"La regla '{regla.nombre}' debe durar al menos 1 día.")
+            if regla.ciclos and not all(1 <= c <= CICLO_MAXIMO for c in regla.ciclos):
+                raise NegocioError(f"La regla '{regla.nombre}' tiene ciclos fuera de 1-{CICLO_MAXIMO}.")
+
+        resumenes = self.repositorio.rotar_vencidos(hoy=hoy.isoformat(), reglas=reglas, simular=simular)
+        return ResultadoRotacion(hoy=hoy.isoformat(), simulado=simular, reglas=resumenes)
+
+    def registrar_asistencia(self, cliente_id: int, fecha_hora: datetime | None = None):
+        # Check-in del kiosco. Con escritor en lotes solo se encola (no bloquea la UI);
+        # el cliente_id se valida al guardar por la FK (las asistencias inválidas se descartan).
+        asistencia = Asistencia(id=0, cliente_id=cliente_id, fecha_hora=fecha_hora or datetime.now())
+        if self.registro_asistencias is not None:
+            return self.registro_asistencias.registrar(asistencia)
+        return self.repositorio.add(asistencia)
+
+    # --- Pagos: libro de solo inserción; una corrección es un movimiento nuevo, nunca se edita ni se borra ---
+    def _movimiento(self, cliente_id: int, tipo: str, monto: float, fecha: date, vencimiento: date, concepto: str):
+        if monto is None or monto <= 0:
+            raise NegocioError("El monto debe ser mayor a 0.")
+        if self.repositorio.get_by_id(entity_id=cliente_id, class_entity=Cliente) is None:
+            raise RegistroNoEncontrado(f"No existe el cliente con ID {cliente_id}.")
+        return self.repositorio.add(Pago(
+            id=0, cliente_id=cliente_id, tipo=tipo, monto=round(float(monto), 2),
+            fecha=fecha.isoformat(), vencimiento=vencimiento.isoformat(), concepto=concepto,
+        ))
+
+    def registrar_cargo(self, cliente_id: int, monto: float, vencimiento: date, concepto: str = "Cuota", fecha: date | None = None):
+        # Cuota a pagar: pasa a deuda vencida si al llegar 'vencimiento' los pagos no la cubren
+        return self._movimiento(cliente_id, "cargo", monto, fecha or date.today(), vencimiento, concepto)
+
+    def registrar_pago(self, cliente_id: int, monto: float, fecha: date | None = None, concepto: str = "Pago"):
+        # Los pagos se imputan a los cargos más viejos primero (lo resuelve el trigger de saldo_cliente)
+        fecha = fecha or date.today()
+        return self._movimiento(cliente_id, "pago", monto, fecha, fecha, concepto)
+
+    def estado_cuenta(self, cliente_id: int) -> EstadoCuenta:
+        estado = self.repositorio.get_estado_cuenta(cliente_id)
+        return estado or EstadoCuenta(cliente_id=cliente_id, cargos=0.0, pagos=0.0, vence_deuda=None)
+
+    def morosos(self, limite: int = 50, hoy: date | None = None) -> list[Deudor]:
+        if limite <= 0:
+            raise NegocioError("El límite debe ser mayor a 0.")
+        return self.repositorio.get_morosos(hoy=(hoy or date.today()).isoformat(), limite=limite)
+
+    # --- Importación / exportación CSV (cualquier entidad, en lotes) ---
+    def exportar_csv(self, clase_entidad: Type[ENTIDADES], archivo, tamano_lote: int = csv_io.TAMANO_LOTE) -> int:
+        meta(clase_entidad)  # EntidadNoValidaError si no es una entidad registrada
+        return csv_io.exportar_csv(self.repositorio, clase_entidad, archivo, tamano_lote)
+
+    def importar_csv(self, clase_entidad: Type[ENTIDADES], archivo, tamano_lote: int = csv_io.TAMANO_LOTE) -> ResultadoImportacion:
+        meta(clase_entidad)
+        if tamano_lote < 1:
+            raise NegocioError("El tamaño de lote debe ser mayor a 0.")
+        resultado = csv_io.importar_csv(self.repositorio, clase_entidad, archivo, tamano_lote)
+        self._catalogos_cambiaron(meta(clase_entidad).tabla)
+        return resultado
+
+    # --- Copias de seguridad ---
+    def _respaldos(self):
+        if self.respaldos is None:
+            raise ServicioNoDisponibleError("No hay un gestor de respaldos configurado.")
+        return self.respaldos
+
+    def respaldar(self, progreso=None, en_segundo_plano: bool = False, al_terminar=None) -> Respaldo | bool:
+        # progreso(copiadas, total) por cada paso de la copia. En segundo plano devuelve False si ya hay uno en curso
+        # y el resultado llega por al_terminar(respaldo, error).
+        if en_segundo_plano:
+            return self._respaldos().respaldar_en_segundo_plano(progreso=progreso, al_terminar=al_terminar)
+        return self._respaldos().respaldar(progreso=progreso)
+
+    def listar_respaldos(self) -> list[Respaldo]:
+        return self._respaldos().listar()
+
+    def restaurar_respaldo(self, nombre: str, confirmar: bool = False) -> Respaldo:
+        # Reemplaza TODOS los datos actuales: se exige confirmarlo explícitamente.
+        # Devuelve el respaldo de seguridad que se toma del estado anterior.
+        if not confirmar:
+            raise NegocioError("Restaurar reemplaza todos los datos actuales: confirme la operación.")
+        seguridad = self._respaldos().restaurar(nombre)
+        self._catalogos_cambiaron()
+        return seguridad
+
+    # --- Sincronización entre estaciones ---
+    def observar_cambios(self, al_cambiar) -> bool:
+        """Llama a al_cambiar(Cambios) cuando otra estación (o este proceso) modifica clientes, instructores o rutinas.
+        Devuelve False si no hay un notificador configurado (la app funciona igual, sin sincronizar)."""
+        if self.cambios is None:
+            return False
+        if self.catalogos is not None:
+            # Antes que las sesiones: cuando les llega el aviso, los catálogos ya se releen de la base
+            self.cambios.iniciar(self._al_cambiar_catalogos)
+        self.cambios.iniciar(al_cambiar)
+        return True
+
+    def dejar_de_observar(self, al_cambiar):
+        # Una sesión que se cerró (pestaña del navegador): el vigilante sigue para las demás
+        if self.cambios is not None:
+            self.cambios.quitar(al_cambiar)
+
+    def _al_cambiar_catalogos(self, cambios):
+        # Cambios de otras estaciones o procesos (la línea de comandos, otra PC con la misma base)
+        if cambios.completo:
+            self._catalogos_cambiaron()
+        else:
+            self._catalogos_cambiaron(*cambios.ids)
+
+    # --- Estadísticas (se leen de los resúmenes: el costo depende de los buckets, no del historial) ---
+    def _rango(self, dias: int, hoy: date | None) -> tuple[str, str]:
+        if dias < 1:
+            raise NegocioError("El período debe ser de al menos 1 día.")
+        hoy = hoy or date.today()
+        return (hoy - timedelta(days=dias - 1)).isoformat(), hoy.isoformat()
+
+    def asistencias_por_dia(self, dias: int = 30, hoy: date | None = None) -> list[ConteoPeriodo]:
+        desde, hasta = self._rango(dias, hoy)
+        return self.repositorio.get_asistencias_por_dia(desde=desde, hasta=hasta)
+
+    def asistencias_por_semana(self, dias: int = 30, hoy: date | None = None) -> list[ConteoPeriodo]:
+        return _agrupar_por_semana(self.asistencias_por_dia(dias, hoy))
+
+    def horas_pico(self, dias: int = 30, hoy: date | None = None, top: int | None = None) -> list[ConteoPeriodo]:
+        # Todas las horas con asistencias (ordenadas por hora); con 'top' solo las más concurridas
+        desde, hasta = self._rango(dias, hoy)
+        por_hora = self.repositorio.get_asistencias_por_hora(desde=desde, hasta=hasta)
+        if top is not None:
+            return sorted(por_hora, key=lambda c: c.asistencias, reverse=True)[:top]
+        return por_hora
+
+    def clientes_por_instructor(self, dias: int = 30, hoy: date | None = None):
+        desde, hasta = self._rango(dias, hoy)
+        return self.repositorio.get_resumen_instructores(desde=desde, hasta=hasta)
+
+    def popularidad_rutinas(self, dias: int = 30, hoy: date | None = None):
+        desde, hasta = self._rango(dias, hoy)
+        return self.repositorio.get_resumen_rutinas(desde=desde, hasta=hasta)
 
+    def tablero(self, dias: int = 30, hoy: date | None = None) -> Tablero:
+        # Todo lo que muestra el panel de estadísticas, en cuatro lecturas de resúmenes
+        desde, hasta = self._rango(dias, hoy)
+        por_dia = self.repositorio.get_asistencias_por_dia(desde=desde, hasta=hasta)
+        return Tablero(
+            desde=desde,
+            hasta=hasta,
+            por_dia=por_dia,
+            por_semana=_agrupar_por_semana(por_dia),
+            por_hora=self.repositorio.get_asistencias_por_hora(desde=desde, hasta=hasta),
+            por_instructor=self.repositorio.get_resumen_instructores(desde=desde, hasta=hasta),
+            por_rutina=self.repositorio.get_resumen_rutinas(desde=desde, hasta=hasta),
+        )
@@ -0,0 +1,2 @@
+# Paquete de benchmarks y generación de datos sintéticos.
+# Se ejecutan desde la carpeta src, por ejemplo: python -m benchmarks.escala
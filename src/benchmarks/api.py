@@ -0,0 +1,149 @@
+"""
+Prueba de carga de la API HTTP local (python -m api).
+
+Levanta el servidor sobre una base sintética en una carpeta temporal y simula kioscos: cada cliente
+(un hilo con su conexión keep-alive) repite una mezcla de pedidos durante 'segundos':
+    - recorrer una página de clientes (por cursor, al azar),
+    - ver el detalle de un cliente,
+    - revalidar la lista de rutinas con If-None-Match (304 sin cuerpo),
+    - registrar un check-in (POST /asistencias).
+
+Se informan pedidos por segundo, latencia p50/p99/máx vista por el cliente y la cantidad de cada estado.
+
+Uso (desde src/):
+    python -m benchmarks.api
+    python -m benchmarks.api --clientes 16 --segundos 10 --hilos 8 --salida bench_api.json
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from api import ServidorAPI
+from application.services import GymService
+from benchmarks.asistencias import _percentil
+from benchmarks.escala import _cargar_base
+from benchmarks.generador import generar
+from config import Config
+from infrastructure.asistencias import EscritorAsistencias
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.metrics import RegistroMetricas
+from infrastructure.sqlite3_repo import SQLite3Repository
+
+CLIENTES_BASE = 20_000
+CLIENTES_HTTP_POR_DEFECTO = 8
+SEGUNDOS_POR_DEFECTO = 5.0
+
+
+def _kiosco(puerto: int, ids: list[int], hasta: float, semilla: int, latencias: list[float], estados: Counter, lock: threading.Lock):
+    rng = random.Random(semilla)
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=10)
+    etag_rutinas = None
+    propias: list[float] = []
+    contados: Counter = Counter()
+    while time.perf_counter() < hasta:
+        sorteo = rng.random()
+        cabeceras, cuerpo, metodo = {}, None, "GET"
+        if sorteo < 0.4:
+            ruta = f"/clientes?despues_de={rng.choice(ids)}&limite=50"
+        elif sorteo < 0.7:
+            ruta = f"/clientes/{rng.choice(ids)}"
+        elif sorteo < 0.9:
+            ruta = "/rutinas"
+            if etag_rutinas:
+                cabeceras["If-None-Match"] = etag_rutinas
+        else:
+            metodo, ruta = "POST", "/asistencias"
+            cuerpo = json.dumps({"cliente_id": rng.choice(ids)})
+            cabeceras["Content-Type"] = "application/json"
+
+        inicio = time.perf_counter()
+        conexion.request(metodo, ruta, body=cuerpo, headers=cabeceras)
+        respuesta = conexion.getresponse()
+        respuesta.read()
+        propias.append((time.perf_counter() - inicio) * 1000)
+        contados[respuesta.status] += 1
+        if ruta == "/rutinas" and respuesta.status == 200:
+            etag_rutinas = respuesta.getheader("ETag")
+    conexion.close()
+    with lock:
+        latencias.extend(propias)
+        estados.update(contados)
+
+
+def medir(clientes: int, segundos: float, hilos: int, semilla: int, carpeta: str) -> dict:
+    db = DatabaseConnection(os.path.join(carpeta, "api.db"), metricas=RegistroMetricas())
+    db.init_db()
+    datos = generar(CLIENTES_BASE, semilla=semilla)
+    _cargar_base(db, datos)
+    ids = [c.id for c in datos.clientes]
+    escritor = EscritorAsistencias(db)
+    servicio = GymService(SQLite3Repository(db), registro_asistencias=escritor)
+
+    # El servidor corre en su propio bucle, en un hilo aparte de los clientes
+    bucle = asyncio.new_event_loop()
+    servidor = ServidorAPI(servicio, puerto=0, hilos=hilos, max_pendientes=max(Config.API_MAX_PENDIENTES, clientes))
+    bucle.run_until_complete(servidor.iniciar())
+    hilo_servidor = threading.Thread(target=bucle.run_forever, name="api-bench", daemon=True)
+    hilo_servidor.start()
+
+    latencias: list[float] = []
+    estados: Counter = Counter()
+    lock = threading.Lock()
+    inicio = time.perf_counter()
+    kioscos = [
+        threading.Thread(target=_kiosco, args=(servidor.puerto, ids, inicio + segundos, semilla + i, latencias, estados, lock))
+        for i in range(clientes)
+    ]
+    for k in kioscos:
+        k.start()
+    for k in kioscos:
+        k.join()
+    total_s = time.perf_counter() - inicio
+
+    asyncio.run_coroutine_threadsafe(servidor.detener(), bucle).result()
+    bucle.call_soon_threadsafe(bucle.stop)
+    hilo_servidor.join()
+    bucle.close()
+    escritor.cerrar()
+
+    return {
+        "clientes_http": clientes,
+        "hilos_servidor": hilos,
+        "segundos": round(total_s, 2),
+        "pedidos": len(latencias),
+        "pedidos_por_s": round(len(latencias) / total_s, 1) if total_s else 0.0,
+        "p50_ms": round(_percentil(latencias, 50), 3),
+        "p99_ms": round(_percentil(latencias, 99), 3),
+        "max_ms": round(max(latencias), 3) if latencias else 0.0,
+        "estados": {str(estado): n for estado, n in sorted(estados.items())},
+    }
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API HTTP local")
+    parser.add_argument("--clientes", type=int, default=CLIENTES_HTTP_POR_DEFECTO, help="Conexiones keep-alive simultáneas")
+    parser.add_argument("--segundos", type=float, default=SEGUNDOS_POR_DEFECTO)
+    parser.add_argument("--hilos", type=int, default=Config.API_HILOS, help="Hilos del servidor para la base")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default="bench_api.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        resultados = medir(args.clientes, args.segundos, args.hilos, args.semilla, carpeta)
+
+    print(f"{resultados['pedidos_por_s']} pedidos/s, p50 {resultados['p50_ms']} ms, p99 {resultados['p99_ms']} ms, estados {resultados['estados']}")
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Prueba de carga del check-in (asistencias).
+
+Simula una hora pico: varios kioscos (hilos) registran check-ins a la vez y se compara:
+    - Escritor en lotes (EscritorAsistencias): registrar() solo encola; un hilo de fondo
+      guarda por lote (group commit).
+    - Escritura directa: un INSERT + commit por asistencia (SQLite3Repository.add).
+
+Para cada modo se informa la latencia de la llamada que vería la UI (p50/p99/máx), el tiempo
+hasta que todo quedó guardado, las asistencias por segundo y la cantidad de commits.
+
+Uso (desde src/):
+    python -m benchmarks.asistencias
+    python -m benchmarks.asistencias --checkins 20000 --kioscos 8 --salida bench_asistencias.json
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.escala import _cargar_base
+from benchmarks.generador import generar
+from domain.entities import Asistencia
+from infrastructure.asistencias import EscritorAsistencias
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.metrics import RegistroMetricas
+from infrastructure.sqlite3_repo import SQLite3Repository
+
+CHECKINS_POR_DEFECTO = 10_000
+KIOSCOS_POR_DEFECTO = 4
+CLIENTES_BASE = 5_000
+
+
+def _percentil(valores: list[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))] if ordenados else 0.0
+
+
+def _rafaga(registrar, clientes_ids: list[int], checkins: int, kioscos: int, semilla: int) -> list[float]:
+    """Reparte los check-ins entre los kioscos (hilos) y devuelve la latencia de cada llamada en ms."""
+    latencias: list[float] = []
+    lock = threading.Lock()
+
+    def kiosco(n: int, cantidad: int):
+        rng = random.Random(semilla + n)
+        propias = []
+        for _ in range(cantidad):
+            asistencia = Asistencia(id=0, cliente_id=rng.choice(clientes_ids))
+            inicio = time.perf_counter()
+            registrar(asistencia)
+            propias.append((time.perf_counter() - inicio) * 1000)
+        with lock:
+            latencias.extend(propias)
+
+    hilos = [threading.Thread(target=kiosco, args=(n, checkins // kioscos)) for n in range(kioscos)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return latencias
+
+
+def _resumen(latencias: list[float], total_s: float, commits: int) -> dict:
+    return {
+        "checkins": len(latencias),
+        "llamada_p50_ms": round(_percentil(latencias, 50), 4),
+        "llamada_p99_ms": round(_percentil(latencias, 99), 4),
+        "llamada_max_ms": round(max(latencias), 4),
+        "total_hasta_guardar_s": round(total_s, 4),
+        "asistencias_por_s": round(len(latencias) / total_s, 1) if total_s else 0.0,
+        "commits": commits,
+    }
+
+
+def _preparar(carpeta: str, nombre: str, semilla: int) -> tuple[DatabaseConnection, list[int]]:
+    db = DatabaseConnection(os.path.join(carpeta, nombre), metricas=RegistroMetricas())
+    db.init_db()
+    datos = generar(CLIENTES_BASE, semilla=semilla)
+    _cargar_base(db, datos)
+    return db, [c.id for c in datos.clientes]
+
+
+def medir(checkins: int, kioscos: int, semilla: int, carpeta: str) -> dict:
+    # Escritor en lotes
+    db, ids = _preparar(carpeta, "lotes.db", semilla)
+    escritor = EscritorAsistencias(db)
+    inicio = time.perf_counter()
+    latencias = _rafaga(escritor.registrar, ids, checkins, kioscos, semilla)
+    escritor.flush()
+    total_s = time.perf_counter() - inicio
+    escritor.cerrar()
+    lotes = _resumen(latencias, total_s, db.metricas.snapshot()["contadores"].get("lotes_asistencias", 0))
+
+    # Escritura directa (un commit por asistencia)
+    db, ids = _preparar(carpeta, "directa.db", semilla)
+    repo = SQLite3Repository(db)
+    inicio = time.perf_counter()
+    latencias = _rafaga(repo.add, ids, checkins, kioscos, semilla)
+    directa = _resumen(latencias, time.perf_counter() - inicio, len(latencias))
+
+    return {"checkins": checkins, "kioscos": kioscos, "lotes": lotes, "directa": directa}
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Prueba de carga del check-in")
+    parser.add_argument("--checkins", type=int, default=CHECKINS_POR_DEFECTO)
+    parser.add_argument("--kioscos", type=int, default=KIOSCOS_POR_DEFECTO)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", default="bench_asistencias.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        resultados = medir(args.checkins, args.kioscos, args.semilla, carpeta)
+
+    for modo in ("lotes", "directa"):
+        r = resultados[modo]
+        print(f"{modo}: p99 {r['llamada_p99_ms']} ms por llamada, {r['asistencias_por_s']}/s, {r['commits']} commits")
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
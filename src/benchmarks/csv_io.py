@@ -0,0 +1,96 @@
+"""
+Benchmark de importación/exportación CSV (GymService.exportar_csv / importar_csv).
+
+Carga N clientes sintéticos (por defecto 100k), los exporta junto con instructores y rutinas
+y los importa en una base vacía, midiendo filas por minuto y el pico de memoria de Python
+(tracemalloc) de cada etapa: con el cursor por lotes el export no debe crecer con la tabla.
+
+Uso (desde src/):
+    python -m benchmarks.csv_io
+    python -m benchmarks.csv_io --clientes 200000 --lote 5000 --salida bench_csv.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+from application.services import GymService
+from benchmarks.escala import _cargar_base
+from benchmarks.generador import generar
+from domain.entities import Cliente, Instructor, Rutina
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.metrics import RegistroMetricas
+from infrastructure.sqlite3_repo import SQLite3Repository
+
+CLIENTES_POR_DEFECTO = 100_000
+LOTE_POR_DEFECTO = 5000
+
+
+def _servicio(ruta: str) -> GymService:
+    db = DatabaseConnection(ruta, metricas=RegistroMetricas())
+    db.init_db()
+    return GymService(repositorio=SQLite3Repository(db))
+
+
+def _medir(funcion) -> tuple[object, float, float]:
+    """Devuelve (resultado, segundos, pico de memoria en MB)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, segundos, round(pico / 1_000_000, 2)
+
+
+def medir(cantidad: int, semilla: int, lote: int, carpeta: str) -> dict:
+    origen = _servicio(os.path.join(carpeta, "origen.db"))
+    _cargar_base(origen.repositorio.db, generar(cantidad, semilla=semilla, hoy=date.today()))
+    destino = _servicio(os.path.join(carpeta, "destino.db"))
+
+    resultados = {"clientes": cantidad, "lote": lote}
+    for entidad in (Instructor, Rutina, Cliente):
+        archivo = os.path.join(carpeta, f"{entidad.__name__}.csv")
+        filas, exportar_s, exportar_mb = _medir(lambda: origen.exportar_csv(entidad, archivo, tamano_lote=lote))
+        importado, importar_s, importar_mb = _medir(lambda: destino.importar_csv(entidad, archivo, tamano_lote=lote))
+        resultados[entidad.__name__] = {
+            "filas": filas,
+            "exportar_s": round(exportar_s, 3),
+            "exportar_filas_por_min": round(filas / exportar_s * 60, 1) if exportar_s else 0.0,
+            "exportar_pico_mb": exportar_mb,
+            "importar_s": round(importar_s, 3),
+            "importar_filas_por_min": importado.filas_por_minuto,
+            "importar_pico_mb": importar_mb,
+            "importadas": importado.importadas,
+            "rechazadas": importado.rechazadas,
+        }
+    resultados["metricas"] = destino.repositorio.metricas.snapshot()
+    return resultados
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Benchmark de importación/exportación CSV")
+    parser.add_argument("--clientes", type=int, default=CLIENTES_POR_DEFECTO)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=LOTE_POR_DEFECTO)
+    parser.add_argument("--salida", default="bench_csv.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        resultados = medir(args.clientes, args.semilla, args.lote, carpeta)
+
+    clientes = resultados["Cliente"]
+    print(f"{clientes['filas']} clientes: export {clientes['exportar_filas_por_min']}/min "
+          f"(pico {clientes['exportar_pico_mb']} MB), import {clientes['importar_filas_por_min']}/min "
+          f"(pico {clientes['importar_pico_mb']} MB, {clientes['rechazadas']} rechazadas)")
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark de representación de entidades: dataclass con slots vs dataclass con __dict__.
+
+Mide, para N instancias (por defecto 100k):
+    - Memoria por instancia (tracemalloc).
+    - Tiempo de construcción.
+    - Conversión a dict/tupla: dataclasses.asdict (copia profunda) vs domain.campos (superficial).
+
+Para comparar se arma en tiempo de ejecución una copia "clásica" (sin slots) de cada clase
+con los mismos campos, así la diferencia medida es solo la representación.
+
+Uso (desde src/):
+    python -m benchmarks.entidades
+    python -m benchmarks.entidades --cantidad 100000 --salida bench_entidades.json
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, fields, make_dataclass
+
+from GUI.DTOs import ClienteViewDTO
+from domain.campos import como_dict, valores
+from domain.entities import Cliente
+
+CANTIDAD_POR_DEFECTO = 100_000
+
+
+def _clase_sin_slots(clase: type) -> type:
+    """Misma dataclass (mismos campos y defaults) pero sin slots, como estaba antes."""
+    return make_dataclass(
+        f"{clase.__name__}Dict",
+        [(f.name, f.type, f) for f in fields(clase)],
+    )
+
+
+# Argumentos de construcción para cada clase medida
+ARGUMENTOS = {
+    "Cliente": lambda i: {
+        "id": i, "nombre": "María", "apellido": "González",
+        "fecha_inicio_rutina": "2026-01-01", "fecha_fin_rutina": "2026-02-01",
+        "instructor_id": 1, "rutina_id": 1, "ciclo_rutina": 1,
+    },
+    "ClienteViewDTO": lambda i: {
+        "id": i, "Nombre_y_Apellido": "María González", "Rutina": "Pierna (id:1)",
+        "Ciclo": "1", "Instructor": "Juan Pérez", "Fechas": "01/01/26 - 01/02/26",
+    },
+}
+
+
+def _medir_clase(clase: type, cantidad: int, nombre_base: str) -> dict:
+    argumentos = [ARGUMENTOS[nombre_base](i) for i in range(cantidad)]
+
+    gc.collect()
+    tracemalloc.start()
+    inicio_mem = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    instancias = [clase(**a) for a in argumentos]
+    construccion_s = time.perf_counter() - inicio
+    memoria = tracemalloc.get_traced_memory()[0] - inicio_mem
+    tracemalloc.stop()
+
+    inicio = time.perf_counter()
+    for obj in instancias:
+        asdict(obj)
+    asdict_s = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for obj in instancias:
+        como_dict(obj)
+    como_dict_s = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for obj in instancias:
+        valores(obj)
+    valores_s = time.perf_counter() - inicio
+
+    return {
+        "bytes_por_instancia": round(memoria / cantidad, 1),
+        "construccion_s": round(construccion_s, 6),
+        "asdict_s": round(asdict_s, 6),
+        "como_dict_s": round(como_dict_s, 6),
+        "valores_s": round(valores_s, 6),
+    }
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Benchmark de entidades con slots")
+    parser.add_argument("--cantidad", type=int, default=CANTIDAD_POR_DEFECTO)
+    parser.add_argument("--salida", default="bench_entidades.json")
+    args = parser.parse_args(argv)
+
+    resultados = {"cantidad": args.cantidad, "clases": {}}
+    for clase in (Cliente, ClienteViewDTO):
+        con_slots = _medir_clase(clase, args.cantidad, clase.__name__)
+        sin_slots = _medir_clase(_clase_sin_slots(clase), args.cantidad, clase.__name__)
+        resultados["clases"][clase.__name__] = {
+            "slots": con_slots,
+            "dict": sin_slots,
+            "ahorro_memoria_pct": round(100 * (1 - con_slots["bytes_por_instancia"] / sin_slots["bytes_por_instancia"]), 1),
+        }
+        print(f"{clase.__name__}: {con_slots['bytes_por_instancia']} B (slots) vs "
+              f"{sin_slots['bytes_por_instancia']} B (dict) por instancia")
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
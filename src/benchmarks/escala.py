@@ -0,0 +1,188 @@
+"""
+Benchmark de escala para todo el stack (Repositorio -> Servicio -> Controlador -> Tablas).
+
+Para cada escala (por defecto 1k, 10k y 100k clientes) se crea una base SQLite temporal,
+se carga con datos sintéticos y se mide:
+    - SQLite3Repository: get_all, get_by_id, add, update y delete.
+    - GymService.añadir: validación de un Cliente (busca instructor y rutina) + INSERT.
+    - GymController.GetTabla: armado de los DTOs de la vista de clientes.
+    - Tablas: construcción de las filas (construir_filas).
+Además se adjunta el snapshot de la instrumentación del repositorio (infrastructure.metrics).
+
+Las etapas de GUI necesitan Flet; si no está instalado se marcan como omitidas.
+Los resultados se escriben en un JSON para poder comparar corridas.
+
+Uso (desde src/):
+    python -m benchmarks.escala
+    python -m benchmarks.escala --escalas 1000 10000 --salida bench_escala.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from dataclasses import replace
+from datetime import datetime
+
+from application.services import GymService
+from benchmarks.generador import DatosSinteticos, generar
+from domain.entities import Cliente
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.metrics import RegistroMetricas
+from infrastructure.sqlite3_repo import SQLite3Repository
+
+ESCALAS_POR_DEFECTO = [1_000, 10_000, 100_000]
+# Cantidad de operaciones individuales que se miden por escala (add/update/delete/get_by_id)
+MUESTRA_POR_DEFECTO = 300
+
+
+def _cronometrar(funcion, repeticiones: int = 1) -> dict:
+    """Ejecuta 'funcion' n veces y devuelve total, media y p95 en segundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return {
+        "n": repeticiones,
+        "total_s": round(sum(tiempos), 6),
+        "media_s": round(statistics.fmean(tiempos), 6),
+        "p95_s": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 6),
+    }
+
+
+def _cargar_base(db: DatabaseConnection, datos: DatosSinteticos):
+    """Carga masiva con executemany (la carga no forma parte de lo medido)."""
+    with db.get_connection() as conn:
+        conn.executemany(
+            "insert into instructor (id, nombre, apellido, cupo) values (?, ?, ?, ?)",
+            [(i.id, i.nombre, i.apellido, i.cupo) for i in datos.instructores],
+        )
+        conn.executemany(
+            "insert into rutina (id, nombre, pdf_link) values (?, ?, ?)",
+            [(r.id, r.nombre, r.pdf_link) for r in datos.rutinas],
+        )
+        conn.executemany(
+            "insert into cliente (id, nombre, apellido, fecha_inicio_rutina, fecha_fin_rutina, "
+            "instructor_id, rutina_id, ciclo_rutina) values (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (c.id, c.nombre, c.apellido, c.fecha_inicio_rutina, c.fecha_fin_rutina,
+                 c.instructor_id, c.rutina_id, c.ciclo_rutina)
+                for c in datos.clientes
+            ],
+        )
+
+
+def _medir_repositorio(repo: SQLite3Repository, datos: DatosSinteticos, rng: random.Random, muestra: int) -> dict:
+    ids = [c.id for c in datos.clientes]
+    muestra = min(muestra, len(ids))
+    resultados = {}
+
+    resultados["get_all_cliente"] = _cronometrar(lambda: repo.get_all(Cliente), repeticiones=3)
+
+    ids_lectura = iter(rng.sample(ids, muestra))
+    resultados["get_by_id_cliente"] = _cronometrar(
+        lambda: repo.get_by_id(next(ids_lectura), Cliente), repeticiones=muestra
+    )
+
+    nuevos = iter([replace(c, id=0) for c in rng.sample(datos.clientes, muestra)])
+    resultados["add_cliente"] = _cronometrar(lambda: repo.add(next(nuevos)), repeticiones=muestra)
+
+    a_editar = iter([replace(c, ciclo_rutina=c.ciclo_rutina % 3 + 1) for c in rng.sample(datos.clientes, muestra)])
+    resultados["update_cliente"] = _cronometrar(lambda: repo.update(next(a_editar)), repeticiones=muestra)
+
+    a_borrar = iter(rng.sample(datos.clientes, muestra))
+    resultados["delete_cliente"] = _cronometrar(lambda: repo.delete(next(a_borrar)), repeticiones=muestra)
+    return resultados
+
+
+def _medir_servicio(servicio: GymService, datos: DatosSinteticos, rng: random.Random, muestra: int) -> dict:
+    nuevos = iter([replace(c, id=0) for c in rng.choices(datos.clientes, k=muestra)])
+    return {"añadir_cliente": _cronometrar(lambda: servicio.añadir(next(nuevos)), repeticiones=muestra)}
+
+
+def _medir_gui(servicio: GymService) -> dict:
+    """Mide GetTabla y la construcción de filas. Requiere Flet."""
+    try:
+        from GUI.controllers import GymController, GymState
+        from GUI.tables import construir_filas
+    except ImportError as e:
+        return {"omitido": f"Flet no disponible: {e}"}
+
+    controlador = GymController(GymState())
+    resultados = {"get_tabla_cliente": _cronometrar(lambda: controlador.GetTabla(servicio, Cliente), repeticiones=3)}
+
+    dtos = [fila.dato for fila in controlador.state.filas.values()]
+    resultados["construir_filas_cliente"] = _cronometrar(lambda: construir_filas(dtos), repeticiones=3)
+    resultados["filas"] = len(dtos)
+    return resultados
+
+
+def medir_escala(cantidad: int, semilla: int, muestra: int, carpeta: str) -> dict:
+    db_path = os.path.join(carpeta, f"bench_{cantidad}.db")
+    # Cada escala tiene su propio registro de métricas para que no se mezclen
+    db = DatabaseConnection(db_path, metricas=RegistroMetricas())
+    db.init_db()
+
+    inicio = time.perf_counter()
+    datos = generar(cantidad, semilla=semilla)
+    generacion_s = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    _cargar_base(db, datos)
+    carga_s = time.perf_counter() - inicio
+
+    repo = SQLite3Repository(db)
+    servicio = GymService(repositorio=repo)
+    rng = random.Random(semilla)
+
+    return {
+        "clientes": cantidad,
+        "instructores": len(datos.instructores),
+        "rutinas": len(datos.rutinas),
+        "generacion_s": round(generacion_s, 6),
+        "carga_masiva_s": round(carga_s, 6),
+        "repositorio": _medir_repositorio(repo, datos, rng, muestra),
+        "servicio": _medir_servicio(servicio, datos, rng, muestra),
+        "gui": _medir_gui(servicio),
+        "metricas": db.metricas.snapshot(),
+    }
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Benchmark de escala del gestor de gimnasio")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS_POR_DEFECTO)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--muestra", type=int, default=MUESTRA_POR_DEFECTO,
+                        help="Operaciones individuales medidas por escala")
+    parser.add_argument("--salida", default="bench_escala.json", help="Archivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    resultados = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "semilla": args.semilla,
+        "muestra": args.muestra,
+        "escalas": {},
+    }
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        for cantidad in args.escalas:
+            print(f"Midiendo escala de {cantidad} clientes...")
+            resultados["escalas"][str(cantidad)] = medir_escala(cantidad, args.semilla, args.muestra, carpeta)
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    print(f"Resultados guardados en {args.salida}")
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Generador de datos sintéticos (con semilla) para Instructor, Rutina y Cliente.
+
+Las distribuciones intentan parecerse a un gimnasio real:
+- Un instructor cada ~50 clientes (mínimo 3), con carga desigual: unos pocos
+  instructores concentran la mayoría de los clientes (pesos tipo Zipf).
+- Un catálogo chico de rutinas (entre 8 y 24) donde las primeras son las más populares.
+- Fechas de inicio repartidas en el último año y duraciones típicas de 4, 8 o 12 semanas.
+- Fechas en formato 'YYYY-MM-DD', igual que las guarda el controlador.
+- Cupo de cada instructor con ~25% libre sobre su carga (mínimo el cupo por defecto), así
+  los benchmarks pueden seguir agregando clientes sin chocar con CupoExcedidoError.
+"""
+
+import random
+import math
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from domain.entities import Cliente, Instructor, Rutina
+
+NOMBRES = [
+    "María", "Juan", "Lucía", "Pedro", "Sofía", "Martín", "Valentina", "Diego", "Camila", "Matías",
+    "Julieta", "Nicolás", "Florencia", "Santiago", "Agustina", "Tomás", "Micaela", "Facundo", "Paula", "Joaquín",
+]
+APELLIDOS = [
+    "González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Ramírez", "Flores", "Acosta", "Benítez", "Medina",
+]
+RUTINAS_BASE = [
+    "Full Body", "Pierna y Glúteo", "Torso", "Empuje", "Tracción", "Cardio HIIT", "Core", "Movilidad",
+    "Fuerza 5x5", "Hipertrofia", "Funcional", "Principiante",
+]
+# Duraciones de rutina en días y su peso relativo (la mayoría hace bloques de 4 semanas)
+DURACIONES_DIAS = [28, 56, 84]
+PESOS_DURACION = [6, 3, 1]
+
+
+@dataclass
+class DatosSinteticos:
+    instructores: list[Instructor]
+    rutinas: list[Rutina]
+    clientes: list[Cliente]
+
+
+def _pesos_zipf(cantidad: int, exponente: float = 1.1) -> list[float]:
+    """Pesos decrecientes: el primero es el más elegido."""
+    return [1 / (rango ** exponente) for rango in range(1, cantidad + 1)]
+
+
+def generar_instructores(rng: random.Random, cantidad: int) -> list[Instructor]:
+    return [
+        Instructor(id=i, nombre=rng.choice(NOMBRES), apellido=rng.choice(APELLIDOS))
+        for i in range(1, cantidad + 1)
+    ]
+
+
+def generar_rutinas(rng: random.Random, cantidad: int) -> list[Rutina]:
+    rutinas = []
+    for i in range(1, cantidad + 1):
+        nombre = RUTINAS_BASE[(i - 1) % len(RUTINAS_BASE)]
+        if i > len(RUTINAS_BASE):
+            nombre = f"{nombre} {(i - 1) // len(RUTINAS_BASE) + 1}"
+        rutinas.append(Rutina(id=i, nombre=nombre, pdf_link=f"https://rutinas.example.com/{i}.pdf"))
+    return rutinas
+
+
+def generar_clientes(
+    rng: random.Random,
+    cantidad: int,
+    instructores_ids: list[int],
+    rutinas_ids: list[int],
+    hoy: date,
+) -> list[Cliente]:
+    pesos_instr = _pesos_zipf(len(instructores_ids), exponente=0.8)
+    pesos_rutina = _pesos_zipf(len(rutinas_ids))
+
+    # Elegimos todo de una vez (random.choices con k) que es mucho más rápido que de a uno
+    instr_elegidos = rng.choices(instructores_ids, weights=pesos_instr, k=cantidad)
+    rutinas_elegidas = rng.choices(rutinas_ids, weights=pesos_rutina, k=cantidad)
+    duraciones = rng.choices(DURACIONES_DIAS, weights=PESOS_DURACION, k=cantidad)
+
+    clientes = []
+    for i in range(cantidad):
+        inicio = hoy - timedelta(days=rng.randint(0, 365))
+        fin = inicio + timedelta(days=duraciones[i])
+        clientes.append(Cliente(
+            id=i + 1,
+            nombre=rng.choice(NOMBRES),
+            apellido=rng.choice(APELLIDOS),
+            fecha_inicio_rutina=inicio.strftime("%Y-%m-%d"),
+            fecha_fin_rutina=fin.strftime("%Y-%m-%d"),
+            instructor_id=instr_elegidos[i],
+            rutina_id=rutinas_elegidas[i],
+            ciclo_rutina=rng.randint(1, 3),
+        ))
+    return clientes
+
+
+def generar(cantidad_clientes: int, semilla: int = 42, hoy: date | None = None) -> DatosSinteticos:
+    """
+    Genera un juego de datos completo y coherente (las FK apuntan a ids existentes).
+    Los ids son correlativos desde 1, tal como los asignaría el AUTOINCREMENT en una base vacía.
+    """
+    rng = random.Random(semilla)
+    hoy = hoy or date.today()
+
+    cant_instructores = max(3, cantidad_clientes // 50)
+    cant_rutinas = min(24, max(8, cantidad_clientes // 500))
+
+    instructores = generar_instructores(rng, cant_instructores)
+    rutinas = generar_rutinas(rng, cant_rutinas)
+    clientes = generar_clientes(
+        rng,
+        cantidad_clientes,
+        [i.id for i in instructores],
+        [r.id for r in rutinas],
+        hoy,
+    )
+    carga = Counter(c.instructor_id for c in clientes)
+    for instructor in instructores:
+        instructor.cupo = max(instructor.cupo, math.ceil(carga[instructor.id] * 1.25))
+    return DatosSinteticos(instructores=instructores, rutinas=rutinas, clientes=clientes)
@@ -0,0 +1,107 @@
+"""
+Benchmark de la rotación masiva de ciclos (GymService.rotar_ciclos).
+
+Carga N clientes sintéticos (por defecto 100k; con el generador la gran mayoría ya
+tienen la rutina vencida) y mide:
+    - Simulación (dry-run): mismo trabajo que la rotación real, con rollback.
+    - Rotación real: un UPDATE por regla dentro de una transacción.
+    - Referencia: rotar de a un cliente (get_by_id + update), como se hace hoy desde la hoja
+      de edición. Se mide sobre una muestra y se extrapola al total de vencidos.
+
+Uso (desde src/):
+    python -m benchmarks.rotacion
+    python -m benchmarks.rotacion --clientes 100000 --salida bench_rotacion.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from dataclasses import replace
+from datetime import date
+
+from application.services import GymService
+from benchmarks.escala import _cargar_base
+from benchmarks.generador import generar
+from domain.entities import Cliente
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.metrics import RegistroMetricas
+from infrastructure.sqlite3_repo import SQLite3Repository
+
+CLIENTES_POR_DEFECTO = 100_000
+MUESTRA_POR_DEFECTO = 500
+
+
+def _por_segundo(cantidad: int, segundos: float) -> float:
+    return round(cantidad / segundos, 1) if segundos else 0.0
+
+
+def _medir_uno_a_uno(repo: SQLite3Repository, ids: list[int]) -> float:
+    """Segundos para rotar 'ids' de a uno, como lo haría el formulario de edición."""
+    inicio = time.perf_counter()
+    for cliente_id in ids:
+        cliente = repo.get_by_id(cliente_id, Cliente)
+        repo.update(replace(cliente, ciclo_rutina=cliente.ciclo_rutina % 3 + 1))
+    return time.perf_counter() - inicio
+
+
+def medir(cantidad: int, semilla: int, muestra: int, carpeta: str) -> dict:
+    hoy = date.today()
+    db = DatabaseConnection(os.path.join(carpeta, f"rotacion_{cantidad}.db"), metricas=RegistroMetricas())
+    db.init_db()
+    datos = generar(cantidad, semilla=semilla, hoy=hoy)
+    _cargar_base(db, datos)
+
+    repo = SQLite3Repository(db)
+    servicio = GymService(repositorio=repo)
+    vencidos = [c.id for c in datos.clientes if c.fecha_fin_rutina < hoy.isoformat()]
+
+    inicio = time.perf_counter()
+    simulacion = servicio.rotar_ciclos(hoy=hoy, simular=True)
+    simulacion_s = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    real = servicio.rotar_ciclos(hoy=hoy)
+    real_s = time.perf_counter() - inicio
+
+    ids_muestra = vencidos[:muestra]
+    uno_a_uno_s = _medir_uno_a_uno(repo, ids_muestra)
+
+    return {
+        "clientes": cantidad,
+        "vencidos": len(vencidos),
+        "rotados": real.total,
+        "simulacion_coincide": simulacion.total == real.total,
+        "por_regla": {r.regla: r.clientes for r in real.reglas},
+        "simulacion_s": round(simulacion_s, 6),
+        "rotacion_s": round(real_s, 6),
+        "rotacion_clientes_por_s": _por_segundo(real.total, real_s),
+        "uno_a_uno_muestra": len(ids_muestra),
+        "uno_a_uno_clientes_por_s": _por_segundo(len(ids_muestra), uno_a_uno_s),
+        "uno_a_uno_estimado_total_s": round(uno_a_uno_s / max(1, len(ids_muestra)) * len(vencidos), 3),
+        "metricas": db.metricas.snapshot(),
+    }
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Benchmark de rotación masiva de ciclos")
+    parser.add_argument("--clientes", type=int, default=CLIENTES_POR_DEFECTO)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--muestra", type=int, default=MUESTRA_POR_DEFECTO,
+                        help="Clientes rotados de a uno para la referencia")
+    parser.add_argument("--salida", default="bench_rotacion.json")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        resultados = medir(args.clientes, args.semilla, args.muestra, carpeta)
+
+    print(f"{resultados['rotados']} clientes rotados en {resultados['rotacion_s']} s "
+          f"({resultados['rotacion_clientes_por_s']}/s); de a uno: {resultados['uno_a_uno_clientes_por_s']}/s")
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, ensure_ascii=False, indent=2)
+    return resultados
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Línea de comandos (sin interfaz gráfica) para tareas programadas: importación/exportación,
+estadísticas, rotación de ciclos y mantenimiento de la base.
+
+Arma el mismo stack que main.py (DatabaseConnection -> SQLite3Repository -> GymService)
+pero sin importar Flet ni nada de GUI, así arranca en unas decenas de milisegundos.
+
+Uso (desde src/):
+    python -m cli estadisticas --dias 30
+    python -m cli vencimientos --dias 7 --json
+    python -m cli rotar --simular
+    python -m cli exportar Cliente clientes.csv
+    python -m cli importar Cliente clientes.csv --errores rechazadas.csv
+    python -m cli mantenimiento --reconstruir --compactar
+    python -m cli respaldar
+    python -m cli restaurar learnlifting-20260101-030000-000000.db --confirmar
+    python -m cli --db otra.db morosos
+
+Códigos de salida: 0 ok, 1 error de negocio, de persistencia o de archivos, 2 argumentos inválidos.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from dataclasses import asdict, is_dataclass
+from datetime import date
+
+from application.csv_io import TAMANO_LOTE
+from application.services import GymService
+from config import ruta_base_datos
+from domain.entities import ENTIDADES
+from domain.exceptions import GymException
+from domain.reportes import ResultadoImportacion
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.mantenimiento import MantenimientoProgramado
+from infrastructure.respaldos import GestorRespaldos
+from infrastructure.sqlite3_repo import SQLite3Repository
+
+
+def crear_servicio(db_path: str) -> tuple[DatabaseConnection, GymService]:
+    """Mismo armado que main.py, sin la GUI (las asistencias se guardan de a una con el repositorio)."""
+    db = DatabaseConnection(db_path)
+    db.init_db()
+    # Sin hilo de vacuum (el proceso dura poco): ANALYZE tras importaciones grandes y optimize al salir
+    MantenimientoProgramado(db)
+    return db, GymService(repositorio=SQLite3Repository(db), respaldos=GestorRespaldos(db))
+
+
+def _fecha(texto: str) -> date:
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Fecha inválida '{texto}' (se espera YYYY-MM-DD)")
+
+
+def _entidad(nombre: str) -> type:
+    if nombre not in ENTIDADES:
+        raise argparse.ArgumentTypeError(f"Entidad desconocida '{nombre}'. Opciones: {', '.join(ENTIDADES)}")
+    return ENTIDADES[nombre]
+
+
+# ========================================
+# COMANDOS (devuelven datos; la salida la arma _imprimir)
+# ========================================
+
+def cmd_estadisticas(servicio: GymService, db: DatabaseConnection, args) -> dict:
+    tablero = servicio.tablero(dias=args.dias, hoy=args.hoy)
+    return {
+        "desde": tablero.desde,
+        "hasta": tablero.hasta,
+        "total_asistencias": tablero.total_asistencias,
+        "por_semana": tablero.por_semana,
+        "horas_pico": servicio.horas_pico(dias=args.dias, hoy=args.hoy, top=5),
+        "por_instructor": tablero.por_instructor,
+        "por_rutina": tablero.por_rutina,
+        "cargas": servicio.cargas_instructores(),
+    }
+
+
+def cmd_vencimientos(servicio: GymService, db: DatabaseConnection, args) -> list:
+    return servicio.clientes_por_vencer(dias=args.dias, limite=args.limite, hoy=args.hoy, incluir_vencidos=args.incluir_vencidos)
+
+
+def cmd_morosos(servicio: GymService, db: DatabaseConnection, args) -> list:
+    return servicio.morosos(limite=args.limite, hoy=args.hoy)
+
+
+def cmd_rotar(servicio: GymService, db: DatabaseConnection, args) -> dict:
+    resultado = servicio.rotar_ciclos(hoy=args.hoy, simular=args.simular)
+    return {"hoy": resultado.hoy, "simulado": resultado.simulado, "total": resultado.total, "reglas": resultado.reglas}
+
+
+def cmd_exportar(servicio: GymService, db: DatabaseConnection, args) -> dict:
+    filas = servicio.exportar_csv(args.entidad, args.archivo, tamano_lote=args.lote)
+    return {"entidad": args.entidad.__name__, "archivo": args.archivo, "filas": filas}
+
+
+def cmd_importar(servicio: GymService, db: DatabaseConnection, args) -> ResultadoImportacion:
+    resultado = servicio.importar_csv(args.entidad, args.archivo, tamano_lote=args.lote)
+    if args.errores:
+        # Reporte completo de filas rechazadas (hasta el máximo que guarda el importador)
+        with open(args.errores, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(("linea", "campo", "mensaje"))
+            escritor.writerows((e.linea, e.campo or "", e.mensaje) for e in resultado.errores)
+    return resultado
+
+
+def cmd_mantenimiento(servicio: GymService, db: DatabaseConnection, args) -> dict:
+    reporte = {"tamano_inicial": db.tamano_bytes()}
+    pasos = [("integridad", db.verificar_integridad)]
+    if args.reconstruir:
+        pasos.append(("reconstruir", db.reconstruir_resumenes))
+    if args.compactar:
+        pasos.append(("compactar", db.compactar))
+    if args.incremental:
+        pasos.append(("incremental", db.vacuum_incremental))
+    pasos.append(("optimizar", db.optimizar))
+
+    for nombre, paso in pasos:
+        inicio = time.perf_counter()
+        resultado = paso()
+        reporte[nombre] = {"ms": round((time.perf_counter() - inicio) * 1000, 1)}
+        if resultado is not None:
+            reporte[nombre]["resultado"] = resultado
+    reporte["tamano_final"] = db.tamano_bytes()
+    return reporte
+
+
+def _barra_progreso(copiadas: int, total: int):
+    # Progreso en stderr (una sola línea que se reescribe) para no mezclarlo con la salida del comando
+    print(f"\rRespaldando: {copiadas * 100 // max(total, 1)}% ({copiadas}/{total} páginas)", end="", file=sys.stderr, flush=True)
+    if copiadas >= total:
+        print(file=sys.stderr)
+
+
+def cmd_respaldar(servicio: GymService, db: DatabaseConnection, args):
+    return servicio.respaldar(progreso=None if args.silencioso else _barra_progreso)
+
+
+def cmd_respaldos(servicio: GymService, db: DatabaseConnection, args) -> list:
+    return servicio.listar_respaldos()
+
+
+def cmd_restaurar(servicio: GymService, db: DatabaseConnection, args) -> dict:
+    seguridad = servicio.restaurar_respaldo(args.nombre, confirmar=args.confirmar)
+    return {"restaurado": args.nombre, "estado_anterior": seguridad.nombre}
+
+
+# ========================================
+# PARSER Y SALIDA
+# ========================================
+
+def crear_parser() -> argparse.ArgumentParser:
+    # --db y --json se aceptan antes o después del subcomando (SUPPRESS: el subcomando no pisa el valor global)
+    comunes = argparse.ArgumentParser(add_help=False)
+    comunes.add_argument("--db", default=argparse.SUPPRESS, help="Ruta de la base SQLite (por defecto la de la app)")
+    comunes.add_argument("--json", action="store_true", default=argparse.SUPPRESS, help="Salida en JSON (para scripts)")
+
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Tareas del gimnasio sin interfaz gráfica.", parents=[comunes])
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("estadisticas", parents=[comunes], help="Tablero de asistencias, instructores y rutinas")
+    p.add_argument("--dias", type=int, default=30)
+    p.add_argument("--hoy", type=_fecha, default=None)
+    p.set_defaults(funcion=cmd_estadisticas)
+
+    p = sub.add_parser("vencimientos", parents=[comunes], help="Clientes cuya rutina vence en los próximos días")
+    p.add_argument("--dias", type=int, default=7)
+    p.add_argument("--limite", type=int, default=50)
+    p.add_argument("--hoy", type=_fecha, default=None)
+    p.add_argument("--incluir-vencidos", action="store_true")
+    p.set_defaults(funcion=cmd_vencimientos)
+
+    p = sub.add_parser("morosos", parents=[comunes], help="Clientes con cuotas vencidas impagas")
+    p.add_argument("--limite", type=int, default=50)
+    p.add_argument("--hoy", type=_fecha, default=None)
+    p.set_defaults(funcion=cmd_morosos)
+
+    p = sub.add_parser("rotar", parents=[comunes], help="Rota los ciclos de los clientes con la rutina vencida")
+    p.add_argument("--simular", action="store_true", help="Solo muestra qué se rotaría (dry-run)")
+    p.add_argument("--hoy", type=_fecha, default=None)
+    p.set_defaults(funcion=cmd_rotar)
+
+    p = sub.add_parser("exportar", parents=[comunes], help="Exporta una entidad a CSV (lectura por lotes, memoria constante)")
+    p.add_argument("entidad", type=_entidad)
+    p.add_argument("archivo")
+    p.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por lote")
+    p.set_defaults(funcion=cmd_exportar)
+
+    p = sub.add_parser("importar", parents=[comunes], help="Importa una entidad desde CSV (valida FK, inserta en lotes)")
+    p.add_argument("entidad", type=_entidad)
+    p.add_argument("archivo")
+    p.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por transacción")
+    p.add_argument("--errores", default=None, help="CSV donde escribir las filas rechazadas")
+    p.set_defaults(funcion=cmd_importar)
+
+    p = sub.add_parser("mantenimiento", parents=[comunes], help="Integridad, estadísticas del planificador y compactación")
+    p.add_argument("--reconstruir", action="store_true", help="Recalcula contadores, resúmenes y saldos")
+    p.add_argument("--compactar", action="store_true", help="VACUUM (bloquea la base mientras dura; activa el vacuum incremental)")
+    p.add_argument("--incremental", action="store_true", help="Devuelve al disco las páginas libres sin reescribir el archivo")
+    p.set_defaults(funcion=cmd_mantenimiento)
+
+    p = sub.add_parser("respaldar", parents=[comunes], help="Copia de seguridad en caliente (verificada y con retención)")
+    p.add_argument("--silencioso", action="store_true", help="Sin barra de progreso")
+    p.set_defaults(funcion=cmd_respaldar)
+
+    p = sub.add_parser("respaldos", parents=[comunes], help="Lista las copias de seguridad disponibles")
+    p.set_defaults(funcion=cmd_respaldos)
+
+    p = sub.add_parser("restaurar", parents=[comunes], help="Reemplaza la base por una copia (guarda antes el estado actual)")
+    p.add_argument("nombre", help="Archivo de la copia (ver el subcomando respaldos)")
+    p.add_argument("--confirmar", action="store_true", help="Obligatorio: confirma que se reemplazan todos los datos")
+    p.set_defaults(funcion=cmd_restaurar)
+    return parser
+
+
+def _serializable(valor):
+    if is_dataclass(valor):
+        return asdict(valor)
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+def _imprimir(resultado, como_json: bool, salida=None):
+    salida = salida or sys.stdout
+    if como_json:
+        json.dump(resultado, salida, default=_serializable, ensure_ascii=False, indent=2)
+        salida.write("\n")
+        return
+    filas = resultado if isinstance(resultado, list) else [resultado]
+    for fila in filas:
+        if isinstance(fila, dict):
+            for clave, valor in fila.items():
+                if isinstance(valor, list):
+                    print(f"{clave}:", file=salida)
+                    for item in valor:
+                        print(f"  {_serializable(item) if is_dataclass(item) else item}", file=salida)
+                else:
+                    print(f"{clave}: {valor}", file=salida)
+        else:
+            print(_serializable(fila) if is_dataclass(fila) else fila, file=salida)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = crear_parser().parse_args(argv)
+    db, servicio = crear_servicio(getattr(args, "db", None) or ruta_base_datos())
+    try:
+        resultado = args.funcion(servicio, db, args)
+    except (GymException, OSError, csv.Error) as e:
+        # OSError: archivo a importar inexistente, carpeta de destino que no existe, sin permisos...
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.mantenimiento.cerrar()
+    _imprimir(resultado, getattr(args, "json", False))
+    return 0
@@ -4,4 +4,58 @@ class Config:
     DEBUG = False 
     DB_NAME = "data/gym_debug.db" if DEBUG else "data/gimnasio.db"
     # DB_PATH = os.path.join(os.path.dirname(__file__), DB_NAME)
-    APP_NAME = "Gestión Gym (Dev)" if DEBUG else "Gimnasio Pro"
\ No newline at end of file
+    APP_NAME = "Gestión Gym (Dev)" if DEBUG else "Gimnasio Pro"
+    # Consultas más lentas que este umbral se loguean con su EXPLAIN QUERY PLAN
+    UMBRAL_CONSULTA_LENTA_MS = 50
+    # Escritura en lotes de asistencias (check-in): se guarda al juntar N o al pasar este tiempo
+    ASISTENCIAS_TAMANO_LOTE = 100
+    ASISTENCIAS_INTERVALO_S = 1.0
+    # Copias de seguridad: páginas copiadas por paso (entre pasos la base queda libre) y copias que se conservan
+    RESPALDOS_PAGINAS_POR_PASO = 256
+    RESPALDOS_PAUSA_S = 0.005
+    RESPALDOS_RETENCION = 7
+    # Mantenimiento automático: vacuum incremental cuando la base lleva un rato sin uso (de a N páginas
+    # por pasada, para no bloquearla) y ANALYZE después de cargas masivas de al menos N filas
+    MANTENIMIENTO_INACTIVIDAD_S = 30.0
+    MANTENIMIENTO_INTERVALO_S = 10.0
+    MANTENIMIENTO_PAGINAS_VACUUM = 1000
+    MANTENIMIENTO_FILAS_ANALYZE = 1000
+    # Espera de cada intento por el lock de la base cuando escribe otra estación (o la copia de seguridad).
+    # Si se vence, la operación completa se reintenta con espera exponencial y jitter (infrastructure.reintentos).
+    DB_BUSY_TIMEOUT_S = 1.0
+    REINTENTOS_MAXIMO = 5
+    REINTENTOS_BASE_S = 0.05
+    REINTENTOS_TOPE_S = 1.0
+    # Sincronización entre estaciones: cada cuánto se mira PRAGMA data_version y cuántos ids
+    # cambiados se aplican de a uno (con más, la tabla abierta se recarga completa)
+    CAMBIOS_INTERVALO_S = 0.5
+    CAMBIOS_MAXIMO = 500
+    # Ajustes (config.json): se escriben cuando pasa este tiempo sin cambios nuevos (clics seguidos = una escritura)
+    AJUSTES_DEMORA_S = 0.5
+    # Modo web (python main.py --web): puerto donde se sirve la app a las demás recepciones
+    WEB_PUERTO = 8550
+    # API HTTP local (python -m api): puerto, hilos que atienden la base y pedidos en curso
+    # (atendiéndose o esperando un hilo) antes de responder 503
+    API_PUERTO = 8560
+    API_HILOS = 4
+    API_MAX_PENDIENTES = 64
+    # Conexiones keep-alive sin pedidos durante este tiempo se cierran
+    API_ESPERA_S = 30.0
+
+
+def carpeta_datos() -> str:
+    """Carpeta de datos del usuario: %APPDATA%/LearnLifting en Windows, ~/LearnLifting en el resto."""
+    base_path = os.path.join(os.getenv("APPDATA") or os.path.expanduser("~"), "LearnLifting")
+    os.makedirs(base_path, exist_ok=True)
+    return base_path
+
+
+def ruta_base_datos() -> str:
+    """Ruta de la base SQLite que comparten la app de escritorio y la línea de comandos."""
+    return os.path.join(carpeta_datos(), "learnlifting.db")
+
+
+def ruta_ajustes() -> str:
+    """Ruta del config.json con el tema y los metadatos de la app (ver infrastructure.ajustes)."""
+    return os.path.join(carpeta_datos(), "config.json")
+
@@ -0,0 +1,61 @@
+"""
+Acceso rápido (superficial) a los campos de una dataclass.
+
+dataclasses.asdict/astuple copian en profundidad y recorren el objeto de forma recursiva
+en cada llamada. Para entidades y DTOs planos (solo str/int/fechas) alcanza con una copia
+superficial, que aquí se resuelve con un operator.attrgetter precalculado por clase.
+"""
+
+from dataclasses import fields, replace
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable
+
+
+@lru_cache(maxsize=None)
+def nombres_campos(clase: type) -> tuple[str, ...]:
+    """Nombres de los campos en el orden de declaración. Se calcula una sola vez por clase."""
+    return tuple(f.name for f in fields(clase))
+
+
+@lru_cache(maxsize=None)
+def _lector(clase: type) -> Callable[[Any], tuple]:
+    nombres = nombres_campos(clase)
+    if len(nombres) == 1:
+        # attrgetter con un solo nombre devuelve el valor suelto, no una tupla
+        getter = attrgetter(nombres[0])
+        return lambda obj: (getter(obj),)
+    return attrgetter(*nombres)
+
+
+def valores(obj: Any) -> tuple:
+    """Tupla con los valores de los campos (copia superficial), en el orden de nombres_campos()."""
+    return _lector(type(obj))(obj)
+
+
+def como_dict(obj: Any) -> dict[str, Any]:
+    """Equivalente superficial de dataclasses.asdict()."""
+    return dict(zip(nombres_campos(type(obj)), _lector(type(obj))(obj)))
+
+
+def modificados(obj: Any, valores_nuevos: dict[str, Any]) -> dict[str, Any]:
+    """Los pares {campo: valor} de 'valores_nuevos' que difieren de lo que tiene 'obj' (campos sucios de un formulario)."""
+    return {n: v for n, v in valores_nuevos.items() if getattr(obj, n) != v}
+
+
+def diferencias(antes: Any, despues: Any) -> tuple[str, ...]:
+    """Nombres de los campos cuyo valor cambió entre dos objetos de la misma clase, en orden de declaración."""
+    return tuple(n for n, a, d in zip(nombres_campos(type(antes)), valores(antes), valores(despues)) if a != d)
+
+
+def combinar(base: Any, mia: Any, actual: Any) -> tuple[Any, tuple[str, ...], tuple[str, ...]]:
+    """
+    Combinación de tres vías de una edición que chocó con la de otra estación.
+    base: como se leyó al abrir el formulario; mia: lo que guardó el usuario; actual: como está ahora en la base.
+    Devuelve (combinada, mis_campos, pisados): 'actual' con los campos que cambió el usuario encima, los nombres
+    de esos campos y los que cambiaron los dos (en esos gana la edición del usuario si se guarda la combinada).
+    """
+    mis_campos = diferencias(base, mia)
+    suyos = set(diferencias(base, actual))
+    combinada = replace(actual, **{n: getattr(mia, n) for n in mis_campos})
+    return combinada, mis_campos, tuple(n for n in mis_campos if n in suyos and getattr(mia, n) != getattr(actual, n))
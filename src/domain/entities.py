@@ -4,19 +4,23 @@ from typing import Optional
 import inspect
 import sys
 
-@dataclass
+# Las entidades usan slots=True: sin __dict__ por instancia (menos memoria y acceso más rápido).
+# fields()/asdict() siguen funcionando igual; para copias superficiales ver domain.campos.
+
+@dataclass(slots=True)
 class Rutina:
     id: int
     nombre: str
     pdf_link: str
 
-@dataclass
+@dataclass(slots=True)
 class Instructor:
     id: int
     nombre: str
     apellido: str
+    cupo: int = 30  # Máximo de clientes asignados a la vez
 
-@dataclass
+@dataclass(slots=True)
 class Cliente:
     id: int
     nombre: str
@@ -36,6 +40,25 @@ class Cliente:
             self.rutina_id is not None
         ])
 
+@dataclass(slots=True)
+class Asistencia:
+    # Registro de check-in en el kiosco. La tabla es de solo inserción (historial).
+    id: int
+    cliente_id: Optional[int] = None
+    fecha_hora: datetime = field(default_factory=datetime.now)
+
+@dataclass(slots=True)
+class Pago:
+    # Movimiento de la cuenta del cliente: tipo "cargo" (cuota a pagar) o "pago".
+    # La tabla es de solo inserción (libro contable): las correcciones se hacen con otro movimiento.
+    id: int
+    cliente_id: Optional[int] = None
+    tipo: str = "pago"
+    monto: float = 0.0
+    fecha: datetime = field(default_factory=datetime.now)
+    vencimiento: datetime = field(default_factory=datetime.now)  # En los cargos: fecha límite de pago
+    concepto: str = ""
+
 # --- Automatización: Devuelvo todas las entidades registradas ---
 def obtener_entidades_registradas():
     """Retorna un diccionario {nombre_clase: clase} de todas las dataclasses en este archivo"""
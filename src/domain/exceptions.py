@@ -11,6 +11,21 @@ class ReferenciaEnUso(PersistenciaError):
     """Específica para el caso de las Foreign Keys"""
     pass
 
+class ConflictoEdicionError(PersistenciaError):
+    """Otra estación guardó el registro después de que se leyó: 'actual' y 'version' son los de la fila ahora."""
+    def __init__(self, mensaje: str, actual=None, version: int | None = None):
+        super().__init__(mensaje)
+        self.actual = actual
+        self.version = version
+
+class BaseOcupadaError(PersistenciaError):
+    """La base siguió bloqueada por otra estación después de todos los reintentos."""
+    pass
+
+class RespaldoError(PersistenciaError):
+    """Copia de seguridad que no se pudo hacer, no pasó la verificación o no se puede restaurar."""
+    pass
+
 # --- Grupo de Negocio ---
 class NegocioError(GymException): pass
 
@@ -12,7 +12,18 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def update(self, entity: object):
+    def get_by_ids(self, entity_ids, entity: object) -> list[object]:
+        """Los registros que existan entre 'entity_ids' (los borrados no vienen)."""
+        pass
+
+    @abstractmethod
+    def update(self, entity: object, campos=None, version: int | None = None):
+        """Guarda 'entity' (solo 'campos' si se indican). Con 'version', lanza ConflictoEdicionError si la fila ya cambió."""
+        pass
+
+    @abstractmethod
+    def update_fields(self, entity: object, changed, version: int | None = None) -> bool:
+        """UPDATE de solo los campos 'changed'. Sin campos no escribe nada y devuelve False."""
         pass
 
     @abstractmethod
@@ -21,4 +32,196 @@ class Repository(ABC):
     
     @abstractmethod
     def add(self, entity: object):
-        pass
\ No newline at end of file
+        pass
+
+# Interface para las consultas de vencimientos de rutinas
+class VencimientosRepository(ABC):
+
+    @abstractmethod
+    def get_vencimientos(self, desde: str, hasta: str, limite: int) -> list[object]:
+        """Clientes cuya fecha_fin_rutina está entre 'desde' y 'hasta' (ISO), ordenados por fecha."""
+        pass
+
+# Interface para la rotación masiva de ciclos de rutina
+class RotacionRepository(ABC):
+
+    @abstractmethod
+    def rotar_vencidos(self, hoy: str, reglas: list, simular: bool = False) -> list[object]:
+        """Aplica cada regla con un UPDATE sobre los clientes con fecha_fin_rutina < hoy. Con simular=True deshace los cambios."""
+        pass
+
+# Interface para registrar asistencias (check-in). La implementación puede encolar y escribir en lotes.
+class RegistroAsistencias(ABC):
+
+    @abstractmethod
+    def registrar(self, asistencia: object):
+        """Agenda la asistencia para guardarse. No debe bloquear a quien llama."""
+        pass
+
+    @abstractmethod
+    def flush(self):
+        """Guarda ya todo lo pendiente."""
+        pass
+
+# Interface para las estadísticas (se leen de tablas de resumen, no de las tablas base)
+class EstadisticasRepository(ABC):
+
+    @abstractmethod
+    def get_asistencias_por_dia(self, desde: str, hasta: str) -> list[object]:
+        pass
+
+    @abstractmethod
+    def get_asistencias_por_hora(self, desde: str, hasta: str) -> list[object]:
+        pass
+
+    @abstractmethod
+    def get_resumen_instructores(self, desde: str, hasta: str) -> list[object]:
+        pass
+
+    @abstractmethod
+    def get_resumen_rutinas(self, desde: str, hasta: str) -> list[object]:
+        pass
+
+# Interface para la carga (clientes asignados) de los instructores
+class CargaInstructoresRepository(ABC):
+
+    @abstractmethod
+    def get_carga_instructor(self, instructor_id: int) -> object:
+        """Cupo y clientes asignados de un instructor (None si no existe)."""
+        pass
+
+    @abstractmethod
+    def get_cargas_instructores(self) -> list[object]:
+        pass
+
+    @abstractmethod
+    def get_instructor_con_menos_carga(self) -> object:
+        """Instructor con menos clientes que todavía tiene cupo (None si todos están completos)."""
+        pass
+
+# Interface para el estado de cuenta de los clientes (saldo acumulado del libro de pagos)
+class PagosRepository(ABC):
+
+    @abstractmethod
+    def get_estado_cuenta(self, cliente_id: int) -> object:
+        """Cargos, pagos y deuda vencida más vieja de un cliente (None si no tiene movimientos)."""
+        pass
+
+    @abstractmethod
+    def get_morosos(self, hoy: str, limite: int) -> list[object]:
+        """Clientes con algún cargo impago vencido antes de 'hoy', los de deuda más vieja primero."""
+        pass
+
+# Interface para las referencias (FK) hacia un registro: vista previa y reasignación antes de borrar
+class ReferenciasRepository(ABC):
+
+    @abstractmethod
+    def contar_referencias(self, entity_id: int, class_entity: object) -> list[object]:
+        """Cuántas filas de cada tabla apuntan al registro (solo las tablas con FK hacia la entidad)."""
+        pass
+
+    @abstractmethod
+    def reasignar_y_eliminar(self, origen: object, destino: object) -> int:
+        """Mueve todas las referencias de 'origen' a 'destino' y borra 'origen' en una sola transacción. Devuelve las filas movidas."""
+        pass
+
+    @abstractmethod
+    def archivar(self, entity: object):
+        """Baja lógica de un registro con historial que no se puede borrar (deja de leerse; el historial queda)."""
+        pass
+
+# Interface para la importación/exportación masiva (CSV): lectura por lotes e inserción en lotes
+class CargaMasivaRepository(ABC):
+
+    @abstractmethod
+    def iterar_lotes(self, class_entity: object, tamano_lote: int):
+        """Genera listas de hasta 'tamano_lote' filas (tuplas en el orden de la dataclass) ordenadas por id."""
+        pass
+
+    @abstractmethod
+    def get_ids(self, class_entity: object) -> set[int]:
+        pass
+
+    @abstractmethod
+    def insertar_lote(self, class_entity: object, filas: list[dict]) -> list[tuple[int, str]]:
+        """Inserta las filas en una transacción. Devuelve (índice, error) de las que la base rechazó."""
+        pass
+
+    @abstractmethod
+    def carga_terminada(self, class_entity: object, filas: int):
+        """Aviso de fin de una carga masiva de 'filas' filas (para actualizar estadísticas)."""
+        pass
+
+# Interface para los listados paginados (API): páginas por cursor sobre el id
+class PaginasRepository(ABC):
+
+    @abstractmethod
+    def get_pagina(self, class_entity: object, despues_de: int, limite: int) -> list[object]:
+        """Hasta 'limite' registros con id mayor a 'despues_de', ordenados por id."""
+        pass
+
+# Interface para la concurrencia optimista: leer un registro junto con su versión para editarlo
+class VersionesRepository(ABC):
+
+    @abstractmethod
+    def get_con_version(self, entity_id: int, class_entity: object) -> tuple[object, int] | None:
+        """(entidad, versión) en una sola lectura, o None si no existe. La versión se pasa después a update()."""
+        pass
+
+# Interface para las copias de seguridad de la base
+class Respaldos(ABC):
+
+    @abstractmethod
+    def respaldar(self, progreso=None) -> object:
+        """Copia la base en caliente y la verifica. progreso(copiadas, total) se llama después de cada paso."""
+        pass
+
+    @abstractmethod
+    def respaldar_en_segundo_plano(self, progreso=None, al_terminar=None) -> bool:
+        """Igual que respaldar() pero en un hilo de fondo. al_terminar(respaldo, error). False si ya hay uno en curso."""
+        pass
+
+    @abstractmethod
+    def listar(self) -> list[object]:
+        """Respaldos disponibles, el más reciente primero."""
+        pass
+
+    @abstractmethod
+    def restaurar(self, nombre: str):
+        """Reemplaza el contenido de la base por el del respaldo 'nombre'."""
+        pass
+
+# Interface para enterarse de los cambios hechos por otras estaciones (u otros procesos) sobre la misma base
+class NotificadorCambios(ABC):
+
+    @abstractmethod
+    def revisar(self) -> object | None:
+        """Cambios desde la última revisión (None si no hubo ninguno)."""
+        pass
+
+    @abstractmethod
+    def iniciar(self, al_cambiar):
+        """Revisa periódicamente en un hilo de fondo y llama a al_cambiar(cambios) cuando hay novedades."""
+        pass
+
+    @abstractmethod
+    def detener(self):
+        pass
+
+    @abstractmethod
+    def quitar(self, al_cambiar):
+        """Deja de avisarle a al_cambiar (una sesión que se cerró). El hilo sigue para los demás."""
+        pass
+
+# Interface para la caché de catálogos (instructores, rutinas, cupos) que comparten todas las sesiones
+class Catalogos(ABC):
+
+    @abstractmethod
+    def obtener(self, clave: str, cargar) -> object:
+        """El valor guardado en 'clave', o el de cargar() si no está (una sola carga aunque lo pidan varios hilos a la vez)."""
+        pass
+
+    @abstractmethod
+    def invalidar(self, *claves: str):
+        """Descarta 'claves' (todas si no se indica ninguna). Una carga de esas claves que ya estaba en curso no se guarda."""
+        pass
@@ -0,0 +1,159 @@
+"""
+Registro de metadatos de las entidades, calculado UNA sola vez al importar.
+
+Reemplaza la reflexión en cada llamada (fields(), get_type_hints(), str(tipo)...) por una
+tabla precalculada que leen el repositorio, el servicio, las migraciones y el formulario.
+
+Por cada entidad se guarda:
+    - nombre de la clase y de la tabla
+    - campos en orden, con su tipo resuelto (Optional[int] -> int) y si admite None
+    - FK inferidas por el sufijo "_id" (solo si existe una entidad con ese nombre)
+    - tipo SQL de cada columna
+
+Ejemplo:
+    meta(Cliente).tabla                       # "cliente"
+    meta(Cliente).campo("rutina_id").fk       # "rutina"
+    meta(Cliente).columnas_formulario         # {"nombre": str, ..., "instructor_id": int, ...}
+"""
+
+from dataclasses import MISSING, dataclass, fields
+from datetime import date, datetime
+from types import NoneType, UnionType
+from typing import Any, Union, get_args, get_origin, get_type_hints
+
+from domain.entities import ENTIDADES
+from domain.exceptions import EntidadNoValidaError
+
+# Mapeo de tipos de Python a SQLite.
+# Las fechas se guardan como texto ISO 'YYYY-MM-DD' (así las escribe el controlador).
+MAPEO_TIPOS_SQL: dict[type, str] = {
+    str: "TEXT",
+    int: "INTEGER",
+    float: "REAL",
+    bool: "INTEGER",  # SQLite usa 0 o 1
+    datetime: "TEXT",
+    date: "TEXT",
+}
+
+# Valores por defecto para columnas NOT NULL nuevas cuando la dataclass no define uno
+DEFAULTS_POR_TIPO: dict[type, Any] = {str: "", int: 0, float: 0.0, bool: 0, datetime: "", date: ""}
+
+
+@dataclass(frozen=True, slots=True)
+class MetaCampo:
+    nombre: str
+    tipo: type          # Tipo base ya resuelto (sin Optional)
+    anulable: bool      # True si la dataclass lo declara Optional
+    fk: str | None      # Tabla referenciada (inferida de "<tabla>_id") o None
+    tipo_sql: str
+    es_pk: bool
+    default: Any = MISSING
+
+    @property
+    def not_null(self) -> bool:
+        # Las FK se declaran Optional para poder armar el objeto antes de elegir en el formulario,
+        # pero en la base son obligatorias (un cliente siempre tiene instructor y rutina).
+        return not self.anulable or self.fk is not None
+
+
+@dataclass(frozen=True, slots=True)
+class MetaEntidad:
+    clase: type
+    nombre: str
+    tabla: str
+    campos: tuple[MetaCampo, ...]
+    nombres: tuple[str, ...]
+    por_nombre: dict[str, MetaCampo]
+    columnas_formulario: dict[str, type]   # {campo: tipo} sin la PK, en orden
+    fks: tuple[MetaCampo, ...]
+
+    def campo(self, nombre: str) -> MetaCampo | None:
+        return self.por_nombre.get(nombre)
+
+
+def _resolver_tipo(tipo: Any) -> tuple[type, bool]:
+    """Devuelve (tipo_base, anulable). Optional[int] / int | None -> (int, True)."""
+    if get_origin(tipo) in (Union, UnionType):
+        argumentos = [a for a in get_args(tipo) if a is not NoneType]
+        anulable = len(argumentos) != len(get_args(tipo))
+        return (argumentos[0] if len(argumentos) == 1 else object), anulable
+    return tipo, False
+
+
+def _construir(clase: type, tablas: set[str]) -> MetaEntidad:
+    tipos = get_type_hints(clase)
+    campos = []
+    for f in fields(clase):
+        tipo, anulable = _resolver_tipo(tipos[f.name])
+        fk = None
+        if f.name.endswith("_id") and f.name[:-3] in tablas:
+            fk = f.name[:-3]
+        campos.append(MetaCampo(
+            nombre=f.name,
+            tipo=tipo,
+            anulable=anulable,
+            fk=fk,
+            tipo_sql=MAPEO_TIPOS_SQL.get(tipo, "TEXT"),
+            es_pk=f.name == "id",
+            default=f.default,
+        ))
+    campos = tuple(campos)
+    return MetaEntidad(
+        clase=clase,
+        nombre=clase.__name__,
+        tabla=clase.__name__.lower(),
+        campos=campos,
+        nombres=tuple(c.nombre for c in campos),
+        por_nombre={c.nombre: c for c in campos},
+        columnas_formulario={c.nombre: c.tipo for c in campos if not c.es_pk},
+        fks=tuple(c for c in campos if c.fk),
+    )
+
+
+def _construir_registro() -> dict[type, MetaEntidad]:
+    tablas = {clase.__name__.lower() for clase in ENTIDADES.values()}
+    return {clase: _construir(clase, tablas) for clase in ENTIDADES.values()}
+
+
+REGISTRO: dict[type, MetaEntidad] = _construir_registro()
+REGISTRO_POR_TABLA: dict[str, MetaEntidad] = {m.tabla: m for m in REGISTRO.values()}
+# Subclases de entidades ya resueltas por meta() (no se mezclan con el registro principal)
+_SUBCLASES: dict[type, MetaEntidad] = {}
+
+
+def meta(clase: type) -> MetaEntidad:
+    """Metadatos de una entidad (clase). Acepta subclases de entidades registradas."""
+    if not isinstance(clase, type):
+        raise EntidadNoValidaError(f"Entidad {clase!r} no reconocida")
+    encontrada = REGISTRO.get(clase) or _SUBCLASES.get(clase)
+    if encontrada is not None:
+        return encontrada
+    for base in getattr(clase, "__mro__", ())[1:]:
+        if base in REGISTRO:
+            _SUBCLASES[clase] = REGISTRO[base]
+            return REGISTRO[base]
+    raise EntidadNoValidaError(f"Entidad {getattr(clase, '__name__', clase)} no reconocida")
+
+
+def orden_creacion() -> list[MetaEntidad]:
+    """Entidades ordenadas para crear tablas: las referenciadas (padres) antes que las que las referencian."""
+    ordenadas: list[MetaEntidad] = []
+    visitadas: set[str] = set()
+
+    def visitar(m: MetaEntidad):
+        if m.tabla in visitadas:
+            return
+        visitadas.add(m.tabla)
+        for campo in m.fks:
+            if campo.fk != m.tabla:
+                visitar(REGISTRO_POR_TABLA[campo.fk])
+        ordenadas.append(m)
+
+    for m in sorted(REGISTRO.values(), key=lambda m: m.tabla):
+        visitar(m)
+    return ordenadas
+
+
+def referencias_a(tabla: str) -> list[tuple[MetaEntidad, MetaCampo]]:
+    """Todas las (entidad, campo) que tienen una FK hacia 'tabla'."""
+    return [(m, c) for m in REGISTRO.values() for c in m.fks if c.fk == tabla]
@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+
+# Objetos de valor de solo lectura que devuelven las consultas de reportes.
+# Viven fuera de entities.py para que no se registren como entidades (no tienen tabla propia).
+
+@dataclass(slots=True, frozen=True)
+class Vencimiento:
+    cliente_id: int
+    nombre_cliente: str
+    fecha_fin_rutina: str   # 'YYYY-MM-DD'
+    ciclo_rutina: int
+    rutina: str
+    instructor: str
+
+
+@dataclass(slots=True, frozen=True)
+class ResumenRegla:
+    regla: str
+    clientes: int                   # Clientes rotados por la regla
+    por_rutina: dict[int, int]      # rutina_id anterior -> cantidad de clientes
+
+
+@dataclass(slots=True, frozen=True)
+class ResultadoRotacion:
+    hoy: str                        # 'YYYY-MM-DD'
+    simulado: bool                  # True: dry-run (se deshizo la transacción)
+    reglas: list[ResumenRegla]
+
+    @property
+    def total(self) -> int:
+        return sum(r.clientes for r in self.reglas)
+
+
+@dataclass(slots=True, frozen=True)
+class ConteoPeriodo:
+    periodo: str        # Día 'YYYY-MM-DD', semana 'YYYY-Www' u hora 'HH'
+    asistencias: int
+
+
+@dataclass(slots=True, frozen=True)
+class ConteoInstructor:
+    instructor_id: int
+    instructor: str
+    clientes: int       # Clientes asignados hoy
+    asistencias: int    # Check-ins en el período consultado
+
+
+@dataclass(slots=True, frozen=True)
+class ConteoRutina:
+    rutina_id: int
+    rutina: str
+    clientes: int
+    asistencias: int
+
+
+@dataclass(slots=True, frozen=True)
+class Tablero:
+    desde: str
+    hasta: str
+    por_dia: list[ConteoPeriodo]
+    por_semana: list[ConteoPeriodo]
+    por_hora: list[ConteoPeriodo]
+    por_instructor: list[ConteoInstructor]
+    por_rutina: list[ConteoRutina]
+
+    @property
+    def total_asistencias(self) -> int:
+        return sum(c.asistencias for c in self.por_dia)
+
+
+@dataclass(slots=True, frozen=True)
+class CargaInstructor:
+    instructor_id: int
+    instructor: str
+    cupo: int
+    clientes: int           # Clientes asignados (contador mantenido por triggers)
+
+    @property
+    def libres(self) -> int:
+        return max(0, self.cupo - self.clientes)
+
+
+@dataclass(slots=True, frozen=True)
+class EstadoCuenta:
+    cliente_id: int
+    cargos: float
+    pagos: float
+    vence_deuda: str | None     # Vencimiento del cargo impago más viejo ('YYYY-MM-DD'), None si está al día
+
+    @property
+    def saldo(self) -> float:
+        # Positivo: lo que el cliente debe. Negativo: saldo a favor.
+        return round(self.cargos - self.pagos, 2)
+
+    def moroso(self, hoy: str) -> bool:
+        return self.vence_deuda is not None and self.vence_deuda < hoy
+
+
+@dataclass(slots=True, frozen=True)
+class Deudor:
+    cliente_id: int
+    nombre_cliente: str
+    saldo: float
+    vence_deuda: str
+
+
+@dataclass(slots=True, frozen=True)
+class Referencia:
+    tabla: str              # Tabla que apunta al registro (p. ej. "cliente")
+    columna: str            # Columna FK (p. ej. "instructor_id")
+    cantidad: int
+
+
+@dataclass(slots=True, frozen=True)
+class ErrorImportacion:
+    linea: int              # Línea del archivo (la 1 es el encabezado)
+    campo: str | None       # None si el error es de la fila completa
+    mensaje: str
+
+
+@dataclass(slots=True, frozen=True)
+class ResultadoImportacion:
+    entidad: str
+    leidas: int
+    importadas: int
+    rechazadas: int
+    errores: list[ErrorImportacion]     # Hasta max_errores (rechazadas tiene el total)
+    segundos: float
+
+    @property
+    def filas_por_minuto(self) -> float:
+        return round(self.importadas / self.segundos * 60, 1) if self.segundos else 0.0
+
+
+@dataclass(slots=True, frozen=True)
+class Pagina:
+    registros: list
+    siguiente: int | None   # 'despues_de' para pedir la página siguiente (None si era la última)
+
+
+@dataclass(slots=True, frozen=True)
+class Respaldo:
+    nombre: str             # Archivo dentro de la carpeta de respaldos
+    ruta: str
+    creado: str             # 'YYYY-MM-DD HH:MM:SS'
+    bytes: int
+    segundos: float = 0.0   # Duración de la copia (0 si se leyó del disco)
+
+
+@dataclass(slots=True, frozen=True)
+class Cambios:
+    version: int                            # Última versión del registro de cambios leída
+    ids: dict[str, frozenset[int]]          # {tabla: ids dados de alta, editados o borrados}
+    completo: bool = False                  # Demasiados cambios o se perdió parte del registro: recargar todo
+
+
+@dataclass(slots=True, frozen=True)
+class EjecucionMantenimiento:
+    tarea: str              # "optimize", "analyze" o "incremental_vacuum"
+    motivo: str             # Qué la disparó: "cierre", "carga masiva", "inactividad", "manual"
+    bytes_antes: int
+    bytes_despues: int
+    segundos: float
+
+    @property
+    def bytes_liberados(self) -> int:
+        return self.bytes_antes - self.bytes_despues
@@ -0,0 +1,39 @@
+"""
+Reglas de rotación de ciclos de rutina.
+
+Un cliente recorre los ciclos 1 -> 2 -> 3 -> 1 ... Cuando su fecha_fin_rutina ya pasó, la rotación:
+    - avanza el ciclo (3 vuelve a 1),
+    - le asigna la rutina siguiente según la regla (mapa_rutinas),
+    - corre las fechas: empieza hoy y dura lo mismo que el período anterior (o duracion_dias).
+
+Cada regla se aplica con un único UPDATE sobre todos los clientes vencidos que cumplen su filtro.
+Las reglas se aplican en orden: un cliente ya rotado deja de estar vencido y no lo toma la siguiente.
+"""
+
+from dataclasses import dataclass, field
+
+CICLO_MAXIMO = 3
+# Duración usada si las fechas guardadas no permiten calcular la del período anterior
+DURACION_POR_DEFECTO_DIAS = 28
+
+
+@dataclass(slots=True, frozen=True)
+class ReglaRotacion:
+    nombre: str
+    mapa_rutinas: dict[int, int] = field(default_factory=dict)  # rutina actual -> siguiente (las que no están se mantienen)
+    duracion_dias: int | None = None                             # None: repite la duración del período anterior
+    ciclos: tuple[int, ...] | None = None                        # Ciclos actuales a los que aplica (None: todos)
+
+
+def mapa_siguiente(rutinas_ids: list[int]) -> dict[int, int]:
+    """Cada rutina pasa a la siguiente por id; la última vuelve a la primera."""
+    ordenados = sorted(rutinas_ids)
+    return {actual: siguiente for actual, siguiente in zip(ordenados, ordenados[1:] + ordenados[:1]) if actual != siguiente}
+
+
+def reglas_por_defecto(rutinas_ids: list[int]) -> list[ReglaRotacion]:
+    """Los ciclos 1 y 2 repiten la rutina; al cerrar el ciclo 3 se pasa a la rutina siguiente."""
+    return [
+        ReglaRotacion(nombre="Cambio de rutina", mapa_rutinas=mapa_siguiente(rutinas_ids), ciclos=(CICLO_MAXIMO,)),
+        ReglaRotacion(nombre="Avance de ciclo", ciclos=tuple(range(1, CICLO_MAXIMO))),
+    ]
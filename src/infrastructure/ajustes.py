@@ -0,0 +1,149 @@
+"""
+Ajustes de la aplicación (config.json en la carpeta de datos del usuario): tema, nombre y versión.
+
+Antes cada cambio de modo o de color releía y reescribía el archivo completo desde el hilo de la UI,
+y get_project_metadata lo reescribía en cada arranque. El almacén:
+
+    - Lee el archivo una sola vez y después trabaja en memoria (obtener() no toca el disco).
+    - actualizar() solo anota los valores y vuelve enseguida. Un hilo de fondo escribe cuando pasan
+      'demora_s' sin cambios nuevos (debounce): cinco clics seguidos sobre el color son una escritura.
+    - No escribe si el contenido quedó igual al del archivo (por ejemplo, claro -> oscuro -> claro).
+    - Escribe de forma atómica: archivo temporal en la misma carpeta + os.replace. Un corte a mitad de
+      camino deja el archivo anterior entero, nunca un JSON a medias.
+    - Tema y metadatos comparten la misma instancia (almacen_ajustes()), así ninguno pisa las claves del otro.
+
+Los valores tienen que ser serializables a JSON (textos, números, booleanos).
+
+Uso:
+    ajustes = almacen_ajustes()
+    ajustes.actualizar(mode="dark", color="teal")
+    ajustes.obtener("mode", "dark")
+    ...
+    ajustes.cerrar()   # escribe lo pendiente y detiene el hilo
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Any
+
+from config import Config, ruta_ajustes
+from infrastructure.metrics import RegistroMetricas, metricas as metricas_globales
+
+logger = logging.getLogger(__name__)
+
+
+class AlmacenAjustes:
+    def __init__(self, ruta: str, demora_s: float = Config.AJUSTES_DEMORA_S, metricas: RegistroMetricas = None):
+        self.ruta = ruta
+        self.demora_s = demora_s
+        self.metricas = metricas or metricas_globales
+        self._lock = threading.Lock()
+        self._escritura = threading.Lock()  # Una escritura a la vez (hilo de fondo o guardar_ahora)
+        self._datos = self._leer()
+        self._persistido = dict(self._datos)  # Lo que hay en el disco: si los datos son iguales no se escribe
+        self._aviso = threading.Event()
+        self._cerrado = threading.Event()
+        self._hilo: threading.Thread | None = None
+
+    def _leer(self) -> dict:
+        try:
+            with open(self.ruta, "r", encoding="utf-8") as f:
+                datos = json.load(f)
+            return datos if isinstance(datos, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            # Archivo dañado: se arranca con los valores por defecto y se reescribe en el próximo cambio
+            logger.warning("No se pudieron leer los ajustes de %s: %s", self.ruta, e)
+            return {}
+
+    # --- API (cualquier hilo) ---
+    def obtener(self, clave: str, defecto: Any = None) -> Any:
+        with self._lock:
+            return self._datos.get(clave, defecto)
+
+    def todos(self) -> dict:
+        with self._lock:
+            return dict(self._datos)
+
+    def actualizar(self, valores: dict | None = None, **mas) -> bool:
+        """Anota los valores nuevos (sin tocar el disco). Devuelve False si ya eran los que estaban."""
+        nuevos = {**(valores or {}), **mas}
+        with self._lock:
+            if all(clave in self._datos and self._datos[clave] == valor for clave, valor in nuevos.items()):
+                return False
+            if self._cerrado.is_set():
+                raise RuntimeError("El almacén de ajustes está cerrado")
+            self._datos.update(nuevos)
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="ajustes", daemon=True)
+                self._hilo.start()
+        self._aviso.set()
+        return True
+
+    def guardar_ahora(self):
+        """Escribe ya lo pendiente (si hay algo distinto de lo que está en el disco)."""
+        self._escribir()
+
+    def cerrar(self, timeout: float | None = 5.0):
+        """Escribe lo pendiente y detiene el hilo de fondo."""
+        self._cerrado.set()
+        self._aviso.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+        self._escribir()
+
+    # --- Hilo de fondo ---
+    def _bucle(self):
+        while not self._cerrado.is_set():
+            self._aviso.wait()
+            # Debounce: mientras sigan llegando cambios antes de 'demora_s' se sigue esperando
+            while self._aviso.is_set() and not self._cerrado.is_set():
+                self._aviso.clear()
+                self._cerrado.wait(self.demora_s)
+            if self._cerrado.is_set():
+                return  # cerrar() escribe lo pendiente desde su propio hilo
+            try:
+                self._escribir()
+            except OSError as e:  # Disco lleno, sin permisos: se reintenta en el próximo cambio
+                logger.error("No se pudieron guardar los ajustes en %s: %s", self.ruta, e)
+
+    def _escribir(self):
+        with self._escritura:
+            with self._lock:
+                if self._datos == self._persistido:
+                    self.metricas.incrementar("ajustes_sin_cambios")
+                    return
+                datos = dict(self._datos)
+
+            carpeta = os.path.dirname(self.ruta) or "."
+            os.makedirs(carpeta, exist_ok=True)
+            descriptor, temporal = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=carpeta)
+            try:
+                with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+                    json.dump(datos, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporal, self.ruta)
+            except BaseException:
+                os.unlink(temporal)
+                raise
+            with self._lock:
+                self._persistido = datos
+            self.metricas.incrementar("ajustes_escritos")
+
+
+_compartidos: dict[str, AlmacenAjustes] = {}
+_lock_compartidos = threading.Lock()
+
+
+def almacen_ajustes(ruta: str | None = None) -> AlmacenAjustes:
+    """La instancia compartida del archivo de ajustes (por defecto el de la carpeta de datos del usuario)."""
+    ruta = os.path.abspath(ruta or ruta_ajustes())
+    with _lock_compartidos:
+        if ruta not in _compartidos:
+            _compartidos[ruta] = AlmacenAjustes(ruta)
+        return _compartidos[ruta]
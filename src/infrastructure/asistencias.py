@@ -0,0 +1,181 @@
+"""
+Escritura en lotes (group commit) de las asistencias del kiosco.
+
+registrar() solo encola la asistencia y vuelve enseguida: nunca toca la base desde el hilo
+de la UI. Un hilo de fondo junta las asistencias y las guarda con un único executemany por
+transacción cuando se llena el lote (tamano_lote) o cuando pasa el intervalo (intervalo_s),
+lo que ocurra primero. Así una ráfaga de cientos de check-ins por minuto cuesta unos pocos
+commits en lugar de uno por asistencia.
+
+Si un lote falla por integridad (por ejemplo, un cliente_id que no existe) se reintenta fila
+por fila para no perder las asistencias válidas; las inválidas se cuentan como descartadas.
+
+Uso:
+    escritor = EscritorAsistencias(db_manager)
+    escritor.registrar(Asistencia(id=0, cliente_id=7))
+    ...
+    escritor.cerrar()   # guarda lo pendiente y detiene el hilo
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from config import Config
+from domain.entities import Asistencia
+from domain.exceptions import BaseOcupadaError
+from domain.interfaces import RegistroAsistencias
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.esquema import sentencias
+from infrastructure.metrics import RegistroMetricas
+from infrastructure.reintentos import PoliticaReintentos
+
+logger = logging.getLogger(__name__)
+
+
+def _como_fila(asistencia: Asistencia) -> dict:
+    fecha_hora = asistencia.fecha_hora
+    if isinstance(fecha_hora, datetime):
+        fecha_hora = fecha_hora.isoformat(sep=" ", timespec="seconds")
+    return {"cliente_id": asistencia.cliente_id, "fecha_hora": fecha_hora}
+
+
+class EscritorAsistencias(RegistroAsistencias):
+    def __init__(
+        self,
+        db_conn: DatabaseConnection,
+        tamano_lote: int = Config.ASISTENCIAS_TAMANO_LOTE,
+        intervalo_s: float = Config.ASISTENCIAS_INTERVALO_S,
+        metricas: RegistroMetricas = None,
+        reintentos: PoliticaReintentos = None,
+    ):
+        self.db = db_conn
+        self.tamano_lote = tamano_lote
+        self.intervalo_s = intervalo_s
+        self.metricas = metricas or db_conn.metricas
+        self.reintentos = reintentos or PoliticaReintentos()
+        self._cola: queue.Queue = queue.Queue()
+        # Señales para el hilo: forzar un flush y esperar a que termine
+        self._pedido_flush = threading.Event()
+        self._flush_listo = threading.Event()
+        self._cerrado = threading.Event()
+        self._hilo = threading.Thread(target=self._bucle, name="escritor-asistencias", daemon=True)
+        self._hilo.start()
+
+    # --- API (hilo de quien llama) ---
+    def registrar(self, asistencia: Asistencia):
+        if self._cerrado.is_set():
+            raise RuntimeError("El escritor de asistencias está cerrado.")
+        self._cola.put(_como_fila(asistencia))
+
+    def pendientes(self) -> int:
+        return self._cola.qsize()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Pide guardar todo lo encolado y espera a que termine. Devuelve False si venció el timeout."""
+        self._flush_listo.clear()
+        self._pedido_flush.set()
+        self._cola.put(None)  # Despierta al hilo si está esperando en la cola
+        return self._flush_listo.wait(timeout)
+
+    def cerrar(self, timeout: float | None = 5.0):
+        """Guarda lo pendiente y detiene el hilo de fondo."""
+        if self._cerrado.is_set():
+            return
+        self._cerrado.set()
+        self._cola.put(None)
+        self._hilo.join(timeout)
+
+    # --- Hilo de fondo ---
+    def _bucle(self):
+        lote: list[dict] = []
+        limite = time.monotonic() + self.intervalo_s
+        while True:
+            try:
+                fila = self._cola.get(timeout=max(0.0, limite - time.monotonic()))
+                if fila is not None:
+                    lote.append(fila)
+            except queue.Empty:
+                pass
+
+            vencido = time.monotonic() >= limite
+            if len(lote) >= self.tamano_lote or vencido or self._pedido_flush.is_set() or self._cerrado.is_set():
+                # Vaciamos lo que ya esté en la cola para aprovechar el mismo commit
+                lote.extend(self._drenar(self.tamano_lote * 10))
+                if lote:
+                    try:
+                        self._guardar(lote)
+                    except Exception:  # Un error inesperado no puede matar el hilo: los check-ins siguientes se perderían
+                        logger.exception("Falló el guardado de un lote de %s asistencias", len(lote))
+                        self.metricas.incrementar("asistencias_descartadas", len(lote))
+                    lote = []
+                limite = time.monotonic() + self.intervalo_s
+
+                if self._pedido_flush.is_set() and self._cola.empty():
+                    self._pedido_flush.clear()
+                    self._flush_listo.set()
+                if self._cerrado.is_set() and self._cola.empty():
+                    self._flush_listo.set()
+                    return
+
+    def _drenar(self, maximo: int) -> list[dict]:
+        filas = []
+        while len(filas) < maximo:
+            try:
+                fila = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if fila is not None:
+                filas.append(fila)
+        return filas
+
+    def _guardar(self, lote: list[dict]):
+        query = sentencias(Asistencia).insert
+        inicio = time.perf_counter()
+
+        def transaccion():
+            with self.db.get_connection() as conn:
+                with self.metricas.medir_consulta(query, "asistencia") as medida:
+                    conn.executemany(query, lote)
+                    medida["filas"] = len(lote)
+
+        try:
+            # Un lote es una transacción: si la base está ocupada por otra estación se repite completo
+            self.reintentos.ejecutar(transaccion, self.metricas, "guardar_asistencias")
+            self.metricas.incrementar("asistencias_guardadas", len(lote))
+        except sqlite3.IntegrityError:
+            # Algún cliente_id inválido: se guardan las válidas de a una
+            self._guardar_de_a_una(lote)
+        except (sqlite3.Error, BaseOcupadaError) as e:
+            # Error técnico (disco, base bloqueada tras los reintentos): se registra y el lote se descarta para no trabar la cola
+            logger.error("No se pudo guardar un lote de %s asistencias: %s", len(lote), e)
+            self.metricas.incrementar("asistencias_descartadas", len(lote))
+        finally:
+            self.metricas.registrar_metodo("guardar_asistencias", time.perf_counter() - inicio)
+            self.metricas.incrementar("lotes_asistencias")
+
+    def _guardar_de_a_una(self, lote: list[dict]):
+        query = sentencias(Asistencia).insert
+
+        def transaccion() -> int:
+            guardadas = 0
+            with self.db.get_connection() as conn:
+                for fila in lote:
+                    try:
+                        conn.execute(query, fila)
+                        guardadas += 1
+                    except sqlite3.IntegrityError:
+                        logger.warning("Asistencia descartada (cliente inexistente): %s", fila)
+            return guardadas
+
+        try:
+            # Misma política que el lote: si la base está ocupada se repite la transacción completa
+            guardadas = self.reintentos.ejecutar(transaccion, self.metricas, "guardar_asistencias_de_a_una")
+        except (sqlite3.Error, BaseOcupadaError) as e:
+            logger.error("No se pudieron guardar de a una %s asistencias: %s", len(lote), e)
+            guardadas = 0
+        self.metricas.incrementar("asistencias_guardadas", guardadas)
+        self.metricas.incrementar("asistencias_descartadas", len(lote) - guardadas)
@@ -0,0 +1,166 @@
+"""
+Detección de cambios hechos por otras estaciones sobre el mismo archivo de base.
+
+La recepción y la laptop de los instructores abren la misma base: para que cada una vea lo que
+cambia la otra sin recargar todo, los triggers anotan en la tabla 'cambio' (tabla, id) cada alta,
+edición o baja de clientes, instructores y rutinas (ver esquema.TABLAS_OBSERVADAS).
+
+El vigilante mantiene una conexión propia abierta y cada 'intervalo_s' consulta PRAGMA data_version,
+que cambia solo cuando otra conexión confirmó una transacción: sin cambios, cada revisión es una
+lectura en memoria sin tocar el disco. Cuando cambia, lee las filas de 'cambio' posteriores a la
+última versión vista (rango sobre la PK) y entrega los ids agrupados por tabla.
+
+Si llegan más de 'maximo' cambios juntos, o la retención ya borró filas que no se leyeron
+(la estación estuvo dormida mucho tiempo), se avisa con completo=True para recargar todo. Lo mismo
+si la última fila vista ya no está o es otra (la base se restauró y las versiones volvieron atrás),
+o si llega la fila que anota GestorRespaldos.restaurar: aunque después de restaurar se hayan escrito
+otras filas con los mismos números, no se toman por cambios sueltos.
+
+Un solo vigilante (una conexión y un hilo) sirve a todas las sesiones del proceso: cada iniciar()
+suma un oyente y quitar() lo saca. Si un oyente falla (una sesión que se desconectó) los demás
+reciben el aviso igual.
+
+Uso:
+    vigilante = VigilanteCambios(db_manager)
+    vigilante.iniciar(al_cambiar=lambda cambios: ...)   # cambios.ids == {"cliente": frozenset({7, 9})}
+    ...
+    vigilante.quitar(al_cambiar)
+    vigilante.detener()
+"""
+
+import logging
+import sqlite3
+import threading
+from typing import Callable
+
+from config import Config
+from domain.interfaces import NotificadorCambios
+from domain.reportes import Cambios
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.esquema import CAMBIO_RESTAURACION
+from infrastructure.metrics import RegistroMetricas
+
+logger = logging.getLogger(__name__)
+
+
+class VigilanteCambios(NotificadorCambios):
+    def __init__(
+        self,
+        db_conn: DatabaseConnection,
+        intervalo_s: float = Config.CAMBIOS_INTERVALO_S,
+        maximo: int = Config.CAMBIOS_MAXIMO,
+        metricas: RegistroMetricas = None,
+    ):
+        self.db = db_conn
+        self.intervalo_s = intervalo_s
+        self.maximo = maximo
+        self.metricas = metricas or db_conn.metricas
+        # La conexión se usa desde el hilo del vigilante o desde quien llame a revisar(): nunca a la vez
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._data_version: int | None = None
+        self.version = 0
+        self._ancla: tuple[str, int] | None = None  # (tabla, registro_id) de la fila 'version' de cambio
+        self._detenido = threading.Event()
+        self._hilo: threading.Thread | None = None
+        self._oyentes: list[Callable[[Cambios], None]] = []
+        self._lock_oyentes = threading.Lock()  # Oyentes y arranque del hilo (varias sesiones pueden iniciar a la vez)
+
+    def _conexion(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Conexión de solo lectura que vive mientras vive el vigilante: data_version es por conexión
+            self._conn = sqlite3.connect(self.db.db_path, check_same_thread=False)
+            self._data_version = self._conn.execute("pragma data_version").fetchone()[0]
+            # Se arranca desde el estado actual: lo anterior ya está en pantalla
+            self._ir_al_ultimo(self._conn)
+        return self._conn
+
+    def _ir_al_ultimo(self, conn: sqlite3.Connection):
+        ultima = conn.execute("select version, tabla, registro_id from cambio order by version desc limit 1").fetchone()
+        self.version, self._ancla = (ultima[0], tuple(ultima[1:])) if ultima else (0, None)
+
+    def revisar(self) -> Cambios | None:
+        with self._lock:
+            conn = self._conexion()
+            data_version = conn.execute("pragma data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return None
+            self._data_version = data_version
+            self.metricas.incrementar("cambios_revisados")
+
+            if self.version:
+                # Búsqueda por PK: si la última fila vista desapareció o cambió, la base se restauró
+                ancla = conn.execute("select tabla, registro_id from cambio where version = ?", (self.version,)).fetchone()
+                if ancla != self._ancla:
+                    self._ir_al_ultimo(conn)
+                    self.metricas.incrementar("cambios_recarga_completa")
+                    return Cambios(version=self.version, ids={}, completo=True)
+
+            # Rango sobre la PK de cambio (version > última vista); uno más que el máximo para saber si se pasó
+            filas = conn.execute(
+                "select version, tabla, registro_id from cambio where version > ? order by version limit ?",
+                (self.version, self.maximo + 1),
+            ).fetchall()
+            if not filas:
+                return None  # Otra escritura (asistencias, pagos) que no toca las tablas observadas
+
+            primera = filas[0][0]
+            restaurada = any(tabla == CAMBIO_RESTAURACION for _, tabla, _ in filas)
+            if len(filas) > self.maximo or (self.version and primera > self.version + 1) or restaurada:
+                # Más cambios de los que conviene aplicar de a uno, la retención borró algunos sin leer
+                # o se restauró un respaldo
+                self._ir_al_ultimo(conn)
+                self.metricas.incrementar("cambios_recarga_completa")
+                return Cambios(version=self.version, ids={}, completo=True)
+
+            por_tabla: dict[str, set[int]] = {}
+            for version, tabla, registro_id in filas:
+                por_tabla.setdefault(tabla, set()).add(registro_id)
+            self.version, self._ancla = filas[-1][0], tuple(filas[-1][1:])
+            self.metricas.incrementar("cambios_detectados", len(filas))
+            return Cambios(version=self.version, ids={t: frozenset(ids) for t, ids in por_tabla.items()})
+
+    def iniciar(self, al_cambiar: Callable[[Cambios], None]):
+        with self._lock_oyentes:
+            if al_cambiar not in self._oyentes:
+                self._oyentes.append(al_cambiar)
+            if self._hilo is not None:
+                return
+            self._conexion()  # Fija el punto de partida antes de que la app siga escribiendo
+            self._detenido.clear()
+            self._hilo = threading.Thread(target=self._bucle, name="vigilante-cambios", daemon=True)
+            self._hilo.start()
+
+    def quitar(self, al_cambiar: Callable[[Cambios], None]):
+        with self._lock_oyentes:
+            if al_cambiar in self._oyentes:
+                self._oyentes.remove(al_cambiar)
+
+    def _bucle(self):
+        while not self._detenido.wait(self.intervalo_s):
+            try:
+                cambios = self.revisar()
+            except Exception as e:  # Una falla puntual (base ocupada) no detiene la sincronización
+                logger.error("Falló la revisión de cambios: %s", e)
+                continue
+            if cambios is None:
+                continue
+            with self._lock_oyentes:
+                oyentes = list(self._oyentes)  # En orden de llegada: la caché de catálogos se suscribe primero
+            for oyente in oyentes:
+                try:
+                    oyente(cambios)
+                except Exception as e:  # Un error en una sesión (GUI) no les quita el aviso a las demás
+                    logger.error("Falló el aviso de cambios: %s", e)
+
+    def detener(self, timeout: float | None = 5.0):
+        self._detenido.set()
+        with self._lock_oyentes:
+            hilo, self._hilo = self._hilo, None
+            self._oyentes.clear()
+        if hilo is not None:
+            hilo.join(timeout)
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
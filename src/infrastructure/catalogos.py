@@ -0,0 +1,58 @@
+"""
+Caché en memoria de los catálogos (instructores, rutinas, cupos) que comparten todas las sesiones.
+
+En modo web cada pestaña es una sesión con su propio controlador, pero todas usan el mismo servicio.
+Abrir la tabla de clientes lee instructores, rutinas y cupos para armar las filas y el formulario:
+con N recepciones, N lecturas iguales. La caché guarda el último resultado por clave y:
+
+    - Si varias sesiones piden una clave que no está, la carga una sola (las demás esperan ese resultado).
+    - El servicio la invalida cuando escribe (GymService._catalogos_cambiaron) y cuando el vigilante
+      avisa cambios de otras estaciones o procesos.
+    - Una carga que empezó antes de invalidar la clave no se guarda: podría traer los datos viejos.
+
+Los valores se comparten entre hilos: quien los recibe no debe modificarlos (el servicio devuelve copias de las listas).
+
+Métricas: 'catalogos_aciertos' (lecturas servidas de memoria) y 'catalogos_cargas.<clave>' (lecturas a la base).
+"""
+
+import threading
+from typing import Any, Callable
+
+from domain.interfaces import Catalogos
+from infrastructure.metrics import RegistroMetricas, metricas as metricas_globales
+
+
+class CacheCatalogos(Catalogos):
+    def __init__(self, metricas: RegistroMetricas = None):
+        self.metricas = metricas or metricas_globales
+        self._lock = threading.Lock()
+        self._valores: dict[str, Any] = {}
+        self._generaciones: dict[str, int] = {}  # Sube con cada invalidación de la clave
+        self._cargas: dict[str, threading.Lock] = {}  # Una carga a la vez por clave
+
+    def obtener(self, clave: str, cargar: Callable[[], Any]) -> Any:
+        with self._lock:
+            if clave in self._valores:
+                self.metricas.incrementar("catalogos_aciertos")
+                return self._valores[clave]
+            carga = self._cargas.setdefault(clave, threading.Lock())
+
+        with carga:
+            with self._lock:
+                # Otra sesión pudo cargarla mientras se esperaba el lock
+                if clave in self._valores:
+                    self.metricas.incrementar("catalogos_aciertos")
+                    return self._valores[clave]
+                generacion = self._generaciones.get(clave, 0)
+            valor = cargar()
+            self.metricas.incrementar(f"catalogos_cargas.{clave}")
+            with self._lock:
+                if self._generaciones.get(clave, 0) == generacion:
+                    self._valores[clave] = valor
+            return valor
+
+    def invalidar(self, *claves: str):
+        with self._lock:
+            for clave in claves or tuple(set(self._valores) | set(self._cargas)):
+                self._valores.pop(clave, None)
+                self._generaciones[clave] = self._generaciones.get(clave, 0) + 1
@@ -1,67 +1,40 @@
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
+from config import Config
+from infrastructure.esquema import migrar, reconstruir_resumenes
+from infrastructure.metrics import RegistroMetricas, metricas as metricas_globales
 
 class DatabaseConnection:
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, metricas: RegistroMetricas = None):
         self.db_path = db_path
+        self.metricas = metricas or metricas_globales
+        # Momento (time.monotonic) del último uso de la base por la app: el mantenimiento
+        # programado (infrastructure.mantenimiento) solo trabaja cuando pasó un rato sin actividad
+        self.ultima_actividad = time.monotonic()
+        # Mantenimiento programado asociado a esta base, si lo hay (lo asigna MantenimientoProgramado)
+        self.mantenimiento = None
+        # Una conexión reutilizable por hilo y un único escritor a la vez dentro del proceso
+        self._local = threading.local()
+        self._escritura = threading.RLock()
 
     #Inicialización de la base de datos en la carpeta data
     def init_db(self):
         ''' Inicialización de la base de datos en la carpeta data '''
+        conn = None
         try:
             conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            # Creamos la tabla instructores.
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS instructor (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    apellido TEXT NOT NULL
-                )
-            ''')
-
-            # Creamos la tabla rutinas.
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS rutina (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    pdf_link TEXT NOT NULL
-                )
-            ''')
-            
-            # --- 1. DEFINICIÓN INICIAL (Para instalaciones nuevas) ---
-            # Creamos la tabla clientes. 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cliente (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nombre TEXT NOT NULL,
-                    apellido TEXT NOT NULL,
-                    fecha_inicio_rutina TEXT NOT NULL,
-                    fecha_fin_rutina TEXT NOT NULL,
-                    instructor_id INTEGER NOT NULL,
-                    rutina_id INTEGER NOT NULL,
-                    ciclo_rutina INTEGER NOT NULL,
-
-                    -- Anclajes de las foreign keys:
-                    FOREIGN KEY (instructor_id) REFERENCES instructor (id),
-                    FOREIGN KEY (rutina_id) REFERENCES rutina (id)
-                )
-            ''')
-
-            # --- 2. MIGRACIÓN (Para instalaciones existentes) ---
-            # Lista de Migraciones (De momento vacía)
-            # Formato: [(tabla1, columna1, tipo1), (tabla2, columna2, tipo2), ...]
-            # Ejemplo: [("instructores", "telefono", "TEXT NOT NULL"), ...]
-            campos_nuevos = [] 
-
-            for tabla, columna, tipo in campos_nuevos:
-                try:
-                    cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
-                except sqlite3.OperationalError:
-                    pass # La columna ya existe, no hay nada que hacer
-            
+
+            # --- 1. DEFINICIÓN INICIAL Y 2. MIGRACIÓN ---
+            # Las tablas se generan desde el registro de metadatos de las entidades (domain.metadata):
+            # en instalaciones nuevas se crean completas (padres antes que hijas) y en las existentes
+            # se agregan con ALTER TABLE las columnas nuevas que aparezcan en las dataclasses.
+            migrar(conn)
+
             conn.commit()
+            # WAL: los lectores no bloquean al escritor ni al revés. Fuera de la transacción; queda guardado en el archivo.
+            conn.execute("pragma journal_mode = wal")
 
         except sqlite3.Error as e:
             print(f"Error SQLite3 al inicializar la base de datos: {e}")
@@ -69,26 +42,151 @@ class DatabaseConnection:
             print(f"Error inesperado al inicializar la base de datos: {e}")
         
         finally:
-            conn.close()
+            if conn:
+                conn.close()
+
 
+    def _conectar(self) -> sqlite3.Connection:
+        # Aseguramos que haga la conversión de tipos de datos con "detect_types=sqlite3.PARSE_DECLTYPES"
+        conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES, timeout=Config.DB_BUSY_TIMEOUT_S)
+        conn.row_factory = sqlite3.Row  # Permite acceder a columnas por nombre
+        # Activamos FK para esta sesión de trabajo
+        conn.execute("PRAGMA foreign_keys = ON")
+        self.metricas.incrementar("conexiones_abiertas")
+        return conn
 
     @contextmanager
-    def get_connection(self):
-        conn = None
+    def get_connection(self, actividad: bool = True, solo_lectura: bool = False):
+        """
+        Presta una conexión dentro de una transacción: commit al salir, rollback si hay una excepción.
+
+        Hilos: cada hilo reutiliza su propia conexión (una sqlite3.Connection nunca se comparte entre
+        hilos). Si la del hilo ya está prestada (un bloque anidado o un generador a medio recorrer)
+        se abre una aparte, así cada bloque sigue siendo su propia transacción.
+
+        Escrituras: se serializan dentro del proceso con un lock y empiezan con BEGIN IMMEDIATE, así
+        nunca chocan dos escritores a mitad de transacción. Las lecturas (solo_lectura=True) no toman
+        el lock y corren en paralelo con la escritura gracias a WAL.
+
+        'actividad=False' para las tareas de mantenimiento: no cuentan como uso de la base.
+        """
+        inicio = time.perf_counter()
+        if actividad:
+            self.ultima_actividad = time.monotonic()
+
+        local = self._local
+        temporal = getattr(local, "en_uso", False)
+        if temporal:
+            conn = self._conectar()
+        else:
+            conn = getattr(local, "conn", None)
+            if conn is None:
+                conn = local.conn = self._conectar()
+            else:
+                self.metricas.incrementar("conexiones_reutilizadas")
+            local.en_uso = True
+
+        escritor = not solo_lectura
+        if escritor:
+            self._escritura.acquire()
         try:
-            # Aseguramos que haga la conversión de tipos de datos con "detect_types=sqlite3.PARSE_DECLTYPES"
-            conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
-            conn.row_factory = sqlite3.Row  # Permite acceder a columnas por nombre
-            
-            # Activamos FK para esta sesión de trabajo
-            conn.execute("PRAGMA foreign_keys = ON")
+            if escritor:
+                conn.execute("begin immediate")
+            # Tiempo de espera hasta tener la conexión lista para usar (incluye la espera del lock de escritura)
+            self.metricas.registrar_espera_conexion(time.perf_counter() - inicio)
 
             yield conn # Aquí "presta" la conexión al repositorio
             conn.commit() # Si no hay error, guardamos los cambios
-        except Exception as e:
-            if conn:
-                conn.rollback() # Si hay error, deshacemos los cambios
+        except Exception:
+            conn.rollback() # Si hay error, deshacemos los cambios
             raise # Re-lanzamos para que las capas superiores manejen el error
         finally:
-            if conn:
-                conn.close() # Se asegura de cerrar siempre
\ No newline at end of file
+            if escritor:
+                self._escritura.release()
+            if temporal:
+                conn.close()
+            else:
+                if conn.in_transaction:
+                    conn.rollback()  # Un generador abandonado a mitad de camino no deja la transacción abierta
+                local.en_uso = False
+
+    def bloqueo_escritura(self) -> threading.RLock:
+        """El lock de escritura del proceso, para quien escribe en el archivo con una conexión propia (VACUUM, restauración)."""
+        return self._escritura
+
+    def cerrar(self):
+        """Cierra la conexión reutilizable del hilo que llama (si tiene una)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and not getattr(self._local, "en_uso", False):
+            conn.close()
+            self._local.conn = None
+
+    # --- Mantenimiento (lo usan la línea de comandos y las tareas programadas) ---
+    def verificar_integridad(self) -> list[str]:
+        """PRAGMA integrity_check. Devuelve los problemas encontrados (lista vacía si la base está sana)."""
+        with self.get_connection(solo_lectura=True) as conn:
+            filas = [fila[0] for fila in conn.execute("pragma integrity_check")]
+            filas += [f"FK rota en {fila[0]} (rowid {fila[1]})" for fila in conn.execute("pragma foreign_key_check")]
+        return [] if filas == ["ok"] else [f for f in filas if f != "ok"]
+
+    def optimizar(self):
+        """Actualiza las estadísticas del planificador solo para las tablas que lo necesitan."""
+        with self.get_connection(actividad=False) as conn:
+            conn.execute("pragma optimize")
+
+    def analizar(self):
+        """ANALYZE completo: recalcula las estadísticas de todas las tablas e índices (después de cargas masivas)."""
+        with self.get_connection(actividad=False) as conn:
+            conn.execute("analyze")
+
+    def reconstruir_resumenes(self):
+        """Recalcula contadores, resúmenes y saldos desde las tablas base (en una transacción)."""
+        with self.get_connection() as conn:
+            reconstruir_resumenes(conn)
+
+    def compactar(self):
+        """VACUUM: reescribe el archivo y devuelve al disco las páginas libres. Bloquea la base mientras dura."""
+        # VACUUM no puede ir dentro de una transacción: conexión aparte en modo autocommit, sin otros escritores del proceso
+        with self.bloqueo_escritura():
+            self.cerrar()
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=Config.DB_BUSY_TIMEOUT_S)
+            try:
+                if conn.execute("pragma auto_vacuum").fetchone()[0] != 2:
+                    # Las bases creadas antes del vacuum incremental pasan a auto_vacuum=INCREMENTAL: el modo solo
+                    # cambia al reescribir el archivo con un VACUUM fuera de WAL (sin otras conexiones abiertas)
+                    conn.execute("pragma journal_mode = delete")
+                    conn.execute("pragma auto_vacuum = incremental")
+                conn.execute("vacuum")
+                conn.execute("pragma journal_mode = wal")
+            finally:
+                conn.close()
+
+    def vacuum_incremental(self, paginas: int | None = None) -> int:
+        """Devuelve al disco hasta 'paginas' páginas libres (todas si es None). Devuelve las liberadas."""
+        with self.get_connection(actividad=False) as conn:
+            antes = conn.execute("pragma freelist_count").fetchone()[0]
+            # Cada página liberada es un paso del pragma y execute() da uno solo: executescript lo corre completo
+            conn.executescript(f"pragma incremental_vacuum({int(paginas or 0)});")
+            despues = conn.execute("pragma freelist_count").fetchone()[0]
+        return antes - despues
+
+    def modo_auto_vacuum(self) -> str:
+        with self.get_connection(actividad=False, solo_lectura=True) as conn:
+            modo = conn.execute("pragma auto_vacuum").fetchone()[0]
+        return {0: "none", 1: "full", 2: "incremental"}[modo]
+
+    def paginas_libres(self) -> int:
+        with self.get_connection(actividad=False, solo_lectura=True) as conn:
+            return conn.execute("pragma freelist_count").fetchone()[0]
+
+    def tamano_bytes(self) -> int:
+        with self.get_connection(actividad=False, solo_lectura=True) as conn:
+            paginas = conn.execute("pragma page_count").fetchone()[0]
+            tamano_pagina = conn.execute("pragma page_size").fetchone()[0]
+        return paginas * tamano_pagina
+
+    def carga_masiva_terminada(self, filas: int):
+        """Aviso de las cargas masivas (importaciones): el mantenimiento programado decide si corre ANALYZE."""
+        if self.mantenimiento is not None:
+            self.mantenimiento.despues_de_carga(filas)
+
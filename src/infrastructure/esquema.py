@@ -0,0 +1,563 @@
+"""
+Esquema SQLite generado a partir del registro de metadatos (domain.metadata).
+
+- sql_crear_tabla(): CREATE TABLE de una entidad (tipos, NOT NULL, defaults y FK).
+- migrar(): crea las tablas que falten (padres antes que hijas), agrega las columnas
+  nuevas con ALTER TABLE (comparando contra PRAGMA table_info), agrega las columnas
+  auxiliares (contadores), crea las tablas auxiliares (resúmenes), los índices secundarios y
+  triggers (reemplaza los que cambiaron de definición), y aplica una sola vez las migraciones
+  de datos (PRAGMA user_version).
+- reconstruir_resumenes(): recalcula desde cero las tablas de resumen (rollups).
+- sentencias(): SELECT/INSERT/UPDATE/DELETE precalculados por entidad (se arman una sola vez).
+- sentencia_update(): UPDATE de solo algunas columnas y/o con chequeo de versión (una vez por combinación).
+"""
+
+import logging
+import re
+import sqlite3
+from dataclasses import MISSING, dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Iterable
+
+from domain.metadata import DEFAULTS_POR_TIPO, REGISTRO, REGISTRO_POR_TABLA, MetaCampo, MetaEntidad, meta, orden_creacion
+
+logger = logging.getLogger(__name__)
+
+
+def _literal_sql(valor) -> str:
+    if isinstance(valor, bool):
+        return str(int(valor))
+    if isinstance(valor, (int, float)):
+        return str(valor)
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def _definicion_columna(campo: MetaCampo, para_alter: bool = False) -> str:
+    if campo.es_pk:
+        return f"{campo.nombre} integer primary key autoincrement"
+
+    partes = [campo.nombre, campo.tipo_sql.lower()]
+    default = campo.default if campo.default is not MISSING else None
+    if campo.not_null:
+        partes.append("not null")
+        # ALTER TABLE ... ADD COLUMN NOT NULL exige un default para las filas existentes
+        if default is None and para_alter:
+            default = DEFAULTS_POR_TIPO.get(campo.tipo, "")
+    if default is not None:
+        partes.append(f"default {_literal_sql(default)}")
+    if para_alter and campo.fk:
+        partes.append(f"references {campo.fk} (id)")
+    return " ".join(partes)
+
+
+def sql_crear_tabla(m: MetaEntidad) -> str:
+    lineas = [_definicion_columna(c) for c in m.campos]
+    # Anclajes de las foreign keys (inferidas del sufijo _id)
+    lineas += [f"foreign key ({c.nombre}) references {c.fk} (id)" for c in m.fks]
+    return f"create table if not exists {m.tabla} (\n    " + ",\n    ".join(lineas) + "\n)"
+
+
+# Tablas que se editan desde los formularios y llevan columna 'version' (control de concurrencia optimista).
+# asistencia y pago son de solo inserción: nunca hay dos ediciones que se pisen.
+TABLAS_VERSIONADAS = ("cliente", "instructor", "rutina")
+
+# Tablas con baja lógica: un cliente con historial (asistencias, pagos) no se puede borrar sin perderlo,
+# así que se archiva (activo = 0). Los archivados no aparecen en las lecturas de la entidad, no se
+# pueden editar, no ocupan cupo ni cuentan en los resúmenes; su historial queda intacto.
+TABLAS_ARCHIVABLES = ("cliente",)
+
+# Columnas auxiliares que no forman parte de las entidades (el repositorio no las lee en
+# select_todos/select_por_id). Las mantienen los triggers. {(tabla, columna): definición}
+COLUMNAS_AUXILIARES: dict[tuple[str, str], str] = {
+    # Clientes asignados a cada instructor (para validar el cupo sin hacer count(*) sobre cliente)
+    ("instructor", "clientes_asignados"): "integer not null default 0",
+    # Versión de la fila: la suma un trigger en cada UPDATE de las columnas de la entidad (cualquier escritor:
+    # formularios, rotación, reasignación, otras estaciones). Quien guarda una edición exige la versión que leyó.
+    **{(tabla, "version"): "integer not null default 0" for tabla in TABLAS_VERSIONADAS},
+    **{(tabla, "activo"): "integer not null default 1" for tabla in TABLAS_ARCHIVABLES},
+    # Puntero al primer cargo impago (bases creadas antes de llevarlo; la migración de datos lo completa)
+    ("saldo_cliente", "cubierto"): "integer not null default 0",
+    ("saldo_cliente", "deuda_id"): "integer",
+}
+
+# Tablas auxiliares que no son entidades: resúmenes (rollups) mantenidos por triggers.
+# Se consultan por su PK, así los reportes cuestan según la cantidad de buckets y no de filas.
+TABLAS_AUXILIARES: dict[str, str] = {
+    # Check-ins por (día, hora, instructor, rutina) del cliente al momento de la asistencia
+    "resumen_asistencia": (
+        "create table if not exists resumen_asistencia (\n"
+        "    dia text not null,\n"
+        "    hora integer not null,\n"
+        "    instructor_id integer not null,\n"
+        "    rutina_id integer not null,\n"
+        "    asistencias integer not null default 0,\n"
+        "    primary key (dia, hora, instructor_id, rutina_id)\n"
+        ") without rowid"
+    ),
+    # Estado de cuenta de cada cliente (acumulado del libro de pagos), en centavos enteros: las sumas y
+    # comparaciones son exactas (0.1 + 0.2 no deja una deuda fantasma). Imputando los pagos a los cargos
+    # más viejos primero, deuda_id es el primer cargo impago y vence_deuda su vencimiento (NULL si está
+    # al día): moroso = vence_deuda < hoy. cubierto: suma de los cargos anteriores a deuda_id (todos si
+    # está al día), para avanzar desde ahí sin volver a sumar el historial.
+    "saldo_cliente": (
+        "create table if not exists saldo_cliente (\n"
+        "    cliente_id integer primary key,\n"
+        "    cargos integer not null default 0,\n"
+        "    pagos integer not null default 0,\n"
+        "    cubierto integer not null default 0,\n"
+        "    deuda_id integer,\n"
+        "    vence_deuda text\n"
+        ")"
+    ),
+    # Registro compacto de cambios para sincronizar varias estaciones (infrastructure.cambios):
+    # una fila (tabla, id) por alta, edición o baja. Se leen por rango de la PK (version > última leída)
+    # y un trigger descarta las más viejas que CAMBIOS_RETENCION, así la tabla no crece.
+    "cambio": (
+        "create table if not exists cambio (\n"
+        "    version integer primary key,\n"
+        "    tabla text not null,\n"
+        "    registro_id integer not null\n"
+        ")"
+    ),
+    # Clientes actuales por (instructor, rutina)
+    "resumen_cliente": (
+        "create table if not exists resumen_cliente (\n"
+        "    instructor_id integer not null,\n"
+        "    rutina_id integer not null,\n"
+        "    clientes integer not null default 0,\n"
+        "    primary key (instructor_id, rutina_id)\n"
+        ") without rowid"
+    ),
+}
+
+# Índices secundarios. Se crean (si no existen) después de las tablas.
+INDICES: dict[str, str] = {
+    # Vencimientos: búsqueda por rango de fecha de fin (clientes_por_vencer).
+    # El índice también entrega las filas ya ordenadas, así el "order by ... limit" no ordena en memoria.
+    "idx_cliente_fecha_fin": "create index if not exists idx_cliente_fecha_fin on cliente (fecha_fin_rutina)",
+    # Asistencias de un cliente (historial y última visita): rango sobre (cliente_id, fecha_hora) sin ordenar en memoria.
+    "idx_asistencia_cliente_fecha": "create index if not exists idx_asistencia_cliente_fecha on asistencia (cliente_id, fecha_hora)",
+    # Instructor con menos carga (proponer_instructor): recorre el índice en orden y corta en el primero con cupo.
+    "idx_instructor_carga": "create index if not exists idx_instructor_carga on instructor (clientes_asignados)",
+    # Clientes de un instructor / rutina: conteo de referencias, reasignación masiva y el chequeo
+    # de FK al borrar el padre (sin estos índices SQLite recorre toda la tabla cliente)
+    "idx_cliente_instructor": "create index if not exists idx_cliente_instructor on cliente (instructor_id)",
+    "idx_cliente_rutina": "create index if not exists idx_cliente_rutina on cliente (rutina_id)",
+    # Movimientos de un cliente por vencimiento (recalcular vence_deuda sin recorrer todo el libro)
+    "idx_pago_cliente_vencimiento": "create index if not exists idx_pago_cliente_vencimiento on pago (cliente_id, tipo, vencimiento)",
+    # Morosos: rango vence_deuda < hoy, ya ordenado por antigüedad de la deuda (los NULL quedan afuera)
+    "idx_saldo_vence_deuda": "create index if not exists idx_saldo_vence_deuda on saldo_cliente (vence_deuda)",
+}
+
+# Tablas cuyas altas, ediciones y bajas se anotan en 'cambio' (las que muestran las tablas de la GUI)
+TABLAS_OBSERVADAS = ("cliente", "instructor", "rutina")
+# Filas de 'cambio' que se conservan. Una estación que se atrasa más que esto recarga todo.
+CAMBIOS_RETENCION = 10_000
+# Valor de cambio.tabla con el que se anota una restauración: las estaciones recargan todo
+CAMBIO_RESTAURACION = "*"
+
+
+def _triggers_cambios() -> dict[str, str]:
+    """Triggers que anotan en 'cambio' cada alta, edición o baja de las tablas observadas."""
+    triggers = {
+        # Retención: borra a lo sumo una fila por inserción, por rango de la PK
+        "cambio_retencion": (
+            "create trigger if not exists cambio_retencion after insert on cambio "
+            f"begin delete from cambio where version <= new.version - {CAMBIOS_RETENCION}; end"
+        ),
+    }
+    for tabla in TABLAS_OBSERVADAS:
+        # Solo las columnas de la entidad: los contadores auxiliares (clientes_asignados) no son un cambio visible.
+        # Archivar sí lo es: para las demás estaciones el cliente desaparece como si se hubiera borrado.
+        nombres = [c.nombre for c in REGISTRO_POR_TABLA[tabla].campos if not c.es_pk]
+        columnas = ", ".join(nombres + (["activo"] if tabla in TABLAS_ARCHIVABLES else []))
+        for evento, fila in (("insert", "new"), ("update of " + columnas, "new"), ("delete", "old")):
+            nombre = f"cambio_{tabla}_{evento.split()[0]}"
+            triggers[nombre] = (
+                f"create trigger if not exists {nombre} after {evento} on {tabla} "
+                f"begin insert into cambio (tabla, registro_id) values ('{tabla}', {fila}.id); end"
+            )
+    return triggers
+
+
+def _triggers_versiones() -> dict[str, str]:
+    """Triggers que suman 1 a la versión de la fila en cada UPDATE de sus columnas (búsqueda por PK)."""
+    triggers = {}
+    for tabla in TABLAS_VERSIONADAS:
+        # Sin 'version' en la lista: el UPDATE del propio trigger no lo vuelve a disparar
+        columnas = ", ".join(c.nombre for c in REGISTRO_POR_TABLA[tabla].campos if not c.es_pk)
+        triggers[f"version_{tabla}_update"] = (
+            f"create trigger if not exists version_{tabla}_update after update of {columnas} on {tabla} "
+            f"begin update {tabla} set version = old.version + 1 where id = new.id; end"
+        )
+    return triggers
+
+
+def _centavos(monto: str) -> str:
+    """Expresión SQL: el monto (REAL en el libro de pagos) en centavos enteros."""
+    return f"cast(round({monto} * 100) as integer)"
+
+
+def _sql_deuda(filtro: str, desde_puntero: bool) -> str:
+    """
+    UPDATE de saldo_cliente que ubica el primer cargo impago (deuda_id, vence_deuda) y lo cubierto antes de él.
+    Suma los cargos del cliente en orden (vencimiento, id) hasta pasar lo pagado. Con desde_puntero la suma
+    arranca en el cargo impago actual y en lo ya cubierto (los pagos solo lo mueven hacia adelante); sin él,
+    desde el primer cargo. Si todo está cubierto: deuda_id y vence_deuda NULL y cubierto = cargos.
+    """
+    base = "saldo_cliente.cubierto" if desde_puntero else "0"
+    rango = " and (vencimiento, id) >= (saldo_cliente.vence_deuda, saldo_cliente.deuda_id)" if desde_puntero else ""
+    return (
+        "update saldo_cliente set (deuda_id, vence_deuda, cubierto) = ("
+        "select c.id, c.vencimiento, coalesce(c.cubierto, saldo_cliente.cargos) from (select 1) left join ("
+        f"select id, vencimiento, {base} + acumulado - centavos as cubierto from ("
+        f"select id, vencimiento, {_centavos('monto')} as centavos, "
+        f"sum({_centavos('monto')}) over (order by vencimiento, id) as acumulado "
+        f"from pago where cliente_id = saldo_cliente.cliente_id and tipo = 'cargo'{rango}"
+        f") where {base} + acumulado > saldo_cliente.pagos order by vencimiento, id limit 1"
+        ") c"
+        f") where {filtro}"
+    )
+
+
+# Triggers de versiones anteriores que ya no existen (migrar() los borra)
+TRIGGERS_OBSOLETOS = ("saldo_cliente_insert",)
+
+# Mensaje con el que abortan los triggers de cupo (el repositorio lo reconoce en el IntegrityError)
+CUPO_EXCEDIDO = "El instructor ya tiene el cupo completo."
+
+# Triggers. Se crean (si no existen) después de los índices.
+TRIGGERS: dict[str, str] = {
+    # asistencia es un historial de solo inserción: no se edita ni se borra.
+    "asistencia_sin_update": (
+        "create trigger if not exists asistencia_sin_update before update on asistencia "
+        "begin select raise(abort, 'asistencia es de solo inserción'); end"
+    ),
+    "asistencia_sin_delete": (
+        "create trigger if not exists asistencia_sin_delete before delete on asistencia "
+        "begin select raise(abort, 'asistencia es de solo inserción'); end"
+    ),
+    # pago también es de solo inserción
+    "pago_sin_update": (
+        "create trigger if not exists pago_sin_update before update on pago "
+        "begin select raise(abort, 'pago es de solo inserción'); end"
+    ),
+    "pago_sin_delete": (
+        "create trigger if not exists pago_sin_delete before delete on pago "
+        "begin select raise(abort, 'pago es de solo inserción'); end"
+    ),
+    # --- Resúmenes: se actualizan en la misma transacción que la fila que los origina ---
+    # Saldo del cliente (búsquedas por PK de saldo_cliente). Un pago avanza el puntero al primer cargo
+    # impago recorriendo solo los cargos desde ese puntero (rango de idx_pago_cliente_vencimiento).
+    "saldo_pago_insert": (
+        "create trigger if not exists saldo_pago_insert after insert on pago when new.tipo = 'pago' "
+        "begin "
+        "insert into saldo_cliente (cliente_id) values (new.cliente_id) on conflict (cliente_id) do nothing; "
+        f"update saldo_cliente set pagos = pagos + {_centavos('new.monto')} where cliente_id = new.cliente_id; "
+        f"{_sql_deuda('cliente_id = new.cliente_id and deuda_id is not null', desde_puntero=True)}; "
+        "end"
+    ),
+    # Un cargo nuevo casi siempre vence después de todo lo anterior: si el cliente estaba al día y no le
+    # alcanza lo pagado, el cargo nuevo es el primero impago; si ya debía, el puntero no se mueve.
+    # Solo un cargo con vencimiento anterior a lo ya cubierto obliga a recalcular desde el primer cargo.
+    "saldo_cargo_insert": (
+        "create trigger if not exists saldo_cargo_insert after insert on pago when new.tipo = 'cargo' "
+        "begin "
+        "insert into saldo_cliente (cliente_id) values (new.cliente_id) on conflict (cliente_id) do nothing; "
+        f"update saldo_cliente set cargos = cargos + {_centavos('new.monto')} where cliente_id = new.cliente_id; "
+        # Al día y lo pagado cubre también este cargo
+        "update saldo_cliente set cubierto = cargos "
+        "where cliente_id = new.cliente_id and deuda_id is null and pagos >= cargos; "
+        # Al día, no alcanza y el cargo es el último por vencimiento: pasa a ser el primero impago
+        "update saldo_cliente set deuda_id = new.id, vence_deuda = new.vencimiento "
+        "where cliente_id = new.cliente_id and deuda_id is null and pagos < cargos and not exists ("
+        "select 1 from pago p where p.cliente_id = new.cliente_id and p.tipo = 'cargo' "
+        "and (p.vencimiento, p.id) > (new.vencimiento, new.id)); "
+        # Con deuda y el cargo vence antes del primero impago: queda entre los cubiertos
+        f"update saldo_cliente set cubierto = cubierto + {_centavos('new.monto')} "
+        "where cliente_id = new.cliente_id and deuda_id is not null "
+        "and (new.vencimiento, new.id) < (vence_deuda, deuda_id); "
+        # Cargo con vencimiento atrasado que ya no entra en lo pagado: se recalcula desde el principio
+        f"{_sql_deuda('cliente_id = new.cliente_id and ((deuda_id is null and pagos < cargos) or cubierto > pagos)', desde_puntero=False)}; "
+        "end"
+    ),
+    # Cada check-in suma 1 al bucket (día, hora, instructor, rutina). Busca el cliente por PK.
+    "resumen_asistencia_insert": (
+        "create trigger if not exists resumen_asistencia_insert after insert on asistencia "
+        "begin "
+        "insert into resumen_asistencia (dia, hora, instructor_id, rutina_id, asistencias) "
+        "select substr(new.fecha_hora, 1, 10), cast(substr(new.fecha_hora, 12, 2) as integer), c.instructor_id, c.rutina_id, 1 "
+        "from cliente c where c.id = new.cliente_id "
+        "on conflict (dia, hora, instructor_id, rutina_id) do update set asistencias = asistencias + 1; "
+        "end"
+    ),
+    "resumen_cliente_insert": (
+        "create trigger if not exists resumen_cliente_insert after insert on cliente "
+        "begin "
+        "insert into resumen_cliente (instructor_id, rutina_id, clientes) values (new.instructor_id, new.rutina_id, 1) "
+        "on conflict (instructor_id, rutina_id) do update set clientes = clientes + 1; "
+        "end"
+    ),
+    # Los clientes archivados ya se descontaron al archivarlos
+    "resumen_cliente_delete": (
+        "create trigger if not exists resumen_cliente_delete after delete on cliente when old.activo = 1 "
+        "begin "
+        "update resumen_cliente set clientes = clientes - 1 "
+        "where instructor_id = old.instructor_id and rutina_id = old.rutina_id; "
+        "end"
+    ),
+    # Cupo del instructor: se valida dentro de la transacción que escribe, leyendo el contador por PK.
+    # Dos estaciones (o sesiones) que agregan a la vez el último lugar no pueden pasarse del cupo:
+    # la segunda ve el contador ya incrementado por la primera. El repositorio lo traduce a CupoExcedidoError.
+    "cupo_instructor_insert": (
+        "create trigger if not exists cupo_instructor_insert before insert on cliente "
+        "when (select clientes_asignados >= cupo from instructor where id = new.instructor_id) "
+        f"begin select raise(abort, '{CUPO_EXCEDIDO}'); end"
+    ),
+    "cupo_instructor_update": (
+        "create trigger if not exists cupo_instructor_update before update of instructor_id on cliente "
+        "when old.instructor_id is not new.instructor_id and new.activo = 1 "
+        "and (select clientes_asignados >= cupo from instructor where id = new.instructor_id) "
+        f"begin select raise(abort, '{CUPO_EXCEDIDO}'); end"
+    ),
+    # Contador de clientes por instructor (búsquedas por PK de instructor)
+    "carga_instructor_insert": (
+        "create trigger if not exists carga_instructor_insert after insert on cliente "
+        "begin update instructor set clientes_asignados = clientes_asignados + 1 where id = new.instructor_id; end"
+    ),
+    "carga_instructor_delete": (
+        "create trigger if not exists carga_instructor_delete after delete on cliente when old.activo = 1 "
+        "begin update instructor set clientes_asignados = clientes_asignados - 1 where id = old.instructor_id; end"
+    ),
+    "carga_instructor_update": (
+        "create trigger if not exists carga_instructor_update after update of instructor_id on cliente "
+        "when old.instructor_id is not new.instructor_id and new.activo = 1 "
+        "begin "
+        "update instructor set clientes_asignados = clientes_asignados - 1 where id = old.instructor_id; "
+        "update instructor set clientes_asignados = clientes_asignados + 1 where id = new.instructor_id; "
+        "end"
+    ),
+    # Solo si cambió el instructor o la rutina (editar nombre o fechas no toca el resumen)
+    "resumen_cliente_update": (
+        "create trigger if not exists resumen_cliente_update after update of instructor_id, rutina_id on cliente "
+        "when (old.instructor_id is not new.instructor_id or old.rutina_id is not new.rutina_id) and new.activo = 1 "
+        "begin "
+        "update resumen_cliente set clientes = clientes - 1 "
+        "where instructor_id = old.instructor_id and rutina_id = old.rutina_id; "
+        "insert into resumen_cliente (instructor_id, rutina_id, clientes) values (new.instructor_id, new.rutina_id, 1) "
+        "on conflict (instructor_id, rutina_id) do update set clientes = clientes + 1; "
+        "end"
+    ),
+    # Archivar un cliente libera su lugar en el cupo y lo saca de los resúmenes (PK de instructor y de resumen_cliente)
+    "archivo_cliente": (
+        "create trigger if not exists archivo_cliente after update of activo on cliente "
+        "when old.activo = 1 and new.activo = 0 "
+        "begin "
+        "update instructor set clientes_asignados = clientes_asignados - 1 where id = old.instructor_id; "
+        "update resumen_cliente set clientes = clientes - 1 "
+        "where instructor_id = old.instructor_id and rutina_id = old.rutina_id; "
+        "end"
+    ),
+    **_triggers_cambios(),
+    **_triggers_versiones(),
+}
+
+
+def _recalcular_carga_instructores(conn: sqlite3.Connection):
+    conn.execute(
+        "update instructor set clientes_asignados = "
+        "(select count(*) from cliente where cliente.instructor_id = instructor.id and cliente.activo = 1)"
+    )
+
+
+def _recalcular_saldos(conn: sqlite3.Connection):
+    conn.execute("delete from saldo_cliente")
+    conn.execute(
+        "insert into saldo_cliente (cliente_id, cargos, pagos) "
+        "select cliente_id, "
+        f"sum(case when tipo = 'cargo' then {_centavos('monto')} else 0 end), "
+        f"sum(case when tipo = 'pago' then {_centavos('monto')} else 0 end) "
+        "from pago group by cliente_id"
+    )
+    conn.execute(_sql_deuda("true", desde_puntero=False))
+
+
+def _saldos_en_centavos(conn: sqlite3.Connection):
+    """Bases con los saldos en REAL y sin puntero a la deuda: se recalculan en centavos desde el libro."""
+    _recalcular_saldos(conn)
+
+
+def reconstruir_resumenes(conn: sqlite3.Connection):
+    """Recalcula los resúmenes, contadores y saldos desde las tablas base (instalaciones previas o reparación)."""
+    _recalcular_carga_instructores(conn)
+    _recalcular_saldos(conn)
+    conn.execute("delete from resumen_asistencia")
+    conn.execute(
+        "insert into resumen_asistencia (dia, hora, instructor_id, rutina_id, asistencias) "
+        "select substr(a.fecha_hora, 1, 10), cast(substr(a.fecha_hora, 12, 2) as integer), c.instructor_id, c.rutina_id, count(*) "
+        "from asistencia a join cliente c on c.id = a.cliente_id "
+        "group by 1, 2, 3, 4"
+    )
+    conn.execute("delete from resumen_cliente")
+    conn.execute(
+        "insert into resumen_cliente (instructor_id, rutina_id, clientes) "
+        "select instructor_id, rutina_id, count(*) from cliente where activo = 1 group by instructor_id, rutina_id"
+    )
+
+
+def _normalizar_fechas_iso(conn: sqlite3.Connection):
+    """Pasa a 'YYYY-MM-DD' las fechas viejas guardadas como 'DD-MM-YYYY' (las consultas por rango necesitan ISO)."""
+    for m in REGISTRO.values():
+        for campo in m.campos:
+            if campo.tipo in (datetime, date):
+                conn.execute(
+                    f"update {m.tabla} set {campo.nombre} = "
+                    f"substr({campo.nombre}, 7, 4) || '-' || substr({campo.nombre}, 4, 2) || '-' || substr({campo.nombre}, 1, 2) "
+                    f"where {campo.nombre} like '__-__-____'"
+                )
+
+
+# Migraciones de datos, en orden. Cada una se aplica una sola vez: PRAGMA user_version guarda
+# cuántas se aplicaron (así no se recorre la tabla completa en cada arranque).
+MIGRACIONES_DATOS: list[Callable[[sqlite3.Connection], None]] = [
+    _normalizar_fechas_iso,
+    reconstruir_resumenes,
+    _recalcular_carga_instructores,
+    _recalcular_saldos,
+    _saldos_en_centavos,
+]
+
+
+def _sql_guardado(sql: str) -> str:
+    """Cómo guarda SQLite un CREATE ... IF NOT EXISTS en sqlite_master (para comparar definiciones)."""
+    return re.sub(r"^create (\w+) if not exists", lambda m: f"CREATE {m.group(1).upper()}", sql)
+
+
+def migrar(conn: sqlite3.Connection) -> list[str]:
+    """
+    Sincroniza el esquema con las entidades. Devuelve la lista de sentencias estructurales
+    ejecutadas (vacía si no hubo cambios). No borra ni renombra columnas sobrantes.
+    """
+    cambios = []
+    if conn.execute("select count(*) from sqlite_master").fetchone()[0] == 0:
+        # Base nueva: el vacuum incremental solo se puede elegir antes de crear la primera tabla
+        # (en las existentes lo activa DatabaseConnection.compactar)
+        conn.execute("pragma auto_vacuum = incremental")
+    for m in orden_creacion():
+        existentes = {fila[1] for fila in conn.execute(f"pragma table_info({m.tabla})")}
+        if not existentes:
+            sql = sql_crear_tabla(m)
+            conn.execute(sql)
+            cambios.append(sql)
+            continue
+
+        for campo in m.campos:
+            if campo.nombre not in existentes:
+                sql = f"alter table {m.tabla} add column {_definicion_columna(campo, para_alter=True)}"
+                conn.execute(sql)
+                cambios.append(sql)
+
+    for (tabla, columna), definicion in COLUMNAS_AUXILIARES.items():
+        columnas = {fila[1] for fila in conn.execute(f"pragma table_info({tabla})")}
+        # Una tabla auxiliar que todavía no existe se crea más abajo con la definición completa
+        if columnas and columna not in columnas:
+            sql = f"alter table {tabla} add column {columna} {definicion}"
+            conn.execute(sql)
+            cambios.append(sql)
+
+    existentes = {(fila[0], fila[1]): fila[2] for fila in conn.execute("select type, name, sql from sqlite_master")}
+    for tipo, objetos in (("table", TABLAS_AUXILIARES), ("index", INDICES), ("trigger", TRIGGERS)):
+        for nombre, sql in objetos.items():
+            guardado = existentes.get((tipo, nombre))
+            if guardado is None:
+                conn.execute(sql)
+                cambios.append(sql)
+            elif tipo == "trigger" and guardado != _sql_guardado(sql):
+                # Trigger de una versión anterior: se reemplaza por la definición actual
+                conn.execute(f"drop trigger {nombre}")
+                conn.execute(sql)
+                cambios.append(sql)
+
+    for nombre in TRIGGERS_OBSOLETOS:
+        if ("trigger", nombre) in existentes:
+            conn.execute(f"drop trigger {nombre}")
+            cambios.append(f"drop trigger {nombre}")
+
+    version = conn.execute("pragma user_version").fetchone()[0]
+    for numero, migracion in enumerate(MIGRACIONES_DATOS, start=1):
+        if numero > version:
+            migracion(conn)
+            conn.execute(f"pragma user_version = {numero}")
+            cambios.append(f"migración de datos {numero}: {migracion.__name__}")
+
+    for sql in cambios:
+        logger.info("Migración aplicada: %s", sql.replace("\n", " "))
+    return cambios
+
+
+@dataclass(frozen=True, slots=True)
+class Sentencias:
+    columnas: str              # "id, nombre, apellido" en el orden de la dataclass
+    select_todos: str
+    select_por_id: str
+    select_por_ids: str        # Varios ids en un solo parámetro (lista JSON)
+    select_pagina: str         # Hasta :limite filas con id > :despues_de (paginado por cursor)
+    insert: str
+    insert_con_id: str         # Con id explícito (NULL -> autoincrement): importaciones que conservan los ids
+    update: str
+    delete: str
+    select_con_version: str | None  # select_por_id + la versión al final (None si la tabla no es versionada)
+    archivar: str | None       # Baja lógica (None si la tabla no es archivable)
+
+
+def _armar_sentencias(m: MetaEntidad) -> Sentencias:
+    columnas = ", ".join(m.nombres)
+    sin_pk = [n for n in m.nombres if n != "id"]
+    # Las filas archivadas no se leen ni se editan (el filtro se evalúa sobre la fila ya encontrada por PK)
+    activas = " and activo = 1" if m.tabla in TABLAS_ARCHIVABLES else ""
+    return Sentencias(
+        columnas=columnas,
+        select_todos=f"select {columnas} from {m.tabla}" + (" where activo = 1" if activas else ""),
+        # Búsqueda por PK (rowid): no necesita índice adicional
+        select_por_id=f"select {columnas} from {m.tabla} where id = :id{activas}",
+        # Una búsqueda por PK por cada id de la lista (json_each), sin armar "in (?, ?, ...)" a mano
+        select_por_ids=f"select {columnas} from {m.tabla} where id in (select value from json_each(:ids)){activas}",
+        # Rango sobre la PK (rowid), ya ordenado por id: el costo depende de :limite, no de cuántas páginas hay antes
+        select_pagina=f"select {columnas} from {m.tabla} where id > :despues_de{activas} order by id limit :limite",
+        insert=f"insert into {m.tabla} ({', '.join(sin_pk)}) values ({', '.join(':' + n for n in sin_pk)})",
+        insert_con_id=f"insert into {m.tabla} ({columnas}) values ({', '.join(':' + n for n in m.nombres)})",
+        update=f"update {m.tabla} set {', '.join(f'{n} = :{n}' for n in sin_pk)} where id = :id{activas}",
+        delete=f"delete from {m.tabla} where id = :id",
+        select_con_version=f"select {columnas}, version from {m.tabla} where id = :id{activas}" if m.tabla in TABLAS_VERSIONADAS else None,
+        archivar=f"update {m.tabla} set activo = 0 where id = :id and activo = 1" if activas else None,
+    )
+
+
+_SENTENCIAS: dict[type, Sentencias] = {clase: _armar_sentencias(m) for clase, m in REGISTRO.items()}
+
+
+def sentencias(clase: type) -> Sentencias:
+    encontradas = _SENTENCIAS.get(clase)
+    if encontradas is None:
+        encontradas = _SENTENCIAS[clase] = _armar_sentencias(meta(clase))
+    return encontradas
+
+
+@lru_cache(maxsize=None)
+def _update(clase: type, columnas: frozenset[str] | None, con_version: bool) -> str:
+    m = meta(clase)
+    # En el orden del registro: la misma combinación de columnas da siempre el mismo texto (y la misma sentencia preparada)
+    nombres = [c.nombre for c in m.campos if not c.es_pk and (columnas is None or c.nombre in columnas)]
+    query = f"update {m.tabla} set {', '.join(f'{n} = :{n}' for n in nombres)} where id = :id"
+    if m.tabla in TABLAS_ARCHIVABLES:
+        query += " and activo = 1"
+    if con_version:
+        # Solo si nadie la guardó desde que se leyó: 0 filas afectadas = no existe o la editó otro
+        query += " and version = :version"
+    return query
+
+
+def sentencia_update(clase: type, columnas: Iterable[str] | None = None, con_version: bool = False) -> str:
+    """UPDATE por PK de 'columnas' (None = todas). Las columnas que no se escriben no disparan sus triggers 'update of'."""
+    return _update(clase, None if columnas is None else frozenset(columnas), con_version)
@@ -0,0 +1,122 @@
+"""
+Mantenimiento automático de la base SQLite, asociado a un DatabaseConnection.
+
+Con las altas, bajas y ediciones constantes de clientes el archivo acumula páginas libres y las
+estadísticas del planificador quedan viejas. Este programador corre tres tareas:
+
+    - PRAGMA optimize al cerrar la app (cerrar()): actualiza estadísticas solo de las tablas que lo necesitan.
+    - ANALYZE después de una carga masiva (DatabaseConnection.carga_masiva_terminada) de al menos
+      'filas_analyze' filas: los importes grandes cambian la distribución de los datos de golpe.
+    - Vacuum incremental (auto_vacuum=INCREMENTAL) cuando la base lleva 'inactividad_s' segundos sin
+      uso: un hilo de fondo revisa cada 'intervalo_s' y devuelve al disco de a 'paginas_vacuum' páginas
+      libres por pasada, así nunca bloquea la base por mucho tiempo.
+
+Cada ejecución se loguea con el tamaño del archivo antes y después y lo que tardó, queda en
+'historial' y en las métricas (mantenimiento_<tarea>).
+
+Uso:
+    mantenimiento = MantenimientoProgramado(db_manager)
+    mantenimiento.iniciar()     # hilo de vacuum en los ratos libres
+    ...
+    mantenimiento.cerrar()      # detiene el hilo y corre PRAGMA optimize
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+
+from config import Config
+from domain.reportes import EjecucionMantenimiento
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.metrics import RegistroMetricas
+
+logger = logging.getLogger(__name__)
+
+HISTORIAL_MAXIMO = 100
+
+
+class MantenimientoProgramado:
+    def __init__(
+        self,
+        db_conn: DatabaseConnection,
+        inactividad_s: float = Config.MANTENIMIENTO_INACTIVIDAD_S,
+        intervalo_s: float = Config.MANTENIMIENTO_INTERVALO_S,
+        paginas_vacuum: int = Config.MANTENIMIENTO_PAGINAS_VACUUM,
+        filas_analyze: int = Config.MANTENIMIENTO_FILAS_ANALYZE,
+        metricas: RegistroMetricas = None,
+    ):
+        self.db = db_conn
+        self.inactividad_s = inactividad_s
+        self.intervalo_s = intervalo_s
+        self.paginas_vacuum = paginas_vacuum
+        self.filas_analyze = filas_analyze
+        self.metricas = metricas or db_conn.metricas
+        self.historial: deque[EjecucionMantenimiento] = deque(maxlen=HISTORIAL_MAXIMO)
+        # Una tarea a la vez (el ANALYZE de una importación no se pisa con el vacuum del hilo)
+        self._ocupado = threading.Lock()
+        self._detenido = threading.Event()
+        self._hilo: threading.Thread | None = None
+        db_conn.mantenimiento = self
+
+    # --- Disparadores ---
+    def iniciar(self):
+        """Arranca el hilo que hace el vacuum incremental en los ratos sin actividad."""
+        if self._hilo is not None:
+            return
+        self._detenido.clear()
+        self._hilo = threading.Thread(target=self._bucle, name="mantenimiento-db", daemon=True)
+        self._hilo.start()
+
+    def cerrar(self, timeout: float | None = 5.0) -> EjecucionMantenimiento:
+        """Detiene el hilo (si corre) y deja las estadísticas al día con PRAGMA optimize."""
+        self._detenido.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+        return self.ejecutar("optimize", "cierre")
+
+    def despues_de_carga(self, filas: int) -> EjecucionMantenimiento | None:
+        # Las cargas chicas no cambian las estadísticas lo suficiente: las cubre el optimize del cierre
+        if filas < self.filas_analyze:
+            return None
+        return self.ejecutar("analyze", "carga masiva")
+
+    def en_reposo(self) -> EjecucionMantenimiento | None:
+        """Una pasada de vacuum incremental si la base está inactiva y tiene páginas libres."""
+        if time.monotonic() - self.db.ultima_actividad < self.inactividad_s:
+            return None
+        if self.db.paginas_libres() == 0 or self.db.modo_auto_vacuum() != "incremental":
+            return None
+        return self.ejecutar("incremental_vacuum", "inactividad")
+
+    # --- Ejecución ---
+    def ejecutar(self, tarea: str, motivo: str = "manual") -> EjecucionMantenimiento:
+        tareas = {
+            "optimize": self.db.optimizar,
+            "analyze": self.db.analizar,
+            "incremental_vacuum": lambda: self.db.vacuum_incremental(self.paginas_vacuum),
+        }
+        with self._ocupado:
+            antes = self.db.tamano_bytes()
+            inicio = time.perf_counter()
+            tareas[tarea]()
+            segundos = time.perf_counter() - inicio
+            ejecucion = EjecucionMantenimiento(
+                tarea=tarea, motivo=motivo, bytes_antes=antes, bytes_despues=self.db.tamano_bytes(),
+                segundos=round(segundos, 4),
+            )
+        self.historial.append(ejecucion)
+        self.metricas.registrar_metodo(f"mantenimiento_{tarea}", segundos)
+        logger.info(
+            "Mantenimiento %s (%s): %s -> %s bytes en %.1f ms",
+            tarea, motivo, ejecucion.bytes_antes, ejecucion.bytes_despues, segundos * 1000,
+        )
+        return ejecucion
+
+    def _bucle(self):
+        while not self._detenido.wait(self.intervalo_s):
+            try:
+                self.en_reposo()
+            except Exception as e:  # Un error de mantenimiento no debe matar el hilo
+                logger.error("Falló el mantenimiento en segundo plano: %s", e)
@@ -0,0 +1,209 @@
+"""
+Instrumentación de la capa de persistencia.
+
+Registra en memoria (sin dependencias externas):
+- Por consulta: texto SQL, entidad (tabla), duración y filas afectadas/leídas.
+- Por método del repositorio: duración y cantidad de errores.
+- Por conexión: tiempo de espera hasta tener la conexión lista.
+
+Las duraciones se guardan en histogramas de buckets fijos (en milisegundos), así el costo
+por registro es O(1) y la memoria no crece con la cantidad de consultas.
+Las consultas que superan el umbral se loguean junto a su EXPLAIN QUERY PLAN.
+
+Uso desde un panel de debug o la CLI:
+    from infrastructure.metrics import metricas
+    metricas.snapshot()
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Iterator
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores de cada bucket en milisegundos (el último es "todo lo demás")
+BUCKETS_MS: tuple[float, ...] = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float("inf"))
+
+
+@dataclass
+class Histograma:
+    """Histograma de duraciones con buckets fijos."""
+    cuentas: list[int] = field(default_factory=lambda: [0] * len(BUCKETS_MS))
+    total: int = 0
+    suma_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observar(self, valor_ms: float):
+        self.cuentas[bisect_left(BUCKETS_MS, valor_ms)] += 1
+        self.total += 1
+        self.suma_ms += valor_ms
+        if valor_ms > self.max_ms:
+            self.max_ms = valor_ms
+
+    def percentil(self, p: float) -> float:
+        """Estimación del percentil p (0-100): límite superior del bucket que lo contiene."""
+        if self.total == 0:
+            return 0.0
+        objetivo = self.total * p / 100
+        acumulado = 0
+        for limite, cuenta in zip(BUCKETS_MS, self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return self.max_ms if limite == float("inf") else min(limite, self.max_ms)
+        return self.max_ms
+
+    def resumen(self) -> dict:
+        return {
+            "n": self.total,
+            "total_ms": round(self.suma_ms, 3),
+            "media_ms": round(self.suma_ms / self.total, 3) if self.total else 0.0,
+            "p50_ms": self.percentil(50),
+            "p95_ms": self.percentil(95),
+            "p99_ms": self.percentil(99),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+@dataclass
+class EstadisticaConsulta:
+    entidad: str
+    query: str
+    duracion: Histograma = field(default_factory=Histograma)
+    filas: int = 0
+
+
+class RegistroMetricas:
+    """Registro de métricas en proceso. Es thread-safe."""
+
+    def __init__(self, umbral_lento_ms: float = Config.UMBRAL_CONSULTA_LENTA_MS, max_lentas: int = 100):
+        self.umbral_lento_ms = umbral_lento_ms
+        self._lock = threading.Lock()
+        self._consultas: dict[str, EstadisticaConsulta] = {}
+        self._metodos: dict[str, Histograma] = {}
+        self._errores: dict[str, int] = {}
+        self._contadores: dict[str, int] = {}
+        self._espera_conexion = Histograma()
+        self._lentas: deque = deque(maxlen=max_lentas)
+
+    # --- Registro ---
+    def registrar_consulta(self, query: str, entidad: str, duracion_s: float, filas: int,
+                           conn=None, params: Any = None):
+        duracion_ms = duracion_s * 1000
+        with self._lock:
+            estadistica = self._consultas.get(query)
+            if estadistica is None:
+                estadistica = self._consultas[query] = EstadisticaConsulta(entidad=entidad, query=query)
+            estadistica.duracion.observar(duracion_ms)
+            estadistica.filas += max(filas, 0)
+
+        if duracion_ms >= self.umbral_lento_ms:
+            plan = self._explain(conn, query, params) if conn is not None else []
+            with self._lock:
+                self._lentas.append({
+                    "momento": time.time(),
+                    "entidad": entidad,
+                    "query": query,
+                    "duracion_ms": round(duracion_ms, 3),
+                    "filas": filas,
+                    "plan": plan,
+                })
+            logger.warning("Consulta lenta (%.1f ms, %s filas) en %s: %s | plan: %s",
+                           duracion_ms, filas, entidad, query, " / ".join(plan))
+
+    def registrar_metodo(self, nombre: str, duracion_s: float, error: bool = False):
+        with self._lock:
+            histograma = self._metodos.get(nombre)
+            if histograma is None:
+                histograma = self._metodos[nombre] = Histograma()
+            histograma.observar(duracion_s * 1000)
+            if error:
+                self._errores[nombre] = self._errores.get(nombre, 0) + 1
+
+    def registrar_espera_conexion(self, duracion_s: float):
+        with self._lock:
+            self._espera_conexion.observar(duracion_s * 1000)
+
+    def incrementar(self, nombre: str, cantidad: int = 1):
+        with self._lock:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    @contextmanager
+    def medir_consulta(self, query: str, entidad: str, conn=None, params: Any = None) -> Iterator[dict]:
+        """
+        Mide una consulta. El bloque puede informar las filas leídas con medida["filas"] = n;
+        si no lo hace, se registra el rowcount que haya dejado el cursor (o 0).
+        """
+        medida = {"filas": None, "cursor": None}
+        inicio = time.perf_counter()
+        try:
+            yield medida
+        finally:
+            duracion = time.perf_counter() - inicio
+            filas = medida["filas"]
+            if filas is None:
+                filas = getattr(medida["cursor"], "rowcount", 0) or 0
+            self.registrar_consulta(query, entidad, duracion, filas, conn=conn, params=params)
+
+    @staticmethod
+    def _explain(conn, query: str, params: Any) -> list[str]:
+        try:
+            filas = conn.execute(f"explain query plan {query}", params or {}).fetchall()
+            return [str(fila[-1]) for fila in filas]
+        except Exception as e:  # El plan es informativo: nunca debe romper la operación
+            return [f"(sin plan: {e})"]
+
+    # --- Lectura ---
+    def snapshot(self) -> dict:
+        """Copia consistente de todas las métricas, lista para serializar a JSON."""
+        with self._lock:
+            return {
+                "consultas": [
+                    {"entidad": e.entidad, "query": e.query, "filas": e.filas, **e.duracion.resumen()}
+                    for e in sorted(self._consultas.values(), key=lambda e: e.duracion.suma_ms, reverse=True)
+                ],
+                "metodos": {nombre: h.resumen() for nombre, h in sorted(self._metodos.items())},
+                "errores": dict(self._errores),
+                "contadores": dict(self._contadores),
+                "espera_conexion": self._espera_conexion.resumen(),
+                "consultas_lentas": list(self._lentas),
+                "umbral_lento_ms": self.umbral_lento_ms,
+            }
+
+    def reiniciar(self):
+        with self._lock:
+            self._consultas.clear()
+            self._metodos.clear()
+            self._errores.clear()
+            self._contadores.clear()
+            self._espera_conexion = Histograma()
+            self._lentas.clear()
+
+
+def instrumentado(nombre: str):
+    """Decorador para métodos del repositorio: mide la duración y cuenta los errores."""
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            inicio = time.perf_counter()
+            error = False
+            try:
+                return metodo(self, *args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                self.metricas.registrar_metodo(nombre, time.perf_counter() - inicio, error=error)
+        return envoltura
+    return decorador
+
+
+# Instancia compartida por defecto (se puede inyectar otra en DatabaseConnection / SQLite3Repository)
+metricas = RegistroMetricas()
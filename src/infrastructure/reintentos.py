@@ -0,0 +1,95 @@
+"""
+Reintentos ante "database is locked" / "database is busy" (SQLITE_BUSY, SQLITE_LOCKED).
+
+Con dos estaciones escribiendo sobre el mismo archivo, una puede encontrar la base tomada por la
+otra más allá del busy timeout de la conexión. En lugar de devolverle al usuario un
+PersistenciaError genérico (y perder lo que estaba guardando), la operación se repite:
+
+    - A lo sumo 'intentos' reintentos; si se agotan se lanza BaseOcupadaError con un mensaje claro.
+    - Espera exponencial con jitter completo: un valor al azar entre 0 y min(tope_s, base_s * 2^n),
+      así dos estaciones que chocaron no vuelven a chocar en el mismo instante.
+    - Cada reintento suma al contador 'reintentos_bloqueo' y su espera al histograma
+      'espera_reintento'; los agotados, a 'bloqueos_agotados'.
+
+Qué se puede reintentar: solo operaciones de UNA transacción que no hicieron nada visible fuera de
+la base antes de fallar. Si la transacción falla por bloqueo, get_connection hace rollback y la base
+queda como estaba, así que repetirla completa no duplica nada (altas incluidas). NO se reintentan
+los generadores que ya entregaron filas (iterar_lotes) ni los bloques que mezclan varias
+transacciones: por eso el reintento envuelve el método completo del repositorio y no cada consulta.
+"""
+
+import random
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, TypeVar
+
+from config import Config
+from domain.exceptions import BaseOcupadaError
+from infrastructure.metrics import RegistroMetricas
+
+T = TypeVar("T")
+
+# Códigos primarios de SQLite (los extendidos, como SQLITE_BUSY_SNAPSHOT, comparten el byte bajo)
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+
+def es_bloqueo(error: BaseException) -> bool:
+    """True si el error (o la excepción que lo originó) es un SQLITE_BUSY / SQLITE_LOCKED."""
+    while error is not None:
+        if isinstance(error, sqlite3.OperationalError):
+            codigo = getattr(error, "sqlite_errorcode", None)
+            if codigo is not None:
+                return (codigo & 0xFF) in (SQLITE_BUSY, SQLITE_LOCKED)
+            mensaje = str(error).lower()
+            return "locked" in mensaje or "busy" in mensaje
+        # El repositorio convierte los sqlite3.Error en PersistenciaError dentro del except: la causa queda en __context__
+        error = error.__cause__ or error.__context__
+    return False
+
+
+@dataclass(frozen=True)
+class PoliticaReintentos:
+    intentos: int = Config.REINTENTOS_MAXIMO
+    base_s: float = Config.REINTENTOS_BASE_S
+    tope_s: float = Config.REINTENTOS_TOPE_S
+    azar: Callable[[], float] = field(default=random.random, compare=False)
+
+    def espera(self, intento: int) -> float:
+        """Segundos a esperar antes del reintento número 'intento' (0, 1, ...): jitter completo."""
+        return self.azar() * min(self.tope_s, self.base_s * 2 ** intento)
+
+    def ejecutar(self, operacion: Callable[[], T], metricas: RegistroMetricas, nombre: str = "") -> T:
+        """Ejecuta 'operacion' (una transacción completa) y la repite mientras la base esté ocupada."""
+        intento = 0
+        while True:
+            try:
+                return operacion()
+            except Exception as e:
+                if not es_bloqueo(e):
+                    raise
+                if intento >= self.intentos:
+                    metricas.incrementar("bloqueos_agotados")
+                    raise BaseOcupadaError(
+                        "La base de datos está ocupada por otra estación. Espere unos segundos y vuelva a intentar."
+                    ) from e
+                espera = self.espera(intento)
+                metricas.incrementar("reintentos_bloqueo")
+                if nombre:
+                    metricas.incrementar(f"reintentos_bloqueo.{nombre}")
+                metricas.registrar_metodo("espera_reintento", espera)
+                time.sleep(espera)
+                intento += 1
+
+
+def reintentable(nombre: str):
+    """Decorador para métodos del repositorio que son UNA transacción (ver el docstring del módulo).
+    Usa self.reintentos (PoliticaReintentos) y self.metricas."""
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            return self.reintentos.ejecutar(lambda: metodo(self, *args, **kwargs), self.metricas, nombre)
+        return envoltura
+    return decorador
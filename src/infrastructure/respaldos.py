@@ -0,0 +1,217 @@
+"""
+Copias de seguridad en caliente de la base SQLite (sqlite3.Connection.backup).
+
+La copia se hace de a 'paginas_por_paso' páginas con una pausa entre pasos: entre paso y paso la
+base queda libre, así la app sigue leyendo y escribiendo mientras se respalda (si alguien escribe,
+SQLite retoma la copia para que el resultado sea consistente).
+
+Cada respaldo:
+    1. Se copia a un archivo temporal (.tmp) en la carpeta de respaldos.
+    2. Se verifica con PRAGMA integrity_check; si falla, se borra y se lanza RespaldoError.
+    3. Se renombra a learnlifting-AAAAMMDD-HHMMSS-ffffff.db (el rename es atómico: nunca queda un respaldo a medias).
+    4. Se borran los más viejos que excedan la retención.
+
+Restaurar exige un respaldo que pase la verificación, y antes de pisar la base hace un respaldo
+de seguridad del estado actual (que no cuenta para la retención).
+
+Uso:
+    respaldos = GestorRespaldos(db_manager)
+    respaldos.respaldar(progreso=lambda copiadas, total: ...)
+    respaldos.respaldar_en_segundo_plano(progreso=..., al_terminar=lambda respaldo, error: ...)
+    respaldos.restaurar("learnlifting-20260101-030000-000000.db")
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+from config import Config
+from domain.exceptions import RespaldoError
+from domain.interfaces import Respaldos
+from domain.reportes import Respaldo
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.esquema import CAMBIO_RESTAURACION
+from infrastructure.metrics import RegistroMetricas
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = "learnlifting-"
+PREFIJO_SEGURIDAD = "antes-de-restaurar-"
+
+
+def _verificar(ruta: str) -> list[str]:
+    """Problemas de integridad del archivo (lista vacía si está sano)."""
+    try:
+        conn = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+        try:
+            filas = [fila[0] for fila in conn.execute("pragma integrity_check")]
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError as e:  # "file is not a database" y similares
+        return [str(e)]
+    return [] if filas == ["ok"] else filas
+
+
+class GestorRespaldos(Respaldos):
+    def __init__(
+        self,
+        db_conn: DatabaseConnection,
+        carpeta: str | None = None,
+        retencion: int = Config.RESPALDOS_RETENCION,
+        paginas_por_paso: int = Config.RESPALDOS_PAGINAS_POR_PASO,
+        pausa_s: float = Config.RESPALDOS_PAUSA_S,
+        metricas: RegistroMetricas = None,
+    ):
+        self.db = db_conn
+        # Por defecto, una carpeta "respaldos" junto a la base
+        self.carpeta = carpeta or os.path.join(os.path.dirname(os.path.abspath(db_conn.db_path)), "respaldos")
+        self.retencion = retencion
+        self.paginas_por_paso = paginas_por_paso
+        self.pausa_s = pausa_s
+        self.metricas = metricas or db_conn.metricas
+        # Un solo respaldo o restauración a la vez
+        self._en_curso = threading.Lock()
+
+    # --- Respaldo ---
+    def respaldar(self, progreso: Callable[[int, int], None] | None = None) -> Respaldo:
+        if not self._en_curso.acquire(blocking=False):
+            raise RespaldoError("Ya hay un respaldo en curso.")
+        try:
+            respaldo = self._copiar(PREFIJO, progreso)
+            self._rotar()
+            return respaldo
+        finally:
+            self._en_curso.release()
+
+    def respaldar_en_segundo_plano(self, progreso=None, al_terminar=None) -> bool:
+        if self._en_curso.locked():
+            return False
+
+        def tarea():
+            respaldo, error = None, None
+            try:
+                respaldo = self.respaldar(progreso)
+            except Exception as e:  # Se informa a quien lo pidió; el hilo no debe morir en silencio
+                logger.error("Falló el respaldo en segundo plano: %s", e)
+                error = e
+            if al_terminar:
+                al_terminar(respaldo, error)
+
+        threading.Thread(target=tarea, name="respaldo", daemon=True).start()
+        return True
+
+    def listar(self) -> list[Respaldo]:
+        if not os.path.isdir(self.carpeta):
+            return []
+        encontrados = []
+        for nombre in os.listdir(self.carpeta):
+            if nombre.endswith(".db") and nombre.startswith((PREFIJO, PREFIJO_SEGURIDAD)):
+                ruta = os.path.join(self.carpeta, nombre)
+                encontrados.append((os.stat(ruta), nombre, ruta))
+        encontrados.sort(key=lambda e: (e[0].st_mtime_ns, e[1]), reverse=True)
+        return [
+            Respaldo(
+                nombre=nombre, ruta=ruta, bytes=estado.st_size,
+                creado=datetime.fromtimestamp(estado.st_mtime).isoformat(sep=" ", timespec="seconds"),
+            )
+            for estado, nombre, ruta in encontrados
+        ]
+
+    # --- Restauración ---
+    def restaurar(self, nombre: str, progreso: Callable[[int, int], None] | None = None) -> Respaldo:
+        """Restaura el respaldo 'nombre' sobre la base. Devuelve el respaldo de seguridad del estado anterior."""
+        ruta = os.path.join(self.carpeta, os.path.basename(nombre))
+        if not os.path.isfile(ruta):
+            raise RespaldoError(f"No existe el respaldo {nombre}.")
+        problemas = _verificar(ruta)
+        if problemas:
+            raise RespaldoError(f"El respaldo {nombre} está dañado: {problemas[0]}")
+
+        if not self._en_curso.acquire(blocking=False):
+            raise RespaldoError("Hay un respaldo en curso; reintente cuando termine.")
+        try:
+            seguridad = self._copiar(PREFIJO_SEGURIDAD, None)
+            inicio = time.perf_counter()
+            origen = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+            destino = sqlite3.connect(self.db.db_path)
+            try:
+                # Misma API en sentido inverso: reemplaza todas las páginas de la base en una transacción
+                # (sin escritores del proceso en el medio)
+                with self.db.bloqueo_escritura():
+                    previa = destino.execute("select coalesce(max(version), 0) from cambio").fetchone()[0]
+                    origen.backup(destino, pages=self.paginas_por_paso, progress=self._avisar(progreso))
+            except sqlite3.Error as e:
+                raise RespaldoError(f"No se pudo restaurar {nombre}: {e}")
+            finally:
+                origen.close()
+                destino.close()
+            # Un respaldo viejo puede tener un esquema anterior: se migra como al abrir la app
+            self.db.init_db()
+            # Las versiones de 'cambio' volvieron atrás: se anota la restauración con una versión mayor a
+            # todas las que pudo ver otra estación, para que recarguen todo (infrastructure.cambios) en vez
+            # de tomar lo que se escriba después por cambios sueltos
+            with self.db.get_connection() as conn:
+                conn.execute(
+                    "insert into cambio (version, tabla, registro_id) "
+                    "select max(coalesce(max(version), 0), :previa) + 1, :tabla, 0 from cambio",
+                    {"previa": previa, "tabla": CAMBIO_RESTAURACION},
+                )
+            self.metricas.registrar_metodo("restaurar_respaldo", time.perf_counter() - inicio)
+            logger.warning("Base restaurada desde %s (estado anterior en %s)", nombre, seguridad.nombre)
+            return seguridad
+        finally:
+            self._en_curso.release()
+
+    # --- Internos ---
+    def _copiar(self, prefijo: str, progreso) -> Respaldo:
+        os.makedirs(self.carpeta, exist_ok=True)
+        nombre = f"{prefijo}{datetime.now():%Y%m%d-%H%M%S-%f}.db"
+        ruta = os.path.join(self.carpeta, nombre)
+        temporal = ruta + ".tmp"
+        inicio = time.perf_counter()
+
+        origen = sqlite3.connect(self.db.db_path)
+        destino = sqlite3.connect(temporal)
+        try:
+            origen.backup(destino, pages=self.paginas_por_paso, progress=self._avisar(progreso), sleep=self.pausa_s)
+        except sqlite3.Error as e:
+            destino.close()
+            os.remove(temporal)
+            raise RespaldoError(f"No se pudo copiar la base: {e}")
+        finally:
+            origen.close()
+            destino.close()
+
+        problemas = _verificar(temporal)
+        if problemas:
+            os.remove(temporal)
+            raise RespaldoError(f"El respaldo no pasó la verificación de integridad: {problemas[0]}")
+        os.replace(temporal, ruta)
+
+        segundos = time.perf_counter() - inicio
+        self.metricas.registrar_metodo("respaldar", segundos)
+        self.metricas.incrementar("respaldos")
+        logger.info("Respaldo %s (%s bytes) en %.2f s", nombre, os.path.getsize(ruta), segundos)
+        return Respaldo(
+            nombre=nombre, ruta=ruta, bytes=os.path.getsize(ruta), segundos=round(segundos, 3),
+            creado=datetime.now().isoformat(sep=" ", timespec="seconds"),
+        )
+
+    def _avisar(self, progreso):
+        if progreso is None:
+            return None
+        # sqlite3 informa (estado, restantes, total) después de cada paso
+        return lambda estado, restantes, total: progreso(total - restantes, total)
+
+    def _rotar(self):
+        # Solo cuentan los respaldos programados/manuales; los de seguridad previos a restaurar se conservan
+        vigentes = [r for r in self.listar() if r.nombre.startswith(PREFIJO)]
+        for respaldo in vigentes[self.retencion:]:
+            try:
+                os.remove(respaldo.ruta)
+            except OSError as e:
+                logger.warning("No se pudo borrar el respaldo viejo %s: %s", respaldo.nombre, e)
@@ -1,55 +1,69 @@
-from domain.interfaces import Repository
+from domain.interfaces import Repository, VencimientosRepository, RotacionRepository, EstadisticasRepository, CargaInstructoresRepository, PagosRepository, ReferenciasRepository, CargaMasivaRepository, VersionesRepository, PaginasRepository
+from domain.reportes import Vencimiento, ResumenRegla, ConteoPeriodo, ConteoInstructor, ConteoRutina, CargaInstructor, EstadoCuenta, Deudor, Referencia
+from domain.rotacion import ReglaRotacion, CICLO_MAXIMO, DURACION_POR_DEFECTO_DIAS
 from domain.entities import ENTIDADES
 from infrastructure.db_conn import DatabaseConnection
-from dataclasses import asdict
-from domain.exceptions import RegistroNoEncontrado, ReferenciaEnUso, PersistenciaError, RegistroDuplicado
+from domain.campos import como_dict
+from domain.metadata import meta, referencias_a
+from infrastructure.esquema import CUPO_EXCEDIDO, TABLAS_VERSIONADAS, sentencias, sentencia_update
+from domain.exceptions import RegistroNoEncontrado, ReferenciaEnUso, PersistenciaError, RegistroDuplicado, ConflictoEdicionError, CupoExcedidoError
+from infrastructure.metrics import RegistroMetricas, instrumentado, metricas as metricas_globales
+from infrastructure.reintentos import PoliticaReintentos, reintentable
+import json
 import sqlite3
-from typing import get_type_hints, Type
+from typing import Iterator, Type
 
-class SQLite3Repository(Repository):
-    def __init__(self, db_conn: DatabaseConnection):
+class SQLite3Repository(Repository, VencimientosRepository, RotacionRepository, EstadisticasRepository, CargaInstructoresRepository, PagosRepository, ReferenciasRepository, CargaMasivaRepository, VersionesRepository, PaginasRepository):
+    def __init__(self, db_conn: DatabaseConnection, metricas: RegistroMetricas = None, reintentos: PoliticaReintentos = None):
         self.db = db_conn
+        # Si no se inyecta un registro propio, se comparte el de la conexión (o el global)
+        self.metricas = metricas or getattr(db_conn, "metricas", None) or metricas_globales
+        # Base ocupada por otra estación: cada método @reintentable (una transacción) se repite con backoff.
+        # iterar_lotes no lo es: un generador que ya entregó filas no se puede repetir.
+        self.reintentos = reintentos or PoliticaReintentos()
 
+    @instrumentado("add")
+    @reintentable("add")
     def add(self, entity: ENTIDADES): # Este "entity" debería ser un objeto instancia de alguna clase ENTIDADES, tiene datos!
-        tabla = type(entity).__name__.lower()
-        tipos = get_type_hints(type(entity)) # Obtenemos los tipos en un diccionario {"id": int, "nombre": str, "apellido": str}
-        datos = asdict(entity) # Obtenemos los datos del objeto en un diccionario {"id": 1, "nombre": "Juan", "apellido": "Perez"}
+        # Tabla y sentencia salen del registro de metadatos (precalculadas al importar)
+        tabla = meta(type(entity)).tabla
+        query = sentencias(type(entity)).insert
+        datos = como_dict(entity) # Obtenemos los datos del objeto en un diccionario {"id": 1, "nombre": "Juan", "apellido": "Perez"}
 
         if "id" in datos:
             del datos["id"]
 
-        if "id" in tipos:
-            del tipos["id"]
-        
-        columnas = ", ".join(datos.keys())
-        valores = ", ".join([f":{k}" for k in datos.keys()])
-
-        query = f"INSERT INTO {tabla} ({columnas}) VALUES ({valores})"
-
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute(query, datos)
+                with self.metricas.medir_consulta(query, tabla, conn, datos) as medida:
+                    medida["cursor"] = cursor.execute(query, datos)
 
-            except sqlite3.IntegrityError:
+            except sqlite3.IntegrityError as e:
+                if CUPO_EXCEDIDO in str(e):
+                    raise CupoExcedidoError(CUPO_EXCEDIDO)
                 raise RegistroDuplicado(f"Ya existe un registro con estos datos.")
 
             except sqlite3.Error as e:
                 raise PersistenciaError(f"Error técnico al intentar agregar el registro: {str(e)}")
 
+    @instrumentado("get_by_id")
+    @reintentable("get_by_id")
     def get_by_id(self, entity_id: int, class_entity: Type[ENTIDADES]) -> ENTIDADES: # Este "entity" solo es la clase, no tiene datos. Por eso ponemos Type[ENTIDADES]
-        tabla = class_entity.__name__.lower()
-
-        query = f"SELECT * FROM {tabla} WHERE id = :id"
+        tabla = meta(class_entity).tabla
+        # Las columnas vienen en el orden de la dataclass para construir el objeto por posición
+        query = sentencias(class_entity).select_por_id
 
-        with self.db.get_connection() as conn:
+        with self.db.get_connection(solo_lectura=True) as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute(query, {"id": entity_id})
-                row = cursor.fetchone() # Obtenemos la fila en un diccionario
+                with self.metricas.medir_consulta(query, tabla, conn, {"id": entity_id}) as medida:
+                    cursor.execute(query, {"id": entity_id})
+                    row = cursor.fetchone() # Obtenemos la fila en un diccionario
+                    medida["filas"] = 1 if row else 0
                 if row:
                     # Devolvemos el objeto con los datos de la fila aprovechando el constructor de la dataclass.
-                    return class_entity(**row)
+                    return class_entity(*row)
                 else:
                     return None
 
@@ -63,19 +77,23 @@ class SQLite3Repository(Repository):
                 # Error técnico de SQLite (Disco lleno, base bloqueada)
                 raise PersistenciaError(f"Error técnico al intentar obtener el registro con ID {entity_id}: {str(e)}")
 
+    @instrumentado("get_all")
+    @reintentable("get_all")
     def get_all(self, class_entity: Type[ENTIDADES]) -> list[ENTIDADES]: # Este "entity" solo es la clase, no tiene datos. Por eso ponemos Type[ENTIDADES]
-        tabla = class_entity.__name__.lower()
-        query = f"SELECT * FROM {tabla}"
+        tabla = meta(class_entity).tabla
+        query = sentencias(class_entity).select_todos
 
-        with self.db.get_connection() as conn:
+        with self.db.get_connection(solo_lectura=True) as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute(query)
-                rows = cursor.fetchall()
+                with self.metricas.medir_consulta(query, tabla, conn) as medida:
+                    cursor.execute(query)
+                    rows = cursor.fetchall()
+                    medida["filas"] = len(rows)
                 
                 if rows:
                     # Devolvemos una lista de los objetos con los datos de cada fila aprovechando el constructor de la dataclass.
-                    return [class_entity(**row) for row in rows]
+                    return [class_entity(*row) for row in rows]
                 else:
                     return []
 
@@ -89,9 +107,33 @@ class SQLite3Repository(Repository):
                 # Error técnico de SQLite (Disco lleno, base bloqueada)
                 raise PersistenciaError(f"Error técnico al intentar obtener todos los registros de {tabla}: {str(e)}")
 
-    def update(self, entity: ENTIDADES) -> ENTIDADES: # Este "entity" debería ser un objeto instancia de alguna clase ENTIDADES, tiene datos!
-        tabla = type(entity).__name__.lower()
-        datos = asdict(entity) # Obtenemos los datos del objeto en un diccionario {"id": 1, "nombre": "Juan", "apellido": "Perez"}
+    @instrumentado("get_by_ids")
+    @reintentable("get_by_ids")
+    def get_by_ids(self, entity_ids, class_entity: Type[ENTIDADES]) -> list[ENTIDADES]:
+        # Relecturas puntuales (filas cambiadas en otra estación): una búsqueda por PK por id, en una sola consulta
+        tabla = meta(class_entity).tabla
+        query = sentencias(class_entity).select_por_ids
+        rows = self._leer(query, {"ids": json.dumps(sorted(entity_ids))}, tabla)
+        return [class_entity(*row) for row in rows]
+
+    @instrumentado("get_pagina")
+    @reintentable("get_pagina")
+    def get_pagina(self, class_entity: Type[ENTIDADES], despues_de: int, limite: int) -> list[ENTIDADES]:
+        # Paginado por cursor (keyset) para la API: la página siguiente arranca después del último id entregado.
+        # Con offset la base tendría que recorrer y descartar todas las filas de las páginas anteriores.
+        tabla = meta(class_entity).tabla
+        query = sentencias(class_entity).select_pagina
+        rows = self._leer(query, {"despues_de": despues_de, "limite": limite}, tabla)
+        return [class_entity(*row) for row in rows]
+
+    @instrumentado("update")
+    @reintentable("update")
+    def update(self, entity: ENTIDADES, campos=None, version: int | None = None) -> ENTIDADES: # Este "entity" debería ser un objeto instancia de alguna clase ENTIDADES, tiene datos!
+        # 'campos': solo esas columnas (las que cambió el usuario); None = todas.
+        # 'version': la que se leyó con get_con_version. Si la fila ya está en otra, otra estación la guardó
+        # mientras tanto y se lanza ConflictoEdicionError en vez de pisarla. None = sin chequeo (último gana).
+        tabla = meta(type(entity)).tabla
+        datos = como_dict(entity) # Obtenemos los datos del objeto en un diccionario {"id": 1, "nombre": "Juan", "apellido": "Perez"}
         entity_id = None
 
         if "id" in datos:
@@ -99,44 +141,433 @@ class SQLite3Repository(Repository):
         else:
             raise PersistenciaError("No se puede actualizar: ID no existe.")
 
-        query_values = []
-        for key in datos.keys():
-            if key == "id":
-                continue
-            query_values.append(f"{key} = :{key}")
-            
-        query_values_str = ", ".join(query_values)
-        
-        query = f"UPDATE {tabla} SET {query_values_str} WHERE id = :id"
+        con_version = version is not None and tabla in TABLAS_VERSIONADAS
+        if campos is None and not con_version:
+            query = sentencias(type(entity)).update
+        else:
+            query = sentencia_update(type(entity), campos, con_version)
+            datos["version"] = version
 
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute(query, datos)
+                with self.metricas.medir_consulta(query, tabla, conn, datos) as medida:
+                    medida["cursor"] = cursor.execute(query, datos)
                 if cursor.rowcount == 0:
-                    raise RegistroNoEncontrado(f"No se puede actualizar: ID {entity_id} no existe.")
+                    actual = None
+                    if con_version:
+                        # Búsqueda por PK en la misma transacción: o no existe, o cambió de versión
+                        actual = cursor.execute(sentencias(type(entity)).select_con_version, {"id": entity_id}).fetchone()
+                    if actual is None:
+                        raise RegistroNoEncontrado(f"No se puede actualizar: ID {entity_id} no existe.")
+                    self.metricas.incrementar("conflictos_edicion")
+                    raise ConflictoEdicionError(
+                        "Otra estación modificó este registro mientras lo editaba.",
+                        actual=type(entity)(*actual[:-1]), version=actual[-1],
+                    )
+            except sqlite3.IntegrityError as e:
+                if CUPO_EXCEDIDO in str(e):
+                    raise CupoExcedidoError(CUPO_EXCEDIDO)
+                raise PersistenciaError(f"Error técnico al intentar actualizar el registro: {str(e)}")
             except sqlite3.Error as e:
                 raise PersistenciaError(f"Error técnico al intentar actualizar el registro: {str(e)}")
+        return entity
+
+    @instrumentado("update_fields")
+    def update_fields(self, entity: ENTIDADES, changed, version: int | None = None) -> bool:
+        # Escritura mínima: solo las columnas sucias, así no se reescriben las demás ni se disparan sus
+        # triggers 'update of' (resúmenes, contadores). Sin cambios no se abre ninguna transacción.
+        # (update ya se reintenta si la base está ocupada: acá no se envuelve otra vez)
+        changed = tuple(changed)
+        if not changed:
+            self.metricas.incrementar("updates_omitidos")
+            return False
+        self.update(entity, campos=changed, version=version)
+        self.metricas.incrementar("columnas_actualizadas", len(changed))
+        return True
+
+    @instrumentado("get_con_version")
+    @reintentable("get_con_version")
+    def get_con_version(self, entity_id: int, class_entity: Type[ENTIDADES]) -> tuple[ENTIDADES, int] | None:
+        # Búsqueda por PK: la entidad y su versión en la misma lectura (para abrir un formulario de edición)
+        tabla = meta(class_entity).tabla
+        query = sentencias(class_entity).select_con_version
+        if query is None:
+            entidad = self.get_by_id(entity_id, class_entity)
+            return None if entidad is None else (entidad, 0)
+        rows = self._leer(query, {"id": entity_id}, tabla)
+        return (class_entity(*rows[0][:-1]), rows[0][-1]) if rows else None
     
+    @instrumentado("delete")
+    @reintentable("delete")
     def delete(self, entity: ENTIDADES): # Este "entity" debería ser un objeto instancia de alguna clase ENTIDADES, tiene datos!
         entity_id = getattr(entity, "id", None)
-        tabla = type(entity).__name__.lower()
+        tabla = meta(type(entity)).tabla
 
         if entity_id is None:
             raise PersistenciaError("No se puede eliminar: ID no existe.")
 
-        query = f"DELETE FROM {tabla} WHERE id = :id"
+        query = sentencias(type(entity)).delete
         
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
             try:
-                cursor.execute(query, {"id": entity_id})
+                with self.metricas.medir_consulta(query, tabla, conn, {"id": entity_id}) as medida:
+                    medida["cursor"] = cursor.execute(query, {"id": entity_id})
                 if cursor.rowcount == 0: # Si no borró ninguna fila...
                     raise RegistroNoEncontrado(f"No existe el registro con ID {entity_id}")
 
             except sqlite3.IntegrityError:
-                raise ReferenciaEnUso("No se puede eliminar porque está asignado a uno o más clientes.")
+                # El mensaje depende de quién apunta a la entidad (cliente -> asistencia, pago; instructor -> cliente)
+                tablas = ", ".join(sorted({m.tabla for m, _ in referencias_a(tabla)}))
+                raise ReferenciaEnUso(f"No se puede eliminar el registro de {tabla}: tiene registros asociados en {tablas}.")
 
             except sqlite3.Error as e:
                 raise PersistenciaError(f"Error técnico al intentar eliminar el registro: {str(e)}")
 
+    @instrumentado("archivar")
+    @reintentable("archivar")
+    def archivar(self, entity: ENTIDADES):
+        # Baja lógica por PK: los triggers liberan el cupo, descuentan los resúmenes y anotan el cambio
+        tabla = meta(type(entity)).tabla
+        query = sentencias(type(entity)).archivar
+        if query is None:
+            raise PersistenciaError(f"Los registros de {tabla} no se pueden archivar.")
+
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                with self.metricas.medir_consulta(query, tabla, conn, {"id": entity.id}) as medida:
+                    medida["cursor"] = cursor.execute(query, {"id": entity.id})
+                if cursor.rowcount == 0:
+                    raise RegistroNoEncontrado(f"No existe el registro con ID {entity.id}")
+
+            except sqlite3.Error as e:
+                raise PersistenciaError(f"Error técnico al intentar archivar el registro: {str(e)}")
+
+    @instrumentado("get_vencimientos")
+    @reintentable("get_vencimientos")
+    def get_vencimientos(self, desde: str, hasta: str, limite: int) -> list[Vencimiento]:
+        # Usa idx_cliente_fecha_fin: búsqueda por rango + filas ya ordenadas, corta en "limite" sin recorrer la tabla.
+        # Instructor y rutina se traen por PK (una búsqueda por fila devuelta).
+        query = (
+            "select c.id, c.nombre || ' ' || c.apellido, c.fecha_fin_rutina, c.ciclo_rutina, "
+            "r.nombre, i.nombre || ' ' || i.apellido "
+            "from cliente c "
+            "join rutina r on r.id = c.rutina_id "
+            "join instructor i on i.id = c.instructor_id "
+            "where c.fecha_fin_rutina between :desde and :hasta and c.activo = 1 "
+            "order by c.fecha_fin_rutina, c.id "
+            "limit :limite"
+        )
+        params = {"desde": desde, "hasta": hasta, "limite": limite}
+
+        with self.db.get_connection(solo_lectura=True) as conn:
+            cursor = conn.cursor()
+            try:
+                with self.metricas.medir_consulta(query, "cliente", conn, params) as medida:
+                    cursor.execute(query, params)
+                    rows = cursor.fetchall()
+                    medida["filas"] = len(rows)
+                return [Vencimiento(*row) for row in rows]
+
+            except sqlite3.Error as e:
+                raise PersistenciaError(f"Error técnico al intentar obtener los vencimientos: {str(e)}")
+
+    @staticmethod
+    def _sql_rotacion(regla: ReglaRotacion) -> tuple[str, str, dict]:
+        """Arma (filtro, update, parámetros) de una regla. El filtro usa idx_cliente_fecha_fin (rango fecha_fin_rutina < :hoy)."""
+        params = {"ciclo_maximo": CICLO_MAXIMO, "duracion": regla.duracion_dias, "duracion_defecto": DURACION_POR_DEFECTO_DIAS}
+        # Los clientes morosos no se rotan (no se les asigna rutina nueva hasta regularizar): PK de saldo_cliente
+        filtro = (
+            "fecha_fin_rutina < :hoy and activo = 1 and not exists "
+            "(select 1 from saldo_cliente s where s.cliente_id = cliente.id and s.vence_deuda < :hoy)"
+        )
+        if regla.ciclos:
+            marcadores = []
+            for n, ciclo in enumerate(regla.ciclos):
+                params[f"ciclo_{n}"] = ciclo
+                marcadores.append(f":ciclo_{n}")
+            filtro += f" and ciclo_rutina in ({', '.join(marcadores)})"
+
+        # Rutina siguiente: un CASE con el mapa de la regla (las rutinas que no figuran se mantienen)
+        asignacion_rutina = ""
+        if regla.mapa_rutinas:
+            casos = []
+            for n, (actual, siguiente) in enumerate(regla.mapa_rutinas.items()):
+                params[f"de_{n}"], params[f"a_{n}"] = actual, siguiente
+                casos.append(f"when :de_{n} then :a_{n}")
+            asignacion_rutina = f"rutina_id = case rutina_id {' '.join(casos)} else rutina_id end, "
+
+        # Fechas: el período nuevo empieza hoy y dura lo mismo que el anterior (mínimo 1 día),
+        # salvo que la regla fije la duración. julianday() nulo (fecha inválida) cae en la duración por defecto.
+        update = (
+            "update cliente set "
+            "ciclo_rutina = ciclo_rutina % :ciclo_maximo + 1, "
+            f"{asignacion_rutina}"
+            "fecha_inicio_rutina = :hoy, "
+            "fecha_fin_rutina = date(:hoy, '+' || coalesce(:duracion, "
+            "max(1, cast(julianday(fecha_fin_rutina) - julianday(fecha_inicio_rutina) as integer)), "
+            ":duracion_defecto) || ' days') "
+            f"where {filtro}"
+        )
+        return filtro, update, params
+
+    @instrumentado("rotar_vencidos")
+    @reintentable("rotar_vencidos")
+    def rotar_vencidos(self, hoy: str, reglas: list[ReglaRotacion], simular: bool = False) -> list[ResumenRegla]:
+        # Todas las reglas van en una sola transacción: o se rotan todas o ninguna.
+        # En simulación (dry-run) se ejecutan igual y se hace rollback, así el reporte es exacto.
+        resumenes = []
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for regla in reglas:
+                    filtro, update, params = self._sql_rotacion(regla)
+                    params["hoy"] = hoy
+
+                    conteo = f"select rutina_id, count(*) from cliente where {filtro} group by rutina_id"
+                    with self.metricas.medir_consulta(conteo, "cliente", conn, params) as medida:
+                        por_rutina = {fila[0]: fila[1] for fila in cursor.execute(conteo, params)}
+                        medida["filas"] = len(por_rutina)
+
+                    with self.metricas.medir_consulta(update, "cliente", conn, params) as medida:
+                        medida["cursor"] = cursor.execute(update, params)
+
+                    resumenes.append(ResumenRegla(regla=regla.nombre, clientes=cursor.rowcount, por_rutina=por_rutina))
+
+                if simular:
+                    conn.rollback()
+                else:
+                    self.metricas.incrementar("clientes_rotados", sum(r.clientes for r in resumenes))
+                return resumenes
+
+            except sqlite3.IntegrityError:
+                raise ReferenciaEnUso("La regla de rotación asigna una rutina que no existe.")
+
+            except sqlite3.Error as e:
+                raise PersistenciaError(f"Error técnico al intentar rotar los ciclos: {str(e)}")
+
+    def _leer(self, query: str, params: dict, tabla: str) -> list:
+        """Ejecuta una consulta de solo lectura (reportes) y devuelve las filas."""
+        with self.db.get_connection(solo_lectura=True) as conn:
+            try:
+                with self.metricas.medir_consulta(query, tabla, conn, params) as medida:
+                    rows = conn.execute(query, params).fetchall()
+                    medida["filas"] = len(rows)
+                return rows
+            except sqlite3.Error as e:
+                raise PersistenciaError(f"Error técnico al intentar leer {tabla}: {str(e)}")
+
+    # --- Estadísticas: se leen de las tablas de resumen que mantienen los triggers ---
+    @instrumentado("get_asistencias_por_dia")
+    @reintentable("get_asistencias_por_dia")
+    def get_asistencias_por_dia(self, desde: str, hasta: str) -> list[ConteoPeriodo]:
+        # Rango sobre el prefijo de la PK (dia, ...): sale ordenado por día sin ordenar en memoria
+        query = (
+            "select dia, sum(asistencias) from resumen_asistencia "
+            "where dia between :desde and :hasta group by dia order by dia"
+        )
+        return [ConteoPeriodo(*row) for row in self._leer(query, {"desde": desde, "hasta": hasta}, "resumen_asistencia")]
+
+    @instrumentado("get_asistencias_por_hora")
+    @reintentable("get_asistencias_por_hora")
+    def get_asistencias_por_hora(self, desde: str, hasta: str) -> list[ConteoPeriodo]:
+        # Mismo rango por PK; el agrupado por hora es sobre los buckets (a lo sumo 24 grupos)
+        query = (
+            "select printf('%02d', hora), sum(asistencias) from resumen_asistencia "
+            "where dia between :desde and :hasta group by hora order by hora"
+        )
+        return [ConteoPeriodo(*row) for row in self._leer(query, {"desde": desde, "hasta": hasta}, "resumen_asistencia")]
+
+    @instrumentado("get_resumen_instructores")
+    @reintentable("get_resumen_instructores")
+    def get_resumen_instructores(self, desde: str, hasta: str) -> list[ConteoInstructor]:
+        # Instructor por PK; clientes desde resumen_cliente y asistencias desde resumen_asistencia (rango por PK)
+        query = (
+            "with a as (select instructor_id, sum(asistencias) as n from resumen_asistencia "
+            "           where dia between :desde and :hasta group by instructor_id), "
+            "     c as (select instructor_id, sum(clientes) as n from resumen_cliente group by instructor_id) "
+            "select i.id, i.nombre || ' ' || i.apellido, coalesce(c.n, 0), coalesce(a.n, 0) "
+            "from instructor i "
+            "left join c on c.instructor_id = i.id "
+            "left join a on a.instructor_id = i.id "
+            "order by 3 desc, i.id"
+        )
+        return [ConteoInstructor(*row) for row in self._leer(query, {"desde": desde, "hasta": hasta}, "resumen_cliente")]
+
+    @instrumentado("get_resumen_rutinas")
+    @reintentable("get_resumen_rutinas")
+    def get_resumen_rutinas(self, desde: str, hasta: str) -> list[ConteoRutina]:
+        query = (
+            "with a as (select rutina_id, sum(asistencias) as n from resumen_asistencia "
+            "           where dia between :desde and :hasta group by rutina_id), "
+            "     c as (select rutina_id, sum(clientes) as n from resumen_cliente group by rutina_id) "
+            "select r.id, r.nombre, coalesce(c.n, 0), coalesce(a.n, 0) "
+            "from rutina r "
+            "left join c on c.rutina_id = r.id "
+            "left join a on a.rutina_id = r.id "
+            "order by 3 desc, 4 desc, r.id"
+        )
+        return [ConteoRutina(*row) for row in self._leer(query, {"desde": desde, "hasta": hasta}, "resumen_cliente")]
+
+    # --- Carga de instructores: lee el contador clientes_asignados (sin count(*) sobre cliente) ---
+    _SELECT_CARGA = "select id, nombre || ' ' || apellido, cupo, clientes_asignados from instructor"
+
+    @instrumentado("get_carga_instructor")
+    @reintentable("get_carga_instructor")
+    def get_carga_instructor(self, instructor_id: int) -> CargaInstructor | None:
+        # Búsqueda por PK
+        rows = self._leer(f"{self._SELECT_CARGA} where id = :id", {"id": instructor_id}, "instructor")
+        return CargaInstructor(*rows[0]) if rows else None
+
+    @instrumentado("get_cargas_instructores")
+    @reintentable("get_cargas_instructores")
+    def get_cargas_instructores(self) -> list[CargaInstructor]:
+        return [CargaInstructor(*row) for row in self._leer(f"{self._SELECT_CARGA} order by id", {}, "instructor")]
+
+    @instrumentado("get_instructor_con_menos_carga")
+    @reintentable("get_instructor_con_menos_carga")
+    def get_instructor_con_menos_carga(self) -> CargaInstructor | None:
+        # Usa idx_instructor_carga: recorre de menor a mayor carga y corta en el primero con cupo libre
+        query = f"{self._SELECT_CARGA} where clientes_asignados < cupo order by clientes_asignados limit 1"
+        rows = self._leer(query, {}, "instructor")
+        return CargaInstructor(*rows[0]) if rows else None
+
+    @instrumentado("get_estado_cuenta")
+    @reintentable("get_estado_cuenta")
+    def get_estado_cuenta(self, cliente_id: int) -> EstadoCuenta | None:
+        # Búsqueda por PK en saldo_cliente (acumulado por trigger): no recorre el libro de pagos
+        # Los importes se guardan en centavos enteros
+        query = "select cliente_id, cargos / 100.0, pagos / 100.0, vence_deuda from saldo_cliente where cliente_id = :id"
+        rows = self._leer(query, {"id": cliente_id}, "saldo_cliente")
+        return EstadoCuenta(*rows[0]) if rows else None
+
+    @instrumentado("get_morosos")
+    @reintentable("get_morosos")
+    def get_morosos(self, hoy: str, limite: int) -> list[Deudor]:
+        # Usa idx_saldo_vence_deuda: rango vence_deuda < :hoy ya ordenado; el cliente se busca por PK.
+        # Los clientes archivados siguen apareciendo: la deuda no se borra al darlos de baja.
+        query = (
+            "select s.cliente_id, c.nombre || ' ' || c.apellido, (s.cargos - s.pagos) / 100.0, s.vence_deuda "
+            "from saldo_cliente s "
+            "join cliente c on c.id = s.cliente_id "
+            "where s.vence_deuda < :hoy "
+            "order by s.vence_deuda, s.cliente_id "
+            "limit :limite"
+        )
+        return [Deudor(*row) for row in self._leer(query, {"hoy": hoy, "limite": limite}, "saldo_cliente")]
+
+    @instrumentado("contar_referencias")
+    @reintentable("contar_referencias")
+    def contar_referencias(self, entity_id: int, class_entity: Type[ENTIDADES]) -> list[Referencia]:
+        # Un count por FK hacia la entidad (inferidas del registro de metadatos). Cada conteo es una
+        # búsqueda por índice (idx_cliente_instructor / idx_cliente_rutina), no un recorrido de la tabla.
+        referencias = []
+        with self.db.get_connection(solo_lectura=True) as conn:
+            try:
+                for m, campo in referencias_a(meta(class_entity).tabla):
+                    query = f"select count(*) from {m.tabla} where {campo.nombre} = :id"
+                    with self.metricas.medir_consulta(query, m.tabla, conn, {"id": entity_id}) as medida:
+                        cantidad = conn.execute(query, {"id": entity_id}).fetchone()[0]
+                        medida["filas"] = 1
+                    referencias.append(Referencia(tabla=m.tabla, columna=campo.nombre, cantidad=cantidad))
+                return referencias
+            except sqlite3.Error as e:
+                raise PersistenciaError(f"Error técnico al intentar contar las referencias: {str(e)}")
+
+    @instrumentado("reasignar_y_eliminar")
+    @reintentable("reasignar_y_eliminar")
+    def reasignar_y_eliminar(self, origen: ENTIDADES, destino: ENTIDADES) -> int:
+        # Un UPDATE por FK (set-based, por índice) y el DELETE del origen en la misma transacción:
+        # si algo falla no queda ningún cliente movido. Los triggers ajustan contadores y resúmenes, y el
+        # de cupo aborta la transacción si el instructor destino se llena (aunque otra sesión lo haya
+        # ocupado después del chequeo previo del servicio).
+        tabla = meta(type(origen)).tabla
+        params = {"origen": origen.id, "destino": destino.id}
+        movidos = 0
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for m, campo in referencias_a(tabla):
+                    query = f"update {m.tabla} set {campo.nombre} = :destino where {campo.nombre} = :origen"
+                    with self.metricas.medir_consulta(query, m.tabla, conn, params) as medida:
+                        medida["cursor"] = cursor.execute(query, params)
+                    movidos += cursor.rowcount
+
+                query = sentencias(type(origen)).delete
+                with self.metricas.medir_consulta(query, tabla, conn, {"id": origen.id}) as medida:
+                    medida["cursor"] = cursor.execute(query, {"id": origen.id})
+                if cursor.rowcount == 0:
+                    raise RegistroNoEncontrado(f"No existe el registro con ID {origen.id}")
+
+                self.metricas.incrementar("referencias_reasignadas", movidos)
+                return movidos
+
+            except sqlite3.IntegrityError as e:
+                if CUPO_EXCEDIDO in str(e):
+                    raise CupoExcedidoError(f"No se pudieron reasignar los clientes: {CUPO_EXCEDIDO}")
+                raise ReferenciaEnUso("No se pudieron reasignar las referencias: el destino no existe o hay otras tablas que lo impiden.")
+
+            except sqlite3.Error as e:
+                raise PersistenciaError(f"Error técnico al intentar reasignar y eliminar: {str(e)}")
+
+    # --- Carga masiva (importación / exportación CSV) ---
+    def iterar_lotes(self, class_entity: Type[ENTIDADES], tamano_lote: int = 5000) -> Iterator[list[tuple]]:
+        # Un solo cursor recorre la tabla por rowid (ya ordenada por id, sin ordenar en memoria) y se
+        # consume con fetchmany: en memoria hay como máximo un lote, sin importar el tamaño de la tabla.
+        tabla = meta(class_entity).tabla
+        query = f"{sentencias(class_entity).select_todos} order by id"
+        with self.db.get_connection(solo_lectura=True) as conn:
+            try:
+                with self.metricas.medir_consulta(query, tabla, conn):
+                    cursor = conn.execute(query)
+                while lote := cursor.fetchmany(tamano_lote):
+                    yield [tuple(fila) for fila in lote]
+            except sqlite3.Error as e:
+                raise PersistenciaError(f"Error técnico al intentar leer {tabla}: {str(e)}")
+
+    @instrumentado("get_ids")
+    @reintentable("get_ids")
+    def get_ids(self, class_entity: Type[ENTIDADES]) -> set[int]:
+        # Solo la PK: se resuelve recorriendo el índice más chico de la tabla (sin leer las filas)
+        tabla = meta(class_entity).tabla
+        return {fila[0] for fila in self._leer(f"select id from {tabla}", {}, tabla)}
+
+    @instrumentado("insertar_lote")
+    @reintentable("insertar_lote")
+    def insertar_lote(self, class_entity: Type[ENTIDADES], filas: list[dict]) -> list[tuple[int, str]]:
+        # Todo el lote en una transacción con executemany. Si la base rechaza alguna fila (id duplicado,
+        # FK), se reintenta de a una dentro de la misma transacción (BEGIN IMMEDIATE de get_connection)
+        # para guardar las válidas.
+        tabla = meta(class_entity).tabla
+        query = sentencias(class_entity).insert_con_id
+        rechazadas: list[tuple[int, str]] = []
+        with self.db.get_connection() as conn:
+            try:
+                # La primera fila sirve de parámetros para el EXPLAIN si el lote resulta lento
+                with self.metricas.medir_consulta(query, tabla, conn, filas[0] if filas else None) as medida:
+                    # El savepoint deshace solo lo que alcanzó a insertar executemany, sin cerrar la
+                    # transacción: el reintento de a una sigue con el lock de escritura ya tomado
+                    conn.execute("savepoint lote")
+                    try:
+                        conn.executemany(query, filas)
+                        conn.execute("release lote")
+                    except sqlite3.IntegrityError:
+                        conn.execute("rollback to lote")
+                        conn.execute("release lote")
+                        for indice, fila in enumerate(filas):
+                            try:
+                                conn.execute(query, fila)
+                            except sqlite3.IntegrityError as e:
+                                rechazadas.append((indice, str(e)))
+                    medida["filas"] = len(filas) - len(rechazadas)
+            except sqlite3.Error as e:
+                raise PersistenciaError(f"Error técnico al intentar importar en {tabla}: {str(e)}")
+        self.metricas.incrementar("filas_importadas", len(filas) - len(rechazadas))
+        return rechazadas
+
+    def carga_terminada(self, class_entity: Type[ENTIDADES], filas: int):
+        # El mantenimiento programado de la base decide si amerita un ANALYZE
+        self.db.carga_masiva_terminada(filas)
+
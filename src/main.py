@@ -4,14 +4,16 @@ from datetime import datetime
 from dataclasses import dataclass, field
 from domain.entities import Cliente, Instructor, Rutina
 from domain.exceptions import RequisitoClienteInstructorError, RequisitoClienteRutinaError
-from config import Config
+from config import Config, ruta_base_datos
 from GUI.theme import AppWithTheme
 from GUI.views import AppView
 from GUI.contexts.service_context import GymServiceContext
-import os
+from GUI.contexts.controller_context import GymControllerContext
+from GUI.controllers import GymController, GymState
+import sys
 import tomllib
-import json
 from pathlib import Path
+from infrastructure.ajustes import almacen_ajustes
 
 #=============================================================================
 # METADATOS DEL PROYECTO
@@ -19,38 +21,17 @@ from pathlib import Path
 def get_project_metadata():
     # Buscamos el archivo pyproject.toml en la raíz del proyecto
     toml_path = Path(__file__).parent.parent / "pyproject.toml"
+    # name/version se guardan también en config.json (almacén compartido con el tema: ver infrastructure.ajustes)
+    ajustes = almacen_ajustes()
 
-    # También construimos la ruta al config.json en APPDATA para sincronizar
-    app_data = os.getenv("APPDATA") or str(Path.home())
-    base_path = os.path.join(app_data, "LearnLifting")
-    if not os.path.exists(base_path):
-        try:
-            os.makedirs(base_path, exist_ok=True)
-        except Exception:
-            pass
-    config_json_path = os.path.join(base_path, "config.json")
-
-    # Si existe pyproject.toml, lo leemos y persistimos name/version en config.json
+    # Si existe pyproject.toml, lo leemos y persistimos name/version (solo se escribe si cambiaron)
     try:
         with open(toml_path, "rb") as f:
             data = tomllib.load(f)
             name = data.get("project", {}).get("name")
             version = data.get("project", {}).get("version")
             if name and version:
-                # Merge con config.json existente si corresponde
-                cfg = {}
-                if os.path.exists(config_json_path):
-                    try:
-                        with open(config_json_path, "r", encoding="utf-8") as jf:
-                            cfg = json.load(jf)
-                    except Exception:
-                        cfg = {}
-                cfg.update({"name": name, "version": version})
-                try:
-                    with open(config_json_path, "w", encoding="utf-8") as jf:
-                        json.dump(cfg, jf, ensure_ascii=False, indent=2)
-                except Exception:
-                    pass
+                ajustes.actualizar(name=name, version=version)
                 return name, version
     except (FileNotFoundError, KeyError):
         # No hay pyproject.toml o está malformado: fallback a config.json
@@ -58,17 +39,11 @@ def get_project_metadata():
     except Exception:
         pass
 
-    # Fallback: leer config.json si existe
-    try:
-        if os.path.exists(config_json_path):
-            with open(config_json_path, "r", encoding="utf-8") as jf:
-                cfg = json.load(jf)
-                name = cfg.get("name")
-                version = cfg.get("version")
-                if name and version:
-                    return name, version
-    except Exception:
-        pass
+    # Fallback: lo último guardado en config.json
+    name = ajustes.obtener("name")
+    version = ajustes.obtener("version")
+    if name and version:
+        return name, version
 
     # Valores por defecto si todo falla
     return "App", "0.0.0"
@@ -79,13 +54,8 @@ APP_NAME, VERSION = get_project_metadata()
 # Obtenemos la ruta para la base de datos, 
 # será la carpeta de perfil de usuario para asegurar permisos
 def get_db_path():
-    app_data = os.getenv("APPDATA") # En Windows: C:\Users\Nombre\AppData\Roaming y se puede ingresar por %APPDATA%
-    base_path = os.path.join(app_data, "LearnLifting")
-    
-    if not os.path.exists(base_path):
-        os.makedirs(base_path)
-        
-    return os.path.join(base_path, "learnlifting.db")
+    # En Windows: C:\Users\Nombre\AppData\Roaming\LearnLifting (%APPDATA%). La comparte la línea de comandos (python -m cli).
+    return ruta_base_datos()
 
 # Instanciación e inicialización de la base de datos
 from infrastructure.db_conn import DatabaseConnection as DB
@@ -97,9 +67,32 @@ db_manager.init_db()
 from infrastructure.sqlite3_repo import SQLite3Repository
 repo = SQLite3Repository(db_manager)
 
-# Instanciación del servicio
+# Escritor en lotes de asistencias (check-in): hilo de fondo con group commit
+from infrastructure.asistencias import EscritorAsistencias
+escritor_asistencias = EscritorAsistencias(db_manager)
+
+# Copias de seguridad en caliente (carpeta "respaldos" junto a la base)
+from infrastructure.respaldos import GestorRespaldos
+respaldos = GestorRespaldos(db_manager)
+
+# Mantenimiento automático: vacuum incremental en los ratos sin uso, ANALYZE tras importaciones, optimize al cerrar
+from infrastructure.mantenimiento import MantenimientoProgramado
+mantenimiento = MantenimientoProgramado(db_manager)
+mantenimiento.iniciar()
+
+# Cambios de otras estaciones sobre la misma base (PRAGMA data_version + tabla 'cambio')
+from infrastructure.cambios import VigilanteCambios
+vigilante_cambios = VigilanteCambios(db_manager)
+
+# Caché de instructores, rutinas y cupos: una sola para todas las sesiones (se invalida con cada cambio)
+from infrastructure.catalogos import CacheCatalogos
+catalogos = CacheCatalogos()
+
+# Instanciación del servicio: uno solo, compartido por todas las sesiones (en modo web, una por pestaña).
+# Es seguro entre hilos: cada hilo usa su propia conexión y las escrituras se serializan (DatabaseConnection).
 from application.services import GymService
-gimnasio_servicios = GymService(repositorio=repo)
+gimnasio_servicios = GymService(repositorio=repo, registro_asistencias=escritor_asistencias, respaldos=respaldos,
+                                cambios=vigilante_cambios, catalogos=catalogos)
 
 # Definición de la función principal
 def main(page: ft.Page):
@@ -120,6 +113,10 @@ def main(page: ft.Page):
         supported_locales=[ft.Locale("es", "AR"), ft.Locale("en", "US")],
     )
     
+    # Estado y controlador propios de esta sesión: dos pestañas no se pisan la tabla abierta ni el formulario
+    controlador = GymController(GymState())
+    page.on_close = lambda e: controlador.cerrar_sesion(gimnasio_servicios)
+
     # --- Renderizado ---
     # definimos un wrapper para inyectar el servicio
     # Para que funcione bien y los contextos no devuelvan un "None", 
@@ -133,8 +130,11 @@ def main(page: ft.Page):
         return GymServiceContext(
             value=gimnasio_servicios, 
             # Usamos callback con lambda para que la construcción ocurra DENTRO del contexto
-            callback=lambda: AppWithTheme( # El hijo del contexto de servicio es el Tema
-                view_builder=AppView # El hijo del Tema es la App. Pasamos la referencia a la clase/función, NO la instancia ()
+            callback=lambda: GymControllerContext( # El hijo del servicio es el controlador de la sesión
+                value=controlador,
+                callback=lambda: AppWithTheme( # El hijo del contexto del controlador es el Tema
+                    view_builder=AppView # El hijo del Tema es la App. Pasamos la referencia a la clase/función, NO la instancia ()
+                )
             )
         )
 
@@ -142,4 +142,15 @@ def main(page: ft.Page):
 
 
 if __name__ == "__main__":
-    ft.run(main)
+    if "--web" in sys.argv:
+        # Varias recepciones desde el navegador: cada pestaña es una sesión con su propio controlador
+        ft.run(main, view=ft.AppView.WEB_BROWSER, port=Config.WEB_PUERTO)
+    else:
+        ft.run(main)
+    # Al cerrar la ventana se guardan las asistencias que queden en cola
+    escritor_asistencias.cerrar()
+    vigilante_cambios.detener()
+    # Y se dejan al día las estadísticas del planificador (PRAGMA optimize)
+    mantenimiento.cerrar()
+    # Los ajustes del tema que todavía no se escribieron (debounce)
+    almacen_ajustes().cerrar()
@@ -0,0 +1,85 @@
+"""
+Tests de la línea de comandos (python -m cli)
+
+Estos tests verifican:
+1. Que arranca sin importar Flet ni la GUI
+2. Subcomandos de reportes, rotación, importación/exportación y mantenimiento
+3. Códigos de salida ante errores
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from cli import main
+
+SRC = Path(__file__).resolve().parent.parent
+
+
+# ========================================
+# FIXTURES
+# ========================================
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cli.db")
+
+
+def _json(capsys, *argv) -> object:
+    assert main(["--json", *argv]) == 0
+    return json.loads(capsys.readouterr().out)
+
+
+# ========================================
+# TESTS
+# ========================================
+
+class TestCLI:
+    """Tests de la línea de comandos"""
+
+    def test_no_importa_la_gui(self):
+        """Test: El stack headless no carga flet ni el paquete GUI"""
+        codigo = "import sys, cli; print(any(m == 'flet' or m.startswith(('flet.', 'GUI')) for m in sys.modules))"
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=SRC, capture_output=True, text=True, check=True)
+        assert salida.stdout.strip() == "False"
+
+    def test_importar_y_exportar(self, db_path, tmp_path, capsys):
+        """Test: Lo importado se puede exportar; las filas inválidas quedan en el reporte de errores"""
+        origen = tmp_path / "instructores.csv"
+        origen.write_text("id,nombre,apellido,cupo\n0,Juan,Pérez,10\n0,Ana,Sosa,x\n", encoding="utf-8")
+        reporte = _json(capsys, "--db", db_path, "importar", "Instructor", str(origen))
+        assert reporte["importadas"] == 1
+        assert [e["linea"] for e in reporte["errores"]] == [3]
+
+        destino = tmp_path / "salida.csv"
+        assert _json(capsys, "--db", db_path, "exportar", "Instructor", str(destino))["filas"] == 1
+        assert destino.read_text(encoding="utf-8").splitlines() == ["id,nombre,apellido,cupo", "1,Juan,Pérez,10"]
+
+    def test_reportes_y_rotacion(self, db_path, capsys):
+        """Test: Los subcomandos de reportes devuelven JSON aun con la base vacía"""
+        assert _json(capsys, "--db", db_path, "estadisticas", "--dias", "7")["total_asistencias"] == 0
+        assert _json(capsys, "vencimientos", "--db", db_path) == []
+        assert _json(capsys, "--db", db_path, "rotar", "--simular", "--hoy", "2026-02-15")["simulado"] is True
+
+    def test_mantenimiento(self, db_path, capsys):
+        """Test: El mantenimiento informa integridad y tiempos de cada paso"""
+        reporte = _json(capsys, "--db", db_path, "mantenimiento", "--reconstruir", "--compactar")
+        assert reporte["integridad"]["resultado"] == []
+        assert {"reconstruir", "compactar", "optimizar"} <= reporte.keys()
+
+    def test_errores(self, db_path, capsys):
+        """Test: Argumentos inválidos salen con 2; errores de negocio con 1"""
+        with pytest.raises(SystemExit) as salida:
+            main(["--db", db_path, "exportar", "NoExiste", "x.csv"])
+        assert salida.value.code == 2
+        assert main(["--db", db_path, "morosos", "--limite", "0"]) == 1
+        assert "Error" in capsys.readouterr().err
+
+    def test_errores_de_archivo(self, db_path, tmp_path, capsys):
+        """Test: Un CSV inexistente o una carpeta de destino que no existe salen con 1, sin traceback"""
+        assert main(["--db", db_path, "importar", "Cliente", str(tmp_path / "no_existe.csv")]) == 1
+        assert capsys.readouterr().err.startswith("Error: ")
+        assert main(["--db", db_path, "exportar", "Cliente", str(tmp_path / "no_existe" / "x.csv")]) == 1
+        assert capsys.readouterr().err.startswith("Error: ")
@@ -375,3 +375,103 @@ class TestEdgeCases:
         
         assert "💪" in cliente.nombre
         assert "🏋️" in cliente.apellido
+
+
+# ========================================
+# TESTS DE REPRESENTACIÓN (slots y acceso a campos)
+# ========================================
+
+class TestRepresentacionEntidades:
+    """Tests de las entidades con slots y de los accesores de domain.campos"""
+
+    def test_entidades_sin_dict(self):
+        """Test: Las entidades usan slots y no tienen __dict__ por instancia"""
+        for entidad in (Rutina(id=1, nombre="X", pdf_link="x"), Instructor(id=1, nombre="A", apellido="B")):
+            assert not hasattr(entidad, "__dict__")
+
+    def test_no_se_pueden_agregar_atributos_nuevos(self):
+        """Test: Con slots, un atributo mal escrito falla en vez de crearse en silencio"""
+        rutina = Rutina(id=1, nombre="X", pdf_link="x")
+        with pytest.raises(AttributeError):
+            rutina.nombre_mal_escrito = "Y"
+
+    def test_fields_sigue_funcionando(self):
+        """Test: La introspección con fields() no cambia"""
+        from dataclasses import fields
+        assert [f.name for f in fields(Rutina)] == ["id", "nombre", "pdf_link"]
+
+    def test_valores_y_como_dict(self):
+        """Test: valores() y como_dict() equivalen a astuple()/asdict() para entidades planas"""
+        from dataclasses import asdict, astuple
+        from domain.campos import como_dict, valores
+
+        cliente = Cliente(id=3, nombre="Ana", apellido="Paz", fecha_inicio_rutina="2026-01-01",
+                          fecha_fin_rutina="2026-02-01", instructor_id=1, rutina_id=2)
+        assert valores(cliente) == astuple(cliente)
+        assert como_dict(cliente) == asdict(cliente)
+
+    def test_diferencias(self):
+        """Test: diferencias() devuelve los campos cambiados en orden de declaración"""
+        from domain.campos import diferencias
+        antes = Instructor(id=1, nombre="Juan", apellido="Pérez", cupo=10)
+        assert diferencias(antes, Instructor(id=1, nombre="Juan", apellido="Pérez", cupo=10)) == ()
+        assert diferencias(antes, Instructor(id=1, nombre="Juana", apellido="Pérez", cupo=12)) == ("nombre", "cupo")
+
+    def test_combinar_ediciones(self):
+        """Test: combinar() aplica los campos del usuario sobre la versión actual e informa los que pisa"""
+        from domain.campos import combinar
+        base = Instructor(id=1, nombre="Juan", apellido="Pérez", cupo=10)
+        mia = Instructor(id=1, nombre="Juan", apellido="Perez", cupo=12)
+        actual = Instructor(id=1, nombre="Juan Carlos", apellido="Pérez", cupo=15)
+
+        combinada, mis_campos, pisados = combinar(base, mia, actual)
+        assert combinada == Instructor(id=1, nombre="Juan Carlos", apellido="Perez", cupo=12)
+        assert mis_campos == ("apellido", "cupo")
+        assert pisados == ("cupo",)
+
+
+# ========================================
+# TESTS DEL REGISTRO DE METADATOS
+# ========================================
+
+class TestMetadatos:
+    """Tests del registro de metadatos (domain.metadata)"""
+
+    def test_tipos_resueltos_y_nulabilidad(self):
+        """Test: Optional[int] se resuelve a int y queda marcado como anulable"""
+        from domain.metadata import meta
+        campo = meta(Cliente).campo("instructor_id")
+        assert campo.tipo is int
+        assert campo.anulable is True
+        assert campo.fk == "instructor"
+        assert campo.tipo_sql == "INTEGER"
+
+    def test_columnas_formulario_sin_id(self):
+        """Test: Las columnas del formulario excluyen la PK y respetan el orden"""
+        from domain.metadata import meta
+        assert list(meta(Rutina).columnas_formulario) == ["nombre", "pdf_link"]
+
+    def test_orden_de_creacion_padres_primero(self):
+        """Test: Las tablas referenciadas se crean antes que las que las referencian"""
+        from domain.metadata import orden_creacion
+        tablas = [m.tabla for m in orden_creacion()]
+        assert tablas.index("instructor") < tablas.index("cliente")
+        assert tablas.index("rutina") < tablas.index("cliente")
+
+    def test_entidad_no_registrada(self):
+        """Test: Pedir metadatos de algo que no es entidad lanza EntidadNoValidaError"""
+        from domain.exceptions import EntidadNoValidaError
+        from domain.metadata import meta
+        with pytest.raises(EntidadNoValidaError):
+            meta(dict)
+        with pytest.raises(EntidadNoValidaError):
+            meta({"tipo": "invalido"})
+
+    def test_subclase_usa_metadatos_de_la_base(self):
+        """Test: Una subclase de una entidad comparte tabla con su base"""
+        from domain.metadata import meta
+
+        class RutinaEspecial(Rutina):
+            pass
+
+        assert meta(RutinaEspecial).tabla == "rutina"
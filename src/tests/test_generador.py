@@ -0,0 +1,75 @@
+"""
+Tests del generador de datos sintéticos y del benchmark de escala
+
+Estos tests verifican:
+1. Que el generador sea determinista (misma semilla, mismos datos)
+2. Que los datos sean coherentes (FK válidas, fechas ordenadas)
+3. Que el benchmark corra de punta a punta en una escala chica
+"""
+
+import json
+from datetime import date
+
+from benchmarks import escala
+from benchmarks.generador import generar
+
+
+# ========================================
+# TESTS: GENERADOR
+# ========================================
+
+class TestGenerador:
+    """Tests del generador con semilla"""
+
+    def test_misma_semilla_mismos_datos(self):
+        """Test: Dos corridas con la misma semilla generan exactamente lo mismo"""
+        a = generar(500, semilla=7, hoy=date(2026, 1, 1))
+        b = generar(500, semilla=7, hoy=date(2026, 1, 1))
+        assert a == b
+
+    def test_semilla_distinta_datos_distintos(self):
+        """Test: Otra semilla cambia los datos"""
+        a = generar(500, semilla=1, hoy=date(2026, 1, 1))
+        b = generar(500, semilla=2, hoy=date(2026, 1, 1))
+        assert a.clientes != b.clientes
+
+    def test_fk_y_fechas_coherentes(self):
+        """Test: Todas las FK apuntan a ids generados y el fin nunca es anterior al inicio"""
+        datos = generar(2000, semilla=3)
+        ids_instr = {i.id for i in datos.instructores}
+        ids_rutinas = {r.id for r in datos.rutinas}
+
+        assert len(datos.clientes) == 2000
+        for c in datos.clientes:
+            assert c.instructor_id in ids_instr
+            assert c.rutina_id in ids_rutinas
+            assert c.fecha_inicio_rutina <= c.fecha_fin_rutina
+            assert 1 <= c.ciclo_rutina <= 3
+
+    def test_carga_desigual_de_instructores(self):
+        """Test: La distribución es sesgada, el primer instructor tiene más clientes que el último"""
+        datos = generar(5000, semilla=11)
+        conteo = {}
+        for c in datos.clientes:
+            conteo[c.instructor_id] = conteo.get(c.instructor_id, 0) + 1
+        assert conteo[datos.instructores[0].id] > conteo.get(datos.instructores[-1].id, 0)
+
+
+# ========================================
+# TESTS: BENCHMARK DE ESCALA
+# ========================================
+
+class TestBenchmarkEscala:
+    """Smoke test del benchmark (escala mínima)"""
+
+    def test_escribe_json_con_resultados(self, tmp_path):
+        """Test: El benchmark genera un JSON con las métricas de cada escala"""
+        salida = tmp_path / "bench.json"
+        escala.main(["--escalas", "200", "--muestra", "10", "--salida", str(salida)])
+
+        resultados = json.loads(salida.read_text(encoding="utf-8"))
+        medidas = resultados["escalas"]["200"]
+        assert medidas["clientes"] == 200
+        assert medidas["repositorio"]["get_by_id_cliente"]["n"] == 10
+        assert "añadir_cliente" in medidas["servicio"]
+        assert "gui" in medidas
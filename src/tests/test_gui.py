@@ -0,0 +1,250 @@
+"""
+Tests de la GUI que no necesitan un cliente de Flet
+
+Estos tests verifican:
+1. Que editar una fila vuelve a pintar solo las celdas de esa fila (ui_render.*)
+2. Que ActualizadorPagina manda un solo envío por acción y cuenta los updates (ui_updates.*)
+3. Que los errores de carga de los paneles se avisan en pantalla
+"""
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+ft = pytest.importorskip("flet")
+
+from flet.controls.context import _context_page
+from flet.messaging.connection import Connection
+from flet.messaging.session import Session
+from flet.pubsub.pubsub_hub import PubSubHub
+from GUI.actualizaciones import ActualizadorPagina, contar_render
+from GUI.controllers import FilaTabla, GymController, GymState
+from GUI.DTOs import RutinaViewDTO
+from GUI.tables import Tablas
+from infrastructure.metrics import RegistroMetricas, metricas
+
+
+# ========================================
+# FIXTURES
+# ========================================
+
+class _ConexionNula(Connection):
+    """Conexión sin cliente: los parches de la página se descartan, los componentes se montan igual"""
+
+    def send_message(self, message):
+        pass
+
+
+def _sesion() -> Session:
+    conexion = _ConexionNula()
+    conexion.loop = asyncio.get_running_loop()
+    conexion.pubsubhub = PubSubHub(loop=conexion.loop)
+    sesion = Session(conexion)
+    _context_page.set(sesion.page)
+    return sesion
+
+
+def _renders() -> dict:
+    contadores = metricas.snapshot()["contadores"]
+    return {componente: contadores.get(f"ui_render.{componente}", 0) for componente in ("body", "tablas", "celda")}
+
+
+async def _esperar_renders(antes: dict, componente: str, timeout: float = 2.0) -> dict:
+    """Espera a que el planificador de Flet vuelva a pintar 'componente' y devuelve los renders nuevos"""
+    limite = asyncio.get_running_loop().time() + timeout
+    while _renders()[componente] == antes[componente] and asyncio.get_running_loop().time() < limite:
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)  # Lo que viaje en la misma tanda del planificador
+    return {k: v - antes[k] for k, v in _renders().items()}
+
+
+@pytest.fixture
+def estado():
+    """Tabla de rutinas abierta con tres filas"""
+    estado = GymState()
+    dtos = [RutinaViewDTO(id=i, ID=i, Nombre=f"Rutina {i}") for i in (1, 2, 3)]
+    estado.filas = {d.id: FilaTabla(d.id, d) for d in dtos}
+    estado.ids_filas = [d.id for d in dtos]
+    estado.columnas_actuales = {"id": int, "ID": int, "Nombre": str, "QR": str, "Acciones": str}
+    return estado
+
+
+# ========================================
+# TESTS: RENDERIZADO POR FILA
+# ========================================
+
+class TestRenderPorFila:
+    """Tests de las filas observables de la tabla abierta, medidos con contar_render"""
+
+    CELDAS_POR_FILA = 4  # ID, Nombre, QR y Acciones (el id interno no se muestra)
+
+    @staticmethod
+    def _montar(estado: GymState):
+        # Igual que Body en views.py: observa el estado y le pasa ids, filas y columnas a Tablas
+        @ft.component
+        def Body():
+            state, _ = ft.use_state(estado)
+            contar_render("body")
+            return Tablas(ids=state.ids_filas, filas=state.filas, columnas=state.columnas_actuales)
+
+        sesion = _sesion()
+        sesion.page.render(Body)
+        sesion.get_page_patch()  # Lo que hace Flet cuando se conecta el cliente: monta los componentes
+
+    def test_editar_una_fila_pinta_solo_sus_celdas(self, estado):
+        """Test: Reemplazar el dato de una FilaTabla vuelve a pintar sus celdas, no Body ni Tablas"""
+        async def escenario():
+            antes = _renders()
+            self._montar(estado)
+            assert {k: v - antes[k] for k, v in _renders().items()} == {
+                "body": 1, "tablas": 1, "celda": 3 * self.CELDAS_POR_FILA,
+            }
+
+            antes = _renders()
+            fila = estado.filas[2]
+            fila.dato = replace(fila.dato, Nombre="Editada")
+            return await _esperar_renders(antes, "celda")
+
+        assert asyncio.run(escenario()) == {"body": 0, "tablas": 0, "celda": self.CELDAS_POR_FILA}
+
+    def test_un_alta_vuelve_a_pintar_la_tabla(self, estado):
+        """Test: Reasignar los ids (alta, baja o recarga) sí vuelve a pintar Tablas"""
+        async def escenario():
+            self._montar(estado)
+            antes = _renders()
+            dto = RutinaViewDTO(id=4, ID=4, Nombre="Rutina 4")
+            estado.filas[4] = FilaTabla(4, dto)
+            estado.ids_filas = [*estado.ids_filas, 4]
+            return await _esperar_renders(antes, "tablas")
+
+        nuevos = asyncio.run(escenario())
+        assert nuevos["tablas"] == 1
+
+
+# ========================================
+# TESTS: ACTUALIZACIONES POR ACCIÓN
+# ========================================
+
+class _PaginaFalsa:
+    """Lo que ActualizadorPagina usa de ft.Page, contando cada envío"""
+
+    def __init__(self):
+        self.overlay = []
+        self.envios = []  # "update", "show_dialog" o "pop_dialog", en orden
+
+    def update(self):
+        self.envios.append("update")
+
+    def show_dialog(self, dialogo):
+        self.envios.append("show_dialog")
+
+    def pop_dialog(self):
+        self.envios.append("pop_dialog")
+
+
+@pytest.fixture
+def pantalla():
+    metricas_ui = RegistroMetricas()
+    return ActualizadorPagina(metricas_ui), _PaginaFalsa(), metricas_ui
+
+
+class TestActualizadorPagina:
+    """Tests del agrupamiento de page.update() por acción"""
+
+    def test_accion_anidada_un_solo_update(self, pantalla):
+        """Test: Los cambios de una acción y de las anidadas viajan en un único page.update() al final"""
+        actualizador, pagina, metricas_ui = pantalla
+        with actualizador.accion("guardar", pagina):
+            actualizador.refrescar()
+            with actualizador.accion("recargar_tabla"):
+                actualizador.refrescar()
+                actualizador.refrescar()
+            assert pagina.envios == []
+        assert pagina.envios == ["update"]
+        contadores = metricas_ui.snapshot()["contadores"]
+        assert (contadores["ui_acciones.guardar"], contadores["ui_updates.guardar"]) == (1, 1)
+        assert "ui_acciones.recargar_tabla" not in contadores  # La anidada es parte de la externa
+
+    def test_avisos_en_un_solo_snackbar_reutilizado(self, pantalla):
+        """Test: Los avisos de una acción se juntan en un snackbar; las acciones siguientes lo reutilizan"""
+        actualizador, pagina, _ = pantalla
+        with actualizador.accion("guardar", pagina):
+            actualizador.avisar("Guardado", ft.Colors.GREEN_700)
+            actualizador.avisar("No se pudo recargar", ft.Colors.RED_700)
+        snack = pagina.overlay[0]
+        assert snack.content.value == "Guardado\nNo se pudo recargar"
+        assert snack.bgcolor == ft.Colors.RED_700  # Si hay un error, se muestra como error
+        assert pagina.envios == ["update"]
+
+        actualizador.avisar("Otro aviso", ft.Colors.GREEN_700, pagina=pagina)
+        assert pagina.overlay == [snack]
+        assert (snack.content.value, snack.bgcolor) == ("Otro aviso", ft.Colors.GREEN_700)
+        assert pagina.envios == ["update", "update"]
+
+    def test_dialogos_cuentan_como_updates(self, pantalla):
+        """Test: show_dialog/pop_dialog ya actualizan la página: cuentan y se llevan los cambios pendientes"""
+        actualizador, pagina, metricas_ui = pantalla
+        with actualizador.accion("eliminar", pagina):
+            actualizador.refrescar()
+            actualizador.cerrar_dialogo()
+            actualizador.mostrar_dialogo(object())
+        assert pagina.envios == ["pop_dialog", "show_dialog"]
+        assert metricas_ui.snapshot()["contadores"]["ui_updates.eliminar"] == 2
+
+    def test_accion_sin_cambios_no_envia(self, pantalla):
+        """Test: Una acción que no cambió nada no manda ningún update (ni busca la página)"""
+        actualizador, pagina, metricas_ui = pantalla
+        with actualizador.accion("get_tabla"):
+            pass
+        assert pagina.envios == []
+        contadores = metricas_ui.snapshot()["contadores"]
+        assert contadores["ui_acciones.get_tabla"] == 1
+        assert "ui_updates.get_tabla" not in contadores
+
+    def test_fuera_de_una_accion(self, pantalla):
+        """Test: Sin acción en curso cada refresco se envía en el momento y suma a ui_updates.sin_accion"""
+        actualizador, pagina, metricas_ui = pantalla
+        actualizador.refrescar(pagina=pagina)
+        actualizador.refrescar(pagina=pagina)
+        assert pagina.envios == ["update", "update"]
+        assert metricas_ui.snapshot()["contadores"]["ui_updates.sin_accion"] == 2
+
+    def test_la_accion_que_falla_igual_avisa(self, pantalla):
+        """Test: Si la acción lanza una excepción, los avisos encolados llegan igual a la pantalla"""
+        actualizador, pagina, _ = pantalla
+        with pytest.raises(RuntimeError):
+            with actualizador.accion("guardar", pagina):
+                actualizador.avisar("Error al guardar", ft.Colors.RED_700)
+                raise RuntimeError("falla")
+        assert pagina.overlay[0].content.value == "Error al guardar"
+        assert pagina.envios == ["update"]
+
+
+# ========================================
+# TESTS: AVISOS DE ERROR DEL CONTROLADOR
+# ========================================
+
+class _ServicioQueFalla:
+    def clientes_por_vencer(self, **kwargs):
+        raise RuntimeError("base no disponible")
+
+    def tablero(self, **kwargs):
+        raise RuntimeError("base no disponible")
+
+
+class TestAvisosDeError:
+    """Tests de los errores de carga de los paneles: llegan al usuario en el snackbar, no solo a la consola"""
+
+    @pytest.mark.parametrize("cargar", ["GetVencimientos", "GetEstadisticas"])
+    def test_panel_que_no_carga_avisa(self, cargar):
+        """Test: Si el servicio falla, el panel queda vacío y se muestra el error en rojo"""
+        controlador = GymController(GymState())
+        controlador.pantalla = ActualizadorPagina(RegistroMetricas())
+        pagina = _PaginaFalsa()
+        with controlador.pantalla.accion("abrir_panel", pagina):
+            getattr(controlador, cargar)(_ServicioQueFalla())
+        snack = pagina.overlay[0]
+        assert "base no disponible" in snack.content.value
+        assert snack.bgcolor == ft.Colors.RED_700
+        assert pagina.envios == ["update"]
@@ -0,0 +1,1912 @@
+"""
+Tests de integración de la capa de Infraestructura (SQLite real)
+
+Estos tests verifican:
+1. CRUD del SQLite3Repository contra una base temporal
+2. Instrumentación: histogramas, consultas lentas y snapshot
+3. Esquema generado desde el registro de metadatos y migraciones
+4. Consultas indexadas de reportes (vencimientos)
+5. Rotación masiva de ciclos de rutina
+6. Asistencias: escritor en lotes y tabla de solo inserción
+7. Estadísticas desde tablas de resumen mantenidas por triggers
+8. Cupo de instructores con contador mantenido por triggers
+9. Libro de pagos con saldo acumulado por triggers
+10. Referencias: vista previa y reasignación antes de borrar
+11. Importación/exportación CSV en lotes
+12. Copias de seguridad en caliente y restauración
+13. Mantenimiento automático: optimize, ANALYZE y vacuum incremental
+14. Detección de cambios entre estaciones (data_version y tabla de cambios)
+15. Concurrencia: conexión por hilo, escritor serializado y lectores en paralelo (WAL)
+16. Reintentos con backoff cuando otra estación tiene la base bloqueada
+17. Concurrencia optimista: versión por fila y conflictos de edición
+18. Actualizaciones parciales: solo las columnas modificadas
+19. Ajustes (config.json): escritura diferida, atómica y sin reescrituras inútiles
+20. Varias sesiones (modo web): servicio compartido, caché de catálogos y avisos de cambios por sesión
+21. API HTTP local: páginas por cursor, ETag/304, errores y check-in desde los kioscos
+"""
+
+import asyncio
+import http.client
+import io
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+from api import ServidorAPI
+from application.services import GymService
+from domain.campos import modificados
+from domain.entities import Asistencia, Cliente, Instructor, Pago, Rutina
+from domain.rotacion import ReglaRotacion, mapa_siguiente
+from domain.exceptions import (
+    CupoExcedidoError, EntidadNoValidaError, EstadoFinancieroError, NegocioError, PersistenciaError, ReferenciaEnUso, RegistroNoEncontrado,
+    BaseOcupadaError, ConflictoEdicionError, RequisitoClienteInstructorError, RespaldoError,
+)
+from infrastructure.ajustes import AlmacenAjustes
+from infrastructure.asistencias import EscritorAsistencias
+from infrastructure.cambios import VigilanteCambios
+from infrastructure.catalogos import CacheCatalogos
+from infrastructure.db_conn import DatabaseConnection
+from infrastructure.esquema import migrar, reconstruir_resumenes, sentencia_update
+from infrastructure.mantenimiento import MantenimientoProgramado
+from infrastructure.metrics import Histograma, RegistroMetricas
+from infrastructure.reintentos import PoliticaReintentos, es_bloqueo
+from infrastructure.respaldos import GestorRespaldos
+from infrastructure.sqlite3_repo import SQLite3Repository
+
+
+# ========================================
+# FIXTURES (Base SQLite temporal)
+# ========================================
+
+@pytest.fixture
+def metricas():
+    """Registro de métricas propio de cada test"""
+    return RegistroMetricas(umbral_lento_ms=10_000)
+
+
+@pytest.fixture
+def db(tmp_path, metricas):
+    """Base SQLite inicializada en una carpeta temporal"""
+    conexion = DatabaseConnection(str(tmp_path / "test.db"), metricas=metricas)
+    conexion.init_db()
+    return conexion
+
+
+@pytest.fixture
+def repo(db):
+    return SQLite3Repository(db)
+
+
+@pytest.fixture
+def repo_con_datos(repo):
+    """Repositorio con un instructor, una rutina y un cliente cargados"""
+    repo.add(Instructor(id=0, nombre="Juan", apellido="Pérez"))
+    repo.add(Rutina(id=0, nombre="Pierna", pdf_link="pierna.pdf"))
+    repo.add(Cliente(
+        id=0, nombre="María", apellido="González",
+        fecha_inicio_rutina="2026-01-01", fecha_fin_rutina="2026-02-01",
+        instructor_id=1, rutina_id=1,
+    ))
+    return repo
+
+
+# ========================================
+# TESTS: CRUD DEL REPOSITORIO
+# ========================================
+
+class TestRepositorioCRUD:
+    """Tests del repositorio contra SQLite real"""
+
+    def test_add_y_get_by_id(self, repo_con_datos):
+        """Test: Lo que se inserta se puede leer por ID"""
+        cliente = repo_con_datos.get_by_id(1, Cliente)
+        assert cliente.nombre == "María"
+        assert cliente.instructor_id == 1
+
+    def test_get_by_id_inexistente_devuelve_none(self, repo):
+        """Test: Un ID que no existe devuelve None"""
+        assert repo.get_by_id(99, Rutina) is None
+
+    def test_update(self, repo_con_datos):
+        """Test: Update persiste los cambios"""
+        cliente = repo_con_datos.get_by_id(1, Cliente)
+        cliente.ciclo_rutina = 3
+        repo_con_datos.update(cliente)
+        assert repo_con_datos.get_by_id(1, Cliente).ciclo_rutina == 3
+
+    def test_update_inexistente(self, repo):
+        """Test: Actualizar un ID inexistente lanza RegistroNoEncontrado"""
+        with pytest.raises(RegistroNoEncontrado):
+            repo.update(Rutina(id=99, nombre="X", pdf_link="x.pdf"))
+
+    def test_delete_con_referencias_lanza_referencia_en_uso(self, repo_con_datos):
+        """Test: No se puede borrar un instructor asignado a un cliente (FK)"""
+        with pytest.raises(ReferenciaEnUso):
+            repo_con_datos.delete(Instructor(id=1, nombre="Juan", apellido="Pérez"))
+
+    def test_get_all(self, repo_con_datos):
+        """Test: get_all devuelve todas las filas como entidades"""
+        assert [c.id for c in repo_con_datos.get_all(Cliente)] == [1]
+
+
+# ========================================
+# TESTS: INSTRUMENTACIÓN
+# ========================================
+
+class TestMetricas:
+    """Tests de la instrumentación del repositorio"""
+
+    def test_histograma_percentiles(self):
+        """Test: Los percentiles caen en el bucket correcto"""
+        h = Histograma()
+        for _ in range(99):
+            h.observar(0.3)
+        h.observar(40)
+        assert h.total == 100
+        assert h.percentil(50) == 0.5
+        assert h.percentil(100) == 40
+
+    def test_snapshot_registra_consultas_y_metodos(self, repo_con_datos, metricas):
+        """Test: Cada operación queda registrada por consulta, por método y por conexión"""
+        repo_con_datos.get_all(Cliente)
+        snap = metricas.snapshot()
+
+        select_cliente = next(c for c in snap["consultas"] if c["entidad"] == "cliente" and c["query"].lower().startswith("select"))
+        assert select_cliente["n"] == 1
+        assert select_cliente["filas"] == 1
+        assert snap["metodos"]["add"]["n"] == 3
+        assert snap["metodos"]["get_all"]["n"] == 1
+        assert snap["espera_conexion"]["n"] >= 4
+
+    def test_errores_se_cuentan(self, repo, metricas):
+        """Test: Las excepciones del repositorio suman en el contador de errores"""
+        with pytest.raises(RegistroNoEncontrado):
+            repo.update(Rutina(id=99, nombre="X", pdf_link="x.pdf"))
+        assert metricas.snapshot()["errores"]["update"] == 1
+
+    def test_consulta_lenta_guarda_plan(self, repo_con_datos, metricas):
+        """Test: Con umbral 0 toda consulta es lenta y se guarda su EXPLAIN QUERY PLAN"""
+        metricas.umbral_lento_ms = 0
+        repo_con_datos.get_by_id(1, Cliente)
+        lenta = metricas.snapshot()["consultas_lentas"][-1]
+        assert lenta["entidad"] == "cliente"
+        assert any("cliente" in paso for paso in lenta["plan"])
+
+    def test_reiniciar(self, repo_con_datos, metricas):
+        """Test: reiniciar() deja todas las métricas en cero"""
+        metricas.reiniciar()
+        snap = metricas.snapshot()
+        assert snap["consultas"] == [] and snap["metodos"] == {}
+
+
+# ========================================
+# TESTS: ESQUEMA Y MIGRACIONES
+# ========================================
+
+class TestEsquema:
+    """Tests del esquema generado desde domain.metadata"""
+
+    def test_tablas_creadas_con_fk(self, db):
+        """Test: init_db crea las tablas y las FK inferidas por el sufijo _id"""
+        conn = sqlite3.connect(db.db_path)
+        fks = {(fila[3], fila[2]) for fila in conn.execute("pragma foreign_key_list(cliente)")}
+        conn.close()
+        assert fks == {("instructor_id", "instructor"), ("rutina_id", "rutina")}
+
+    def test_migrar_es_idempotente(self, db):
+        """Test: Correr la migración sobre una base al día no cambia nada"""
+        conn = sqlite3.connect(db.db_path)
+        assert migrar(conn) == []
+        conn.close()
+
+    def test_migrar_agrega_columnas_faltantes(self, tmp_path):
+        """Test: Si a una tabla vieja le falta una columna, se agrega con su default"""
+        conn = sqlite3.connect(str(tmp_path / "vieja.db"))
+        conn.execute("create table rutina (id integer primary key autoincrement, nombre text not null)")
+        conn.execute("insert into rutina (nombre) values ('Pierna')")
+        cambios = migrar(conn)
+        assert any("add column pdf_link" in c for c in cambios)
+        assert conn.execute("select pdf_link from rutina").fetchone() == ("",)
+        conn.close()
+
+    def test_migracion_normaliza_fechas_viejas(self, tmp_path):
+        """Test: Las fechas guardadas como DD-MM-YYYY pasan a ISO una sola vez"""
+        conn = sqlite3.connect(str(tmp_path / "vieja.db"))
+        migrar(conn)
+        conn.execute("pragma user_version = 0")
+        conn.execute("insert into instructor (nombre, apellido) values ('Juan', 'Pérez')")
+        conn.execute("insert into rutina (nombre, pdf_link) values ('Pierna', 'p.pdf')")
+        conn.execute(
+            "insert into cliente (nombre, apellido, fecha_inicio_rutina, fecha_fin_rutina, instructor_id, rutina_id) "
+            "values ('Ana', 'Gómez', '05-01-2026', '2026-02-05', 1, 1)"
+        )
+        cambios = migrar(conn)
+        assert any("_normalizar_fechas_iso" in c for c in cambios)
+        assert conn.execute("select fecha_inicio_rutina, fecha_fin_rutina from cliente").fetchone() == ("2026-01-05", "2026-02-05")
+        assert migrar(conn) == []
+        conn.close()
+
+    def test_migrar_reemplaza_triggers_viejos(self, db):
+        """Test: Un trigger con la definición de una versión anterior se reemplaza por la actual"""
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("drop trigger carga_instructor_delete")
+        conn.execute("create trigger carga_instructor_delete after delete on cliente begin select 1; end")
+        assert [c for c in migrar(conn) if "carga_instructor_delete" in c]
+        assert migrar(conn) == []
+        conn.close()
+
+
+# ========================================
+# TESTS: VENCIMIENTOS
+# ========================================
+
+@pytest.fixture
+def repo_vencimientos(repo):
+    """Un instructor, una rutina y clientes que vencen en fechas distintas (desordenados a propósito)"""
+    repo.add(Instructor(id=0, nombre="Juan", apellido="Pérez"))
+    repo.add(Rutina(id=0, nombre="Pierna", pdf_link="pierna.pdf"))
+    for nombre, fin in [("C", "2026-03-20"), ("A", "2026-03-02"), ("Vencido", "2026-02-27"), ("B", "2026-03-05"), ("Lejano", "2026-06-01")]:
+        repo.add(Cliente(
+            id=0, nombre=nombre, apellido="Test",
+            fecha_inicio_rutina="2026-01-01", fecha_fin_rutina=fin,
+            instructor_id=1, rutina_id=1,
+        ))
+    return repo
+
+
+class TestVencimientos:
+    """Tests de la consulta de rutinas por vencer"""
+
+    HOY = date(2026, 3, 1)
+
+    def test_ventana_ordenada_por_fecha(self, repo_vencimientos):
+        """Test: Solo entran los que vencen dentro de la ventana, los más próximos primero"""
+        servicio = GymService(repo_vencimientos)
+        vencimientos = servicio.clientes_por_vencer(dias=7, hoy=self.HOY)
+        assert [v.nombre_cliente for v in vencimientos] == ["A Test", "B Test"]
+        assert vencimientos[0].rutina == "Pierna"
+        assert vencimientos[0].instructor == "Juan Pérez"
+
+    def test_incluir_vencidos_y_limite(self, repo_vencimientos):
+        """Test: incluir_vencidos agrega los ya vencidos y el límite corta la lista"""
+        servicio = GymService(repo_vencimientos)
+        vencimientos = servicio.clientes_por_vencer(dias=30, limite=2, hoy=self.HOY, incluir_vencidos=True)
+        assert [v.nombre_cliente for v in vencimientos] == ["Vencido Test", "A Test"]
+
+    def test_parametros_invalidos(self, repo):
+        """Test: Días negativos o límite 0 son un error de negocio"""
+        with pytest.raises(NegocioError):
+            GymService(repo).clientes_por_vencer(dias=-1)
+        with pytest.raises(NegocioError):
+            GymService(repo).clientes_por_vencer(limite=0)
+
+    def test_consulta_usa_indice(self, repo_vencimientos, metricas):
+        """Test: El plan de la consulta busca por idx_cliente_fecha_fin (no recorre la tabla)"""
+        metricas.umbral_lento_ms = 0
+        repo_vencimientos.get_vencimientos("2026-03-01", "2026-03-08", 10)
+        plan = " ".join(metricas.snapshot()["consultas_lentas"][-1]["plan"])
+        assert "idx_cliente_fecha_fin" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+# ========================================
+# TESTS: ROTACIÓN DE CICLOS
+# ========================================
+
+@pytest.fixture
+def repo_rotacion(repo):
+    """Dos rutinas y tres clientes: dos vencidos (ciclos 1 y 3) y uno vigente"""
+    repo.add(Instructor(id=0, nombre="Juan", apellido="Pérez"))
+    repo.add(Rutina(id=0, nombre="Pierna", pdf_link="pierna.pdf"))
+    repo.add(Rutina(id=0, nombre="Torso", pdf_link="torso.pdf"))
+    for nombre, inicio, fin, ciclo in [
+        ("Ciclo1", "2026-01-01", "2026-01-29", 1),
+        ("Ciclo3", "2026-01-01", "2026-02-26", 3),
+        ("Vigente", "2026-02-20", "2026-03-20", 1),
+    ]:
+        repo.add(Cliente(
+            id=0, nombre=nombre, apellido="Test",
+            fecha_inicio_rutina=inicio, fecha_fin_rutina=fin,
+            instructor_id=1, rutina_id=1, ciclo_rutina=ciclo,
+        ))
+    return repo
+
+
+class TestRotacion:
+    """Tests de GymService.rotar_ciclos contra SQLite real"""
+
+    HOY = date(2026, 3, 1)
+
+    def test_mapa_siguiente_da_la_vuelta(self):
+        """Test: Cada rutina pasa a la siguiente y la última vuelve a la primera"""
+        assert mapa_siguiente([3, 1, 2]) == {1: 2, 2: 3, 3: 1}
+        assert mapa_siguiente([5]) == {}
+
+    def test_reglas_por_defecto(self, repo_rotacion):
+        """Test: Ciclo 1 avanza con la misma rutina; ciclo 3 vuelve a 1 con la rutina siguiente"""
+        resultado = GymService(repo_rotacion).rotar_ciclos(hoy=self.HOY)
+        assert resultado.total == 2
+
+        ciclo1 = repo_rotacion.get_by_id(1, Cliente)
+        assert (ciclo1.ciclo_rutina, ciclo1.rutina_id) == (2, 1)
+        # Conserva la duración anterior (28 días) a partir de hoy
+        assert (ciclo1.fecha_inicio_rutina, ciclo1.fecha_fin_rutina) == ("2026-03-01", "2026-03-29")
+
+        ciclo3 = repo_rotacion.get_by_id(2, Cliente)
+        assert (ciclo3.ciclo_rutina, ciclo3.rutina_id) == (1, 2)
+
+        vigente = repo_rotacion.get_by_id(3, Cliente)
+        assert (vigente.ciclo_rutina, vigente.fecha_fin_rutina) == (1, "2026-03-20")
+
+    def test_simulacion_no_guarda(self, repo_rotacion):
+        """Test: El dry-run informa lo mismo que la rotación real pero no cambia nada"""
+        servicio = GymService(repo_rotacion)
+        simulacion = servicio.rotar_ciclos(hoy=self.HOY, simular=True)
+        assert simulacion.simulado
+        assert repo_rotacion.get_by_id(1, Cliente).ciclo_rutina == 1
+
+        real = servicio.rotar_ciclos(hoy=self.HOY)
+        assert [(r.regla, r.clientes, r.por_rutina) for r in simulacion.reglas] == \
+               [(r.regla, r.clientes, r.por_rutina) for r in real.reglas]
+
+    def test_regla_con_duracion_fija(self, repo_rotacion):
+        """Test: Una regla con duracion_dias fija la nueva fecha de fin"""
+        regla = ReglaRotacion(nombre="Semanal", duracion_dias=7)
+        GymService(repo_rotacion).rotar_ciclos(reglas=[regla], hoy=self.HOY)
+        assert repo_rotacion.get_by_id(2, Cliente).fecha_fin_rutina == "2026-03-08"
+
+    def test_regla_con_rutina_inexistente(self, repo_rotacion):
+        """Test: No se puede rotar hacia una rutina que no existe"""
+        regla = ReglaRotacion(nombre="Rota", mapa_rutinas={1: 99})
+        with pytest.raises(NegocioError):
+            GymService(repo_rotacion).rotar_ciclos(reglas=[regla], hoy=self.HOY)
+
+
+# ========================================
+# TESTS: ASISTENCIAS
+# ========================================
+
+def _contar_asistencias(db) -> int:
+    conn = sqlite3.connect(db.db_path)
+    cantidad = conn.execute("select count(*) from asistencia").fetchone()[0]
+    conn.close()
+    return cantidad
+
+
+class TestAsistencias:
+    """Tests del escritor en lotes de asistencias"""
+
+    def test_flush_por_tamano(self, repo_con_datos, db, metricas):
+        """Test: Al llenar el lote se guarda sin esperar el intervalo, en pocos commits"""
+        escritor = EscritorAsistencias(db, tamano_lote=10, intervalo_s=60)
+        for _ in range(25):
+            escritor.registrar(Asistencia(id=0, cliente_id=1))
+        escritor.flush(timeout=5)
+        escritor.cerrar()
+        assert _contar_asistencias(db) == 25
+        assert metricas.snapshot()["contadores"]["lotes_asistencias"] <= 3
+
+    def test_flush_por_tiempo(self, repo_con_datos, db):
+        """Test: Con menos asistencias que el lote, se guardan al vencer el intervalo"""
+        escritor = EscritorAsistencias(db, tamano_lote=1000, intervalo_s=0.05)
+        escritor.registrar(Asistencia(id=0, cliente_id=1))
+        limite = time.monotonic() + 5
+        while _contar_asistencias(db) == 0 and time.monotonic() < limite:
+            time.sleep(0.01)
+        escritor.cerrar()
+        assert _contar_asistencias(db) == 1
+
+    def test_cerrar_guarda_pendientes(self, repo_con_datos, db):
+        """Test: cerrar() guarda lo encolado y después no acepta más"""
+        escritor = EscritorAsistencias(db, tamano_lote=1000, intervalo_s=60)
+        escritor.registrar(Asistencia(id=0, cliente_id=1))
+        escritor.cerrar()
+        assert _contar_asistencias(db) == 1
+        with pytest.raises(RuntimeError):
+            escritor.registrar(Asistencia(id=0, cliente_id=1))
+
+    def test_cliente_inexistente_no_tira_el_lote(self, repo_con_datos, db, metricas):
+        """Test: Una asistencia con cliente inválido se descarta y las demás se guardan"""
+        escritor = EscritorAsistencias(db, tamano_lote=1000, intervalo_s=60)
+        for cliente_id in (1, 99, 1):
+            escritor.registrar(Asistencia(id=0, cliente_id=cliente_id))
+        escritor.cerrar()
+        assert _contar_asistencias(db) == 2
+        assert metricas.snapshot()["contadores"]["asistencias_descartadas"] == 1
+
+    def test_falla_del_reintento_de_a_una_no_mata_el_hilo(self, repo_con_datos, db, metricas, monkeypatch):
+        """Test: Si el guardado de a una también falla (disco, base ocupada) el lote se descarta y el hilo sigue"""
+        escritor = EscritorAsistencias(db, tamano_lote=1000, intervalo_s=60, reintentos=PoliticaReintentos(intentos=0))
+        conexion_real = db.get_connection
+        llamadas = []
+
+        def conexion(*args, **kwargs):
+            llamadas.append(1)
+            if len(llamadas) == 2:  # La del guardado de a una, después del IntegrityError del lote
+                raise sqlite3.OperationalError("disk I/O error")
+            return conexion_real(*args, **kwargs)
+
+        monkeypatch.setattr(db, "get_connection", conexion)
+        for cliente_id in (1, 99):
+            escritor.registrar(Asistencia(id=0, cliente_id=cliente_id))
+        assert escritor.flush(timeout=5)
+        assert escritor._hilo.is_alive()
+        assert metricas.snapshot()["contadores"]["asistencias_descartadas"] == 2
+
+        escritor.registrar(Asistencia(id=0, cliente_id=1))
+        escritor.cerrar()
+        assert _contar_asistencias(db) == 1
+
+    def test_error_inesperado_no_mata_el_hilo(self, repo_con_datos, db, metricas, monkeypatch):
+        """Test: Una excepción no prevista al guardar se registra y el hilo sigue guardando los check-ins siguientes"""
+        escritor = EscritorAsistencias(db, tamano_lote=1000, intervalo_s=60)
+        guardar_real = escritor._guardar
+
+        def falla(lote):
+            raise RuntimeError("inesperado")
+
+        monkeypatch.setattr(escritor, "_guardar", falla)
+        escritor.registrar(Asistencia(id=0, cliente_id=1))
+        assert escritor.flush(timeout=5)
+
+        monkeypatch.setattr(escritor, "_guardar", guardar_real)
+        escritor.registrar(Asistencia(id=0, cliente_id=1))
+        escritor.cerrar()
+        assert _contar_asistencias(db) == 1
+        assert metricas.snapshot()["contadores"]["asistencias_descartadas"] == 1
+
+    def test_tabla_de_solo_insercion(self, repo_con_datos):
+        """Test: Las asistencias no se pueden editar ni borrar"""
+        repo_con_datos.add(Asistencia(id=0, cliente_id=1, fecha_hora="2026-03-01 08:00:00"))
+        asistencia = repo_con_datos.get_by_id(1, Asistencia)
+        with pytest.raises(PersistenciaError):
+            repo_con_datos.update(asistencia)
+        with pytest.raises(PersistenciaError):
+            repo_con_datos.delete(asistencia)
+
+    def test_servicio_encola_en_el_escritor(self, repo_con_datos, db):
+        """Test: Con escritor inyectado, registrar_asistencia no escribe en el momento"""
+        escritor = EscritorAsistencias(db, tamano_lote=1000, intervalo_s=60)
+        GymService(repo_con_datos, registro_asistencias=escritor).registrar_asistencia(1)
+        assert _contar_asistencias(db) == 0
+        escritor.flush(timeout=5)
+        escritor.cerrar()
+        assert _contar_asistencias(db) == 1
+
+
+# ========================================
+# TESTS: ESTADÍSTICAS (RESÚMENES)
+# ========================================
+
+@pytest.fixture
+def repo_estadisticas(repo_con_datos):
+    """Cliente 1 (instructor 1, rutina 1) con check-ins en dos días y dos horas distintas"""
+    repo_con_datos.add(Instructor(id=0, nombre="Ana", apellido="Sosa"))
+    for fecha_hora in ("2026-03-02 08:10:00", "2026-03-02 08:40:00", "2026-03-02 19:00:00", "2026-03-10 08:05:00"):
+        repo_con_datos.add(Asistencia(id=0, cliente_id=1, fecha_hora=fecha_hora))
+    return repo_con_datos
+
+
+def _leer_resumen(db, tabla: str) -> list:
+    conn = sqlite3.connect(db.db_path)
+    filas = conn.execute(f"select * from {tabla} order by 1, 2").fetchall()
+    conn.close()
+    return filas
+
+
+class TestEstadisticas:
+    """Tests de los resúmenes (rollups) y las consultas del tablero"""
+
+    HOY = date(2026, 3, 10)
+
+    def test_trigger_de_asistencia_suma_en_el_bucket(self, repo_estadisticas, db):
+        """Test: Cada check-in suma 1 en su (día, hora, instructor, rutina)"""
+        assert _leer_resumen(db, "resumen_asistencia") == [
+            ("2026-03-02", 8, 1, 1, 2),
+            ("2026-03-02", 19, 1, 1, 1),
+            ("2026-03-10", 8, 1, 1, 1),
+        ]
+
+    def test_triggers_de_cliente(self, repo_estadisticas, db):
+        """Test: Cambiar de instructor mueve al cliente de bucket; borrar lo descuenta"""
+        cliente = repo_estadisticas.get_by_id(1, Cliente)
+        cliente.instructor_id = 2
+        repo_estadisticas.update(cliente)
+        assert _leer_resumen(db, "resumen_cliente") == [(1, 1, 0), (2, 1, 1)]
+
+        repo_estadisticas.add(Cliente(
+            id=0, nombre="Leo", apellido="Paz", fecha_inicio_rutina="2026-01-01",
+            fecha_fin_rutina="2026-02-01", instructor_id=2, rutina_id=1,
+        ))
+        repo_estadisticas.delete(repo_estadisticas.get_by_id(2, Cliente))
+        assert _leer_resumen(db, "resumen_cliente") == [(1, 1, 0), (2, 1, 1)]
+
+    def test_reconstruir_coincide_con_los_triggers(self, repo_estadisticas, db):
+        """Test: Recalcular desde cero da lo mismo que el mantenimiento incremental"""
+        antes = _leer_resumen(db, "resumen_asistencia")
+        conn = sqlite3.connect(db.db_path)
+        reconstruir_resumenes(conn)
+        conn.commit()
+        conn.close()
+        assert _leer_resumen(db, "resumen_asistencia") == antes
+
+    def test_tablero(self, repo_estadisticas):
+        """Test: El tablero agrupa por día, semana, hora, instructor y rutina"""
+        tablero = GymService(repo_estadisticas).tablero(dias=30, hoy=self.HOY)
+        assert tablero.total_asistencias == 4
+        assert [(c.periodo, c.asistencias) for c in tablero.por_dia] == [("2026-03-02", 3), ("2026-03-10", 1)]
+        assert [(c.periodo, c.asistencias) for c in tablero.por_semana] == [("2026-W10", 3), ("2026-W11", 1)]
+        assert [(c.periodo, c.asistencias) for c in tablero.por_hora] == [("08", 3), ("19", 1)]
+        assert [(c.instructor, c.clientes, c.asistencias) for c in tablero.por_instructor] == \
+               [("Juan Pérez", 1, 4), ("Ana Sosa", 0, 0)]
+        assert (tablero.por_rutina[0].rutina, tablero.por_rutina[0].asistencias) == ("Pierna", 4)
+
+    def test_periodo_filtra_por_dia(self, repo_estadisticas):
+        """Test: Con un período de 1 día solo cuenta el día de hoy; la hora pico sale primero"""
+        servicio = GymService(repo_estadisticas)
+        assert [c.asistencias for c in servicio.asistencias_por_dia(dias=1, hoy=self.HOY)] == [1]
+        assert servicio.horas_pico(dias=30, hoy=self.HOY, top=1)[0].periodo == "08"
+        with pytest.raises(NegocioError):
+            servicio.asistencias_por_dia(dias=0)
+
+
+# ========================================
+# TESTS: CUPO DE INSTRUCTORES
+# ========================================
+
+def _nuevo_cliente(instructor_id: int, nombre: str = "Nuevo") -> Cliente:
+    return Cliente(
+        id=0, nombre=nombre, apellido="Test", fecha_inicio_rutina="2026-01-01",
+        fecha_fin_rutina="2026-02-01", instructor_id=instructor_id, rutina_id=1,
+    )
+
+
+@pytest.fixture
+def servicio_cupos(repo_con_datos):
+    """Instructor 1 (cupo 30, 1 cliente) e instructor 2 con cupo 1 y sin clientes"""
+    repo_con_datos.add(Instructor(id=0, nombre="Ana", apellido="Sosa", cupo=1))
+    return GymService(repo_con_datos)
+
+
+class TestCupoInstructores:
+    """Tests del cupo por instructor"""
+
+    def test_contador_sigue_altas_bajas_y_cambios(self, servicio_cupos):
+        """Test: clientes_asignados acompaña los insert, update de instructor y delete"""
+        servicio_cupos.añadir(_nuevo_cliente(1))
+        assert servicio_cupos.repositorio.get_carga_instructor(1).clientes == 2
+
+        cliente = servicio_cupos.buscar_por_id(Cliente, 2)
+        cliente.instructor_id = 2
+        servicio_cupos.actualizar(cliente)
+        assert [c.clientes for c in servicio_cupos.cargas_instructores()] == [1, 1]
+
+        servicio_cupos.eliminar(cliente)
+        assert [c.clientes for c in servicio_cupos.cargas_instructores()] == [1, 0]
+
+    def test_añadir_con_cupo_completo(self, servicio_cupos):
+        """Test: No se puede asignar un cliente a un instructor sin cupo libre"""
+        servicio_cupos.añadir(_nuevo_cliente(2))
+        with pytest.raises(CupoExcedidoError):
+            servicio_cupos.añadir(_nuevo_cliente(2, nombre="Otro"))
+
+    def test_actualizar_sin_cambiar_instructor_no_valida_cupo(self, servicio_cupos):
+        """Test: Editar otros datos de un cliente de un instructor completo está permitido"""
+        servicio_cupos.añadir(_nuevo_cliente(2))
+        cliente = servicio_cupos.buscar_por_id(Cliente, 2)
+        cliente.nombre = "Editado"
+        servicio_cupos.actualizar(cliente)
+
+        cliente_1 = servicio_cupos.buscar_por_id(Cliente, 1)
+        cliente_1.instructor_id = 2
+        with pytest.raises(CupoExcedidoError):
+            servicio_cupos.actualizar(cliente_1)
+
+    def test_cupo_menor_a_la_carga(self, servicio_cupos):
+        """Test: No se puede bajar el cupo por debajo de los clientes ya asignados"""
+        servicio_cupos.añadir(_nuevo_cliente(1))
+        with pytest.raises(CupoExcedidoError):
+            servicio_cupos.actualizar(Instructor(id=1, nombre="Juan", apellido="Pérez", cupo=1))
+        with pytest.raises(NegocioError):
+            servicio_cupos.añadir(Instructor(id=0, nombre="Sin", apellido="Cupo", cupo=0))
+
+    def test_instructor_inexistente(self, servicio_cupos):
+        """Test: Asignar un instructor que no existe lanza RequisitoClienteInstructorError"""
+        with pytest.raises(RequisitoClienteInstructorError):
+            servicio_cupos.añadir(_nuevo_cliente(99))
+
+    def test_altas_concurrentes_no_superan_el_cupo(self, servicio_cupos, repo):
+        """Test: 8 sesiones que agregan a la vez a un instructor de cupo 2: entran 2, el resto CupoExcedidoError"""
+        repo.update(Instructor(id=2, nombre="Ana", apellido="Sosa", cupo=2))
+        barrera = threading.Barrier(8)
+
+        def agregar(n):
+            barrera.wait()
+            try:
+                servicio_cupos.añadir(_nuevo_cliente(2, nombre=f"Concurrente {n}"))
+                return "ok"
+            except CupoExcedidoError:
+                return "cupo"
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            resultados = list(pool.map(agregar, range(8)))
+        assert sorted(resultados) == ["cupo"] * 6 + ["ok"] * 2
+        assert repo.get_carga_instructor(2).clientes == 2
+
+    def test_el_trigger_valida_aunque_no_pase_por_el_servicio(self, servicio_cupos, repo):
+        """Test: El repositorio solo (sin el chequeo previo del servicio) tampoco se pasa del cupo"""
+        repo.add(_nuevo_cliente(2))
+        with pytest.raises(CupoExcedidoError):
+            repo.add(_nuevo_cliente(2, nombre="Otro"))
+        with pytest.raises(CupoExcedidoError):
+            repo.update_fields(replace(repo.get_by_id(1, Cliente), instructor_id=2), ["instructor_id"])
+        assert [c.clientes for c in repo.get_cargas_instructores()] == [1, 1]
+
+    def test_propone_el_de_menos_carga(self, servicio_cupos):
+        """Test: Se propone el instructor con menos clientes que todavía tiene cupo"""
+        assert servicio_cupos.proponer_instructor().instructor_id == 2
+        servicio_cupos.añadir(_nuevo_cliente(2))
+        # El 2 quedó completo: se propone el 1 aunque tenga más clientes
+        assert servicio_cupos.proponer_instructor().instructor_id == 1
+
+
+# ========================================
+# TESTS: PAGOS Y ESTADO DE CUENTA
+# ========================================
+
+@pytest.fixture
+def servicio_pagos(repo_con_datos):
+    """Cliente 1 con dos cuotas de $100 (vencen 10/01 y 10/02) y una segunda rutina disponible"""
+    repo_con_datos.add(Rutina(id=0, nombre="Torso", pdf_link="torso.pdf"))
+    servicio = GymService(repo_con_datos)
+    servicio.registrar_cargo(1, 100, vencimiento=date(2026, 1, 10), fecha=date(2026, 1, 1))
+    servicio.registrar_cargo(1, 100, vencimiento=date(2026, 2, 10), fecha=date(2026, 2, 1))
+    return servicio
+
+
+class TestPagos:
+    """Tests del libro de pagos y el saldo por cliente"""
+
+    HOY = date(2026, 2, 15)
+
+    def test_saldo_y_deuda_mas_vieja(self, servicio_pagos):
+        """Test: Los pagos cubren primero la cuota más vieja; vence_deuda avanza a la siguiente impaga"""
+        assert servicio_pagos.estado_cuenta(1).vence_deuda == "2026-01-10"
+        servicio_pagos.registrar_pago(1, 150, fecha=date(2026, 2, 12))
+
+        estado = servicio_pagos.estado_cuenta(1)
+        assert (estado.cargos, estado.pagos, estado.saldo) == (200, 150, 50)
+        assert estado.vence_deuda == "2026-02-10"
+        assert estado.moroso(self.HOY.isoformat())
+
+        servicio_pagos.registrar_pago(1, 50, fecha=date(2026, 2, 14))
+        assert servicio_pagos.estado_cuenta(1).vence_deuda is None
+
+    def test_morosos(self, servicio_pagos):
+        """Test: Solo figuran los clientes con cuotas vencidas impagas, los de deuda más vieja primero"""
+        servicio_pagos.añadir(_nuevo_cliente(1, nombre="AlDia"))
+        servicio_pagos.registrar_cargo(2, 80, vencimiento=date(2026, 3, 1))
+
+        morosos = servicio_pagos.morosos(hoy=self.HOY)
+        assert [(d.cliente_id, d.saldo, d.vence_deuda) for d in morosos] == [(1, 200, "2026-01-10")]
+        assert servicio_pagos.morosos(hoy=date(2026, 1, 5)) == []
+        assert servicio_pagos.estado_cuenta(3).saldo == 0  # Sin movimientos
+
+    def test_libro_de_solo_insercion(self, servicio_pagos, db):
+        """Test: Los movimientos no se editan ni se borran; los montos inválidos se rechazan"""
+        with db.get_connection() as conn:
+            with pytest.raises(sqlite3.IntegrityError):
+                conn.execute("update pago set monto = 0")
+            with pytest.raises(sqlite3.IntegrityError):
+                conn.execute("delete from pago")
+        with pytest.raises(NegocioError):
+            servicio_pagos.registrar_pago(1, 0)
+        with pytest.raises(RegistroNoEncontrado):
+            servicio_pagos.registrar_pago(99, 10)
+
+    def test_moroso_no_puede_cambiar_de_rutina(self, servicio_pagos):
+        """Test: Asignar rutina a un cliente con deuda vencida lanza EstadoFinancieroError"""
+        cliente = servicio_pagos.buscar_por_id(Cliente, 1)
+        cliente.nombre = "Editado"
+        servicio_pagos.actualizar(cliente)  # Otros datos sí se pueden editar
+
+        cliente.rutina_id = 2
+        with pytest.raises(EstadoFinancieroError):
+            servicio_pagos.actualizar(cliente)
+
+        servicio_pagos.registrar_pago(1, 200)
+        servicio_pagos.actualizar(cliente)
+        assert servicio_pagos.buscar_por_id(Cliente, 1).rutina_id == 2
+
+    def test_rotacion_saltea_morosos(self, servicio_pagos):
+        """Test: La rotación masiva no renueva la rutina de los clientes morosos"""
+        resultado = servicio_pagos.rotar_ciclos(hoy=self.HOY)
+        assert resultado.total == 0
+        servicio_pagos.registrar_pago(1, 200, fecha=self.HOY)
+        assert servicio_pagos.rotar_ciclos(hoy=self.HOY).total == 1
+
+    def test_reconstruir_saldos(self, servicio_pagos, db):
+        """Test: Reconstruir desde el libro da el mismo saldo que los triggers"""
+        servicio_pagos.registrar_pago(1, 120, fecha=date(2026, 2, 1))
+        antes = servicio_pagos.estado_cuenta(1)
+        with db.get_connection() as conn:
+            conn.execute("update saldo_cliente set cargos = 0, pagos = 0, cubierto = 0, deuda_id = null, vence_deuda = null")
+            reconstruir_resumenes(conn)
+        assert servicio_pagos.estado_cuenta(1) == antes
+
+    def test_centavos_sin_deuda_fantasma(self, servicio_pagos):
+        """Test: Cargos de 0.1 y 0.2 quedan saldados con un pago de 0.3 (sin error de punto flotante)"""
+        servicio_pagos.registrar_pago(1, 200, fecha=date(2026, 2, 1))
+        servicio_pagos.registrar_cargo(1, 0.1, vencimiento=date(2026, 2, 11))
+        servicio_pagos.registrar_cargo(1, 0.2, vencimiento=date(2026, 2, 12))
+        servicio_pagos.registrar_pago(1, 0.3, fecha=date(2026, 2, 13))
+
+        estado = servicio_pagos.estado_cuenta(1)
+        assert (estado.saldo, estado.vence_deuda) == (0, None)
+        assert not estado.moroso(self.HOY.isoformat())
+        assert servicio_pagos.morosos(hoy=self.HOY) == []
+
+    def test_cargo_con_vencimiento_atrasado(self, servicio_pagos):
+        """Test: Un cargo que vence antes que los ya cubiertos pasa a ser la deuda más vieja"""
+        servicio_pagos.registrar_pago(1, 100, fecha=date(2026, 1, 5))
+        assert servicio_pagos.estado_cuenta(1).vence_deuda == "2026-02-10"
+
+        servicio_pagos.registrar_cargo(1, 30, vencimiento=date(2026, 1, 1), concepto="Matrícula")
+        assert servicio_pagos.estado_cuenta(1).vence_deuda == "2026-01-10"
+        servicio_pagos.registrar_pago(1, 30)
+        assert servicio_pagos.estado_cuenta(1).vence_deuda == "2026-02-10"
+
+    def test_saldo_incremental_igual_al_recalculo(self, servicio_pagos, db):
+        """Test: Tras una mezcla al azar de cargos y pagos, los triggers coinciden con recalcular todo"""
+        rng = random.Random(7)
+        for _ in range(60):
+            if rng.random() < 0.5:
+                dia = date(2026, 1, 1) + timedelta(days=rng.randint(0, 90))
+                servicio_pagos.registrar_cargo(1, rng.randint(1, 9999) / 100, vencimiento=dia)
+            else:
+                servicio_pagos.registrar_pago(1, rng.randint(1, 9999) / 100)
+        with db.get_connection() as conn:
+            incremental = tuple(conn.execute("select * from saldo_cliente where cliente_id = 1").fetchone())
+            reconstruir_resumenes(conn)
+            recalculado = tuple(conn.execute("select * from saldo_cliente where cliente_id = 1").fetchone())
+        assert incremental == recalculado
+
+
+# ========================================
+# TESTS: REFERENCIAS Y REASIGNACIÓN
+# ========================================
+
+@pytest.fixture
+def servicio_referencias(servicio_cupos):
+    """Instructor 1 con tres clientes, instructor 2 (cupo 1) vacío e instructor 3 con lugar; rutinas 1 y 2"""
+    servicio_cupos.añadir(_nuevo_cliente(1, nombre="Dos"))
+    servicio_cupos.añadir(_nuevo_cliente(1, nombre="Tres"))
+    servicio_cupos.añadir(Instructor(id=0, nombre="Luis", apellido="Díaz"))
+    servicio_cupos.añadir(Rutina(id=0, nombre="Torso", pdf_link="torso.pdf"))
+    return servicio_cupos
+
+
+class TestReferencias:
+    """Tests de la vista previa de referencias y de reasignar_y_eliminar"""
+
+    def test_conteo_de_referencias(self, servicio_referencias):
+        """Test: Se cuentan las filas que apuntan al registro en cada FK"""
+        assert [(r.tabla, r.columna, r.cantidad) for r in servicio_referencias.referencias(Instructor, 1)] == [
+            ("cliente", "instructor_id", 3)
+        ]
+        assert servicio_referencias.referencias(Instructor, 3)[0].cantidad == 0
+
+    def test_conteo_usa_indice(self, db):
+        """Test: El conteo por instructor_id va por índice y no recorre la tabla cliente"""
+        with db.get_connection() as conn:
+            plan = " ".join(fila[3] for fila in conn.execute(
+                "explain query plan select count(*) from cliente where instructor_id = 1"
+            ))
+        assert "idx_cliente_instructor" in plan
+
+    def test_reasignar_instructor(self, servicio_referencias):
+        """Test: Los clientes pasan al destino, el origen se borra y los contadores quedan al día"""
+        assert servicio_referencias.reasignar_y_eliminar(
+            servicio_referencias.buscar_por_id(Instructor, 1), servicio_referencias.buscar_por_id(Instructor, 3)
+        ) == 3
+        assert servicio_referencias.buscar_por_id(Instructor, 1) is None
+        assert {c.instructor_id for c in servicio_referencias.buscar_todos(Cliente)} == {3}
+        assert servicio_referencias.repositorio.get_carga_instructor(3).clientes == 3
+
+    def test_reasignar_rutina(self, servicio_referencias):
+        """Test: Lo mismo vale para las rutinas"""
+        origen, destino = servicio_referencias.buscar_por_id(Rutina, 1), servicio_referencias.buscar_por_id(Rutina, 2)
+        assert servicio_referencias.reasignar_y_eliminar(origen, destino) == 3
+        assert servicio_referencias.buscar_todos(Rutina) == [destino]
+
+    def test_destino_sin_cupo_no_cambia_nada(self, servicio_referencias):
+        """Test: Si el destino no puede absorber a todos, no se mueve ningún cliente ni se borra el origen"""
+        with pytest.raises(CupoExcedidoError):
+            servicio_referencias.reasignar_y_eliminar(
+                servicio_referencias.buscar_por_id(Instructor, 1), servicio_referencias.buscar_por_id(Instructor, 2)
+            )
+        assert servicio_referencias.referencias(Instructor, 1)[0].cantidad == 3
+
+    def test_cupo_del_destino_se_valida_en_la_transaccion(self, servicio_referencias, repo):
+        """Test: El repositorio solo (sin el chequeo previo) tampoco llena de más al destino ni mueve a nadie"""
+        with pytest.raises(CupoExcedidoError):
+            repo.reasignar_y_eliminar(repo.get_by_id(1, Instructor), repo.get_by_id(2, Instructor))
+        assert repo.get_by_id(1, Instructor) is not None
+        assert [c.clientes for c in repo.get_cargas_instructores()][:2] == [3, 0]
+
+    def test_reasignaciones_concurrentes_no_superan_el_cupo(self, servicio_referencias, repo):
+        """Test: Dos instructores que se reasignan a la vez al único lugar libre: pasa uno, el otro CupoExcedidoError"""
+        servicio_referencias.añadir(_nuevo_cliente(3, nombre="Cuatro"))
+        servicio_referencias.añadir(Instructor(id=0, nombre="Eva", apellido="Ruiz"))
+        servicio_referencias.añadir(_nuevo_cliente(4, nombre="Cinco"))
+        destino = repo.get_by_id(2, Instructor)
+        barrera = threading.Barrier(2)
+
+        def reasignar(origen_id):
+            barrera.wait()
+            try:
+                return servicio_referencias.reasignar_y_eliminar(repo.get_by_id(origen_id, Instructor), destino)
+            except CupoExcedidoError:
+                return "cupo"
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            resultados = list(pool.map(reasignar, (3, 4)))
+        assert sorted(resultados, key=str) == [1, "cupo"]
+        assert repo.get_carga_instructor(2).clientes == 1
+
+    def test_validaciones(self, servicio_referencias):
+        """Test: Destino igual al origen, inexistente o de otro tipo se rechazan"""
+        instructor = servicio_referencias.buscar_por_id(Instructor, 1)
+        with pytest.raises(NegocioError):
+            servicio_referencias.reasignar_y_eliminar(instructor, instructor)
+        with pytest.raises(RegistroNoEncontrado):
+            servicio_referencias.reasignar_y_eliminar(instructor, Instructor(id=99, nombre="No", apellido="Existe"))
+        with pytest.raises(EntidadNoValidaError):
+            servicio_referencias.reasignar_y_eliminar(instructor, servicio_referencias.buscar_por_id(Rutina, 1))
+
+    def test_origen_inexistente(self, servicio_referencias):
+        """Test: Reasignar desde un instructor o una rutina que no existe lanza RegistroNoEncontrado"""
+        with pytest.raises(RegistroNoEncontrado):
+            servicio_referencias.reasignar_y_eliminar(
+                Instructor(id=99, nombre="No", apellido="Existe"), servicio_referencias.buscar_por_id(Instructor, 3)
+            )
+        with pytest.raises(RegistroNoEncontrado):
+            servicio_referencias.reasignar_y_eliminar(
+                Rutina(id=99, nombre="No existe", pdf_link=""), servicio_referencias.buscar_por_id(Rutina, 2)
+            )
+        assert servicio_referencias.referencias(Instructor, 1)[0].cantidad == 3
+
+    def test_cliente_con_historial_se_archiva(self, servicio_referencias, db):
+        """Test: Un cliente con asistencias no se borra: se archiva, libera el cupo y el historial queda"""
+        servicio = servicio_referencias
+        servicio.registrar_asistencia(1)
+        with pytest.raises(ReferenciaEnUso, match="asistencia"):
+            servicio.repositorio.delete(servicio.buscar_por_id(Cliente, 1))
+
+        servicio.eliminar(servicio.buscar_por_id(Cliente, 1))
+        assert servicio.buscar_por_id(Cliente, 1) is None
+        assert 1 not in {c.id for c in servicio.buscar_todos(Cliente)}
+        assert servicio.repositorio.get_carga_instructor(1).clientes == 2
+        assert servicio.clientes_por_vencer(dias=0, hoy=date(2026, 3, 1), incluir_vencidos=True)[0].cliente_id == 2
+        with db.get_connection(solo_lectura=True) as conn:
+            assert conn.execute("select count(*) from asistencia where cliente_id = 1").fetchone()[0] == 1
+            assert conn.execute("select sum(clientes) from resumen_cliente").fetchone()[0] == 2
+        # Una estación con el formulario abierto ya no lo puede guardar
+        with pytest.raises(RegistroNoEncontrado):
+            servicio.actualizar(Cliente(id=1, nombre="X", apellido="Y", fecha_inicio_rutina="2026-01-01",
+                                        fecha_fin_rutina="2026-02-01", instructor_id=1, rutina_id=1))
+
+    def test_cliente_sin_historial_se_borra(self, servicio_referencias, db):
+        """Test: Sin asistencias ni pagos el cliente se borra de verdad"""
+        servicio_referencias.eliminar(servicio_referencias.buscar_por_id(Cliente, 2))
+        with db.get_connection(solo_lectura=True) as conn:
+            assert conn.execute("select count(*) from cliente where id = 2").fetchone()[0] == 0
+
+
+# ========================================
+# TESTS: IMPORTACIÓN / EXPORTACIÓN CSV
+# ========================================
+
+class TestCSV:
+    """Tests de csv_io: export por lotes, import validado y en lotes"""
+
+    def test_ida_y_vuelta_conserva_ids_y_fk(self, repo_con_datos, tmp_path):
+        """Test: Lo exportado se importa en una base vacía con los mismos ids (las FK siguen valiendo)"""
+        origen = GymService(repo_con_datos)
+        for entidad in (Instructor, Rutina, Cliente):
+            assert origen.exportar_csv(entidad, tmp_path / f"{entidad.__name__}.csv", tamano_lote=1) == 1
+
+        destino_db = DatabaseConnection(str(tmp_path / "destino.db"), metricas=RegistroMetricas())
+        destino_db.init_db()
+        destino = GymService(SQLite3Repository(destino_db))
+        for entidad in (Instructor, Rutina, Cliente):
+            resultado = destino.importar_csv(entidad, tmp_path / f"{entidad.__name__}.csv")
+            assert (resultado.importadas, resultado.rechazadas) == (1, 0)
+        assert destino.buscar_todos(Cliente) == origen.buscar_todos(Cliente)
+        assert destino.repositorio.get_carga_instructor(1).clientes == 1  # Los triggers corren igual
+
+    def test_errores_por_fila(self, repo_con_datos):
+        """Test: Cada fila inválida se informa con su línea y campo; las válidas se importan"""
+        archivo = io.StringIO(
+            "nombre,apellido,fecha_inicio_rutina,fecha_fin_rutina,instructor_id,rutina_id,ciclo_rutina\n"
+            "Ana,Gómez,2026-01-05,2026-02-05,1,1,1\n"      # ok
+            "Beto,Paz,2026-01-05,2026-02-05,7,1,1\n"       # instructor inexistente
+            "Caro,Ruiz,5-13-2026,2026-02-05,1,1,1\n"       # fecha inválida
+            "Dani,Sol,05-01-2026,2026-02-05,1,1,\n"        # fecha vieja DD-MM-YYYY (se normaliza) y ciclo por defecto
+            ",Vera,2026-01-05,2026-02-05,1,1,1\n"          # obligatorio vacío
+        )
+        resultado = GymService(repo_con_datos).importar_csv(Cliente, archivo, tamano_lote=2)
+        assert (resultado.leidas, resultado.importadas, resultado.rechazadas) == (5, 2, 3)
+        assert [(e.linea, e.campo) for e in resultado.errores] == [
+            (3, "instructor_id"), (4, "fecha_inicio_rutina"), (6, "nombre"),
+        ]
+        dani = repo_con_datos.get_by_id(3, Cliente)
+        assert (dani.fecha_inicio_rutina, dani.ciclo_rutina) == ("2026-01-05", 1)
+
+    def test_rechazo_de_la_base_no_pierde_el_lote(self, repo_con_datos):
+        """Test: Un id duplicado hace reintentar el lote de a una fila; solo se pierde la duplicada"""
+        archivo = io.StringIO("id,nombre,apellido,cupo\n1,Repetido,X,10\n5,Nuevo,Y,10\n")
+        resultado = GymService(repo_con_datos).importar_csv(Instructor, archivo)
+        assert (resultado.importadas, [e.linea for e in resultado.errores]) == (1, [2])
+        assert repo_con_datos.get_by_id(5, Instructor).nombre == "Nuevo"
+
+    def test_reintento_de_a_una_en_la_misma_transaccion(self, repo_con_datos, db, monkeypatch):
+        """Test: El reintento fila por fila sigue en la transacción BEGIN IMMEDIATE (savepoint, sin ROLLBACK)"""
+        sentencias_ejecutadas = []
+        conexion_real = db.get_connection
+
+        @contextmanager
+        def conexion(*args, **kwargs):
+            with conexion_real(*args, **kwargs) as conn:
+                conn.set_trace_callback(sentencias_ejecutadas.append)
+                try:
+                    yield conn
+                finally:
+                    conn.set_trace_callback(None)
+
+        monkeypatch.setattr(db, "get_connection", conexion)
+        filas = [{"id": 1, "nombre": "Repetido", "apellido": "X", "cupo": 10}, {"id": 5, "nombre": "Nuevo", "apellido": "Y", "cupo": 10}]
+        assert [indice for indice, _ in repo_con_datos.insertar_lote(Instructor, filas)] == [0]
+        assert "ROLLBACK" not in sentencias_ejecutadas
+        assert "rollback to lote" in sentencias_ejecutadas
+        assert repo_con_datos.get_by_id(5, Instructor).nombre == "Nuevo"
+
+    def test_columnas_obligatorias(self, repo_con_datos):
+        """Test: Si al archivo le falta una columna obligatoria no se importa nada"""
+        with pytest.raises(NegocioError):
+            GymService(repo_con_datos).importar_csv(Cliente, io.StringIO("nombre,apellido\nAna,Gómez\n"))
+
+    def test_export_por_lotes(self, repo_con_datos):
+        """Test: El cursor entrega lotes del tamaño pedido, ordenados por id"""
+        for n in range(4):
+            repo_con_datos.add(Rutina(id=0, nombre=f"R{n}", pdf_link=""))
+        lotes = list(repo_con_datos.iterar_lotes(Rutina, 2))
+        assert [len(l) for l in lotes] == [2, 2, 1]
+        assert [fila[0] for lote in lotes for fila in lote] == [1, 2, 3, 4, 5]
+
+
+# ========================================
+# TESTS: COPIAS DE SEGURIDAD
+# ========================================
+
+@pytest.fixture
+def servicio_respaldos(repo_con_datos, db, tmp_path):
+    """Servicio con gestor de respaldos de pasos de 1 página y retención 2"""
+    respaldos = GestorRespaldos(db, carpeta=str(tmp_path / "respaldos"), retencion=2, paginas_por_paso=1, pausa_s=0)
+    return GymService(repo_con_datos, respaldos=respaldos)
+
+
+class TestRespaldos:
+    """Tests del respaldo en caliente, la retención y la restauración"""
+
+    def test_respaldo_verificado_con_progreso(self, servicio_respaldos):
+        """Test: La copia tiene los mismos datos y el progreso llega hasta el total de páginas"""
+        avances = []
+        respaldo = servicio_respaldos.respaldar(progreso=lambda copiadas, total: avances.append((copiadas, total)))
+        assert len(avances) > 1 and avances[-1][0] == avances[-1][1]
+        conn = sqlite3.connect(respaldo.ruta)
+        assert conn.execute("select nombre from cliente").fetchall() == [("María",)]
+        conn.close()
+        assert not [n for n in os.listdir(os.path.dirname(respaldo.ruta)) if n.endswith(".tmp")]
+
+    def test_retencion(self, servicio_respaldos):
+        """Test: Solo se conservan los últimos 'retencion' respaldos"""
+        nombres = [servicio_respaldos.respaldar().nombre for _ in range(3)]
+        assert [r.nombre for r in servicio_respaldos.listar_respaldos()] == nombres[:0:-1]
+
+    def test_en_segundo_plano(self, servicio_respaldos):
+        """Test: El respaldo en un hilo avisa al terminar"""
+        terminado = threading.Event()
+        resultado = {}
+
+        def al_terminar(respaldo, error):
+            resultado.update(respaldo=respaldo, error=error)
+            terminado.set()
+
+        assert servicio_respaldos.respaldar(en_segundo_plano=True, al_terminar=al_terminar) is True
+        assert terminado.wait(5)
+        assert resultado["error"] is None and os.path.exists(resultado["respaldo"].ruta)
+
+    def test_restaurar(self, servicio_respaldos):
+        """Test: Restaurar vuelve al estado del respaldo y guarda antes el estado actual"""
+        respaldo = servicio_respaldos.respaldar()
+        servicio_respaldos.añadir(_nuevo_cliente(1, nombre="Posterior"))
+
+        with pytest.raises(NegocioError):
+            servicio_respaldos.restaurar_respaldo(respaldo.nombre)
+        seguridad = servicio_respaldos.restaurar_respaldo(respaldo.nombre, confirmar=True)
+
+        assert [c.nombre for c in servicio_respaldos.buscar_todos(Cliente)] == ["María"]
+        assert servicio_respaldos.repositorio.get_carga_instructor(1).clientes == 1
+        conn = sqlite3.connect(seguridad.ruta)
+        assert conn.execute("select count(*) from cliente").fetchone() == (2,)
+        conn.close()
+
+    def test_restaurar_rechaza_inexistente_o_danado(self, servicio_respaldos):
+        """Test: No se restaura un archivo que no existe o que no pasa integrity_check"""
+        with pytest.raises(RespaldoError):
+            servicio_respaldos.restaurar_respaldo("no-existe.db", confirmar=True)
+        servicio_respaldos.respaldar()
+        danado = os.path.join(servicio_respaldos.respaldos.carpeta, "learnlifting-danado.db")
+        with open(danado, "wb") as f:
+            f.write(b"esto no es una base sqlite" * 100)
+        with pytest.raises(RespaldoError):
+            servicio_respaldos.restaurar_respaldo("learnlifting-danado.db", confirmar=True)
+
+
+
+# ========================================
+# TESTS: MANTENIMIENTO AUTOMÁTICO
+# ========================================
+
+def _cargar_y_borrar_rutinas(repo, cantidad: int = 2000):
+    """Deja páginas libres en el archivo: inserta rutinas con texto largo y las borra"""
+    with repo.db.get_connection() as conn:
+        conn.executemany("insert into rutina (nombre, pdf_link) values (?, ?)", [(f"R{n}", "x" * 500) for n in range(cantidad)])
+    with repo.db.get_connection() as conn:
+        conn.execute("delete from rutina where nombre like 'R%'")
+
+
+@pytest.fixture
+def mantenimiento(db):
+    """Programador sin espera de inactividad y con ANALYZE desde 3 filas"""
+    return MantenimientoProgramado(db, inactividad_s=0, intervalo_s=0.01, paginas_vacuum=50, filas_analyze=3)
+
+
+class TestMantenimiento:
+    """Tests del mantenimiento programado asociado a DatabaseConnection"""
+
+    def test_base_nueva_con_vacuum_incremental(self, db):
+        """Test: Las bases nuevas se crean con auto_vacuum=INCREMENTAL"""
+        assert db.modo_auto_vacuum() == "incremental"
+
+    def test_vacuum_incremental_en_reposo(self, repo, mantenimiento):
+        """Test: Con la base inactiva se devuelven páginas libres de a 'paginas_vacuum' y se registra el tamaño"""
+        _cargar_y_borrar_rutinas(repo)
+        libres = repo.db.paginas_libres()
+        assert libres > 50
+
+        ejecucion = mantenimiento.en_reposo()
+        assert ejecucion.tarea == "incremental_vacuum" and ejecucion.motivo == "inactividad"
+        with repo.db.get_connection() as conn:
+            assert ejecucion.bytes_liberados == 50 * conn.execute("pragma page_size").fetchone()[0]
+        assert repo.db.paginas_libres() == libres - 50
+        assert list(mantenimiento.historial) == [ejecucion]
+        assert repo.metricas.snapshot()["metodos"]["mantenimiento_incremental_vacuum"]["n"] == 1
+
+    def test_no_corre_con_actividad_reciente(self, repo, db):
+        """Test: Si la app usó la base hace poco, el vacuum espera"""
+        mantenimiento = MantenimientoProgramado(db, inactividad_s=60)
+        _cargar_y_borrar_rutinas(repo)
+        repo.get_all(Rutina)
+        assert mantenimiento.en_reposo() is None
+        assert db.paginas_libres() > 0
+
+    def test_hilo_libera_y_cierre_optimiza(self, repo, mantenimiento):
+        """Test: El hilo de fondo vacía la lista de páginas libres; cerrar() lo detiene y corre optimize"""
+        _cargar_y_borrar_rutinas(repo)
+        mantenimiento.iniciar()
+        limite = time.monotonic() + 5
+        while repo.db.paginas_libres() and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert repo.db.paginas_libres() == 0
+
+        cierre = mantenimiento.cerrar()
+        assert cierre.tarea == "optimize" and cierre.motivo == "cierre"
+        assert not any(h.name == "mantenimiento-db" for h in threading.enumerate())
+
+    def test_analyze_despues_de_importar(self, repo_con_datos, mantenimiento):
+        """Test: Una importación grande corre ANALYZE; una chica no"""
+        servicio = GymService(repo_con_datos)
+        servicio.importar_csv(Rutina, io.StringIO("nombre,pdf_link\nA,a.pdf\n"))
+        assert not mantenimiento.historial
+
+        servicio.importar_csv(Rutina, io.StringIO("nombre,pdf_link\nB,b.pdf\nC,c.pdf\nD,d.pdf\n"))
+        assert [e.motivo for e in mantenimiento.historial] == ["carga masiva"]
+        with repo_con_datos.db.get_connection() as conn:
+            assert conn.execute("select count(*) from sqlite_stat1 where tbl = 'rutina'").fetchone()[0] > 0
+
+    def test_compactar_convierte_bases_viejas(self, tmp_path):
+        """Test: Una base creada sin auto_vacuum pasa a incremental al compactarla"""
+        ruta = str(tmp_path / "vieja.db")
+        conn = sqlite3.connect(ruta)
+        conn.execute("create table t (x)")
+        conn.close()
+        vieja = DatabaseConnection(ruta, metricas=RegistroMetricas())
+        vieja.init_db()
+        assert vieja.modo_auto_vacuum() == "none"
+        vieja.compactar()
+        assert vieja.modo_auto_vacuum() == "incremental"
+
+
+# ========================================
+# TESTS: CAMBIOS ENTRE ESTACIONES
+# ========================================
+
+def _otra_estacion(db, sql: str, params=()):
+    """Escribe con una conexión aparte, como lo haría otra PC sobre el mismo archivo"""
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("pragma foreign_keys = on")
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def vigilante(repo_con_datos, db):
+    vigilante = VigilanteCambios(db, intervalo_s=0.01, maximo=3)
+    vigilante.revisar()  # Fija el punto de partida
+    yield vigilante
+    vigilante.detener()
+
+
+class TestCambios:
+    """Tests del registro de cambios por triggers y del vigilante de PRAGMA data_version"""
+
+    def test_solo_los_ids_cambiados(self, vigilante, db):
+        """Test: Una edición y un alta de otra estación llegan como ids por tabla, una sola vez"""
+        _otra_estacion(db, "update cliente set nombre = 'Mariela' where id = 1")
+        _otra_estacion(db, "insert into rutina (nombre, pdf_link) values ('Espalda', '')")
+        cambios = vigilante.revisar()
+        assert cambios.ids == {"cliente": frozenset({1}), "rutina": frozenset({2})}
+        assert not cambios.completo
+        assert vigilante.revisar() is None
+
+    def test_sin_cambios_observados(self, vigilante, db):
+        """Test: Sin escrituras, o con escrituras en tablas no observadas, no hay aviso"""
+        assert vigilante.revisar() is None
+        _otra_estacion(db, "insert into asistencia (cliente_id, fecha_hora) values (1, '2026-01-10 08:00:00')")
+        assert vigilante.revisar() is None
+
+    def test_contadores_auxiliares_no_cuentan(self, vigilante, repo_con_datos):
+        """Test: Un alta de cliente anota al cliente, no al instructor cuyo contador cambia"""
+        repo_con_datos.add(_nuevo_cliente(1))
+        assert vigilante.revisar().ids == {"cliente": frozenset({2})}
+
+    def test_demasiados_cambios_piden_recargar(self, vigilante, repo_con_datos):
+        """Test: Más cambios que 'maximo' se informan como recarga completa"""
+        for n in range(4):
+            repo_con_datos.add(Rutina(id=0, nombre=f"R{n}", pdf_link=""))
+        cambios = vigilante.revisar()
+        assert cambios.completo and cambios.ids == {}
+        assert vigilante.revisar() is None
+
+    def test_restaurar_un_respaldo_pide_recargar(self, vigilante, db, repo_con_datos, tmp_path):
+        """Test: Tras restaurar un respaldo (versiones hacia atrás) se pide recargar todo, haya o no escrituras después"""
+        respaldos = GestorRespaldos(db, carpeta=str(tmp_path / "respaldos"), pausa_s=0)
+        respaldo = respaldos.respaldar()
+        for n in range(2):
+            repo_con_datos.add(Rutina(id=0, nombre=f"R{n}", pdf_link=""))
+        assert not vigilante.revisar().completo
+
+        respaldos.restaurar(respaldo.nombre)
+        assert vigilante.revisar().completo
+        assert vigilante.revisar() is None
+
+        # Restaurar y volver a escribir hasta pasar la versión vista tampoco se confunde con cambios sueltos
+        repo_con_datos.add(Rutina(id=0, nombre="R2", pdf_link=""))
+        vigilante.revisar()
+        respaldos.restaurar(respaldo.nombre)
+        for n in range(3):
+            repo_con_datos.add(Rutina(id=0, nombre=f"Otra {n}", pdf_link=""))
+        assert vigilante.revisar().completo
+
+    def test_versiones_hacia_atras_piden_recargar(self, vigilante, db, repo_con_datos):
+        """Test: Si la última versión vista ya no está (base pisada por fuera de la app) se pide recargar todo"""
+        repo_con_datos.add(Rutina(id=0, nombre="Espalda", pdf_link=""))
+        vista = vigilante.revisar().version
+        _otra_estacion(db, "delete from cambio where version >= ?", (vista,))
+        cambios = vigilante.revisar()
+        assert cambios.completo and vigilante.version < vista
+
+    def test_hilo_avisa_y_relee_por_id(self, vigilante, db, repo_con_datos):
+        """Test: El hilo avisa en menos de un segundo y los borrados no vuelven en get_by_ids"""
+        recibidos = []
+        avisado = threading.Event()
+        vigilante.iniciar(lambda cambios: recibidos.append(cambios) or avisado.set())
+        _otra_estacion(db, "insert into rutina (nombre, pdf_link) values ('Espalda', '')")
+        _otra_estacion(db, "delete from rutina where id = 2")
+        assert avisado.wait(1)
+        ids = set().union(*(c.ids["rutina"] for c in recibidos))
+        assert ids == {2}
+        assert repo_con_datos.get_by_ids({1, 2}, Rutina) == [repo_con_datos.get_by_id(1, Rutina)]
+
+    def test_retencion_del_registro(self, db):
+        """Test: La tabla de cambios no crece más allá de la retención"""
+        with db.get_connection() as conn:
+            conn.executemany("insert into cambio (tabla, registro_id) values ('cliente', ?)", [(n,) for n in range(10_005)])
+            assert conn.execute("select count(*) from cambio").fetchone()[0] == 10_000
+
+
+# ========================================
+# TESTS: CONCURRENCIA
+# ========================================
+
+@pytest.fixture
+def servicio_concurrente(repo):
+    """Servicio con dos instructores de cupo amplio, 100 clientes para editar y 50 rutinas para borrar"""
+    repo.add(Instructor(id=0, nombre="Juan", apellido="Pérez", cupo=1000))
+    repo.add(Instructor(id=0, nombre="Ana", apellido="Sosa", cupo=1000))
+    repo.add(Rutina(id=0, nombre="Base", pdf_link=""))
+    for n in range(50):
+        repo.add(Rutina(id=0, nombre=f"Borrar {n}", pdf_link=""))
+    for n in range(100):
+        repo.add(Cliente(
+            id=0, nombre=f"Cliente {n}", apellido="X", fecha_inicio_rutina="2026-01-01",
+            fecha_fin_rutina="2026-02-01", instructor_id=n % 2 + 1, rutina_id=1,
+        ))
+    return GymService(repo)
+
+
+class TestConcurrencia:
+    """Tests de DatabaseConnection/SQLite3Repository usados desde muchos hilos a la vez"""
+
+    def test_conexion_por_hilo(self, db):
+        """Test: Cada hilo reutiliza su conexión; un bloque anidado usa otra y confirma por su cuenta"""
+        with db.get_connection(solo_lectura=True) as externa:
+            with db.get_connection() as anidada:
+                assert anidada is not externa
+                anidada.execute("insert into rutina (nombre, pdf_link) values ('Anidada', '')")
+            assert externa.execute("select count(*) from rutina").fetchone()[0] == 1
+        with db.get_connection(solo_lectura=True) as otra_vez:
+            assert otra_vez is externa
+
+        conexiones = []
+
+        def en_otro_hilo():
+            with db.get_connection(solo_lectura=True) as conn:
+                conexiones.append(conn)
+
+        hilo = threading.Thread(target=en_otro_hilo)
+        hilo.start()
+        hilo.join()
+        assert conexiones[0] is not externa
+
+    def test_lectores_no_esperan_al_escritor(self, repo_con_datos, db):
+        """Test: Con un escritor ocupando la base, las lecturas de otro hilo responden igual (WAL)"""
+        leidos = []
+        with db.get_connection() as escritor:
+            escritor.execute("update cliente set nombre = 'Sin confirmar' where id = 1")
+            lector = threading.Thread(target=lambda: leidos.append(repo_con_datos.get_by_id(1, Cliente).nombre))
+            lector.start()
+            lector.join(2)
+            assert leidos == ["María"]  # Lee la última versión confirmada, sin bloquearse
+
+    def test_cientos_de_operaciones_simultaneas(self, servicio_concurrente):
+        """Test: 300 altas, ediciones y bajas desde 32 hilos: ninguna se pierde ni falla por lock"""
+        servicio = servicio_concurrente
+
+        def alta(n):
+            servicio.añadir(Cliente(
+                id=0, nombre=f"Nuevo {n}", apellido="Y", fecha_inicio_rutina="2026-01-01",
+                fecha_fin_rutina="2026-02-01", instructor_id=n % 2 + 1, rutina_id=1,
+            ))
+
+        def edicion(n):
+            cliente = servicio.buscar_por_id(Cliente, n + 1)
+            cliente.nombre = f"Editado {n}"
+            servicio.actualizar(cliente)
+
+        def baja(n):
+            servicio.eliminar(servicio.buscar_por_id(Rutina, n + 2))
+
+        operaciones = [(alta, n) for n in range(150)] + [(edicion, n) for n in range(100)] + [(baja, n) for n in range(50)]
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            futuros = [pool.submit(funcion, n) for funcion, n in operaciones]
+            errores = [f.exception() for f in futuros if f.exception() is not None]
+        assert errores == []
+
+        clientes = servicio.buscar_todos(Cliente)
+        assert len(clientes) == 250
+        assert sorted(c.nombre for c in clientes if c.id <= 100) == sorted(f"Editado {n}" for n in range(100))
+        assert [r.id for r in servicio.buscar_todos(Rutina)] == [1]
+        # Los contadores de los triggers no perdieron ninguna actualización
+        assert sorted(c.clientes for c in servicio.cargas_instructores()) == [125, 125]
+        with servicio.repositorio.db.get_connection(solo_lectura=True) as conn:
+            assert conn.execute("select sum(clientes) from resumen_cliente").fetchone()[0] == 250
+            assert conn.execute("pragma journal_mode").fetchone()[0] == "wal"
+
+
+# ========================================
+# TESTS: REINTENTOS POR BASE BLOQUEADA
+# ========================================
+
+def _bloquear_desde_otra_estacion(db, segundos: float) -> threading.Thread:
+    """Toma el lock de escritura del archivo con una conexión aparte y lo suelta a los 'segundos'"""
+    conn = sqlite3.connect(db.db_path, check_same_thread=False)
+    conn.execute("begin immediate")
+
+    def soltar():
+        time.sleep(segundos)
+        conn.rollback()
+        conn.close()
+
+    hilo = threading.Thread(target=soltar)
+    hilo.start()
+    return hilo
+
+
+@pytest.fixture
+def repo_impaciente(repo_con_datos, db, monkeypatch):
+    """Repositorio con busy timeout de 20 ms y reintentos cortos, para no esperar segundos en los tests"""
+    monkeypatch.setattr("infrastructure.db_conn.Config.DB_BUSY_TIMEOUT_S", 0.02)
+    db.cerrar()  # La conexión del hilo se reabre con el timeout nuevo
+    repo_con_datos.reintentos = PoliticaReintentos(intentos=50, base_s=0.01, tope_s=0.02)
+    return repo_con_datos
+
+
+class TestReintentos:
+    """Tests de la política de reintentos ante SQLITE_BUSY"""
+
+    def test_espera_exponencial_con_tope(self):
+        """Test: La espera máxima se duplica por intento hasta el tope, y el azar la reparte entre 0 y ese máximo"""
+        politica = PoliticaReintentos(intentos=5, base_s=0.1, tope_s=0.5, azar=lambda: 1.0)
+        assert [politica.espera(n) for n in range(4)] == [0.1, 0.2, 0.4, 0.5]
+        assert PoliticaReintentos(base_s=0.1, azar=lambda: 0.5).espera(0) == 0.05
+
+    def test_clasificacion_de_errores(self):
+        """Test: Solo locked/busy (directo o como causa de un PersistenciaError) cuentan como bloqueo"""
+        assert es_bloqueo(sqlite3.OperationalError("database is locked"))
+        try:
+            try:
+                raise sqlite3.OperationalError("database is busy")
+            except sqlite3.Error:
+                raise PersistenciaError("Error técnico")
+        except PersistenciaError as e:
+            assert es_bloqueo(e)
+        assert not es_bloqueo(sqlite3.OperationalError("no such table: x"))
+        assert not es_bloqueo(sqlite3.IntegrityError("UNIQUE constraint failed"))
+
+    def test_otros_errores_no_se_reintentan(self, metricas):
+        """Test: Un error que no es de bloqueo sale al primer intento"""
+        llamadas = []
+
+        def falla():
+            llamadas.append(1)
+            raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+
+        with pytest.raises(sqlite3.IntegrityError):
+            PoliticaReintentos(intentos=3, base_s=0).ejecutar(falla, metricas)
+        assert llamadas == [1]
+        assert "reintentos_bloqueo" not in metricas.snapshot()["contadores"]
+
+    def test_escritura_espera_a_la_otra_estacion(self, repo_impaciente, db, metricas):
+        """Test: Con la base tomada por otra estación el alta se reintenta y se guarda una sola vez al liberarse"""
+        hilo = _bloquear_desde_otra_estacion(db, 0.2)
+        repo_impaciente.add(Rutina(id=0, nombre="Espalda", pdf_link=""))
+        hilo.join()
+        assert [r.nombre for r in repo_impaciente.get_all(Rutina)] == ["Pierna", "Espalda"]
+        contadores = metricas.snapshot()["contadores"]
+        assert contadores["reintentos_bloqueo"] >= 1
+        assert contadores["reintentos_bloqueo.add"] == contadores["reintentos_bloqueo"]
+        assert metricas.snapshot()["metodos"]["espera_reintento"]["n"] == contadores["reintentos_bloqueo"]
+
+    def test_reintentos_agotados(self, repo_impaciente, db, metricas):
+        """Test: Si la otra estación no suelta la base, se lanza BaseOcupadaError con un mensaje claro"""
+        repo_impaciente.reintentos = PoliticaReintentos(intentos=2, base_s=0.001, tope_s=0.001)
+        hilo = _bloquear_desde_otra_estacion(db, 0.5)
+        with pytest.raises(BaseOcupadaError, match="ocupada por otra estación"):
+            repo_impaciente.update(repo_impaciente.get_by_id(1, Rutina))
+        hilo.join()
+        contadores = metricas.snapshot()["contadores"]
+        assert contadores["reintentos_bloqueo"] == 2
+        assert contadores["bloqueos_agotados"] == 1
+
+    def test_lote_de_asistencias_no_se_pierde(self, repo_impaciente, db, metricas):
+        """Test: El escritor de asistencias reintenta el lote en vez de descartarlo"""
+        escritor = EscritorAsistencias(
+            db, tamano_lote=1000, intervalo_s=60, reintentos=PoliticaReintentos(intentos=50, base_s=0.01, tope_s=0.02),
+        )
+        hilo = _bloquear_desde_otra_estacion(db, 0.2)
+        escritor.registrar(Asistencia(id=0, cliente_id=1))
+        escritor.cerrar()
+        hilo.join()
+        assert _contar_asistencias(db) == 1
+        assert metricas.snapshot()["contadores"]["reintentos_bloqueo.guardar_asistencias"] >= 1
+
+
+# ========================================
+# TESTS: CONCURRENCIA OPTIMISTA (VERSIONES)
+# ========================================
+
+def _version(db, tabla: str, registro_id: int) -> int:
+    with db.get_connection(solo_lectura=True) as conn:
+        return conn.execute(f"select version from {tabla} where id = ?", (registro_id,)).fetchone()[0]
+
+
+class TestVersiones:
+    """Tests de la columna version y del UPDATE con chequeo de versión"""
+
+    def test_cada_update_suma_una_version(self, repo_con_datos, db):
+        """Test: Cualquier UPDATE de la fila (incluida otra estación) suma 1; el contador auxiliar no"""
+        assert _version(db, "cliente", 1) == 0
+        cliente = repo_con_datos.get_by_id(1, Cliente)
+        cliente.nombre = "Mariela"
+        repo_con_datos.update(cliente)
+        _otra_estacion(db, "update cliente set ciclo_rutina = 2 where id = 1")
+        assert _version(db, "cliente", 1) == 2
+        assert _version(db, "instructor", 1) == 0  # clientes_asignados no es una edición del instructor
+
+    def test_guardar_con_la_version_leida(self, repo_con_datos, db):
+        """Test: Con la versión leída el guardado pasa y la fila avanza de versión"""
+        rutina, version = repo_con_datos.get_con_version(1, Rutina)
+        rutina.nombre = "Piernas"
+        repo_con_datos.update(rutina, version=version)
+        assert repo_con_datos.get_con_version(1, Rutina) == (Rutina(id=1, nombre="Piernas", pdf_link=rutina.pdf_link), version + 1)
+        assert repo_con_datos.get_con_version(99, Rutina) is None
+
+    def test_conflicto_no_pisa_la_otra_edicion(self, repo_con_datos, db, metricas):
+        """Test: Si otra estación guardó después de leer, se lanza ConflictoEdicionError con la fila actual"""
+        rutina, version = repo_con_datos.get_con_version(1, Rutina)
+        _otra_estacion(db, "update rutina set pdf_link = 'nuevo.pdf' where id = 1")
+        rutina.nombre = "Piernas"
+        with pytest.raises(ConflictoEdicionError) as error:
+            repo_con_datos.update(rutina, version=version)
+        assert error.value.actual.pdf_link == "nuevo.pdf"
+        assert error.value.version == version + 1
+        assert repo_con_datos.get_by_id(1, Rutina).nombre == "Pierna"
+        assert metricas.snapshot()["contadores"]["conflictos_edicion"] == 1
+
+        # Con la versión nueva y solo el campo propio, se combinan las dos ediciones
+        repo_con_datos.update(rutina, campos=["nombre"], version=error.value.version)
+        assert repo_con_datos.get_by_id(1, Rutina) == Rutina(id=1, nombre="Piernas", pdf_link="nuevo.pdf")
+
+    def test_registro_borrado_no_es_conflicto(self, repo_con_datos, db):
+        """Test: Si la fila ya no existe se lanza RegistroNoEncontrado"""
+        repo_con_datos.add(Rutina(id=0, nombre="Espalda", pdf_link=""))
+        rutina, version = repo_con_datos.get_con_version(2, Rutina)
+        _otra_estacion(db, "delete from rutina where id = 2")
+        with pytest.raises(RegistroNoEncontrado):
+            repo_con_datos.update(rutina, version=version)
+
+    def test_update_parcial_solo_escribe_lo_cambiado(self, repo_con_datos, db):
+        """Test: Con 'campos' solo se escriben esas columnas: no se pisa lo demás ni se tocan los resúmenes"""
+        cliente, version = repo_con_datos.get_con_version(1, Cliente)
+        _otra_estacion(db, "update cliente set apellido = 'Gómez' where id = 1")
+        cliente.nombre = "Mariela"
+        cliente.rutina_id = 99  # Valor viejo/erróneo en el objeto que no se pide escribir
+        repo_con_datos.update(cliente, campos=["nombre"])
+        guardado = repo_con_datos.get_by_id(1, Cliente)
+        assert (guardado.nombre, guardado.apellido, guardado.rutina_id) == ("Mariela", "Gómez", 1)
+        assert _version(db, "cliente", 1) == version + 2
+
+
+# ========================================
+# TESTS: ACTUALIZACIONES PARCIALES
+# ========================================
+
+class TestActualizacionParcial:
+    """Tests de update_fields y de la detección de campos modificados"""
+
+    def test_sin_cambios_no_escribe(self, repo_con_datos, db, metricas):
+        """Test: Sin campos modificados no hay UPDATE ni cambia la versión"""
+        cliente, version = repo_con_datos.get_con_version(1, Cliente)
+        assert repo_con_datos.update_fields(cliente, modificados(cliente, {"nombre": "María", "ciclo_rutina": 1})) is False
+        assert _version(db, "cliente", 1) == version
+        snapshot = metricas.snapshot()
+        assert snapshot["contadores"]["updates_omitidos"] == 1
+        assert "update" not in snapshot["metodos"]
+
+    def test_solo_escribe_las_columnas_sucias(self, repo_con_datos, db, metricas):
+        """Test: Se escribe solo el ciclo; el resto de la fila (aunque el objeto esté viejo) queda como estaba"""
+        cliente = repo_con_datos.get_by_id(1, Cliente)
+        _otra_estacion(db, "update cliente set nombre = 'Mariela' where id = 1")
+        cambios = modificados(cliente, {"nombre": "María", "ciclo_rutina": 2})
+        assert cambios == {"ciclo_rutina": 2}
+        cliente.ciclo_rutina = 2
+        assert repo_con_datos.update_fields(cliente, cambios) is True
+        guardado = repo_con_datos.get_by_id(1, Cliente)
+        assert (guardado.nombre, guardado.ciclo_rutina) == ("Mariela", 2)
+        assert metricas.snapshot()["contadores"]["columnas_actualizadas"] == 1
+
+    def test_sentencia_minima(self):
+        """Test: El UPDATE lista solo las columnas pedidas, en el orden de la entidad, y se arma una vez"""
+        query = sentencia_update(Cliente, ["rutina_id", "ciclo_rutina"], con_version=True)
+        assert query == "update cliente set rutina_id = :rutina_id, ciclo_rutina = :ciclo_rutina where id = :id and activo = 1 and version = :version"
+        assert sentencia_update(Cliente, ("ciclo_rutina", "rutina_id"), con_version=True) is query
+
+    def test_servicio_valida_solo_lo_que_cambia(self, servicio_cupos):
+        """Test: actualizar_campos valida el cupo solo si cambia el instructor"""
+        servicio_cupos.añadir(_nuevo_cliente(2))
+        cliente, version = servicio_cupos.buscar_para_editar(Cliente, 2)
+        cliente.nombre = "Editado"
+        assert servicio_cupos.actualizar_campos(cliente, ["nombre"], version=version)
+
+        cliente_1 = servicio_cupos.buscar_por_id(Cliente, 1)
+        cliente_1.instructor_id = 2
+        with pytest.raises(CupoExcedidoError):
+            servicio_cupos.actualizar_campos(cliente_1, ["instructor_id"])
+        assert servicio_cupos.actualizar_campos(cliente_1, []) is False
+
+
+# ========================================
+# TESTS: AJUSTES (CONFIG.JSON)
+# ========================================
+
+@pytest.fixture
+def ruta_ajustes(tmp_path):
+    ruta = tmp_path / "config.json"
+    ruta.write_text(json.dumps({"name": "learnlifting", "version": "1.0.0"}), encoding="utf-8")
+    return ruta
+
+
+def _esperar(condicion, segundos: float = 5.0) -> bool:
+    limite = time.monotonic() + segundos
+    while not condicion() and time.monotonic() < limite:
+        time.sleep(0.01)
+    return condicion()
+
+
+class TestAjustes:
+    """Tests del almacén de ajustes compartido por el tema y los metadatos"""
+
+    def test_cambios_seguidos_son_una_escritura(self, ruta_ajustes, metricas):
+        """Test: Varios cambios dentro de la demora se escriben juntos, fuera del hilo que llama"""
+        ajustes = AlmacenAjustes(str(ruta_ajustes), demora_s=0.05, metricas=metricas)
+        for color in ("indigo", "blue", "teal", "green", "pink"):
+            ajustes.actualizar(color=color)
+        assert json.loads(ruta_ajustes.read_text(encoding="utf-8")).get("color") is None  # Todavía no tocó el disco
+        assert _esperar(lambda: metricas.snapshot()["contadores"].get("ajustes_escritos") == 1)
+        assert json.loads(ruta_ajustes.read_text(encoding="utf-8")) == {"name": "learnlifting", "version": "1.0.0", "color": "pink"}
+        ajustes.cerrar()
+
+    def test_sin_cambios_no_escribe(self, ruta_ajustes, metricas):
+        """Test: Volver al valor guardado o repetir el mismo no reescribe el archivo"""
+        ajustes = AlmacenAjustes(str(ruta_ajustes), demora_s=60, metricas=metricas)
+        assert ajustes.actualizar(name="learnlifting", version="1.0.0") is False
+        ajustes.actualizar(mode="light")
+        ajustes.actualizar({"mode": "dark"})
+        ajustes.guardar_ahora()
+        ajustes.actualizar(mode="light")
+        ajustes.actualizar(mode="dark")  # Igual a lo que ya está en el disco
+        ajustes.cerrar()
+        contadores = metricas.snapshot()["contadores"]
+        assert contadores["ajustes_escritos"] == 1
+        assert contadores["ajustes_sin_cambios"] == 1
+
+    def test_dos_escritores_no_se_pisan(self, ruta_ajustes, metricas):
+        """Test: Tema y metadatos escriben claves distintas del mismo archivo sin perder ninguna"""
+        ajustes = AlmacenAjustes(str(ruta_ajustes), demora_s=60, metricas=metricas)
+        ajustes.actualizar(mode="light", color="teal", color_name="Verde\nazulado")
+        ajustes.actualizar(name="learnlifting", version="1.1.0")
+        ajustes.cerrar()
+        assert AlmacenAjustes(str(ruta_ajustes)).todos() == {
+            "name": "learnlifting", "version": "1.1.0", "mode": "light", "color": "teal", "color_name": "Verde\nazulado",
+        }
+
+    def test_escritura_atomica(self, ruta_ajustes, metricas, monkeypatch):
+        """Test: Si la escritura falla a mitad de camino queda el archivo anterior y ningún temporal"""
+        ajustes = AlmacenAjustes(str(ruta_ajustes), demora_s=60, metricas=metricas)
+        ajustes.actualizar(mode="light")
+
+        def falla(*args, **kwargs):
+            raise OSError("disco lleno")
+
+        monkeypatch.setattr("infrastructure.ajustes.os.replace", falla)
+        with pytest.raises(OSError):
+            ajustes.guardar_ahora()
+        assert json.loads(ruta_ajustes.read_text(encoding="utf-8")) == {"name": "learnlifting", "version": "1.0.0"}
+        assert sorted(p.name for p in ruta_ajustes.parent.iterdir()) == ["config.json"]
+
+        monkeypatch.undo()
+        ajustes.cerrar()
+        assert json.loads(ruta_ajustes.read_text(encoding="utf-8"))["mode"] == "light"
+
+    def test_archivo_danado(self, tmp_path):
+        """Test: Un config.json ilegible no impide arrancar: se usan los valores por defecto"""
+        ruta = tmp_path / "config.json"
+        ruta.write_text("{no es json", encoding="utf-8")
+        ajustes = AlmacenAjustes(str(ruta))
+        assert ajustes.obtener("mode", "dark") == "dark"
+
+
+# ========================================
+# TESTS: VARIAS SESIONES (MODO WEB)
+# ========================================
+
+@pytest.fixture
+def servicio_compartido(servicio_concurrente, db, metricas):
+    """Un solo servicio para todas las sesiones, como en main.py: caché de catálogos y vigilante de cambios"""
+    vigilante = VigilanteCambios(db, intervalo_s=0.01, maximo=10_000)
+    servicio = GymService(servicio_concurrente.repositorio, cambios=vigilante, catalogos=CacheCatalogos(metricas))
+    yield servicio
+    vigilante.detener()
+
+
+def _contador(metricas, nombre: str) -> int:
+    return metricas.snapshot()["contadores"].get(nombre, 0)
+
+
+class TestSesiones:
+    """Tests del servicio compartido por varias sesiones: caché de catálogos y un oyente de cambios por sesión"""
+
+    def test_una_carga_para_todas_las_sesiones(self, servicio_compartido, metricas):
+        """Test: 16 sesiones que abren la tabla a la vez leen instructores y cupos de la base una sola vez"""
+        barrera = threading.Barrier(16)
+
+        def abrir_tabla(_):
+            barrera.wait()
+            return len(servicio_compartido.buscar_todos(Instructor)), len(servicio_compartido.cargas_instructores())
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            assert set(pool.map(abrir_tabla, range(16))) == {(2, 2)}
+        assert _contador(metricas, "catalogos_cargas.instructor") == 1
+        assert _contador(metricas, "catalogos_cargas.cargas") == 1
+        assert _contador(metricas, "catalogos_aciertos") == 30
+
+    def test_las_escrituras_invalidan_los_catalogos(self, servicio_compartido):
+        """Test: Después de un alta, una edición o una baja las sesiones leen los catálogos nuevos"""
+        servicio = servicio_compartido
+        assert len(servicio.buscar_todos(Instructor)) == 2
+        assert sorted(c.clientes for c in servicio.cargas_instructores()) == [50, 50]
+
+        servicio.añadir(Instructor(id=0, nombre="Luz", apellido="Díaz", cupo=10))
+        servicio.añadir(Cliente(
+            id=0, nombre="Nuevo", apellido="Y", fecha_inicio_rutina="2026-01-01",
+            fecha_fin_rutina="2026-02-01", instructor_id=3, rutina_id=1,
+        ))
+        assert [i.nombre for i in servicio.buscar_todos(Instructor)] == ["Juan", "Ana", "Luz"]
+        assert sorted(c.clientes for c in servicio.cargas_instructores()) == [1, 50, 50]
+        assert servicio.proponer_instructor().instructor_id == 3
+
+        rutina = servicio.buscar_todos(Rutina)[1]
+        servicio.actualizar_campos(replace(rutina, nombre="Renombrada"), ["nombre"])
+        assert servicio.buscar_todos(Rutina)[1].nombre == "Renombrada"
+        servicio.eliminar(rutina)
+        assert rutina.id not in {r.id for r in servicio.buscar_todos(Rutina)}
+
+    def test_carga_vieja_no_se_guarda(self, metricas):
+        """Test: Si la clave se invalida mientras se carga, ese valor no queda en la caché"""
+        cache = CacheCatalogos(metricas)
+
+        def cargar_mientras_otro_escribe():
+            cache.invalidar("rutina")  # Otra sesión guardó justo ahora
+            return ["vieja"]
+
+        assert cache.obtener("rutina", cargar_mientras_otro_escribe) == ["vieja"]
+        assert cache.obtener("rutina", lambda: ["nueva"]) == ["nueva"]
+        assert cache.obtener("rutina", lambda: ["otra"]) == ["nueva"]
+        assert _contador(metricas, "catalogos_cargas.rutina") == 2
+
+    def test_cambios_de_otra_estacion_invalidan_antes_del_aviso(self, servicio_compartido, db):
+        """Test: Cuando la sesión recibe el aviso de otra estación, el catálogo ya trae el cambio"""
+        servicio = servicio_compartido
+        assert len(servicio.buscar_todos(Rutina)) == 51
+        vistos = []
+        avisado = threading.Event()
+        servicio.observar_cambios(lambda cambios: vistos.append(len(servicio.buscar_todos(Rutina))) or avisado.set())
+
+        _otra_estacion(db, "insert into rutina (nombre, pdf_link) values ('Espalda', '')")
+        assert avisado.wait(2)
+        assert vistos == [52]
+
+    def test_un_oyente_por_sesion(self, servicio_compartido, db):
+        """Test: Cada sesión recibe los avisos; una que falla no se los quita a las demás y al cerrarse deja de recibirlos"""
+        servicio = servicio_compartido
+        recibidos = {"cerrada": 0, "abierta": 0}
+        avisado = threading.Event()
+
+        def sesion_cerrada(cambios):
+            recibidos["cerrada"] += 1
+            raise RuntimeError("la página ya no existe")
+
+        def sesion_abierta(cambios):
+            recibidos["abierta"] += 1
+            avisado.set()
+
+        servicio.observar_cambios(sesion_cerrada)
+        servicio.observar_cambios(sesion_abierta)
+        servicio.observar_cambios(sesion_abierta)  # Volver a suscribirse no duplica los avisos
+        _otra_estacion(db, "update cliente set nombre = 'Uno' where id = 1")
+        assert avisado.wait(2)
+        assert recibidos == {"cerrada": 1, "abierta": 1}
+
+        servicio.dejar_de_observar(sesion_cerrada)
+        avisado.clear()
+        _otra_estacion(db, "update cliente set nombre = 'Dos' where id = 1")
+        assert avisado.wait(2)
+        assert recibidos == {"cerrada": 1, "abierta": 2}
+
+    def test_carga_de_varias_sesiones(self, servicio_compartido, metricas):
+        """Test (carga): 8 sesiones abren la tabla y editan sus clientes 25 veces cada una a la vez.
+        No hay errores ni conflictos, ninguna edición se pierde, los catálogos se leen una vez
+        y cada sesión se entera de las ediciones de todas las demás."""
+        servicio = servicio_compartido
+        sesiones, vueltas = 8, 25
+        vistos = [set() for _ in range(sesiones)]
+        for n in range(sesiones):
+            servicio.observar_cambios(lambda cambios, n=n: vistos[n].update(cambios.ids.get("cliente", ())))
+
+        def sesion(n):
+            propios = [n * 12 + k + 1 for k in range(12)]  # Clientes que edita esta recepción
+            for vuelta in range(vueltas):
+                # Abrir la tabla de clientes: los registros y los catálogos para el formulario
+                assert len(servicio.buscar_todos(Cliente)) == 100
+                assert len(servicio.buscar_todos(Instructor)) == 2
+                assert len(servicio.buscar_todos(Rutina)) == 51
+                servicio.cargas_instructores()
+                servicio.proponer_instructor()
+                # Editar un cliente con la versión leída al abrir el formulario
+                cliente, version = servicio.buscar_para_editar(Cliente, propios[vuelta % 12])
+                servicio.actualizar_campos(replace(cliente, ciclo_rutina=vuelta % 3 + 1), ["ciclo_rutina"], version=version)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sesiones) as pool:
+            errores = [f.exception() for f in [pool.submit(sesion, n) for n in range(sesiones)] if f.exception() is not None]
+        duracion = time.perf_counter() - inicio
+        assert errores == []
+        assert duracion < 30
+
+        editados = {n * 12 + k + 1 for n in range(sesiones) for k in range(12)}
+        for cliente_id in editados:
+            # La última vuelta que tocó a cada cliente es la que quedó guardada
+            n, k = divmod(cliente_id - 1, 12)
+            ultima = max(v for v in range(vueltas) if v % 12 == k)
+            assert servicio.buscar_por_id(Cliente, cliente_id).ciclo_rutina == ultima % 3 + 1
+        assert _contador(metricas, "catalogos_cargas.instructor") == 1
+        assert _contador(metricas, "catalogos_cargas.rutina") == 1
+        assert _contador(metricas, "conflictos_edicion") == 0
+        assert _esperar(lambda: all(v >= editados for v in vistos))
+
+
+# ========================================
+# TESTS: API HTTP LOCAL
+# ========================================
+
+@pytest.fixture
+def api(servicio_concurrente, db, metricas):
+    """Servidor de la API en un puerto libre (bucle propio en otro hilo) con el check-in en lotes"""
+    escritor = EscritorAsistencias(db, intervalo_s=0.01)
+    servicio = GymService(servicio_concurrente.repositorio, registro_asistencias=escritor)
+    servidor = ServidorAPI(servicio, puerto=0, hilos=2, metricas=metricas)
+    bucle = asyncio.new_event_loop()
+    bucle.run_until_complete(servidor.iniciar())
+    hilo = threading.Thread(target=bucle.run_forever, daemon=True)
+    hilo.start()
+    yield servidor, escritor
+    asyncio.run_coroutine_threadsafe(servidor.detener(), bucle).result(5)
+    bucle.call_soon_threadsafe(bucle.stop)
+    hilo.join(5)
+    bucle.close()
+    escritor.cerrar()
+
+
+def _pedir(servidor, metodo: str, ruta: str, cuerpo=None, cabeceras=None, conexion=None):
+    """(estado, cabeceras, JSON o None). Reutiliza 'conexion' si se pasa (keep-alive)."""
+    conexion = conexion or http.client.HTTPConnection("127.0.0.1", servidor.puerto, timeout=5)
+    conexion.request(metodo, ruta, body=None if cuerpo is None else json.dumps(cuerpo), headers=cabeceras or {})
+    respuesta = conexion.getresponse()
+    datos = respuesta.read()
+    return respuesta.status, respuesta, json.loads(datos) if datos else None
+
+
+class TestAPI:
+    """Tests de la API HTTP contra un servidor real: paginado, caché con ETag, errores y check-in"""
+
+    def test_pagina_del_repositorio_por_rango_de_id(self, servicio_concurrente):
+        """Test: get_pagina trae hasta 'limite' filas después del cursor y listar_pagina indica si hay más"""
+        repo = servicio_concurrente.repositorio
+        assert [c.id for c in repo.get_pagina(Cliente, despues_de=95, limite=10)] == [96, 97, 98, 99, 100]
+
+        pagina = servicio_concurrente.listar_pagina(Cliente, despues_de=0, limite=40)
+        assert (len(pagina.registros), pagina.siguiente) == (40, 40)
+        ultima = servicio_concurrente.listar_pagina(Cliente, despues_de=80, limite=20)
+        assert ([c.id for c in ultima.registros][-1], ultima.siguiente) == (100, None)
+        with pytest.raises(NegocioError):
+            servicio_concurrente.listar_pagina(Cliente, limite=0)
+
+    def test_recorrer_todas_las_paginas_por_cursor(self, api):
+        """Test: Siguiendo 'siguiente' con una sola conexión keep-alive se ven todos los clientes una vez"""
+        servidor, _ = api
+        conexion = http.client.HTTPConnection("127.0.0.1", servidor.puerto, timeout=5)
+        vistos, despues_de = [], 0
+        while despues_de is not None:
+            estado, _, datos = _pedir(servidor, "GET", f"/clientes?despues_de={despues_de}&limite=30", conexion=conexion)
+            assert estado == 200
+            vistos += [c["id"] for c in datos["datos"]]
+            despues_de = datos["siguiente"]
+        assert vistos == list(range(1, 101))
+
+        estado, _, cliente = _pedir(servidor, "GET", "/clientes/7", conexion=conexion)
+        assert (estado, cliente["nombre"], cliente["fecha_fin_rutina"]) == (200, "Cliente 6", "2026-02-01")
+
+    def test_etag_responde_304_sin_cuerpo(self, api, servicio_concurrente, metricas):
+        """Test: Con el mismo If-None-Match se responde 304; cuando la lista cambia, 200 con otro ETag"""
+        servidor, _ = api
+        estado, respuesta, datos = _pedir(servidor, "GET", "/rutinas?limite=100")
+        etag = respuesta.getheader("ETag")
+        assert (estado, len(datos["datos"]), respuesta.getheader("Cache-Control")) == (200, 51, "no-cache")
+
+        estado, respuesta, datos = _pedir(servidor, "GET", "/rutinas?limite=100", cabeceras={"If-None-Match": etag})
+        assert (estado, datos, respuesta.getheader("ETag")) == (304, None, etag)
+
+        servicio_concurrente.añadir(Rutina(id=0, nombre="Nueva", pdf_link=""))
+        estado, respuesta, datos = _pedir(servidor, "GET", "/rutinas?limite=100", cabeceras={"If-None-Match": etag})
+        assert (estado, len(datos["datos"])) == (200, 52)
+        assert respuesta.getheader("ETag") != etag
+        assert _contador(metricas, "api_respuestas.304") == 1
+
+    def test_errores_como_json(self, api):
+        """Test: Parámetros inválidos 400, inexistentes 404, método 405 y regla de negocio 422, siempre con {"error"}"""
+        servidor, _ = api
+        casos = [
+            ("GET", "/clientes?limite=abc", None, 400),
+            ("GET", "/clientes/999", None, 404),
+            ("GET", "/pagos", None, 404),
+            ("DELETE", "/clientes/1", None, 405),
+            ("GET", "/clientes?limite=100000", None, 422),
+            ("POST", "/asistencias", {"cliente": 1}, 400),
+            # Enteros fuera del rango de SQLite (OverflowError al consultar)
+            ("GET", f"/clientes?despues_de={2**63}", None, 400),
+            ("GET", f"/vencimientos?dias={-2**64}", None, 400),
+            ("GET", f"/clientes/{2**63}", None, 404),
+            ("GET", f"/clientes/{'9' * 5000}", None, 404),
+            ("POST", "/asistencias", {"cliente_id": 2**63}, 404),
+        ]
+        for metodo, ruta, cuerpo, esperado in casos:
+            estado, _, datos = _pedir(servidor, metodo, ruta, cuerpo)
+            assert estado == esperado, ruta
+            assert datos["error"]
+
+    def test_checkin_desde_el_kiosco(self, api, db):
+        """Test: POST /asistencias responde 202 y la asistencia queda guardada; un cliente inexistente da 404"""
+        servidor, escritor = api
+        estado, _, datos = _pedir(servidor, "POST", "/asistencias", {"cliente_id": 5})
+        assert (estado, datos["cliente_id"]) == (202, 5)
+        estado, _, _ = _pedir(servidor, "POST", "/asistencias", {"cliente_id": 5000})
+        assert estado == 404
+
+        assert escritor.flush(5)
+        with db.get_connection(solo_lectura=True) as conn:
+            assert [tuple(f) for f in conn.execute("select cliente_id from asistencia")] == [(5,)]
+
+    def test_saturado_responde_503(self, api, monkeypatch):
+        """Test: Con todos los cupos ocupados se responde 503 con Retry-After en vez de encolar"""
+        servidor, _ = api
+        monkeypatch.setattr(servidor, "max_pendientes", 0)
+        estado, respuesta, datos = _pedir(servidor, "GET", "/salud")
+        assert (estado, respuesta.getheader("Retry-After")) == (503, "1")
+
+        monkeypatch.setattr(servidor, "max_pendientes", 64)
+        assert _pedir(servidor, "GET", "/salud")[0] == 200
+
+    def test_muchos_kioscos_a_la_vez(self, api, metricas):
+        """Test: 16 clientes concurrentes con 2 hilos de base reciben todas sus páginas sin errores"""
+        servidor, _ = api
+
+        def kiosco(n):
+            conexion = http.client.HTTPConnection("127.0.0.1", servidor.puerto, timeout=10)
+            return [_pedir(servidor, "GET", f"/clientes?despues_de={(n + i) % 100}&limite=10", conexion=conexion)[0] for i in range(20)]
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            estados = [e for lista in pool.map(kiosco, range(16)) for e in lista]
+        assert estados == [200] * 320
+        assert _contador(metricas, "api_respuestas.200") == 320